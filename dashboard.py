@@ -128,6 +128,7 @@ from src.services.symbol_discovery import SymbolDiscovery
 from src.services.iol_availability_checker import IOLAvailabilityChecker
 from src.services.training_monitor import TrainingMonitor
 from src.services.data_collector import DataCollector
+from src.services.dashboard_data import DashboardDataService, file_signature, operations_in_window, read_json
 # Path ya está importado arriba
 
 # Page config
@@ -894,6 +895,41 @@ def get_services():
         'multi_market': MultiMarketClient()
     }
 
+# Read model del dashboard: vistas pre-agregadas que un thread mantiene al día
+@st.cache_resource
+def get_dashboard_data():
+    data = DashboardDataService()
+    data.start()
+    return data
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_view(name: str, version: int) -> dict:
+    """Vista cacheada por versión: cambia de clave solo cuando el archivo cambió"""
+    return get_dashboard_data().view(name)
+
+def dashboard_view(name: str) -> dict:
+    data = get_dashboard_data()
+    return load_view(name, data.version(name))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _load_json_file(path: str, signature: tuple):
+    return read_json(path)
+
+def read_json_file(path, default=None):
+    """JSON de configuración/historial cacheado por (mtime, tamaño) del archivo"""
+    signature = file_signature(path)
+    if signature is None:
+        return default
+    data = _load_json_file(str(path), signature)
+    return default if data is None else data
+
+def read_config_file(path):
+    """Config a editar: {} si no existe, None si existe pero no se pudo leer (no hay que guardar encima)"""
+    if file_signature(path) is None:
+        return {}
+    config = read_json_file(path)
+    return config if isinstance(config, dict) else None
+
 # Initialize IOL Client in Session State - Conexión automática
 def initialize_iol_client():
     """Inicializa o reconecta el cliente IOL automáticamente"""
@@ -932,6 +968,7 @@ if 'iol_connection_error' in st.session_state:
         if 'iol_connection_error' in st.session_state:
             del st.session_state.iol_connection_error
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_monitored_symbols():
     """Fetch unique symbols from database (trading_bot.db)"""
     try:
@@ -1349,22 +1386,10 @@ if page == "🏠 Inicio":
     
     # Estado del Monitoreo
     bot_running_home, _ = check_bot_status()
-    operations_file = Path("data/operations_log.json")
-    has_recent_operations = False
-    recent_ops_count = 0
-    if operations_file.exists():
-        try:
-            with open(operations_file, 'r', encoding='utf-8') as f:
-                all_ops = json.load(f)
-                if all_ops:
-                    # Verificar si hay operaciones en las últimas 24 horas
-                    from datetime import timedelta
-                    cutoff = datetime.now() - timedelta(hours=24)
-                    recent_ops = [op for op in all_ops if datetime.fromisoformat(op.get('timestamp', '')) >= cutoff]
-                    recent_ops_count = len(recent_ops)
-                    has_recent_operations = recent_ops_count > 0
-        except:
-            pass
+    operations_view = dashboard_view('operations')
+    # Verificar si hay operaciones en las últimas 24 horas
+    recent_ops_count = len(operations_in_window(operations_view['operations'], 24))
+    has_recent_operations = recent_ops_count > 0
     
     # Mostrar estado del monitoreo
     if bot_running_home:
@@ -1475,24 +1500,12 @@ if page == "🏠 Inicio":
         """, unsafe_allow_html=True)
     
     # Load trades for enhanced metrics
-    trades_pnl = 0
-    total_trades = 0
-    wins = 0
-    losses = 0
-    win_rate = 0.0
-    
-    if os.path.exists('trades.json'):
-        try:
-            with open('trades.json', 'r', encoding='utf-8') as f:
-                trades = json.load(f)
-                total_trades = len(trades)
-                closed_trades = [t for t in trades if t.get('pnl') is not None]
-                trades_pnl = sum(t.get('pnl', 0) for t in closed_trades)
-                wins = len([t for t in closed_trades if t.get('pnl', 0) > 0])
-                losses = len([t for t in closed_trades if t.get('pnl', 0) < 0])
-                win_rate = (wins / len(closed_trades) * 100) if closed_trades else 0.0
-        except Exception:
-            pass
+    trades_summary = dashboard_view('trades')['summary']
+    trades_pnl = trades_summary['pnl']
+    total_trades = trades_summary['total_trades']
+    wins = trades_summary['wins']
+    losses = trades_summary['losses']
+    win_rate = trades_summary['win_rate']
     
     # Métricas mejoradas en tiempo real
     st.markdown("---")
@@ -1542,18 +1555,7 @@ if page == "🏠 Inicio":
     
     with col5:
         # Contar operaciones de hoy
-        today_ops = 0
-        if operations_file.exists():
-            try:
-                with open(operations_file, 'r', encoding='utf-8') as f:
-                    all_ops = json.load(f)
-                    today = datetime.now().date()
-                    today_ops = len([
-                        op for op in all_ops
-                        if datetime.fromisoformat(op.get('timestamp', '')).date() == today
-                    ])
-            except:
-                pass
+        today_ops = operations_view['by_day'].get(datetime.now().date().isoformat(), 0)
         
         st.markdown(f"""
         <div class="metric-card fade-in">
@@ -1596,16 +1598,8 @@ if page == "🏠 Inicio":
     st.markdown("---")
     st.subheader("⚡ Operaciones Recientes")
     
-    operations_file = Path("data/operations_log.json")
-    recent_operations = []
-    if operations_file.exists():
-        try:
-            with open(operations_file, 'r', encoding='utf-8') as f:
-                all_ops = json.load(f)
-                # Últimas 5 operaciones
-                recent_operations = sorted(all_ops, key=lambda x: x['timestamp'], reverse=True)[:5]
-        except:
-            pass
+    # Últimas 5 operaciones
+    recent_operations = operations_view['operations'][:5]
     
     if recent_operations:
         for op in recent_operations:
@@ -1887,6 +1881,7 @@ elif page == "⚡ Terminal de Trading":
                                     try:
                                         with open('trades.json', 'w', encoding='utf-8') as f:
                                             json.dump(trades, f, indent=2, ensure_ascii=False)
+                                        get_dashboard_data().invalidate('trades')
                                         st.info("✅ Operación registrada para aprendizaje futuro.")
                                     except Exception as e:
                                         st.warning(f"⚠️ Operación ejecutada pero no se pudo guardar: {e}")
@@ -1903,19 +1898,16 @@ elif page == "⚡ Terminal de Trading":
                 # Recent manual trades
                 st.markdown("---")
                 st.markdown("### 📜 Últimas Operaciones Manuales")
-                if os.path.exists('trades.json'):
-                    try:
-                        with open('trades.json', 'r', encoding='utf-8') as f:
-                            all_trades = json.load(f)
-                            manual_trades = [t for t in all_trades if t.get('strategy') == 'Manual_Direct']
-                            if manual_trades:
-                                df_manual = pd.DataFrame(manual_trades[-10:])  # Last 10
-                                if not df_manual.empty:
-                                    st.dataframe(df_manual[['timestamp', 'symbol', 'action', 'quantity', 'price']], use_container_width=True)
-                            else:
-                                st.info("Aún no hay operaciones manuales registradas")
-                    except Exception as e:
-                        st.warning(f"No se pudieron cargar operaciones: {e}")
+                try:
+                    manual_trades = dashboard_view('trades')['manual_trades']  # Last 10
+                    if manual_trades:
+                        df_manual = pd.DataFrame(manual_trades)
+                        if not df_manual.empty:
+                            st.dataframe(df_manual[['timestamp', 'symbol', 'action', 'quantity', 'price']], use_container_width=True)
+                    else:
+                        st.info("Aún no hay operaciones manuales registradas")
+                except Exception as e:
+                    st.warning(f"No se pudieron cargar operaciones: {e}")
                 
             except Exception as e:
                 st.error(f"Error conectando con IOL: {e}")
@@ -2034,6 +2026,7 @@ elif page == "⚡ Terminal de Trading":
                                                             json.dump(trades, f, indent=2, ensure_ascii=False)
                                                     except Exception as e:
                                                         st.error(f"Error guardando trade: {e}")
+                                                    get_dashboard_data().invalidate('trades')
                                                     
                                                     st.info("✅ Operación registrada para aprendizaje futuro.")
                                                     
@@ -2380,23 +2373,12 @@ elif page == "⚡ Terminal de Trading":
         with col_control2:
             st.markdown("### 📊 Estadísticas del Bot")
             if os.path.exists('trades.json'):
-                try:
-                    with open('trades.json', 'r', encoding='utf-8') as f:
-                        all_trades = json.load(f)
-                        bot_trades = [t for t in all_trades if t.get('mode') == 'LIVE' or t.get('mode') == 'PAPER']
-                        total_trades = len(bot_trades)
-                        sales_with_pnl = [t for t in bot_trades if t.get('signal') == 'SELL' and t.get('pnl') is not None]
-                        total_pnl = sum(t.get('pnl', 0) for t in sales_with_pnl)
-                        wins = len([t for t in sales_with_pnl if t.get('pnl', 0) > 0])
-                        losses = len([t for t in sales_with_pnl if t.get('pnl', 0) < 0])
-                        win_rate = (wins / len(sales_with_pnl) * 100) if sales_with_pnl else 0
-                        
-                        st.metric("Total Operaciones", total_trades)
-                        st.metric("Ventas con P&L", len(sales_with_pnl))
-                        st.metric("P&L Total", f"${total_pnl:,.2f}", delta=f"{total_pnl:+,.2f}")
-                        st.metric("Win Rate", f"{win_rate:.1f}%", delta=f"{wins}W/{losses}L")
-                except:
-                    st.info("No hay datos de operaciones aún")
+                bot_stats = dashboard_view('trades')['bot']
+                total_pnl = bot_stats['pnl']
+                st.metric("Total Operaciones", bot_stats['total_trades'])
+                st.metric("Ventas con P&L", bot_stats['sales_with_pnl'])
+                st.metric("P&L Total", f"${total_pnl:,.2f}", delta=f"{total_pnl:+,.2f}")
+                st.metric("Win Rate", f"{bot_stats['win_rate']:.1f}%", delta=f"{bot_stats['wins']}W/{bot_stats['losses']}L")
             else:
                 st.info("No hay operaciones registradas")
         
@@ -2425,21 +2407,13 @@ elif page == "⚡ Terminal de Trading":
         with trade_tabs[0]:
             if os.path.exists('trades.json'):
                 try:
-                    with open('trades.json', 'r', encoding='utf-8') as f:
-                        trades_data = f.read()
-                        if trades_data.strip():
-                            trades = json.loads(trades_data)
-                        else:
-                            trades = []
+                    trades_view = dashboard_view('trades')
                     
-                    if trades and len(trades) > 0:
-                        bot_trades = [t for t in trades if t.get('mode') in ['LIVE', 'PAPER'] or 'signal' in t]
+                    if trades_view['summary']['total_trades'] > 0:
+                        bot_trades = trades_view['recent_bot_trades']  # Ya ordenados, más recientes primero
                         if bot_trades:
                             df_trades = pd.DataFrame(bot_trades)
                             if not df_trades.empty:
-                                if 'timestamp' in df_trades.columns:
-                                    df_trades = df_trades.sort_values('timestamp', ascending=False)
-                                
                                 # Seleccionar columnas relevantes
                                 display_cols = ['timestamp', 'symbol', 'signal', 'quantity', 'price', 'status']
                                 if 'pnl' in df_trades.columns:
@@ -2457,8 +2431,6 @@ elif page == "⚡ Terminal de Trading":
                             st.info("No hay operaciones del bot registradas")
                     else:
                         st.info("No hay trades registrados")
-                except json.JSONDecodeError as e:
-                    st.error(f"Error parseando JSON: {e}")
                 except Exception as e:
                     st.error(f"Error cargando trades: {e}")
             else:
@@ -2470,10 +2442,7 @@ elif page == "⚡ Terminal de Trading":
             
             if os.path.exists('trades.json'):
                 try:
-                    with open('trades.json', 'r', encoding='utf-8') as f:
-                        trades = json.load(f)
-                    
-                    sales_with_pnl = [t for t in trades if t.get('signal') == 'SELL' and t.get('pnl') is not None]
+                    sales_with_pnl = dashboard_view('trades')['sales_with_pnl']
                     
                     if sales_with_pnl:
                         df_sales = pd.DataFrame(sales_with_pnl)
@@ -2518,18 +2487,12 @@ elif page == "⚡ Terminal de Trading":
             
             if os.path.exists('trades.json'):
                 try:
-                    with open('trades.json', 'r', encoding='utf-8') as f:
-                        trades = json.load(f)
-                    
-                    bot_trades = [t for t in trades if t.get('mode') in ['LIVE', 'PAPER']]
-                    sales_with_pnl = [t for t in bot_trades if t.get('signal') == 'SELL' and t.get('pnl') is not None]
+                    pnl_series = dashboard_view('trades')['pnl_series']
                     
-                    if sales_with_pnl:
-                        # Gráfico de P&L acumulado
-                        df_perf = pd.DataFrame(sales_with_pnl)
+                    if pnl_series:
+                        # Gráfico de P&L acumulado (serie pre-agregada por el read model)
+                        df_perf = pd.DataFrame(pnl_series)
                         df_perf['timestamp'] = pd.to_datetime(df_perf['timestamp'])
-                        df_perf = df_perf.sort_values('timestamp')
-                        df_perf['pnl_cumulative'] = df_perf['pnl'].cumsum()
                         
                         fig = px.line(df_perf, x='timestamp', y='pnl_cumulative', 
                                      title='P&L Acumulado del Bot',
@@ -2566,11 +2529,8 @@ elif page == "⚡ Terminal de Trading":
         trades_file = Path("trades.json")
         if trades_file.exists():
             try:
-                with open(trades_file, 'r', encoding='utf-8') as f:
-                    trades = json.load(f)
-                
-                # Filtrar solo trades en modo Paper Trading
-                paper_trades = [t for t in trades if t.get('paper_trading', False)]
+                # Solo trades en modo Paper Trading
+                paper_trades = dashboard_view('trades')['paper_trades']
                 
                 if paper_trades:
                     st.markdown("### 📊 Trades Simulados Recientes")
@@ -2603,22 +2563,13 @@ elif page == "📊 Operaciones en Tiempo Real":
     
     # Verificar estado del bot y monitoreo
     bot_running_ops, _ = check_bot_status()
-    operations_file = Path("data/operations_log.json")
-    operations = []
-    if operations_file.exists():
-        try:
-            with open(operations_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        except:
-            pass
+    operations = dashboard_view('operations')['operations']  # Más recientes primero
     
     # Determinar estado del monitoreo
     if bot_running_ops:
         if operations:
             # Verificar si hay operaciones recientes (últimas 24 horas)
-            from datetime import timedelta
-            cutoff = datetime.now() - timedelta(hours=24)
-            recent_ops = [op for op in operations if datetime.fromisoformat(op.get('timestamp', '')) >= cutoff]
+            recent_ops = operations_in_window(operations, 24)
             if recent_ops:
                 monitoring_status = "ACTIVO"
                 monitoring_desc = f"✅ Bot ejecutando análisis | 📊 {len(recent_ops)} operaciones en las últimas 24h"
@@ -2673,23 +2624,11 @@ elif page == "📊 Operaciones en Tiempo Real":
         if auto_refresh:
             refresh_interval = st.selectbox("Intervalo (segundos)", [5, 10, 30, 60], index=1)
     
-    # Auto-refresh mejorado usando st.rerun con time.sleep
     if auto_refresh:
-        import time
-        placeholder = st.empty()
-        with placeholder.container():
-            st.info(f"🔄 Actualizando automáticamente cada {refresh_interval} segundos...")
-        time.sleep(refresh_interval)
-        st.rerun()
+        st.info(f"🔄 Actualizando automáticamente cada {refresh_interval} segundos...")
     
-    # Filtrar operaciones
-    from datetime import timedelta
-    cutoff = datetime.now() - timedelta(hours=hours_filter)
-    filtered_ops = [
-        op for op in operations
-        if datetime.fromisoformat(op['timestamp']) >= cutoff and
-        (operation_type == "Todas" or op['type'] == operation_type)
-    ]
+    # Filtrar operaciones (la lista ya viene ordenada: se corta al salir de la ventana)
+    filtered_ops = operations_in_window(operations, hours_filter, operation_type)
     
     # Estadísticas
     st.markdown("### 📈 Estadísticas")
@@ -2713,9 +2652,6 @@ elif page == "📊 Operaciones en Tiempo Real":
     if not filtered_ops:
         st.info("No hay operaciones en el período seleccionado")
     else:
-        # Ordenar por timestamp (más recientes primero)
-        filtered_ops.sort(key=lambda x: x['timestamp'], reverse=True)
-        
         for op in filtered_ops[:50]:  # Mostrar últimas 50
             op_time = datetime.fromisoformat(op['timestamp'])
             op_type = op['type']
@@ -2773,6 +2709,11 @@ elif page == "📊 Operaciones en Tiempo Real":
                             st.write("**Factores de Venta:**")
                             for factor in sell_factors:
                                 st.write(f"  • {factor}")
+    
+    # Auto-refresh al final de la página: primero se renderiza el contenido
+    if auto_refresh:
+        time.sleep(refresh_interval)
+        st.rerun()
 
 # ==================== PAGE: APRENDIZAJE CONTINUO ====================
 elif page == "🧠 Aprendizaje Continuo":
@@ -3179,13 +3120,12 @@ elif page == "💼 Gestión de Activos":
         import json
         # Cargar configuración actual
         config_file = "professional_config.json"
-        current_config = {}
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    current_config = json.load(f)
-            except Exception as e:
-                st.error(f"Error cargando configuración: {e}")
+        current_config = read_config_file(config_file)
+        config_unreadable = current_config is None
+        if config_unreadable:
+            # Guardar sobre {} borraría el resto de la configuración
+            st.error("❌ No se pudo leer professional_config.json (¿se está escribiendo?). Recarga la página antes de guardar.")
+            current_config = {}
         
         monitoring_config = current_config.get('monitoring', {})
         use_portfolio = monitoring_config.get('use_portfolio_symbols', True)
@@ -3270,7 +3210,7 @@ elif page == "💼 Gestión de Activos":
         
         # Botón para guardar configuración
         st.markdown("---")
-        if st.button("💾 Guardar Configuración", type="primary"):
+        if st.button("💾 Guardar Configuración", type="primary", disabled=config_unreadable):
             # Actualizar configuración
             if 'monitoring' not in current_config:
                 current_config['monitoring'] = {}
@@ -4261,8 +4201,12 @@ elif page == "⚙️ Sistema & Configuración":
         # Load/Save config logic
         config_file = "professional_config.json"
         if os.path.exists(config_file):
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = read_config_file(config_file)
+            config_unreadable = config is None
+            if config_unreadable:
+                # Guardar sobre {} borraría el resto de la configuración
+                st.error("❌ No se pudo leer professional_config.json (¿se está escribiendo?). Recarga la página antes de guardar.")
+                config = {}
             
             # Modo de configuración: Manual o Automático
             st.markdown("### ⚙️ Modo de Configuración")
@@ -4413,7 +4357,8 @@ elif page == "⚙️ Sistema & Configuración":
             st.markdown("---")
             
             # Botón de guardar
-            if st.button("💾 Guardar Todas las Configuraciones", type="primary", use_container_width=True):
+            if st.button("💾 Guardar Todas las Configuraciones", type="primary", use_container_width=True,
+                         disabled=config_unreadable):
                 config['risk_per_trade'] = new_risk
                 config['max_position_size_pct'] = max_position
                 config['max_daily_loss_pct'] = max_daily_loss
@@ -4445,8 +4390,7 @@ elif page == "⚙️ Sistema & Configuración":
         try:
             config_file = "professional_config.json"
             if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                config = read_json_file(config_file, default={})
                 
                 col_status1, col_status2 = st.columns(2)
                 
@@ -4480,8 +4424,7 @@ elif page == "⚙️ Sistema & Configuración":
         sentiment_file = Path("data/sentiment_history.json")
         if sentiment_file.exists():
             try:
-                with open(sentiment_file, 'r', encoding='utf-8') as f:
-                    sentiment_history = json.load(f)
+                sentiment_history = read_json_file(sentiment_file, default=[])
                 
                 if sentiment_history:
                     # Últimos análisis
@@ -84,12 +84,10 @@ else:
 print()
 
 # 4. Verificar operaciones recientes
-ops_file = Path("data/operations_log.json")
-if ops_file.exists():
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+if DEFAULT_LOG_DIR.exists():
     try:
-        import json
-        with open(ops_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
+        operations = get_operations_log().tail(1)
         if operations:
             last_op = operations[-1]
             last_time = datetime.fromisoformat(last_op.get('timestamp', ''))
@@ -103,7 +101,7 @@ if ops_file.exists():
     except Exception as e:
         print(f"⚠️  Error leyendo operaciones: {e}")
 else:
-    print("⚠️  No hay archivo operations_log.json")
+    print("⚠️  No hay log de operaciones (data/operations_log/)")
 
 print()
 
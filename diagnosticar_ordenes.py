@@ -115,26 +115,22 @@ print()
 # 4. Verificar operaciones recientes
 print("4️⃣ VERIFICAR OPERACIONES RECIENTES")
 print("-"*60)
-ops_file = Path("data/operations_log.json")
-if ops_file.exists():
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+if DEFAULT_LOG_DIR.exists():
     try:
-        import json
-        with open(ops_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
-        
-        # Filtrar análisis recientes con señales BUY
+        # Filtrar análisis recientes con señales BUY (últimos 50 análisis del log)
+        operations = get_operations_log().tail(50, types={'ANALYSIS'})
         recent_buy_signals = []
-        for op in operations[-50:]:  # Últimas 50 operaciones
-            if op.get('type') == 'ANALYSIS':
-                data = op.get('data', {})
-                signal = data.get('final_signal', 'HOLD')
-                if signal == 'BUY':
-                    recent_buy_signals.append({
-                        'symbol': data.get('symbol', 'N/A'),
-                        'timestamp': op.get('timestamp', ''),
-                        'score': data.get('score', 0),
-                        'filter_reason': data.get('filter_reason', 'N/A')
-                    })
+        for op in operations:
+            data = op.get('data', {})
+            signal = data.get('final_signal', 'HOLD')
+            if signal == 'BUY':
+                recent_buy_signals.append({
+                    'symbol': data.get('symbol', 'N/A'),
+                    'timestamp': op.get('timestamp', ''),
+                    'score': data.get('score', 0),
+                    'filter_reason': data.get('filter_reason', 'N/A')
+                })
         
         if recent_buy_signals:
             print(f"   ✅ Se encontraron {len(recent_buy_signals)} señales BUY recientes:")
@@ -148,7 +144,7 @@ if ops_file.exists():
     except Exception as e:
         print(f"   ❌ Error leyendo operaciones: {e}")
 else:
-    print(f"   ⚠️  No hay archivo operations_log.json")
+    print(f"   ⚠️  No hay log de operaciones (data/operations_log/)")
 
 print()
 
@@ -238,7 +234,7 @@ else:
     print("   4. El position_size calculado es 0")
     print()
     print("🔍 Para más detalles:")
-    print("   - Revisa operations_log.json para ver las señales generadas")
+    print("   - Revisa el log de operaciones (data/operations_log/) para ver las señales generadas")
     print("   - Verifica el score mínimo requerido en el código")
     print("   - Revisa los filtros de entrada en professional_config.json")
 
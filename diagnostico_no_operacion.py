@@ -7,6 +7,8 @@ from pathlib import Path
 from datetime import datetime, time
 import os
 
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+
 def verificar_horario_mercado():
     """Verifica si el mercado está abierto según los filtros del bot"""
     print("\n" + "="*70)
@@ -123,21 +125,16 @@ def verificar_scores_recientes():
     print("📊 VERIFICACIÓN DE SCORES RECIENTES")
     print("="*70)
     
-    operations_file = Path("data/operations_log.json")
-    
-    if not operations_file.exists():
-        print("\n⚠️  No se encontró operations_log.json")
+    if not DEFAULT_LOG_DIR.exists():
+        print("\n⚠️  No se encontró el log de operaciones (data/operations_log/)")
         print("   → El bot puede no haber ejecutado análisis aún")
         return
     
     try:
-        with open(operations_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
-        
-        # Filtrar análisis recientes
+        # Últimos análisis con score (leyendo solo el final del log)
         analyses = [
-            op for op in operations 
-            if op.get('type') == 'ANALYSIS' and op.get('data', {}).get('score') is not None
+            op for op in reversed(get_operations_log().tail(100, types={'ANALYSIS'}))
+            if op.get('data', {}).get('score') is not None
         ]
         
         if not analyses:
@@ -145,8 +142,7 @@ def verificar_scores_recientes():
             print("   → El bot puede no haber ejecutado análisis aún")
             return
         
-        # Ordenar por timestamp
-        analyses.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        # Más recientes primero
         recent = analyses[:5]
         
         # Cargar umbrales
@@ -8,14 +8,17 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from src.services.operations_log import OperationsLog, get_operations_log
+
 class OrderMonitor:
     """Monitor de ejecución de órdenes"""
     
-    def __init__(self, trades_file: str = "trades.json", log_file: str = "data/operations_log.json"):
+    def __init__(self, trades_file: str = "trades.json", operations_log: Optional[OperationsLog] = None):
         self.trades_file = Path(trades_file)
-        self.log_file = Path(log_file)
+        self.operations_log = operations_log or get_operations_log()
+        # Cursor sobre el log de operaciones: cada poll lee solo los eventos nuevos
+        self.log_cursor = self.operations_log.cursor()
         self.last_trade_count = 0
-        self.last_log_count = 0
         self.monitored_trades = []
         self.monitored_logs = []
         
@@ -31,18 +34,6 @@ class OrderMonitor:
             print(f"⚠️  Error cargando trades: {e}")
             return []
     
-    def load_logs(self) -> List[Dict]:
-        """Carga logs desde operations_log.json"""
-        if not self.log_file.exists():
-            return []
-        
-        try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️  Error cargando logs: {e}")
-            return []
-    
     def get_new_trades(self) -> List[Dict]:
         """Retorna solo los trades nuevos"""
         trades = self.load_trades()
@@ -54,11 +45,8 @@ class OrderMonitor:
     
     def get_new_logs(self) -> List[Dict]:
         """Retorna solo los logs nuevos relacionados con órdenes"""
-        logs = self.load_logs()
-        if len(logs) > self.last_log_count:
-            new_logs = logs[self.last_log_count:]
-            self.last_log_count = len(logs)
-            
+        new_logs = self.log_cursor.poll()
+        if new_logs:
             # Filtrar solo logs relacionados con órdenes
             order_logs = [
                 log for log in new_logs 
@@ -172,7 +160,7 @@ class OrderMonitor:
         print("🔍 MONITOR DE EJECUCIÓN DE ÓRDENES")
         print("="*70)
         print(f"📁 Archivo de trades: {self.trades_file}")
-        print(f"📁 Archivo de logs: {self.log_file}")
+        print(f"📁 Log de operaciones: {self.operations_log.directory}")
         print(f"⏱️  Intervalo de verificación: {interval} segundos")
         print("="*70)
         print("\n💡 Esperando nuevas órdenes...")
@@ -180,7 +168,7 @@ class OrderMonitor:
         
         # Inicializar contadores
         self.last_trade_count = len(self.load_trades())
-        self.last_log_count = len(self.load_logs())
+        self.log_cursor.reset(self.operations_log.last_seq())
         
         try:
             while True:
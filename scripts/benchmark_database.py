@@ -0,0 +1,183 @@
+"""
+Benchmark de concurrencia de la base SQLite: lectores de "últimas N barras"
+en paralelo con un proceso de ingesta, comparando la configuración anterior
+(journal por defecto, índices de una columna, consulta + insert por fila)
+con la capa de almacenamiento actual (WAL, pool de lectura, índice compuesto
+cubriente y upsert por lotes). Los lectores corren la misma consulta que
+TechnicalAnalysisService.get_historical_data (load_last_bars).
+
+Uso:
+    python scripts/benchmark_database.py --symbols 40 --bars 500 --readers 4 --seconds 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import make_engines, migrate_market_data, upsert
+from src.models.market_data import MarketData
+from src.services.technical_analysis import load_last_bars
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE market_data (id INTEGER NOT NULL PRIMARY KEY, symbol VARCHAR, timestamp DATETIME, "
+    "open FLOAT, high FLOAT, low FLOAT, close FLOAT, volume FLOAT, source VARCHAR)",
+    "CREATE INDEX ix_market_data_id ON market_data (id)",
+    "CREATE INDEX ix_market_data_symbol ON market_data (symbol)",
+    "CREATE INDEX ix_market_data_timestamp ON market_data (timestamp)",
+]
+START = datetime(2020, 1, 1)
+
+
+def make_bar(symbol: str, day: int) -> dict:
+    price = 100 + random.random() * 10
+    return {
+        'symbol': symbol, 'timestamp': START + timedelta(days=day),
+        'open': price, 'high': price + 1, 'low': price - 1, 'close': price,
+        'volume': float(random.randint(1000, 100000)), 'source': 'bench'
+    }
+
+
+def legacy_write(session, rows):
+    """Camino anterior: SELECT por fila y luego UPDATE o INSERT"""
+    for row in rows:
+        existing = session.execute(
+            text("SELECT id FROM market_data WHERE symbol = :symbol AND timestamp = :timestamp"),
+            {'symbol': row['symbol'], 'timestamp': row['timestamp']}
+        ).first()
+        if existing:
+            session.execute(text("UPDATE market_data SET close = :close WHERE id = :id"),
+                            {'close': row['close'], 'id': existing[0]})
+        else:
+            session.execute(text(
+                "INSERT INTO market_data (symbol, timestamp, open, high, low, close, volume, source) "
+                "VALUES (:symbol, :timestamp, :open, :high, :low, :close, :volume, :source)"), row)
+
+
+def setup(mode: str, path: str, symbols, bars: int):
+    url = f"sqlite:///{path}"
+    if mode == 'legacy':
+        writer = create_engine(url, connect_args={"check_same_thread": False})
+        reader = writer
+        with writer.begin() as conn:
+            for ddl in LEGACY_SCHEMA:
+                conn.exec_driver_sql(ddl)
+    else:
+        writer, reader = make_engines(url)
+        MarketData.__table__.create(bind=writer)
+        migrate_market_data(writer)
+
+    Session = sessionmaker(bind=writer)
+    session = Session()
+    rows = [make_bar(s, d) for s in symbols for d in range(bars)]
+    if mode == 'legacy':
+        session.execute(text(
+            "INSERT INTO market_data (symbol, timestamp, open, high, low, close, volume, source) "
+            "VALUES (:symbol, :timestamp, :open, :high, :low, :close, :volume, :source)"), rows)
+    else:
+        upsert(session, MarketData, rows)
+    session.commit()
+    session.close()
+    return writer, reader
+
+
+def run(mode: str, symbols, bars: int, readers: int, seconds: float, batch: int, limit: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, reader = setup(mode, os.path.join(tmp, "bench.db"), symbols, bars)
+        stop = threading.Event()
+        latencies, read_errors = [], [0]
+        written, write_errors = [0], [0]
+        lock = threading.Lock()
+
+        def read_loop():
+            ReadSession = sessionmaker(bind=reader)
+            local = []
+            while not stop.is_set():
+                symbol = random.choice(symbols)
+                t0 = time.perf_counter()
+                session = ReadSession()
+                try:
+                    load_last_bars(session, symbol, limit)
+                    local.append(time.perf_counter() - t0)
+                except OperationalError:
+                    with lock:
+                        read_errors[0] += 1
+                finally:
+                    session.close()
+            with lock:
+                latencies.extend(local)
+
+        def write_loop():
+            Session = sessionmaker(bind=writer)
+            day = bars
+            while not stop.is_set():
+                rows = [make_bar(random.choice(symbols), day + i) for i in range(batch)]
+                day += batch
+                session = Session()
+                try:
+                    if mode == 'legacy':
+                        legacy_write(session, rows)
+                    else:
+                        upsert(session, MarketData, rows)
+                    session.commit()
+                    written[0] += len(rows)
+                except OperationalError:
+                    session.rollback()
+                    write_errors[0] += 1
+                finally:
+                    session.close()
+
+        threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+        threads.append(threading.Thread(target=write_loop))
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        writer.dispose()
+        reader.dispose()
+
+    latencies.sort()
+    return {
+        'reads_per_s': len(latencies) / seconds,
+        'read_p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'read_p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        'rows_written_per_s': written[0] / seconds,
+        'read_errors': read_errors[0],
+        'write_errors': write_errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de lectura/escritura concurrente en SQLite")
+    parser.add_argument('--symbols', type=int, default=40)
+    parser.add_argument('--bars', type=int, default=500, help="Barras iniciales por símbolo")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--batch', type=int, default=50, help="Filas por lote de ingesta")
+    parser.add_argument('--limit', type=int, default=150, help="N de la consulta 'últimas N barras'")
+    args = parser.parse_args()
+
+    random.seed(42)
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    print(f"📊 {args.symbols} símbolos x {args.bars} barras | {args.readers} lectores + 1 escritor | {args.seconds}s")
+    print(f"{'modo':8} {'lecturas/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'filas/s':>9} {'err L':>6} {'err E':>6}")
+    for mode in ('legacy', 'tuned'):
+        r = run(mode, symbols, args.bars, args.readers, args.seconds, args.batch, args.limit)
+        print(f"{mode:8} {r['reads_per_s']:11.0f} {r['read_p50_ms']:8.2f} {r['read_p99_ms']:8.2f} "
+              f"{r['rows_written_per_s']:9.0f} {r['read_errors']:6d} {r['write_errors']:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.connectors.yahoo_client import YahooFinanceClient
 from src.connectors.byma_client import BYMAClient
 from src.connectors.multi_source_client import MultiSourceDataClient
-from src.core.database import SessionLocal, init_db
+from src.core.database import SessionLocal, init_db, upsert
 from src.models.market_data import MarketData
 
 def ingest_symbol(symbol: str, period: str = "1y", days: int = None, use_multi_source: bool = True):
@@ -91,41 +91,22 @@ def ingest_symbol(symbol: str, period: str = "1y", days: int = None, use_multi_s
     # Store in database
     db = SessionLocal()
     try:
-        count = 0
-        for index, row in history.iterrows():
-            # Check if record already exists
-            existing = db.query(MarketData).filter(
-                MarketData.symbol == symbol,
-                MarketData.timestamp == index
-            ).first()
-            
-            if existing:
-                # Update existing record
-                existing.open = row['Open']
-                existing.high = row['High']
-                existing.low = row['Low']
-                existing.close = row['Close']
-                existing.volume = row['Volume']
-            else:
-                # Create new record
-                market_data = MarketData(
-                    symbol=symbol,
-                    timestamp=index,
-                    open=row['Open'],
-                    high=row['High'],
-                    low=row['Low'],
-                    close=row['Close'],
-                    volume=row['Volume'],
-                    source='yahoo'
-                )
-                db.add(market_data)
-                count += 1
+        before = db.query(MarketData).filter(MarketData.symbol == symbol).count()
+        upsert(db, MarketData, [{
+            'symbol': symbol,
+            'timestamp': index,
+            'open': row['Open'],
+            'high': row['High'],
+            'low': row['Low'],
+            'close': row['Close'],
+            'volume': float(row['Volume']),
+            'source': 'yahoo'
+        } for index, row in history.iterrows()])
         
         db.commit()
-        print(f"✓ Ingested {count} new records for {symbol}")
         
-        # Show summary
         total = db.query(MarketData).filter(MarketData.symbol == symbol).count()
+        print(f"✓ Ingested {total - before} new records for {symbol}")
         print(f"  Total records in DB for {symbol}: {total}")
         
     except Exception as e:
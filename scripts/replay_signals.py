@@ -0,0 +1,85 @@
+"""
+Replay histórico del scoring del bot: puntúa todo el universo de market_data
+en una pasada (mismo puntaje que TradingBot.analyze_symbol, sin modelo IA,
+con el respaldo técnico) y evalúa distintos umbrales de compra/venta sobre
+esa matriz sin volver a calcular nada.
+
+Uso:
+    python scripts/replay_signals.py
+    python scripts/replay_signals.py --symbols GGAL YPFD --buy 15 20 25 30 --sell -15 -20 -25 -30 --horizon 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from src.core.database import read_engine
+from src.services.signal_scoring import load_thresholds, score_universe
+
+
+def load_bars(symbols=None) -> pd.DataFrame:
+    query = "SELECT symbol, timestamp, close FROM market_data"
+    params = {}
+    if symbols:
+        placeholders = ", ".join(f":s{i}" for i in range(len(symbols)))
+        query += f" WHERE symbol IN ({placeholders})"
+        params = {f"s{i}": s for i, s in enumerate(symbols)}
+    with read_engine.connect() as conn:
+        bars = pd.read_sql_query(query, conn, params=params, parse_dates=['timestamp'])
+    return bars.dropna(subset=['close'])
+
+
+def evaluate(scores: pd.DataFrame, forward: pd.DataFrame, buy_threshold: float, sell_threshold: float) -> dict:
+    """Cantidad de señales y retorno medio a `horizon` barras de cada lado"""
+    buys = scores >= buy_threshold
+    sells = scores <= sell_threshold
+    return {
+        'buy': int(buys.values.sum()),
+        'sell': int(sells.values.sum()),
+        'buy_ret_pct': float(forward[buys].stack().mean() * 100) if buys.values.any() else 0.0,
+        'sell_ret_pct': float(forward[sells].stack().mean() * 100) if sells.values.any() else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay del scoring del bot sobre la historia de market_data")
+    parser.add_argument('--symbols', nargs='*', help="Símbolos (por defecto todos)")
+    parser.add_argument('--buy', nargs='*', type=float, help="Umbrales de compra a evaluar")
+    parser.add_argument('--sell', nargs='*', type=float, help="Umbrales de venta a evaluar")
+    parser.add_argument('--horizon', type=int, default=5, help="Barras para medir el retorno posterior")
+    args = parser.parse_args()
+
+    bars = load_bars(args.symbols)
+    if bars.empty:
+        print("❌ No hay datos en market_data")
+        return
+
+    start = time.perf_counter()
+    scores = score_universe(bars)
+    elapsed = time.perf_counter() - start
+    print(f"📊 {scores.shape[1]} símbolos, {int(scores.notna().values.sum())} barras puntuadas en {elapsed:.2f}s")
+
+    close = bars.pivot_table(index='timestamp', columns='symbol', values='close').reindex(scores.index)
+    # Por símbolo: retorno a horizon barras propias (no fechas del universo)
+    forward = pd.concat({
+        symbol: (series.shift(-args.horizon) / series - 1).reindex(scores.index)
+        for symbol, series in ((s, close[s].dropna()) for s in close.columns)
+    }, axis=1)
+
+    default_buy, default_sell = load_thresholds() or (30, -30)
+    buy_values = args.buy or [default_buy]
+    sell_values = args.sell or [default_sell]
+    print(f"{'buy':>6} {'sell':>6} {'#BUY':>7} {'#SELL':>7} {f'ret{args.horizon} BUY%':>11} {f'ret{args.horizon} SELL%':>12}")
+    for buy_threshold in buy_values:
+        for sell_threshold in sell_values:
+            r = evaluate(scores, forward, buy_threshold, sell_threshold)
+            print(f"{buy_threshold:6.0f} {sell_threshold:6.0f} {r['buy']:7d} {r['sell']:7d} "
+                  f"{r['buy_ret_pct']:11.2f} {r['sell_ret_pct']:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
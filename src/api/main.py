@@ -1,16 +1,20 @@
 """
 API REST Principal usando FastAPI
 """
-from fastapi import FastAPI, HTTPException, Depends, Security
+from fastapi import FastAPI, HTTPException, Depends, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 from datetime import datetime
 import os
+import time
 
 from src.core.logger import get_logger
 from src.services.health_monitor import HealthMonitor, check_system_health
+from src.core.metrics import metrics, load_snapshot, render_prometheus
+from src.services.prediction_batcher import get_prediction_batcher
 
 logger = get_logger("api")
 
@@ -30,6 +34,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    """Latencia por endpoint (usa la ruta declarada para no multiplicar series por símbolo)"""
+    if not metrics.enabled:
+        return await call_next(request)
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    metrics.observe("api_request_seconds", time.perf_counter() - start, path=path)
+    metrics.inc("api_requests_total", path=path, status=response.status_code)
+    return response
+
+
 # Security
 security = HTTPBearer()
 
@@ -69,6 +88,29 @@ class PredictionResponse(BaseModel):
     confidence: float
 
 
+MAX_BATCH_SYMBOLS = 100
+
+
+class BatchPredictionRequest(BaseModel):
+    symbols: List[str]
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    missing: List[str]  # Símbolos sin modelo o sin datos suficientes
+
+
+def _prediction_payload(symbol: str, result: Dict) -> Dict:
+    return {
+        "symbol": symbol,
+        "signal": result.get("signal", "HOLD"),
+        "predicted_price": result.get("predicted_price", 0.0),
+        "current_price": result.get("current_price", 0.0),
+        "change_pct": result.get("change_pct", 0.0),
+        "confidence": result.get("confidence", 0.0)
+    }
+
+
 # Endpoints
 @app.get("/")
 async def root():
@@ -107,28 +149,29 @@ async def health_check():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/v1/predict/stats")
+async def get_prediction_stats():
+    """
+    Estadísticas del servicio de predicciones (caché, batches, latencia p50/p99)
+    """
+    return get_prediction_batcher().get_stats()
+
+
 @app.get("/api/v1/predict/{symbol}", response_model=PredictionResponse)
 async def get_prediction(symbol: str):
     """
     Obtiene una predicción para un símbolo
+    
+    El modelo corre en un executor (no bloquea el event loop); pedidos
+    simultáneos se agrupan y el resultado queda en caché hasta la próxima barra.
     """
     try:
-        from src.services.prediction_service import PredictionService
-        
-        service = PredictionService()
-        result = service.generate_signal(symbol, threshold=2.0)
+        result = await get_prediction_batcher().predict(symbol)
         
         if result is None:
             raise HTTPException(status_code=404, detail=f"No se pudo generar predicción para {symbol}")
         
-        return {
-            "symbol": symbol,
-            "signal": result.get("signal", "HOLD"),
-            "predicted_price": result.get("predicted_price", 0.0),
-            "current_price": result.get("current_price", 0.0),
-            "change_pct": result.get("change_pct", 0.0),
-            "confidence": result.get("confidence", 0.0)
-        }
+        return _prediction_payload(symbol, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -136,6 +179,25 @@ async def get_prediction(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/predict/batch", response_model=BatchPredictionResponse)
+async def get_predictions_batch(request: BatchPredictionRequest):
+    """
+    Predicciones para varios símbolos en una sola pasada por modelo
+    """
+    if len(request.symbols) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"Máximo {MAX_BATCH_SYMBOLS} símbolos por pedido")
+    try:
+        results = await get_prediction_batcher().predict_many(request.symbols)
+    except Exception as e:
+        logger.error(f"Error obteniendo predicciones batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "predictions": [_prediction_payload(s, r) for s, r in results.items() if r is not None],
+        "missing": [s for s, r in results.items() if r is None]
+    }
+
+
 @app.post("/api/v1/trade", response_model=TradeResponse)
 async def execute_trade(trade: TradeRequest, credentials: HTTPAuthorizationCredentials = Security(security)):
     """
@@ -249,6 +311,19 @@ async def get_metrics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Métricas en formato Prometheus (proceso de la API + último snapshot del bot)
+    """
+    sources = [(metrics.snapshot(), {"process": "api"})]
+    bot_snapshot = load_snapshot()
+    if bot_snapshot:
+        sources.append((bot_snapshot, {"process": "bot"}))
+    body = render_prometheus(*sources)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     
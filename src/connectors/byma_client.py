@@ -19,6 +19,9 @@ from src.core.logger import get_logger
 
 logger = get_logger("byma_client")
 
+# Timeframes que construye IntradayBarAggregator
+INTRADAY_TIMEFRAMES = ('1m', '5m', '15m')
+
 
 class BYMAClient:
     """
@@ -92,17 +95,23 @@ class BYMAClient:
             logger.error(f"Error obteniendo datos desde Yahoo Finance para {symbol}: {e}")
             return pd.DataFrame()
     
-    def get_history_from_iol(self, symbol: str, iol_client, days: int = 365) -> pd.DataFrame:
+    def get_history_from_iol(self, symbol: str, iol_client, days: int = 365,
+                             bar_aggregator: Optional[Any] = None,
+                             timeframe: str = '1d') -> pd.DataFrame:
         """
         Intenta obtener datos históricos desde IOL API.
         
         Nota: IOL API generalmente solo proporciona datos actuales, no históricos completos.
-        Este método intenta obtener datos recientes y acumularlos.
+        Si se pasa un IntradayBarAggregator, la cotización se incorpora a sus barras;
+        solo con un timeframe intradiario explícito ('1m', '5m', '15m') se devuelven
+        las barras acumuladas en lugar de una sola fila diaria.
         
         Args:
             symbol: Símbolo sin sufijo
             iol_client: Instancia de IOLClient
             days: Días de datos a intentar obtener
+            bar_aggregator: IntradayBarAggregator opcional
+            timeframe: '1d' (por defecto) o un timeframe intradiario del agregador
         
         Returns:
             DataFrame con datos (puede estar vacío si IOL no tiene históricos)
@@ -122,6 +131,15 @@ class BYMAClient:
                 logger.warning(f"IOL no tiene datos para {symbol}: {quote.get('error')}")
                 return pd.DataFrame()
             
+            # Si hay agregador intradiario, la cotización alimenta sus barras;
+            # solo se devuelven si se pidió un timeframe intradiario
+            if bar_aggregator is not None and bar_aggregator.on_quote(clean_symbol, quote) \
+                    and timeframe in INTRADAY_TIMEFRAMES:
+                bars = bar_aggregator.get_bars(clean_symbol, timeframe=timeframe)
+                if not bars.empty:
+                    logger.info(f"✅ {len(bars)} barras intradiarias desde IOL para {symbol}")
+                    return bars.rename(columns=str.capitalize)
+            
             # Convertir cotización actual a DataFrame (solo un punto de datos)
             price = quote.get('ultimoPrecio') or quote.get('precio') or quote.get('price')
             if price:
@@ -143,7 +161,8 @@ class BYMAClient:
             return pd.DataFrame()
     
     def get_history(self, symbol: str, period: str = "1y", interval: str = "1d", 
-                   iol_client: Optional[Any] = None) -> pd.DataFrame:
+                   iol_client: Optional[Any] = None,
+                   bar_aggregator: Optional[Any] = None) -> pd.DataFrame:
         """
         Obtiene datos históricos usando el mejor método disponible.
         
@@ -152,6 +171,7 @@ class BYMAClient:
             period: Período para Yahoo Finance
             interval: Intervalo para Yahoo Finance
             iol_client: Cliente IOL opcional (para intentar como fallback)
+            bar_aggregator: IntradayBarAggregator opcional (barras intradiarias de IOL)
         
         Returns:
             DataFrame con datos históricos
@@ -165,7 +185,8 @@ class BYMAClient:
         # Método 2: IOL API (si está disponible y Yahoo falló)
         if iol_client:
             logger.info(f"Yahoo Finance falló, intentando IOL para {symbol}...")
-            history = self.get_history_from_iol(symbol, iol_client)
+            history = self.get_history_from_iol(symbol, iol_client, bar_aggregator=bar_aggregator,
+                                                timeframe=interval)
             if not history.empty:
                 return history
         
@@ -8,6 +8,7 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 from src.core.config import settings
 from src.core.rate_limiter import iol_rate_limiter
 from src.core.error_handler import retry_on_network_error, ErrorHandler
+from src.core.metrics import timed
 
 
 class IOLClient:
@@ -98,6 +99,7 @@ class IOLClient:
         """Detecta el código de mercado para un símbolo"""
         return self.MARKET_CODES.get(symbol.upper(), "bCBA")
 
+    @timed("iol_request_seconds", endpoint="get_quote")
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=5),
@@ -149,6 +151,7 @@ class IOLClient:
             print(f"Error obteniendo cotización para {symbol}: {error_msg}")
             return {"error": error_msg}
 
+    @timed("iol_request_seconds", endpoint="get_account_status")
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=5),
@@ -174,6 +177,7 @@ class IOLClient:
             print(f"Error obteniendo estado de cuenta: {e}")
             raise e
 
+    @timed("iol_request_seconds", endpoint="get_portfolio")
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=5),
@@ -286,6 +290,7 @@ class IOLClient:
         
         return balances
 
+    @timed("iol_request_seconds", endpoint="place_order")
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=5),
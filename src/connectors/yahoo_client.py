@@ -3,6 +3,8 @@ from typing import Any, Dict, Optional
 import pandas as pd
 import yfinance as yf
 
+from src.core.metrics import timed
+
 
 class YahooFinanceClient:
     """
@@ -51,6 +53,7 @@ class YahooFinanceClient:
         
         return safe_stderr()
 
+    @timed("connector_request_seconds", source="yahoo", call="get_quote")
     def get_quote(self, symbol: str) -> Dict[str, Any]:
         """
         Retrieves real-time (delayed) quote data for a symbol.
@@ -84,6 +87,7 @@ class YahooFinanceClient:
             # print(f"Error fetching Yahoo quote for {symbol}: {e}") # Reduce noise
             return None
 
+    @timed("connector_request_seconds", source="yahoo", call="get_history")
     def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
         """
         Retrieves historical data.
@@ -0,0 +1,272 @@
+"""
+Pipeline de Logging No Bloqueante
+Los hilos de trading solo encolan registros; un QueueListener en background
+formatea, codifica y escribe en disco/consola en lotes.
+
+Componentes:
+- DroppingQueueHandler: cola acotada con política de descarte y medición
+  de la latencia que el logging agrega al hilo que loguea
+- SamplingFilter: muestreo por nivel para eventos DEBUG de alto volumen
+- BatchedFileHandler: escrituras por lotes en archivos por día, sin rotación
+- AsyncLogPipeline: arma todo lo anterior alrededor de un QueueListener
+"""
+import atexit
+import itertools
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Políticas de descarte cuando la cola está llena
+DROP_NEW = "drop_new"        # Descartar el registro entrante
+DROP_OLDEST = "drop_oldest"  # Descartar el registro más viejo de la cola
+
+
+class LoggingLatencyTracker:
+    """
+    Acumula el tiempo que los hilos que loguean pasan dentro del logging
+    (lo que el logging le agrega al hot path) y permite medirlo por ciclo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_records = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._cycle_start = (0, 0)
+
+    def record(self, elapsed_ns: int):
+        with self._lock:
+            self.total_records += 1
+            self.total_ns += elapsed_ns
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+
+    def start_cycle(self):
+        """Marca el inicio de un ciclo de trading"""
+        with self._lock:
+            self._cycle_start = (self.total_records, self.total_ns)
+
+    def cycle_summary(self) -> Dict:
+        """Registros y milisegundos de logging desde el último start_cycle"""
+        with self._lock:
+            records = self.total_records - self._cycle_start[0]
+            elapsed_ns = self.total_ns - self._cycle_start[1]
+        return {
+            'records': records,
+            'logging_ms': elapsed_ns / 1e6,
+            'avg_us_per_record': (elapsed_ns / records / 1e3) if records else 0.0
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'records': self.total_records,
+                'total_ms': self.total_ns / 1e6,
+                'avg_us_per_record': (self.total_ns / self.total_records / 1e3) if self.total_records else 0.0,
+                'max_us': self.max_ns / 1e3
+            }
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler sobre una cola acotada que nunca bloquea al hilo que loguea.
+
+    Si la cola está llena aplica la política de descarte. Los registros
+    ERROR o superiores siempre desplazan al más viejo en lugar de perderse.
+    """
+
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = DROP_NEW,
+                 latency_tracker: Optional[LoggingLatencyTracker] = None):
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+        self.latency_tracker = latency_tracker
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatear el mensaje aquí (barato) pero sin serializar exc_info:
+        # el traceback lo formatea el listener en su hilo
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.drop_policy == DROP_OLDEST or record.levelno >= logging.ERROR:
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+                self.queue.put_nowait(record)
+                return
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+
+    def emit(self, record):
+        start = time.perf_counter_ns()
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+        finally:
+            if self.latency_tracker is not None:
+                self.latency_tracker.record(time.perf_counter_ns() - start)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Muestreo por nivel: deja pasar 1 de cada N registros del nivel indicado.
+    Pensado para eventos DEBUG de alto volumen; los niveles sin tasa pasan siempre.
+    """
+
+    def __init__(self, rates: Optional[Dict[int, int]] = None):
+        """
+        Args:
+            rates: Dict nivel -> N (ej. {logging.DEBUG: 10} conserva 1 de cada 10 DEBUG)
+        """
+        super().__init__()
+        self.rates = {level: max(1, int(n)) for level, n in (rates or {}).items()}
+        self._counters = {level: itertools.count() for level in self.rates}
+        self.sampled_out = 0
+
+    def filter(self, record) -> bool:
+        rate = self.rates.get(record.levelno)
+        if rate is None or rate == 1:
+            return True
+        if next(self._counters[record.levelno]) % rate == 0:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class BatchedFileHandler(logging.FileHandler):
+    """
+    Handler de archivo que escribe en lotes (flush cada N registros o T segundos).
+
+    No rota: el bot, el dashboard y los scripts escriben los mismos archivos
+    diarios (trading_bot_YYYYMMDD.log) en modo append, y una rotación por
+    proceso los corrompería (y en Windows falla con el archivo abierto por
+    otro proceso). El nombre por día lo arma quien crea el handler.
+
+    Se usa desde el hilo del QueueListener, por lo que el flush nunca
+    ocurre en el hilo que loguea.
+    """
+
+    def __init__(self, filename, batch_size: int = 100, flush_interval: float = 1.0,
+                 encoding: str = 'utf-8'):
+        super().__init__(filename, encoding=encoding, delay=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if (self._pending >= self.batch_size or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        super().flush()
+
+
+class _PeriodicFlushListener(logging.handlers.QueueListener):
+    """QueueListener que además hace flush de los handlers cuando la cola queda ociosa"""
+
+    def __init__(self, log_queue, *handlers, idle_flush: float = 1.0, **kwargs):
+        super().__init__(log_queue, *handlers, **kwargs)
+        self.idle_flush = idle_flush
+
+    def enqueue_sentinel(self):
+        # Con la cola llena put_nowait fallaría: esperar a que el listener libere lugar
+        self.queue.put(self._sentinel, timeout=5)
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.idle_flush if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    try:
+                        handler.flush()
+                    except Exception:
+                        pass
+
+
+class AsyncLogPipeline:
+    """
+    Pipeline QueueHandler -> cola acotada -> QueueListener -> handlers reales.
+
+    Uso:
+        pipeline = AsyncLogPipeline([file_handler, console_handler])
+        logger.addHandler(pipeline.queue_handler)
+        pipeline.start()
+    """
+
+    def __init__(self, handlers: List[logging.Handler], max_queue_size: int = 10000,
+                 drop_policy: str = DROP_NEW, sample_rates: Optional[Dict[int, int]] = None,
+                 latency_tracker: Optional[LoggingLatencyTracker] = None):
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.latency_tracker = latency_tracker or LoggingLatencyTracker()
+        self.queue_handler = DroppingQueueHandler(self.queue, drop_policy=drop_policy,
+                                                  latency_tracker=self.latency_tracker)
+        self.sampling_filter = SamplingFilter(sample_rates)
+        self.queue_handler.addFilter(self.sampling_filter)
+        self.handlers = handlers
+        self.listener = _PeriodicFlushListener(self.queue, *handlers, respect_handler_level=True)
+        self._started = False
+        self._atexit_registered = False
+
+    def start(self):
+        if not self._started:
+            self.listener.start()
+            self._started = True
+            # Registrar una sola vez aunque el pipeline se reinicie (flush)
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def stop(self):
+        """Detiene el listener escribiendo todo lo pendiente"""
+        if self._started:
+            self._started = False
+            try:
+                self.listener.stop()
+            except Exception:
+                pass
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict:
+        return {
+            'queue_size': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'dropped': self.queue_handler.dropped,
+            'sampled_out': self.sampling_filter.sampled_out,
+            **self.latency_tracker.get_stats()
+        }
+
+
+# Tracker compartido por los pipelines del proyecto (latencia de logging por ciclo)
+logging_latency = LoggingLatencyTracker()
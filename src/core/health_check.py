@@ -20,11 +20,11 @@ class HealthCheck:
     def check_database(self) -> Dict[str, any]:
         """Verifica el estado de la base de datos"""
         try:
-            from src.core.database import SessionLocal, engine
+            from src.core.database import ReadSessionLocal
             from src.models.market_data import MarketData
             
             # Verificar conexión
-            db = SessionLocal()
+            db = ReadSessionLocal()
             try:
                 count = db.query(MarketData).count()
                 db.close()
@@ -9,6 +9,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from src.core.async_logging import (
+    DROP_NEW, AsyncLogPipeline, BatchedFileHandler, logging_latency
+)
 from src.core.console_utils import setup_windows_console
 
 setup_windows_console()
@@ -65,6 +68,10 @@ class ProjectLogger:
         if self.logger.handlers:
             return
         
+        # Los handlers reales se ejecutan en el hilo del pipeline asíncrono:
+        # el hilo de trading solo encola el registro
+        handlers = []
+        
         # Handler para consola (con colores) - con manejo de errores
         try:
             from src.core.safe_logger import SafeStreamHandler
@@ -82,14 +89,14 @@ class ProjectLogger:
                 console_handler.setFormatter(console_formatter)
                 # Agregar filtro para manejar errores de I/O
                 console_handler.addFilter(self._safe_filter)
-                self.logger.addHandler(console_handler)
+                handlers.append(console_handler)
         except Exception:
             # Si falla, crear un handler básico que no falle
             try:
                 if hasattr(sys.stdout, 'closed') and not sys.stdout.closed:
                     console_handler = SafeStreamHandler()
                     console_handler.setLevel(logging.INFO)
-                    self.logger.addHandler(console_handler)
+                    handlers.append(console_handler)
             except Exception:
                 pass  # Continuar sin handler de consola si falla
         
@@ -98,7 +105,7 @@ class ProjectLogger:
             if self.log_dir is None:
                 raise IOError("Log directory not available")
             log_file = self.log_dir / f"trading_bot_{datetime.now().strftime('%Y%m%d')}.log"
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            file_handler = BatchedFileHandler(log_file)
             file_handler.setLevel(logging.DEBUG)
             file_formatter = logging.Formatter(
                 '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
@@ -106,7 +113,7 @@ class ProjectLogger:
             )
             file_handler.setFormatter(file_formatter)
             file_handler.addFilter(self._safe_filter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
         except (ValueError, IOError, OSError, AttributeError, Exception) as e:
             # Ignorar cualquier error de I/O al crear handlers de archivo
             pass
@@ -116,16 +123,37 @@ class ProjectLogger:
             if self.log_dir is None:
                 raise IOError("Log directory not available")
             error_file = self.log_dir / f"errors_{datetime.now().strftime('%Y%m%d')}.log"
-            error_handler = logging.FileHandler(error_file, encoding='utf-8')
+            error_handler = BatchedFileHandler(error_file, batch_size=1)
             error_handler.setLevel(logging.ERROR)
             if 'file_formatter' in locals():
                 error_handler.setFormatter(file_formatter)
             error_handler.addFilter(self._safe_filter)
-            self.logger.addHandler(error_handler)
+            handlers.append(error_handler)
         except (ValueError, IOError, OSError, AttributeError, Exception) as e:
             # Ignorar cualquier error de I/O al crear handlers de archivo
             pass
         
+        self.pipeline = None
+        if os.getenv('LOG_ASYNC', '1') != '0':
+            try:
+                debug_sample_rate = int(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1'))
+                self.pipeline = AsyncLogPipeline(
+                    handlers,
+                    max_queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+                    drop_policy=os.getenv('LOG_DROP_POLICY', DROP_NEW),
+                    sample_rates={logging.DEBUG: debug_sample_rate},
+                    latency_tracker=logging_latency
+                )
+                self.logger.addHandler(self.pipeline.queue_handler)
+                self.pipeline.start()
+            except Exception:
+                self.pipeline = None
+        
+        if self.pipeline is None:
+            # Modo síncrono (LOG_ASYNC=0 o fallo al crear el pipeline)
+            for handler in handlers:
+                self.logger.addHandler(handler)
+        
         self._initialized = True
     
     @staticmethod
@@ -142,6 +170,12 @@ class ProjectLogger:
             return logging.getLogger(f"trading_bot.{name}")
         return self.logger
     
+    def get_pipeline_stats(self) -> dict:
+        """Estadísticas del pipeline asíncrono (cola, descartes, latencia)"""
+        if self.pipeline is None:
+            return {'async': False}
+        return {'async': True, **self.pipeline.get_stats()}
+    
     def set_level(self, level: str):
         """Establece el nivel de logging"""
         level_map = {
@@ -152,7 +186,8 @@ class ProjectLogger:
             'CRITICAL': logging.CRITICAL
         }
         self.logger.setLevel(level_map.get(level.upper(), logging.INFO))
-        for handler in self.logger.handlers:
+        handlers = self.pipeline.handlers if self.pipeline else self.logger.handlers
+        for handler in handlers:
             handler.setLevel(level_map.get(level.upper(), logging.INFO))
 
 
@@ -165,6 +200,11 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     return _logger_instance.get_logger(name)
 
 
+def get_logging_stats() -> dict:
+    """Estadísticas del pipeline de logging del proyecto"""
+    return _logger_instance.get_pipeline_stats()
+
+
 def setup_logging(level: str = "INFO"):
     """Configura el sistema de logging"""
     _logger_instance.set_level(level)
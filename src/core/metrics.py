@@ -0,0 +1,299 @@
+"""
+Instrumentación Liviana (timers, contadores e histogramas)
+Expuesta en formato Prometheus por la API (/metrics) y resumida por ciclo
+de trading en HealthMonitor.get_health_summary.
+
+Uso:
+    from src.core.metrics import timed, timer, metrics
+
+    @timed("analyze_symbol_seconds")
+    def analyze_symbol(...): ...
+
+    with timer("db_read_seconds", query="historical_data"):
+        ...
+
+    metrics.inc("trades_total", side="buy")
+
+Con METRICS_ENABLED=0 los decoradores y context managers no miden nada
+(una sola verificación de flag por llamada).
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Límites superiores de los buckets del histograma (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Snapshot que escribe el bot al terminar cada ciclo (lo lee la API, que es otro proceso)
+SNAPSHOT_FILE = Path("data/metrics_snapshot.json")
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # +1: bucket +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Registro thread-safe de contadores, gauges e histogramas"""
+
+    def __init__(self, enabled: bool = True, cycle_history: int = 20):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._gauges: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, _Histogram]] = {}
+
+        # Resumen por ciclo de trading
+        self._cycle_start: Optional[float] = None
+        self._cycle_sections: Dict[str, List[float]] = {}
+        self._cycles = deque(maxlen=cycle_history)
+
+    # ------------------------------------------------------------------
+    # Registro de valores
+    # ------------------------------------------------------------------
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+
+    def observe(self, name: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram()
+            histogram.observe(seconds)
+
+            if self._cycle_start is not None:
+                section = name if not labels else f"{name}{{{','.join(f'{k}={v}' for k, v in key)}}}"
+                stats = self._cycle_sections.setdefault(section, [0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+
+    # ------------------------------------------------------------------
+    # Ciclos de trading
+    # ------------------------------------------------------------------
+
+    def start_cycle(self):
+        """Empieza a acumular los timers observados en un resumen por ciclo"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._cycle_start = time.perf_counter()
+            self._cycle_sections = {}
+
+    def end_cycle(self, **info) -> Optional[Dict]:
+        """Cierra el ciclo actual y devuelve su resumen (secciones ordenadas por tiempo)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._cycle_start is None:
+                return None
+            total = time.perf_counter() - self._cycle_start
+            sections = {
+                name: {'count': count, 'total_ms': round(seconds * 1000, 2)}
+                for name, (count, seconds) in sorted(
+                    self._cycle_sections.items(), key=lambda x: x[1][1], reverse=True
+                )
+            }
+            summary = {
+                'timestamp': datetime.now().isoformat(),
+                'total_ms': round(total * 1000, 2),
+                'sections': sections,
+                **info
+            }
+            self._cycles.append(summary)
+            self._cycle_start = None
+            self._cycle_sections = {}
+        return summary
+
+    def get_cycle_summary(self) -> Dict:
+        """Último ciclo y promedio de los ciclos recientes"""
+        with self._lock:
+            cycles = list(self._cycles)
+        if not cycles:
+            return {}
+        return {
+            'last_cycle': cycles[-1],
+            'cycles_tracked': len(cycles),
+            'avg_cycle_ms': round(sum(c['total_ms'] for c in cycles) / len(cycles), 2)
+        }
+
+    # ------------------------------------------------------------------
+    # Exportación
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict:
+        """Copia serializable de todas las series"""
+        with self._lock:
+            return {
+                'counters': {n: [[list(k), v] for k, v in s.items()] for n, s in self._counters.items()},
+                'gauges': {n: [[list(k), v] for k, v in s.items()] for n, s in self._gauges.items()},
+                'histograms': {
+                    n: [[list(k), {'buckets': list(h.buckets), 'counts': list(h.counts),
+                                   'sum': h.sum, 'count': h.count}] for k, h in s.items()]
+                    for n, s in self._histograms.items()
+                },
+                'cycles': list(self._cycles)
+            }
+
+    def export_snapshot(self, path: Path = SNAPSHOT_FILE):
+        """Escribe el snapshot a disco de forma atómica (para otros procesos)"""
+        if not self.enabled:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError):
+            pass
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self._cycles.clear()
+            self._cycle_start = None
+
+
+def load_snapshot(path: Path = SNAPSHOT_FILE) -> Optional[Dict]:
+    """Lee el snapshot exportado por otro proceso (None si no existe)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _format_labels(pairs, extra: Optional[Dict] = None) -> str:
+    items = list(pairs) + sorted((extra or {}).items())
+    if not items:
+        return ''
+    escaped = [f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for k, v in items]
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(*sources) -> str:
+    """
+    Convierte uno o más snapshots al formato de texto de Prometheus.
+
+    Args:
+        sources: Tuplas (snapshot, labels_extra); las series con el mismo
+                 nombre se agrupan bajo un único bloque # TYPE
+    """
+    sections = {'counter': {}, 'gauge': {}, 'histogram': {}}
+    for snapshot, extra_labels in sources:
+        for kind, field in (('counter', 'counters'), ('gauge', 'gauges'), ('histogram', 'histograms')):
+            for name, series in snapshot.get(field, {}).items():
+                sections[kind].setdefault(name, []).extend((key, value, extra_labels) for key, value in series)
+
+    lines = []
+    for kind in ('counter', 'gauge'):
+        for name, series in sorted(sections[kind].items()):
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value, extra in series:
+                lines.append(f"{name}{_format_labels(key, extra)} {value}")
+    for name, series in sorted(sections['histogram'].items()):
+        lines.append(f"# TYPE {name} histogram")
+        for key, data, extra in series:
+            cumulative = 0
+            for bound, count in zip(list(data['buckets']) + ['+Inf'], data['counts']):
+                cumulative += count
+                le_labels = list(key) + [('le', bound)]
+                lines.append(f"{name}_bucket{_format_labels(le_labels, extra)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(key, extra)} {data['sum']}")
+            lines.append(f"{name}_count{_format_labels(key, extra)} {data['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# Registro global del proceso
+metrics = MetricsRegistry(enabled=os.getenv('METRICS_ENABLED', '1') != '0')
+
+
+class _NullTimer:
+    """Context manager que no hace nada (métricas deshabilitadas)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name: str, labels: Dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            metrics.inc(f"{self.name.rsplit('_seconds', 1)[0]}_errors_total", **self.labels)
+        return False
+
+
+def timer(name: str, **labels):
+    """Context manager que registra la duración del bloque en un histograma"""
+    if not metrics.enabled:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name: str, **labels):
+    """Decorador que registra la duración de cada llamada en un histograma"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with _Timer(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,234 @@
+"""
+Registro de Servicios con Instanciación Perezosa
+Los servicios se construyen en el primer uso (o en un warm-up paralelo en
+background) y se mide el costo de inicialización de cada componente.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.core.logger import get_logger
+
+logger = get_logger("service_registry")
+
+# Marcador de "servicio aún no construido" (None es un valor válido para servicios opcionales)
+_NOT_BUILT = object()
+
+
+class ServiceRegistry:
+    """
+    Registro de servicios con construcción perezosa y thread-safe.
+
+    - `register` guarda la factory sin ejecutarla
+    - `get` construye el servicio la primera vez (una sola vez aunque lo pidan
+      varios threads a la vez) y mide cuánto tardó
+    - Un servicio no opcional que falla guarda el error: los `get` siguientes
+      lo relanzan sin volver a ejecutar la factory (`reset` permite reintentar)
+    - Los ciclos de dependencias se rechazan con ValueError antes de tomar
+      ningún lock (con locks por servicio un ciclo sería un deadlock)
+    - `warm_up` construye servicios independientes en paralelo
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._depends_on: Dict[str, tuple] = {}
+        self._optional: Dict[str, bool] = {}
+        self._instances: Dict[str, Any] = {}
+        self._failures: Dict[str, Exception] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.timings: Dict[str, float] = {}  # nombre -> segundos de inicialización
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any],
+                 depends_on: Iterable[str] = (), optional: bool = False):
+        """
+        Registra un servicio.
+
+        Args:
+            name: Nombre del servicio (coincide con el atributo del bot)
+            factory: Callable sin argumentos que construye el servicio
+            depends_on: Servicios que deben construirse antes (para el warm-up)
+            optional: Si True, un error al construir deja el servicio en None
+                      en lugar de propagar la excepción
+        """
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._depends_on[name] = tuple(depends_on)
+            self._optional[name] = optional
+            self._locks[name] = threading.Lock()
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._factories
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def find_cycle(self, name: str) -> Optional[List[str]]:
+        """Camino de dependencias que vuelve a `name` (None si no hay ciclo)"""
+        stack = [(name, [name])]
+        seen = set()
+        while stack:
+            current, path = stack.pop()
+            for dependency in self._depends_on.get(current, ()):
+                if dependency == name:
+                    return path + [name]
+                if dependency not in seen and dependency in self._factories:
+                    seen.add(dependency)
+                    stack.append((dependency, path + [dependency]))
+        return None
+
+    def get(self, name: str) -> Any:
+        """Obtiene un servicio, construyéndolo si es la primera vez"""
+        instance = self._instances.get(name, _NOT_BUILT)
+        if instance is not _NOT_BUILT:
+            return instance
+        failure = self._failures.get(name)
+        if failure is not None:
+            raise failure
+
+        if name not in self._factories:
+            raise KeyError(f"Servicio no registrado: {name}")
+        cycle = self.find_cycle(name)
+        if cycle:
+            raise ValueError(f"Ciclo de dependencias: {' -> '.join(cycle)}")
+
+        with self._locks[name]:
+            # Otro thread pudo construirlo (o fallar) mientras esperábamos el lock
+            instance = self._instances.get(name, _NOT_BUILT)
+            if instance is not _NOT_BUILT:
+                return instance
+            failure = self._failures.get(name)
+            if failure is not None:
+                raise failure
+
+            for dependency in self._depends_on[name]:
+                self.get(dependency)
+
+            start = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                if not self._optional[name]:
+                    self.timings[name] = time.perf_counter() - start
+                    self._failures[name] = e
+                    raise
+                logger.warning(f"No se pudo inicializar {name}: {e}")
+                instance = None
+            self.timings[name] = time.perf_counter() - start
+            self._instances[name] = instance
+            return instance
+
+    def reset(self, name: str):
+        """Olvida la instancia o el error guardado: el próximo get vuelve a construir"""
+        with self._locks[name]:
+            self._instances.pop(name, None)
+            self._failures.pop(name, None)
+
+    def set(self, name: str, instance: Any):
+        """Reemplaza la instancia de un servicio (ej. mocks en tests)"""
+        self._failures.pop(name, None)
+        self._instances[name] = instance
+
+    @contextmanager
+    def measure(self, name: str):
+        """Mide una fase de arranque que no es un servicio registrado"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def warm_up(self, names: Optional[List[str]] = None, max_workers: int = 4) -> Dict[str, float]:
+        """
+        Construye en paralelo los servicios indicados (todos si names es None).
+
+        Los servicios se agrupan por nivel de dependencias: cada nivel se
+        construye en paralelo una vez terminado el anterior.
+
+        Returns:
+            Dict nombre -> segundos de inicialización de los servicios construidos
+        """
+        pending = [n for n in (names or list(self._factories)) if not self.is_built(n)]
+        cyclic = [n for n in pending if self.find_cycle(n)]
+        for name in cyclic:
+            logger.warning(f"Warm-up omite {name}: ciclo de dependencias {' -> '.join(self.find_cycle(name))}")
+        pending = [n for n in pending if n not in cyclic]
+        built = set(self._instances)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='service_warmup') as executor:
+            while pending:
+                # Sin ciclos siempre hay al menos uno listo: sus dependencias ya se
+                # construyeron o no están en este warm-up (get() las construye)
+                ready = [n for n in pending
+                         if all(d in built or d not in pending for d in self._depends_on[n])]
+
+                futures = {executor.submit(self.get, n): n for n in ready}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.warning(f"Error en warm-up de {name}: {e}")
+                    built.add(name)
+
+                pending = [n for n in pending if n not in ready]
+
+        return {n: self.timings[n] for n in (names or list(self._factories)) if n in self.timings}
+
+    def warm_up_async(self, names: Optional[List[str]] = None, max_workers: int = 4) -> threading.Thread:
+        """Lanza el warm-up en un thread en background y devuelve el thread"""
+        self._warmup_thread = threading.Thread(
+            target=self.warm_up, args=(names, max_workers), daemon=True, name='service_warmup'
+        )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def wait_warm_up(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine el warm-up en background. Retorna True si terminó"""
+        if self._warmup_thread is None:
+            return True
+        self._warmup_thread.join(timeout)
+        return not self._warmup_thread.is_alive()
+
+    def timing_report(self) -> str:
+        """Reporte de costo de arranque por componente, de mayor a menor"""
+        if not self.timings:
+            return "⏱️  Sin componentes inicializados"
+
+        lines = ["⏱️  Tiempos de inicialización:"]
+        for name, seconds in sorted(self.timings.items(), key=lambda x: x[1], reverse=True):
+            lines.append(f"   {name:<28} {seconds * 1000:>9.1f} ms")
+        pending = [n for n in self._factories if not self.is_built(n)]
+        if pending:
+            lines.append(f"   (pendientes, se crean en el primer uso: {', '.join(pending)})")
+        return "\n".join(lines)
+
+
+class LazyService:
+    """
+    Descriptor que resuelve un atributo desde el ServiceRegistry del objeto.
+
+    Es un descriptor "non-data": después del primer acceso el valor queda en
+    el __dict__ de la instancia y los accesos siguientes no tienen overhead.
+    Asignar el atributo directamente (ej. un mock) también funciona.
+    """
+
+    def __init__(self, registry_attr: str = 'services'):
+        self.registry_attr = registry_attr
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        registry = obj.__dict__.get(self.registry_attr)
+        if registry is None or not registry.is_registered(self.name):
+            raise AttributeError(self.name)
+        value = registry.get(self.name)
+        obj.__dict__[self.name] = value
+        return value
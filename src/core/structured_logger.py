@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from enum import Enum
 
+from src.core.async_logging import AsyncLogPipeline, BatchedFileHandler, logging_latency
 from src.core.logger import get_logger
 
 logger = get_logger("structured_logger")
@@ -53,12 +54,21 @@ class StructuredLogger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
         
-        # Handler para JSON
+        # Handler para JSON: las entradas se encolan y un hilo en background
+        # las escribe por lotes (sin flush por registro en el hilo que loguea)
+        self.json_pipeline = None
         if json_output:
             json_file = self.log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.jsonl"
-            self.json_handler = logging.FileHandler(json_file, encoding='utf-8')
+            self.json_handler = BatchedFileHandler(json_file)
             self.json_handler.setLevel(logging.DEBUG)
-            self.logger.addHandler(self.json_handler)
+            self.json_handler.setFormatter(logging.Formatter('%(message)s'))
+            self.json_pipeline = AsyncLogPipeline([self.json_handler], latency_tracker=logging_latency)
+            # Logger interno solo para las líneas JSON (no propaga al logger estándar)
+            self._json_logger = logging.getLogger(f"{name}.__jsonl__")
+            self._json_logger.setLevel(logging.DEBUG)
+            self._json_logger.propagate = False
+            self._json_logger.handlers = [self.json_pipeline.queue_handler]
+            self.json_pipeline.start()
         
         # Handler para consola (formato legible)
         if console_output:
@@ -92,14 +102,17 @@ class StructuredLogger:
         return entry
     
     def _write_json_log(self, entry: Dict[str, Any]):
-        """Escribe un log en formato JSON"""
-        if self.json_output:
+        """Encola un log en formato JSON (la escritura ocurre en background)"""
+        if self.json_pipeline is not None:
             json_str = json.dumps(entry, ensure_ascii=False, default=str)
-            # Escribir directamente al handler de archivo
-            for handler in self.logger.handlers:
-                if isinstance(handler, logging.FileHandler) and handler.baseFilename.endswith('.jsonl'):
-                    handler.stream.write(json_str + '\n')
-                    handler.stream.flush()
+            level = getattr(logging, entry.get("level", "INFO"), logging.INFO)
+            self._json_logger.log(level, json_str)
+    
+    def flush(self):
+        """Escribe las entradas JSON pendientes (detiene y reinicia el listener)"""
+        if self.json_pipeline is not None:
+            self.json_pipeline.stop()
+            self.json_pipeline.start()
     
     def debug(self, message: str, **kwargs):
         """Log a nivel DEBUG"""
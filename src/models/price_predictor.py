@@ -171,6 +171,28 @@ class LSTMPricePredictor:
 
         return prediction[0]
 
+    def predict_batch(self, windows):
+        """
+        Predict several windows with a single forward pass.
+        Args:
+            windows: Array (n, sequence_length, features)
+        Returns:
+            Array of n predicted prices
+        """
+        if not TF_AVAILABLE:
+            raise ImportError("TensorFlow is required for predictions.")
+
+        windows = np.asarray(windows, dtype=float)
+        n, steps, n_features = windows.shape
+        scaled = self.scaler.transform(windows.reshape(-1, n_features)).reshape(n, steps, n_features)
+
+        # Direct call: avoids model.predict overhead on small batches
+        scaled_prediction = np.asarray(self.model(scaled, training=False))
+
+        dummy = np.zeros(shape=(n, self.scaler.n_features_in_))
+        dummy[:, 0] = scaled_prediction[:, 0]  # Assume target is at index 0
+        return self.scaler.inverse_transform(dummy)[:, 0]
+
     def save(self, filepath):
         """Save model and scaler."""
         if not TF_AVAILABLE:
@@ -9,7 +9,7 @@ from typing import Dict, List, Optional, Tuple, Callable
 import json
 from pathlib import Path
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
 from src.core.logger import get_logger
 from src.models.market_data import MarketData
 from src.services.technical_analysis import TechnicalAnalysisService
@@ -47,7 +47,7 @@ class AdvancedBacktester:
     def load_data(self, symbol: str, start_date: Optional[datetime] = None, 
                   end_date: Optional[datetime] = None) -> pd.DataFrame:
         """Carga datos históricos"""
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             query = db.query(MarketData).filter(MarketData.symbol == symbol)
             
@@ -10,7 +10,7 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 import pandas as pd
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
 from src.core.logger import get_logger
 from src.core.config_manager import get_config
 from src.models.market_data import MarketData
@@ -216,7 +216,7 @@ class PredictionFeedback:
                 continue  # Aún no ha pasado el tiempo
             
             # Obtener precio real
-            db = SessionLocal()
+            db = ReadSessionLocal()
             try:
                 record = db.query(MarketData).filter(
                     MarketData.symbol == pred['symbol'],
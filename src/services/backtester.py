@@ -12,7 +12,7 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
 from src.models.market_data import MarketData
 
 
@@ -30,7 +30,7 @@ class Backtester:
 
     def get_historical_data(self, symbol, days=252):
         """Load historical data from database."""
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             records = (
                 db.query(MarketData)
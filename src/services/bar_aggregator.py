@@ -0,0 +1,443 @@
+"""
+Agregador de Barras Intradiarias
+Construye barras OHLCV de 1m/5m/15m a partir de los snapshots de cotización de IOL
+"""
+import time
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.core.logger import get_logger
+
+logger = get_logger("bar_aggregator")
+
+# Columnas de cada barra dentro del ring buffer
+BAR_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+class BarRingBuffer:
+    """
+    Buffer circular de tamaño fijo con barras OHLCV completas.
+
+    Las barras se guardan en un único array NumPy (capacity × 6) para que
+    leer las últimas N barras sea un slice, sin crecer memoria con el tiempo.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(BAR_FIELDS)), dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, bar: Dict):
+        """Agrega una barra completa (sobrescribe la más vieja si está lleno)"""
+        self._data[self._next] = [bar[field] for field in BAR_FIELDS]
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """Devuelve las últimas n barras en orden cronológico (copia)"""
+        n = self._count if n is None else min(n, self._count)
+        if n <= 0:
+            return np.empty((0, len(BAR_FIELDS)))
+        start = (self._next - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n].copy()
+        return np.concatenate([self._data[start:], self._data[:self._next]])
+
+
+class IntradayBarAggregator:
+    """
+    Consume el stream de cotizaciones de `IOLClient.get_quote` y mantiene
+    barras OHLCV intradiarias por símbolo y timeframe.
+
+    - `ultimoPrecio` (o el punto medio de `puntas`) alimenta OHLC
+    - `volumen` es acumulado del día en IOL: se usa el delta entre snapshots
+    - Las barras completas se guardan en ring buffers de tamaño fijo y se
+      escriben en la base de datos (tabla intraday_bars) en lotes
+    """
+
+    DEFAULT_TIMEFRAMES = (1, 5, 15)  # Minutos
+
+    def __init__(self, iol_client=None, timeframes: tuple = DEFAULT_TIMEFRAMES,
+                 buffer_size: int = 500, flush_batch_size: int = 200,
+                 flush_interval: int = 60, persist: bool = True):
+        """
+        Args:
+            iol_client: Cliente IOL usado por `poll` (opcional si se llama on_quote directo)
+            timeframes: Timeframes a construir, en minutos
+            buffer_size: Barras completas que se conservan en memoria por símbolo/timeframe
+            flush_batch_size: Barras pendientes que disparan una escritura a la base
+            flush_interval: Segundos máximos entre escrituras a la base
+            persist: Si False, las barras solo viven en memoria
+        """
+        self.iol_client = iol_client
+        self.timeframes = tuple(sorted(timeframes))
+        self.buffer_size = buffer_size
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval = flush_interval
+        self.persist = persist
+
+        self._buffers: Dict[tuple, BarRingBuffer] = {}  # (symbol, tf) -> buffer
+        self._current: Dict[tuple, Dict] = {}  # (symbol, tf) -> barra en formación
+        self._last_cum_volume: Dict[str, float] = {}
+        self._last_price: Dict[str, float] = {}
+        self._last_quote_time: Dict[str, float] = {}
+        self._pending: List[Dict] = []
+        self._last_flush = time.time()
+        self._table_ready = False
+        self._lock = Lock()
+
+        self.running = False
+        self._thread = None
+        self._stop_event = Event()
+
+        self.stats = {
+            'quotes_processed': 0,
+            'quotes_rejected': 0,
+            'bars_completed': 0,
+            'bars_flushed': 0,
+            'flush_errors': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Ingesta de cotizaciones
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _extract_price(quote: Dict) -> Optional[float]:
+        """Precio del snapshot: último operado o, si no hay, punto medio de puntas"""
+        price = quote.get('ultimoPrecio') or quote.get('price')
+        if price:
+            return float(price)
+
+        puntas = quote.get('puntas')
+        if isinstance(puntas, list):
+            puntas = puntas[0] if puntas else None
+        if isinstance(puntas, dict):
+            bid = puntas.get('compradorPrecio') or 0
+            ask = puntas.get('vendedorPrecio') or 0
+            if bid and ask:
+                return (float(bid) + float(ask)) / 2
+            if bid or ask:
+                return float(bid or ask)
+        return None
+
+    def on_quote(self, symbol: str, quote: Dict, timestamp: Optional[float] = None) -> bool:
+        """
+        Procesa un snapshot de cotización.
+
+        Args:
+            symbol: Símbolo
+            quote: Dict tal como lo devuelve IOLClient.get_quote
+            timestamp: Epoch en segundos del snapshot (None = ahora)
+
+        Returns:
+            True si el snapshot se incorporó a las barras
+        """
+        if not quote or 'error' in quote:
+            self.stats['quotes_rejected'] += 1
+            return False
+
+        price = self._extract_price(quote)
+        if not price or price <= 0:
+            self.stats['quotes_rejected'] += 1
+            return False
+
+        ts = time.time() if timestamp is None else float(timestamp)
+        symbol = symbol.replace('.BA', '')
+
+        with self._lock:
+            # Volumen incremental (IOL reporta el acumulado del día)
+            volume_delta = 0.0
+            cum_volume = quote.get('volumen') or quote.get('volume')
+            if cum_volume is not None:
+                cum_volume = float(cum_volume)
+                last_cum = self._last_cum_volume.get(symbol)
+                if last_cum is None:
+                    volume_delta = 0.0
+                elif cum_volume >= last_cum:
+                    volume_delta = cum_volume - last_cum
+                else:
+                    volume_delta = cum_volume  # Nueva rueda: el acumulado se reinició
+                self._last_cum_volume[symbol] = cum_volume
+
+            self._last_price[symbol] = price
+            self._last_quote_time[symbol] = ts
+
+            for tf in self.timeframes:
+                key = (symbol, tf)
+                bucket_start = ts - (ts % (tf * 60))
+                bar = self._current.get(key)
+
+                if bar is not None and bar['timestamp'] != bucket_start:
+                    if bucket_start < bar['timestamp']:
+                        continue  # Snapshot fuera de orden: se descarta para este timeframe
+                    self._complete_bar(symbol, tf, bar)
+                    bar = None
+
+                if bar is None:
+                    self._current[key] = {
+                        'timestamp': bucket_start,
+                        'open': price,
+                        'high': price,
+                        'low': price,
+                        'close': price,
+                        'volume': volume_delta
+                    }
+                else:
+                    bar['high'] = max(bar['high'], price)
+                    bar['low'] = min(bar['low'], price)
+                    bar['close'] = price
+                    bar['volume'] += volume_delta
+
+            self.stats['quotes_processed'] += 1
+
+        self._maybe_flush()
+        return True
+
+    def _complete_bar(self, symbol: str, tf: int, bar: Dict):
+        """Mueve una barra terminada al ring buffer y a la cola de escritura (con lock tomado)"""
+        key = (symbol, tf)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = BarRingBuffer(self.buffer_size)
+        buffer.append(bar)
+        self._current.pop(key, None)
+        self.stats['bars_completed'] += 1
+
+        if self.persist:
+            self._pending.append({'symbol': symbol, 'timeframe': f"{tf}m", **bar})
+            # Evitar crecimiento sin límite si la base no está disponible
+            max_pending = self.flush_batch_size * 10
+            if len(self._pending) > max_pending:
+                del self._pending[:len(self._pending) - max_pending]
+
+    def close_elapsed_bars(self, now: Optional[float] = None):
+        """Cierra las barras cuyo intervalo ya terminó aunque no hayan llegado más cotizaciones"""
+        now = time.time() if now is None else now
+        with self._lock:
+            for (symbol, tf), bar in list(self._current.items()):
+                if now >= bar['timestamp'] + tf * 60:
+                    self._complete_bar(symbol, tf, bar)
+
+    def poll(self, symbols: List[str]) -> int:
+        """
+        Pide una cotización por símbolo a IOL y la incorpora a las barras.
+
+        Returns:
+            Cantidad de snapshots procesados correctamente
+        """
+        if not self.iol_client:
+            return 0
+
+        processed = 0
+        for symbol in symbols:
+            try:
+                quote = self.iol_client.get_quote(symbol.replace('.BA', ''))
+                if self.on_quote(symbol, quote):
+                    processed += 1
+            except Exception as e:
+                logger.debug(f"Error obteniendo cotización de {symbol}: {e}")
+
+        self.close_elapsed_bars()
+        return processed
+
+    # ------------------------------------------------------------------
+    # Persistencia por lotes
+    # ------------------------------------------------------------------
+
+    def _maybe_flush(self):
+        if not self.persist:
+            return
+        if (len(self._pending) >= self.flush_batch_size or
+                time.time() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Escribe las barras completas pendientes en la base de datos en un solo lote.
+
+        Returns:
+            Cantidad de barras escritas
+        """
+        with self._lock:
+            batch = self._pending
+            self._pending = []
+            self._last_flush = time.time()
+
+        if not batch:
+            return 0
+
+        try:
+            from src.core.database import SessionLocal, engine
+            from src.models.market_data import IntradayBar
+
+            if not self._table_ready:
+                IntradayBar.__table__.create(bind=engine, checkfirst=True)
+                self._table_ready = True
+
+            rows = [{
+                'symbol': bar['symbol'],
+                'timeframe': bar['timeframe'],
+                'timestamp': datetime.fromtimestamp(bar['timestamp']),
+                'open': bar['open'],
+                'high': bar['high'],
+                'low': bar['low'],
+                'close': bar['close'],
+                'volume': bar['volume'],
+                'source': 'iol_quotes'
+            } for bar in batch]
+
+            db = SessionLocal()
+            try:
+                db.bulk_insert_mappings(IntradayBar, rows)
+                db.commit()
+            finally:
+                db.close()
+
+            self.stats['bars_flushed'] += len(rows)
+            return len(rows)
+        except Exception as e:
+            self.stats['flush_errors'] += 1
+            logger.warning(f"Error guardando barras intradiarias: {e}")
+            # Devolver el lote a la cola para el próximo intento
+            with self._lock:
+                self._pending = batch + self._pending
+            return 0
+
+    # ------------------------------------------------------------------
+    # Lectura (feed intradiario para TechnicalAnalysisService)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_timeframe(timeframe: Union[str, int]) -> int:
+        if isinstance(timeframe, str):
+            return int(timeframe.lower().rstrip('m'))
+        return int(timeframe)
+
+    def get_bars(self, symbol: str, timeframe: Union[str, int] = '5m',
+                 n: Optional[int] = None, include_partial: bool = True) -> pd.DataFrame:
+        """
+        Devuelve las últimas barras de un símbolo.
+
+        Args:
+            symbol: Símbolo (con o sin .BA)
+            timeframe: '1m', '5m', '15m' (o minutos como int)
+            n: Cantidad máxima de barras (None = todas las disponibles)
+            include_partial: Incluir la barra en formación como última fila
+
+        Returns:
+            DataFrame con columnas open/high/low/close/volume indexado por timestamp
+        """
+        tf = self._parse_timeframe(timeframe)
+        key = (symbol.replace('.BA', ''), tf)
+
+        with self._lock:
+            buffer = self._buffers.get(key)
+            data = buffer.last(n) if buffer is not None else np.empty((0, len(BAR_FIELDS)))
+            current = self._current.get(key)
+            if include_partial and current is not None:
+                partial = np.array([[current[field] for field in BAR_FIELDS]])
+                data = np.vstack([data, partial])
+                if n is not None:
+                    data = data[-n:]
+
+        index = pd.DatetimeIndex([datetime.fromtimestamp(ts) for ts in data[:, 0]], name='timestamp')
+        return pd.DataFrame(data[:, 1:], columns=list(BAR_FIELDS[1:]), index=index)
+
+    def get_latest_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Último precio visto para el símbolo.
+
+        Args:
+            max_age: Antigüedad máxima en segundos (None = sin límite)
+
+        Returns:
+            Precio o None si no hubo cotizaciones (o la última es más vieja que max_age)
+        """
+        symbol = symbol.replace('.BA', '')
+        if max_age is not None:
+            last_time = self._last_quote_time.get(symbol)
+            if last_time is None or time.time() - last_time > max_age:
+                return None
+        return self._last_price.get(symbol)
+
+    def get_latest_quote(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Último snapshot visto para el símbolo, con el volumen tal como lo
+        informa la cotización (acumulado del día en IOL, no el de la barra).
+
+        Returns:
+            {'price', 'volume', 'timestamp'} o None (sin cotizaciones o más vieja que max_age)
+        """
+        price = self.get_latest_price(symbol, max_age=max_age)
+        if price is None:
+            return None
+        symbol = symbol.replace('.BA', '')
+        with self._lock:
+            volume = self._last_cum_volume.get(symbol, 0.0)
+            quote_time = self._last_quote_time.get(symbol)
+        return {
+            'price': price,
+            'volume': volume,
+            'timestamp': datetime.fromtimestamp(quote_time).isoformat() if quote_time else "N/A",
+        }
+
+    def get_symbols(self) -> List[str]:
+        """Símbolos con al menos una cotización procesada"""
+        return sorted(self._last_price.keys())
+
+    # ------------------------------------------------------------------
+    # Loop en background
+    # ------------------------------------------------------------------
+
+    def start(self, symbols: Union[List[str], Callable[[], List[str]]], interval: int = 30):
+        """
+        Inicia el polling de cotizaciones en un thread en background.
+
+        Args:
+            symbols: Lista fija de símbolos o función que la devuelve; con una
+                función la lista se resuelve en cada ciclo (toma los símbolos
+                que agregue la sincronización del portafolio)
+            interval: Segundos entre ciclos de polling
+        """
+        if self.running:
+            logger.warning("Agregador de barras ya está corriendo")
+            return
+
+        self.running = True
+        self._stop_event.clear()
+        get_symbols = symbols if callable(symbols) else (lambda: symbols)
+
+        def poll_loop():
+            while self.running:
+                try:
+                    self.poll(list(get_symbols()))
+                except Exception as e:
+                    logger.error(f"Error en loop de barras intradiarias: {e}")
+                # Esperar con el evento: stop() despierta el loop sin aguardar el intervalo
+                self._stop_event.wait(interval)
+
+        self._thread = Thread(target=poll_loop, daemon=True, name='intraday_bars')
+        self._thread.start()
+        logger.info(f"Agregador de barras iniciado (cada {interval}s)")
+
+    def stop(self, timeout: float = 30):
+        """Detiene el polling y escribe las barras pendientes"""
+        self.running = False
+        self._stop_event.set()
+        if self._thread:
+            # Un ciclo de poll en curso (una cotización por símbolo) puede tardar
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning("El thread de barras intradiarias no terminó a tiempo")
+            self._thread = None
+        self.flush()
+        logger.info("Agregador de barras detenido")
@@ -14,9 +14,10 @@ import numpy as np
 import pandas as pd
 import ta
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
 from src.models.market_data import MarketData
 from src.models.price_predictor import LSTMPricePredictor
+from src.services.model_registry import ModelRegistry
 
 
 class ContinuousLearning:
@@ -104,7 +105,7 @@ class ContinuousLearning:
             return {"error": "Model not found or incompatible", "should_retrain": True}
 
         # Get recent data
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             # Fetch enough data for indicators (60 seq + 30 eval + 50 buffer for indicators)
             records = (
@@ -197,7 +198,7 @@ class ContinuousLearning:
         print(f"🔄 Retraining model for {symbol}...")
 
         # Load data
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             records = (
                 db.query(MarketData)
@@ -224,10 +225,8 @@ class ContinuousLearning:
             # Pass full feature matrix
             history = predictor.train(feature_data, epochs=epochs, batch_size=32, validation_split=0.2)
 
-            # Save model
-            os.makedirs(self.model_path, exist_ok=True)
-            model_file = os.path.join(self.model_path, symbol)
-            predictor.save(model_file)
+            # Publish new version (checksums + hot-swap in running model caches)
+            entry = ModelRegistry(self.model_path).publish(symbol, predictor)
 
             # Get final metrics
             final_loss = history.history["loss"][-1]
@@ -243,6 +242,7 @@ class ContinuousLearning:
                 "training_loss": float(final_loss),
                 "validation_loss": float(final_val_loss),
                 "epochs": epochs,
+                "model_version": entry["version"],
                 "success": True,
             }
 
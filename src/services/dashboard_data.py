@@ -0,0 +1,431 @@
+"""
+Capa de Datos del Dashboard
+Read model incremental para el dashboard de Streamlit: un builder en segundo
+plano vigila trades.json por firma (mtime, tamaño) y el log de operaciones
+por offset (cursor), y mantiene vistas pre-agregadas (P&L, posiciones,
+operaciones recientes, estadísticas por símbolo). Cuando algo cambia solo se
+agregan los registros nuevos (y se descuentan los que salen de la ventana),
+así el costo de cada refresh no crece con el historial.
+
+Cada vista tiene una versión; el dashboard la usa como clave de st.cache_data,
+por lo que la caché se invalida sola cuando la vista cambia.
+"""
+import bisect
+import json
+import os
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.logger import get_logger
+from src.services.operations_log import OperationsLog, get_operations_log
+
+logger = get_logger("dashboard_data")
+
+TRADES_FILE = Path("trades.json")
+
+
+def file_signature(path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, tamaño) del archivo, o None si no existe"""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def read_json(path, default=None):
+    """Lee un archivo JSON tolerando archivos ausentes, vacíos o a medio escribir"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return json.loads(content) if content.strip() else default
+    except (OSError, ValueError):
+        return default
+
+
+def _parse_time(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class JsonListSource:
+    """
+    Archivo JSON con una lista de registros que el escritor reescribe completo
+    (append al final y recorte desde el inicio). Se relee solo si cambia su firma
+    y devuelve el delta respecto de la lectura anterior.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.signature = None
+        self.records: List[Dict] = []
+
+    def poll(self) -> Optional[Tuple[List[Dict], List[Dict], bool]]:
+        """
+        Returns:
+            None si el archivo no cambió; si cambió (agregados, descartados, reset).
+            reset=True indica que el contenido no continúa al anterior y hay que reconstruir.
+        """
+        signature = file_signature(self.path)
+        if signature == self.signature:
+            return None
+        data = read_json(self.path, default=[]) if signature else []
+        if not isinstance(data, list):
+            data = []
+        if signature and not data and self.records:
+            # Archivo a medio escribir: reintentar en el próximo poll
+            return None
+        self.signature = signature
+
+        previous = self.records
+        self.records = data
+        if not previous:
+            return data, [], True
+        # Ubicar el último registro conocido en la lista nueva (buscando desde el final)
+        last = previous[-1]
+        for idx in range(len(data) - 1, -1, -1):
+            if data[idx] == last:
+                dropped = len(previous) - (idx + 1)
+                if dropped >= 0 and data[0] == previous[dropped]:
+                    return data[idx + 1:], previous[:dropped], False
+                break
+        return data, [], True
+
+
+class OperationsLogSource:
+    """
+    Últimos `window` eventos del log de operaciones, leídos con un cursor:
+    cada poll solo lee lo escrito desde el offset anterior.
+    """
+
+    def __init__(self, log: OperationsLog, window: int = 1000):
+        self.path = log.directory
+        self.signature = None
+        self.window = window
+        self.records: deque = deque()
+        self.cursor = log.cursor(offset=max(0, log.last_seq() - window))
+
+    def poll(self) -> Optional[Tuple[List[Dict], List[Dict], bool]]:
+        added = self.cursor.poll()
+        if not added:
+            return None
+        self.records.extend(added)
+        dropped = []
+        while len(self.records) > self.window:
+            dropped.append(self.records.popleft())
+        return added, dropped, False
+
+
+class TimeOrderedRecords:
+    """
+    Registros ordenados por timestamp con altas y bajas por bisect. Como los
+    trades llegan casi siempre en orden, agregar es O(1) amortizado.
+    """
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.records: List[Dict] = []
+
+    @staticmethod
+    def key(record: Dict) -> str:
+        return str(record.get('timestamp') or '')
+
+    def add(self, record: Dict) -> int:
+        key = self.key(record)
+        idx = bisect.bisect_right(self.keys, key)
+        self.keys.insert(idx, key)
+        self.records.insert(idx, record)
+        return idx
+
+    def remove(self, record: Dict) -> Optional[int]:
+        key = self.key(record)
+        for idx in range(bisect.bisect_left(self.keys, key), bisect.bisect_right(self.keys, key)):
+            if self.records[idx] == record:
+                del self.keys[idx]
+                del self.records[idx]
+                return idx
+        return None
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _discard(records: deque, record: Dict):
+    """Quita un registro de una lista en orden de llegada (los descartados suelen ser los más viejos)"""
+    if records and records[0] == record:
+        records.popleft()
+        return
+    try:
+        records.remove(record)
+    except ValueError:
+        pass
+
+
+class TradesView:
+    """Agregados de trades.json mantenidos por suma/resta de registros"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total_trades = 0
+        self.closed_trades = 0
+        self.pnl = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.bot = Counter()
+        self.bot_pnl = 0.0
+        self.symbols: Dict[str, Counter] = defaultdict(Counter)
+        self.positions: Dict[str, float] = defaultdict(float)
+        # Listas de la vista, mantenidas al agregar/descontar cada registro
+        self.bot_sales = TimeOrderedRecords()
+        self.pnl_series: List[Dict] = []
+        self.bot_trades = TimeOrderedRecords()
+        self.manual_trades: deque = deque()
+        self.paper_trades: deque = deque()
+        self.sales_with_pnl: deque = deque()
+
+    @staticmethod
+    def _is_bot_trade(trade: Dict) -> bool:
+        return trade.get('mode') in ('LIVE', 'PAPER')
+
+    def _reaccumulate(self, start: int):
+        """Recalcula el P&L acumulado desde `start` (al agregar en orden solo es el último punto)"""
+        cumulative = self.pnl_series[start - 1]['pnl_cumulative'] if start > 0 else 0.0
+        for idx in range(start, len(self.bot_sales)):
+            trade = self.bot_sales.records[idx]
+            cumulative += trade['pnl']
+            # Puntos nuevos (no mutados): las vistas ya publicadas comparten los anteriores
+            self.pnl_series[idx] = {'timestamp': trade.get('timestamp'), 'pnl': trade['pnl'],
+                                    'symbol': trade.get('symbol'), 'pnl_cumulative': cumulative}
+
+    def _apply_lists(self, trade: Dict, sign: int):
+        is_bot = self._is_bot_trade(trade)
+        is_sale = str(trade.get('signal', '')).upper() == 'SELL' and trade.get('pnl') is not None
+
+        if is_bot and is_sale:
+            if sign > 0:
+                idx = self.bot_sales.add(trade)
+                self.pnl_series.insert(idx, None)
+            else:
+                idx = self.bot_sales.remove(trade)
+                if idx is not None:
+                    del self.pnl_series[idx]
+            if idx is not None:
+                self._reaccumulate(idx)
+        if is_bot or 'signal' in trade:
+            if sign > 0:
+                self.bot_trades.add(trade)
+            else:
+                self.bot_trades.remove(trade)
+
+        for records, matches in ((self.manual_trades, trade.get('strategy') == 'Manual_Direct'),
+                                 (self.paper_trades, trade.get('paper_trading', False)),
+                                 (self.sales_with_pnl, is_sale)):
+            if not matches:
+                continue
+            if sign > 0:
+                records.append(trade)
+            else:
+                _discard(records, trade)
+
+    def apply(self, trade: Dict, sign: int = 1):
+        """Suma (sign=1) o descuenta (sign=-1) un trade de los agregados"""
+        pnl = trade.get('pnl')
+        self.total_trades += sign
+        if pnl is not None:
+            self.closed_trades += sign
+            self.pnl += sign * pnl
+            self.wins += sign * (pnl > 0)
+            self.losses += sign * (pnl < 0)
+
+        side = str(trade.get('signal') or trade.get('action') or '').upper()
+        if self._is_bot_trade(trade):
+            self.bot['trades'] += sign
+            if side == 'SELL' and pnl is not None:
+                self.bot['sales_with_pnl'] += sign
+                self.bot['wins'] += sign * (pnl > 0)
+                self.bot['losses'] += sign * (pnl < 0)
+                self.bot_pnl += sign * pnl
+
+        symbol = trade.get('symbol')
+        if symbol:
+            quantity = trade.get('quantity') or 0
+            stats = self.symbols[symbol]
+            stats['trades'] += sign
+            stats['volume'] += sign * quantity * (trade.get('price') or 0)
+            if side in ('BUY', 'SELL'):
+                stats[side.lower() + 's'] += sign
+                self.positions[symbol] += sign * (quantity if side == 'BUY' else -quantity)
+            if pnl is not None:
+                stats['pnl'] += sign * pnl
+                stats['wins'] += sign * (pnl > 0)
+                stats['losses'] += sign * (pnl < 0)
+            if stats['trades'] <= 0:
+                del self.symbols[symbol]
+                self.positions.pop(symbol, None)
+
+        self._apply_lists(trade, sign)
+
+    def to_dict(self, records: List[Dict]) -> Dict:
+        """Vista publicada: copias de las listas mantenidas (no se vuelve a recorrer `records`)"""
+        bot_sales = self.bot['sales_with_pnl']
+        return {
+            'summary': {
+                'total_trades': self.total_trades,
+                'closed_trades': self.closed_trades,
+                'pnl': self.pnl,
+                'wins': self.wins,
+                'losses': self.losses,
+                'win_rate': (self.wins / self.closed_trades * 100) if self.closed_trades else 0.0,
+            },
+            'bot': {
+                'total_trades': self.bot['trades'],
+                'sales_with_pnl': bot_sales,
+                'pnl': self.bot_pnl,
+                'wins': self.bot['wins'],
+                'losses': self.bot['losses'],
+                'win_rate': (self.bot['wins'] / bot_sales * 100) if bot_sales else 0.0,
+            },
+            'symbols': {s: dict(c) for s, c in self.symbols.items()},
+            'positions': {s: q for s, q in self.positions.items() if abs(q) > 1e-9},
+            'pnl_series': list(self.pnl_series),
+            'recent_bot_trades': self.bot_trades.records[:-51:-1],
+            'manual_trades': list(islice(reversed(self.manual_trades), 10))[::-1],
+            'paper_trades': list(self.paper_trades),
+            'sales_with_pnl': list(self.sales_with_pnl),
+        }
+
+
+class OperationsView:
+    """Agregados del log de operaciones: conteos por tipo y por día"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.by_type = Counter()
+        self.by_day = Counter()
+
+    def apply(self, operation: Dict, sign: int = 1):
+        self.by_type[operation.get('type', 'UNKNOWN')] += sign
+        ts = _parse_time(operation.get('timestamp'))
+        if ts is not None:
+            self.by_day[ts.date().isoformat()] += sign
+
+    def to_dict(self, records: List[Dict]) -> Dict:
+        valid = [op for op in records if _parse_time(op.get('timestamp')) is not None]
+        valid.sort(key=lambda op: op['timestamp'], reverse=True)
+        return {
+            'by_type': {k: v for k, v in self.by_type.items() if v > 0},
+            'by_day': {k: v for k, v in self.by_day.items() if v > 0},
+            'total': len(records),
+            # Ordenadas de más nueva a más vieja (la fuente ya acota la ventana)
+            'operations': valid,
+        }
+
+
+class DashboardDataService:
+    """
+    Builder del read model del dashboard.
+
+    Uso:
+        data = DashboardDataService()
+        data.start()                      # thread que refresca cada `interval` segundos
+        version = data.version('trades')  # clave para st.cache_data
+        view = data.view('trades')
+    """
+
+    def __init__(self, trades_file=TRADES_FILE, operations_log: Optional[OperationsLog] = None,
+                 interval: float = 2.0):
+        self.interval = interval
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sources: Dict[str, Tuple[JsonListSource, Any]] = {
+            'trades': (JsonListSource(trades_file), TradesView()),
+            'operations': (OperationsLogSource(operations_log or get_operations_log()), OperationsView()),
+        }
+        self._views: Dict[str, Dict] = {}
+        self._versions: Dict[str, int] = {name: 0 for name in self._sources}
+        self.stats = Counter()
+        self.refresh()
+
+    def refresh(self, names: Optional[List[str]] = None) -> List[str]:
+        """Aplica los cambios de los archivos que cambiaron; devuelve las vistas actualizadas"""
+        changed = []
+        with self._lock:
+            for name in names or list(self._sources):
+                source, aggregate = self._sources[name]
+                try:
+                    delta = source.poll()
+                except Exception as e:
+                    logger.warning(f"Error leyendo {source.path}: {e}")
+                    continue
+                if delta is None:
+                    continue
+                added, dropped, reset = delta
+                if reset:
+                    aggregate.reset()
+                    self.stats['rebuilds'] += 1
+                else:
+                    for record in dropped:
+                        aggregate.apply(record, -1)
+                    self.stats['incremental'] += 1
+                for record in added:
+                    aggregate.apply(record, 1)
+                self._views[name] = aggregate.to_dict(source.records)
+                self._versions[name] += 1
+                changed.append(name)
+        return changed
+
+    def invalidate(self, name: Optional[str] = None):
+        """Fuerza la relectura (p.ej. después de que el propio dashboard escribió el archivo)"""
+        with self._lock:
+            for key in ([name] if name else list(self._sources)):
+                self._sources[key][0].signature = None
+        self.refresh([name] if name else None)
+
+    def version(self, name: str) -> int:
+        return self._versions[name]
+
+    def view(self, name: str) -> Dict:
+        with self._lock:
+            return self._views.get(name) or self._sources[name][1].to_dict([])
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dashboard-data", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refrescando vistas del dashboard: {e}")
+
+
+def operations_in_window(operations: List[Dict], hours: float, operation_type: str = "Todas",
+                         now: Optional[datetime] = None) -> List[Dict]:
+    """Operaciones (ya ordenadas de más nueva a más vieja) de las últimas `hours` horas"""
+    now = now or datetime.now()
+    result = []
+    for op in operations:
+        ts = _parse_time(op['timestamp'])
+        if (now - ts).total_seconds() > hours * 3600:
+            break
+        if operation_type == "Todas" or op.get('type') == operation_type:
+            result.append(op)
+    return result
@@ -416,32 +416,48 @@ class MultiTimeframeAnalyzer:
 class AdvancedRiskDashboard:
     """Dashboard avanzado de riesgo"""
     
-    def calculate_portfolio_risk(self, portfolio: List[Dict]) -> Dict:
-        """Calcula métricas de riesgo del portafolio"""
+    def calculate_portfolio_risk(self, portfolio: List[Dict], returns=None) -> Dict:
+        """
+        Calcula métricas de riesgo del portafolio.
+        Con `returns` (DataFrame de retornos diarios por símbolo) agrega VaR/CVaR
+        y el aporte de cada posición al VaR.
+        """
         if not portfolio:
             return {}
         
-        total_value = sum(p.get('total_val', 0) for p in portfolio)
-        
-        # Calcular exposición por símbolo
-        exposures = {}
-        for position in portfolio:
-            symbol = position.get('symbol', '')
-            value = position.get('total_val', 0)
-            if total_value > 0:
-                exposures[symbol] = (value / total_value) * 100
+        symbols = [p.get('symbol', '') for p in portfolio]
+        values = np.array([p.get('total_val', 0) or 0 for p in portfolio], dtype=float)
+        total_value = float(values.sum())
         
-        # Calcular concentración (Herfindahl Index)
-        concentration = sum(w**2 for w in exposures.values()) / 100
+        # Exposición por símbolo (%) y concentración (Herfindahl Index)
+        weights = values / total_value * 100 if total_value > 0 else np.zeros(0)
+        exposures = dict(zip(symbols, weights.tolist()))
+        concentration = float(np.square(weights).sum()) / 100
+        top = int(np.argmax(weights)) if weights.size else None
         
-        return {
+        risk = {
             'total_value': total_value,
             'position_count': len(portfolio),
             'exposures': exposures,
             'concentration_index': concentration,
-            'max_exposure': max(exposures.values()) if exposures else 0,
-            'max_exposure_symbol': max(exposures.items(), key=lambda x: x[1])[0] if exposures else None,
+            'max_exposure': float(weights[top]) if top is not None else 0,
+            'max_exposure_symbol': symbols[top] if top is not None else None,
         }
+        
+        if returns is not None:
+            from src.services.portfolio_risk import PortfolioRiskEngine
+            engine = PortfolioRiskEngine()
+            engine.set_returns(returns)
+            engine.set_positions(portfolio)
+            report = engine.get_report()
+            risk.update({
+                'var': report['var'],
+                'cvar': report['cvar'],
+                'var_pct': report['var_pct'] * 100,
+                'component_var': report['component_var'],
+            })
+        
+        return risk
     
     def calculate_var(self, returns: List[float], confidence_level: float = 0.95) -> float:
         """Calcula Value at Risk (VaR)"""
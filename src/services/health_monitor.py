@@ -13,6 +13,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 
 from src.core.logger import get_logger
 from src.connectors.iol_client import IOLClient
+from src.core.metrics import metrics, load_snapshot
 
 logger = get_logger("health_monitor")
 
@@ -487,7 +488,24 @@ class HealthMonitor:
             "timestamp": health.timestamp.isoformat(),
             "components": [asdict(c) for c in health.components],
             "metrics": health.metrics,
-            "recommendations": health.recommendations
+            "recommendations": health.recommendations,
+            "cycle_timing": self._get_cycle_timing()
+        }
+    
+    def _get_cycle_timing(self) -> Dict:
+        """Tiempos del último ciclo de análisis (en proceso o desde el snapshot del bot)"""
+        summary = metrics.get_cycle_summary()
+        if summary:
+            return summary
+        
+        snapshot = load_snapshot()
+        cycles = (snapshot or {}).get("cycles") or []
+        if not cycles:
+            return {}
+        return {
+            "last_cycle": cycles[-1],
+            "cycles_tracked": len(cycles),
+            "avg_cycle_ms": round(sum(c["total_ms"] for c in cycles) / len(cycles), 2)
         }
     
     def get_health_history(self, hours: int = 24) -> List[Dict]:
@@ -10,7 +10,7 @@ import json
 from pathlib import Path
 
 from src.core.logger import get_logger
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
 from src.models.market_data import MarketData
 from src.models.price_predictor import LSTMPricePredictor
 from src.services.continuous_learning import ContinuousLearning
@@ -39,7 +39,7 @@ class HyperparameterOptimizer:
         logger.info(f"Iniciando Grid Search para {symbol}")
         
         # Cargar datos
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             records = db.query(MarketData).filter(
                 MarketData.symbol == symbol
@@ -148,7 +148,7 @@ class HyperparameterOptimizer:
         logger.info(f"Iniciando Random Search para {symbol} ({n_iter} iteraciones)")
         
         # Cargar datos
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             records = db.query(MarketData).filter(
                 MarketData.symbol == symbol
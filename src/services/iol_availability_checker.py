@@ -5,6 +5,7 @@ Verifies if symbols and markets are available in IOL (InvertirOnline).
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
@@ -75,34 +76,42 @@ class IOLAvailabilityChecker:
             self._cache[symbol] = result
             return result
     
-    def check_multiple_symbols(self, symbols: List[str]) -> Dict[str, Tuple[bool, Optional[str]]]:
+    def check_multiple_symbols(self, symbols: List[str],
+                               max_workers: int = 8) -> Dict[str, Tuple[bool, Optional[str]]]:
         """
-        Check availability of multiple symbols.
+        Check availability of multiple symbols concurrently.
         
         Args:
             symbols: List of symbols to check
+            max_workers: Concurrent quote requests (1 = sequential).
+                The shared IOL rate limiter still bounds the request rate.
         
         Returns:
-            Dictionary mapping symbol to (is_available, error_message)
+            Dictionary mapping symbol to (is_available, error_message), in input order
         """
-        results = {}
-        for symbol in symbols:
-            results[symbol] = self.is_symbol_available(symbol)
-        return results
+        unique_symbols = list(dict.fromkeys(symbols))
+        if max_workers <= 1 or len(unique_symbols) <= 1:
+            return {symbol: self.is_symbol_available(symbol) for symbol in unique_symbols}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_symbols)),
+                                thread_name_prefix='iol_availability') as executor:
+            checks = executor.map(self.is_symbol_available, unique_symbols)
+            return dict(zip(unique_symbols, checks))
     
-    def get_unavailable_symbols(self, symbols: List[str]) -> List[Tuple[str, str]]:
+    def get_unavailable_symbols(self, symbols: List[str], max_workers: int = 8) -> List[Tuple[str, str]]:
         """
         Get list of symbols that are NOT available in IOL.
         
         Args:
             symbols: List of symbols to check
+            max_workers: Concurrent quote requests (1 = sequential)
         
         Returns:
             List of tuples (symbol, error_message) for unavailable symbols
         """
         unavailable = []
-        for symbol in symbols:
-            is_available, error_msg = self.is_symbol_available(symbol)
+        results = self.check_multiple_symbols(symbols, max_workers=max_workers)
+        for symbol, (is_available, error_msg) in results.items():
             if not is_available:
                 unavailable.append((symbol, error_msg or "No disponible en IOL"))
         return unavailable
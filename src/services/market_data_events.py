@@ -0,0 +1,75 @@
+"""
+Eventos de Ingesta de Datos de Mercado
+Avisa a los consumidores (p.ej. la caché de predicciones de la API) cuando
+entran barras nuevas o se actualiza la del día en market_data.
+
+- En el mismo proceso: quien escribe (DataCollector) publica los símbolos
+  después del commit y los suscriptores reciben la lista.
+- Entre procesos (scripts/ingest_data.py, el bot): last_bar_markers() da una
+  marca de la última barra por símbolo (timestamp, close, volumen); si la
+  marca cambió, los datos cambiaron.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from src.core.logger import get_logger
+
+logger = get_logger("market_data_events")
+
+_subscribers: List[Callable[[List[str]], None]] = []
+_lock = threading.Lock()
+
+
+def subscribe_market_data(callback: Callable[[List[str]], None]):
+    """Registra un callback que recibe los símbolos ingeridos"""
+    with _lock:
+        if callback not in _subscribers:
+            _subscribers.append(callback)
+
+
+def unsubscribe_market_data(callback: Callable[[List[str]], None]):
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def publish_market_data(symbols: Iterable[str]):
+    """Publica que entraron datos nuevos para `symbols` (llamar después del commit)"""
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return
+    with _lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        try:
+            callback(symbols)
+        except Exception as e:
+            logger.error(f"Error en suscriptor de datos de mercado: {e}")
+
+
+def last_bar_markers(symbols: Iterable[str]) -> Dict[str, Tuple]:
+    """Marca (timestamp, close, volumen) de la última barra diaria de cada símbolo"""
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+
+    from sqlalchemy import and_, func
+    from src.core.database import ReadSessionLocal
+    from src.models.market_data import MarketData
+
+    db = ReadSessionLocal()
+    try:
+        last = (
+            db.query(MarketData.symbol, func.max(MarketData.timestamp).label('timestamp'))
+            .filter(MarketData.symbol.in_(symbols))
+            .group_by(MarketData.symbol)
+            .subquery()
+        )
+        rows = (
+            db.query(MarketData.symbol, MarketData.timestamp, MarketData.close, MarketData.volume)
+            .join(last, and_(MarketData.symbol == last.c.symbol, MarketData.timestamp == last.c.timestamp))
+            .all()
+        )
+        return {symbol: (timestamp, close, volume) for symbol, timestamp, close, volume in rows}
+    finally:
+        db.close()
@@ -0,0 +1,509 @@
+"""
+Model Registry y Model Server
+Versiona los modelos LSTM por símbolo (con checksums), los mantiene una sola
+vez en memoria (LRU) y los sirve al resto de los procesos por un socket local.
+
+- ModelRegistry: publica versiones (models/versions/<SYMBOL>/v<N>_*) y mantiene
+  models/<SYMBOL>_model.h5 / _scaler.pkl como versión actual, con sha256 en
+  models/registry.json
+- ModelCache: caché LRU en memoria; recarga el modelo cuando cambia la versión
+  publicada (hot-swap tras un reentrenamiento)
+- ModelServer / ModelClient: worker que atiende pedidos de predicción en batch
+  del bot, el dashboard y la API (MODEL_SERVER_ENABLED=1)
+
+Uso:
+    python src/services/model_registry.py --max-models 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+
+from src.core.logger import get_logger
+from src.core.metrics import metrics
+
+logger = get_logger("model_registry")
+
+MANIFEST_FILE = "registry.json"
+GENERIC_MODEL = "lstm"  # models/lstm_model.h5: fallback para símbolos sin modelo propio
+
+DEFAULT_ADDRESS = (os.getenv('MODEL_SERVER_HOST', '127.0.0.1'), int(os.getenv('MODEL_SERVER_PORT', '6001')))
+# Clave por instalación (si no hay MODEL_SERVER_AUTHKEY): compartida por bot, dashboard y API
+DEFAULT_KEY_FILE = Path(__file__).resolve().parents[2] / "data" / "model_server.key"
+
+
+def load_authkey(key_file: Optional[Path] = None) -> bytes:
+    """
+    Clave del model server. multiprocessing.connection usa pickle: quien conozca
+    la clave puede ejecutar código en el servidor, así que nunca hay un valor fijo.
+
+    Usa MODEL_SERVER_AUTHKEY si está definida; si no, lee (o genera la primera
+    vez) un secreto aleatorio en data/model_server.key con permisos 0600.
+    """
+    env_key = os.getenv('MODEL_SERVER_AUTHKEY')
+    if env_key:
+        return env_key.encode()
+
+    key_file = Path(os.getenv('MODEL_SERVER_KEY_FILE', '') or key_file or DEFAULT_KEY_FILE)
+    try:
+        key_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(secrets.token_hex(32))
+        logger.info(f"Clave del model server generada en {key_file}")
+
+    key = key_file.read_text(encoding='utf-8').strip()
+    if not key:
+        raise ValueError(f"Clave del model server vacía en {key_file}")
+    return key.encode()
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _default_loader(prefix: str):
+    from src.models.price_predictor import LSTMPricePredictor
+
+    predictor = LSTMPricePredictor()
+    predictor.load(prefix)
+    return predictor
+
+
+class ModelRegistry:
+    """Versiones publicadas de los modelos por símbolo"""
+
+    def __init__(self, model_path: str = "models", keep_versions: int = 3):
+        self.model_path = Path(model_path)
+        self.keep_versions = keep_versions
+        self.manifest_path = self.model_path / MANIFEST_FILE
+        self._manifest: Dict = {}
+        self._manifest_mtime = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self) -> Dict:
+        """Manifest cacheado; solo se relee si el archivo cambió"""
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._manifest_mtime:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+                self._manifest_mtime = mtime
+            except (OSError, ValueError):
+                return self._manifest
+        return self._manifest
+
+    def _write_manifest(self, manifest: Dict):
+        self.model_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def entry(self, symbol: str) -> Optional[Dict]:
+        """Versión publicada del símbolo (None si el modelo no pasó por el registry)"""
+        return self._read_manifest().get(symbol)
+
+    def current_files(self, symbol: str) -> Tuple[Path, Path]:
+        return self.model_path / f"{symbol}_model.h5", self.model_path / f"{symbol}_scaler.pkl"
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """Nombre del modelo a usar: el del símbolo o el genérico"""
+        for name in (symbol, GENERIC_MODEL):
+            if self.current_files(name)[0].exists():
+                return name
+        return None
+
+    def version_token(self, name: str) -> Optional[Tuple]:
+        """
+        Identifica la versión cargable de un modelo. Incluye el mtime del archivo
+        para detectar también modelos escritos sin pasar por publish().
+        """
+        try:
+            mtime = self.current_files(name)[0].stat().st_mtime_ns
+        except OSError:
+            return None
+        entry = self.entry(name)
+        return (entry['version'] if entry else 0, mtime)
+
+    # ------------------------------------------------------------------
+    # Publicación / verificación
+    # ------------------------------------------------------------------
+
+    def publish(self, symbol: str, predictor) -> Dict:
+        """
+        Guarda una nueva versión del modelo y la deja como actual.
+
+        Los archivos actuales se reemplazan con os.replace, así que los lectores
+        ven la versión anterior completa o la nueva completa.
+        """
+        with self._lock:
+            manifest = dict(self._read_manifest())
+            version = manifest.get(symbol, {}).get('version', 0) + 1
+
+            version_dir = self.model_path / "versions" / symbol
+            version_dir.mkdir(parents=True, exist_ok=True)
+            prefix = version_dir / f"v{version}"
+            predictor.save(str(prefix))
+
+            versioned = (Path(f"{prefix}_model.h5"), Path(f"{prefix}_scaler.pkl"))
+            checksums = [_sha256(path) for path in versioned]
+            for source, target in zip(versioned, self.current_files(symbol)):
+                tmp_path = target.with_name(target.name + '.tmp')
+                shutil.copyfile(source, tmp_path)
+                os.replace(tmp_path, target)
+
+            entry = {
+                'version': version,
+                'model_sha256': checksums[0],
+                'scaler_sha256': checksums[1],
+                'published_at': datetime.now().isoformat()
+            }
+            manifest[symbol] = entry
+            self._write_manifest(manifest)
+            self._prune_versions(symbol, version)
+
+        logger.info(f"Modelo {symbol} publicado (v{version})")
+        return entry
+
+    def _prune_versions(self, symbol: str, current: int):
+        version_dir = self.model_path / "versions" / symbol
+        for path in version_dir.glob("v*_*"):
+            try:
+                version = int(path.name[1:].split('_', 1)[0])
+            except ValueError:
+                continue
+            if version <= current - self.keep_versions:
+                path.unlink(missing_ok=True)
+
+    def verify(self, name: str) -> bool:
+        """Compara los archivos actuales con los checksums publicados"""
+        entry = self.entry(name)
+        if entry is None:
+            return True  # Modelo previo al registry: no hay checksum de referencia
+        model_file, scaler_file = self.current_files(name)
+        try:
+            return (_sha256(model_file) == entry['model_sha256'] and
+                    _sha256(scaler_file) == entry['scaler_sha256'])
+        except OSError:
+            return False
+
+    def load(self, name: str, loader: Callable = _default_loader):
+        """Carga la versión actual verificando su checksum"""
+        if not self.verify(name):
+            raise ValueError(f"Checksum inválido para el modelo {name}")
+        return loader(str(self.model_path / name))
+
+
+class ModelCache:
+    """
+    Modelos en memoria con desalojo LRU y hot-swap.
+
+    Cada get() compara la versión cargada con la publicada (un stat por llamada)
+    y recarga si el modelo fue reentrenado.
+    """
+
+    def __init__(self, registry: ModelRegistry, max_models: int = 8, loader: Callable = _default_loader):
+        self.registry = registry
+        self.max_models = max_models
+        self.loader = loader
+        self._models: "OrderedDict[str, Tuple[Tuple, object]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._failed: Dict[str, Tuple] = {}  # modelo -> versión que no cargó
+        self.stats = {'hits': 0, 'loads': 0, 'reloads': 0, 'evictions': 0, 'errors': 0, 'fallbacks': 0}
+
+    def get(self, symbol: str):
+        """
+        Predictor para el símbolo (o el genérico); None si no hay modelo utilizable.
+        Si el modelo propio del símbolo no carga o no pasa el checksum se usa el
+        genérico; sin genérico, la versión anterior del símbolo si estaba en memoria.
+        """
+        name = self.registry.resolve(symbol)
+        if name is None:
+            return None
+        predictor, previous = self._get(name)
+        if predictor is None and name != GENERIC_MODEL and self.registry.resolve(GENERIC_MODEL):
+            with self._lock:
+                self.stats['fallbacks'] += 1
+            logger.warning(f"Modelo de {symbol} no utilizable: se usa el genérico ({GENERIC_MODEL})")
+            predictor, generic_previous = self._get(GENERIC_MODEL)
+            previous = previous or generic_previous
+        return predictor if predictor is not None else previous
+
+    def _get(self, name: str):
+        """(predictor en la versión publicada o None si no carga, versión anterior en memoria)"""
+        token = self.registry.version_token(name)
+
+        with self._lock:
+            cached = self._cached(name, token)
+            if cached is not None:
+                return cached, None
+            previous = self._models.get(name)
+            if self._failed.get(name) == token:
+                # Esta versión ya falló: no reintentar hasta que se publique otra
+                return None, previous[1] if previous is not None else None
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # La carga (segundos para un .h5) toma solo el lock del modelo: el resto
+        # de los símbolos se sigue sirviendo mientras tanto
+        with load_lock:
+            with self._lock:
+                cached = self._cached(name, token)  # Otro thread pudo cargarlo mientras esperábamos
+                if cached is not None:
+                    return cached, None
+                previous = self._models.get(name)
+                if self._failed.get(name) == token:
+                    return None, previous[1] if previous is not None else None
+
+            try:
+                predictor = self.registry.load(name, self.loader)
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                    self._failed[name] = token
+                logger.warning(f"No se pudo cargar el modelo {name}: {e}")
+                return None, previous[1] if previous is not None else None
+
+            with self._lock:
+                self._failed.pop(name, None)
+                self.stats['reloads' if previous is not None else 'loads'] += 1
+                self._models[name] = (token, predictor)
+                self._models.move_to_end(name)
+                while len(self._models) > self.max_models:
+                    evicted, _ = self._models.popitem(last=False)
+                    self.stats['evictions'] += 1
+                    logger.debug(f"Modelo {evicted} descargado (LRU)")
+                metrics.set_gauge("models_loaded", len(self._models))
+            return predictor, None
+
+    def _cached(self, name: str, token):
+        """Modelo en memoria si está en la versión publicada (con el lock global tomado)"""
+        cached = self._models.get(name)
+        if cached is None or cached[0] != token:
+            return None
+        self._models.move_to_end(name)
+        self.stats['hits'] += 1
+        return cached[1]
+
+    def predict_batch(self, items: Sequence[Tuple[str, np.ndarray]]) -> List[Optional[float]]:
+        """
+        Predice varias ventanas (símbolo, features[seq, n]) agrupando por modelo:
+        una sola pasada por modelo para todas sus ventanas.
+        """
+        results: List[Optional[float]] = [None] * len(items)
+        groups: Dict[int, Tuple[object, List[int]]] = {}
+        for i, (symbol, _) in enumerate(items):
+            predictor = self.get(symbol)
+            if predictor is not None:
+                groups.setdefault(id(predictor), (predictor, []))[1].append(i)
+
+        for predictor, indices in groups.values():
+            try:
+                windows = np.stack([np.asarray(items[i][1], dtype=float) for i in indices])
+                predictions = predictor.predict_batch(windows)
+            except Exception as e:
+                logger.warning(f"Error en predicción batch: {e}")
+                continue
+            for i, prediction in zip(indices, predictions):
+                results[i] = float(prediction)
+        return results
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._models)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'loaded': list(self._models), 'max_models': self.max_models}
+
+
+class ModelServer:
+    """Worker que mantiene los modelos en memoria y atiende pedidos por socket local"""
+
+    def __init__(self, cache: ModelCache, address: Tuple[str, int] = DEFAULT_ADDRESS,
+                 authkey: Optional[bytes] = None):
+        self.cache = cache
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        self._listener: Optional[Listener] = None
+        self._running = False
+
+    def handle(self, request: Dict) -> Dict:
+        op = request.get('op')
+        if op == 'predict':
+            start = time.perf_counter()
+            predictions = self.cache.predict_batch(request.get('items', []))
+            metrics.observe("model_server_batch_seconds", time.perf_counter() - start)
+            return {'predictions': predictions}
+        if op == 'stats':
+            return {'stats': self.cache.get_stats()}
+        if op == 'ping':
+            return {'ok': True}
+        return {'error': f"Operación desconocida: {op}"}
+
+    def _serve_connection(self, conn):
+        with conn:
+            while self._running:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = self.handle(request)
+                except Exception as e:
+                    response = {'error': str(e)}
+                try:
+                    conn.send(response)
+                except OSError:
+                    return
+
+    def start(self):
+        """Abre el socket (antes de serve_forever, para saber la dirección real)"""
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._running = True
+
+    def serve_forever(self):
+        if self._listener is None:
+            self.start()
+        logger.info(f"Model server escuchando en {self.address[0]}:{self.address[1]}")
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if not self._running:
+                    break
+                continue
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self._running = False
+        if self._listener is not None:
+            self._listener.close()
+
+
+class ModelClient:
+    """
+    Cliente del ModelServer. Si el servidor no responde devuelve None y no
+    vuelve a intentar hasta retry_after segundos (el llamador usa su modelo local).
+    """
+
+    def __init__(self, address: Tuple[str, int] = DEFAULT_ADDRESS, authkey: Optional[bytes] = None,
+                 timeout: float = 5.0, retry_after: float = 30.0):
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._conn = None
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+
+    def _request(self, request: Dict) -> Optional[Dict]:
+        if time.monotonic() < self._unavailable_until:
+            return None
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = Client(self.address, authkey=self.authkey)
+                self._conn.send(request)
+                if not self._conn.poll(self.timeout):
+                    raise TimeoutError("Model server sin respuesta")
+                return self._conn.recv()
+            except Exception as e:
+                logger.debug(f"Model server no disponible: {e}")
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except OSError:
+                        pass
+                self._conn = None
+                self._unavailable_until = time.monotonic() + self.retry_after
+                return None
+
+    def predict_batch(self, items: Sequence[Tuple[str, np.ndarray]]) -> Optional[List[Optional[float]]]:
+        response = self._request({'op': 'predict', 'items': [(s, np.asarray(w)) for s, w in items]})
+        if response is None or 'predictions' not in response:
+            return None
+        return response['predictions']
+
+    def predict(self, symbol: str, window: np.ndarray) -> Optional[float]:
+        predictions = self.predict_batch([(symbol, window)])
+        return predictions[0] if predictions else None
+
+    def get_stats(self) -> Optional[Dict]:
+        response = self._request({'op': 'stats'})
+        return response.get('stats') if response else None
+
+
+_caches: Dict[str, ModelCache] = {}
+_client: Optional[ModelClient] = None
+_singleton_lock = threading.Lock()
+
+
+def get_model_cache(model_path: str = "models") -> ModelCache:
+    """Caché compartida por todos los servicios del proceso"""
+    with _singleton_lock:
+        if model_path not in _caches:
+            max_models = int(os.getenv('MODEL_CACHE_SIZE', '8'))
+            _caches[model_path] = ModelCache(ModelRegistry(model_path), max_models=max_models)
+        return _caches[model_path]
+
+
+def get_model_client() -> Optional[ModelClient]:
+    """Cliente del model server si MODEL_SERVER_ENABLED=1 (None si no)"""
+    global _client
+    if os.getenv('MODEL_SERVER_ENABLED', '0') != '1':
+        return None
+    with _singleton_lock:
+        if _client is None:
+            _client = ModelClient()
+        return _client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de modelos compartido")
+    parser.add_argument("--model-path", default="models")
+    parser.add_argument("--max-models", type=int, default=int(os.getenv('MODEL_CACHE_SIZE', '8')))
+    parser.add_argument("--host", default=DEFAULT_ADDRESS[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    args = parser.parse_args()
+
+    cache = ModelCache(ModelRegistry(args.model_path), max_models=args.max_models)
+    server = ModelServer(cache, address=(args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from pathlib import Path
 from src.core.logger import get_logger
 from src.core.console_utils import setup_windows_console, safe_print
 from src.services.telegram_bot import TelegramAlertBot
+from src.services.operations_log import get_operations_log, operation_payload
 
 setup_windows_console()
 logger = get_logger("operation_notifier")
@@ -30,9 +31,8 @@ class OperationNotifier:
     
     def __init__(self, enable_telegram: bool = True):
         self.telegram_bot = TelegramAlertBot() if enable_telegram else None
-        self.operations_log = []
-        self.operations_file = Path("data/operations_log.json")
-        self.operations_file.parent.mkdir(parents=True, exist_ok=True)
+        # Log de eventos compartido por el proceso (segmentos JSONL append-only)
+        self.operations_log = get_operations_log()
     
     def notify_trade_execution(self, trade_data: Dict):
         """Notifica ejecución de un trade"""
@@ -267,18 +267,10 @@ class OperationNotifier:
         self._save_operation(operation)
     
     def _save_operation(self, operation: Dict):
-        """Guarda operación en archivo"""
-        import json
-        
-        self.operations_log.append(operation)
-        
-        # Mantener solo últimas 1000 operaciones
-        if len(self.operations_log) > 1000:
-            self.operations_log = self.operations_log[-1000:]
-        
+        """Agrega la operación al log de eventos (una línea, sin reescribir el historial)"""
+        data = operation_payload(operation)
         try:
-            with open(self.operations_file, 'w', encoding='utf-8') as f:
-                json.dump(self.operations_log, f, indent=2, default=str)
+            self.operations_log.append(operation['type'], data, operation.get('timestamp'))
         except Exception as e:
             logger.error(f"Error guardando operación: {e}")
     
@@ -400,17 +392,14 @@ class OperationNotifier:
     
     def get_recent_operations(self, limit: int = 10) -> list:
         """Obtiene operaciones recientes"""
-        return self.operations_log[-limit:]
+        return self.operations_log.tail(limit)
     
     def show_operations_summary(self, hours: int = 24):
         """Muestra resumen de operaciones de las últimas horas"""
         from datetime import timedelta
         
         cutoff = datetime.now() - timedelta(hours=hours)
-        recent = [
-            op for op in self.operations_log
-            if datetime.fromisoformat(op['timestamp']) >= cutoff
-        ]
+        recent = list(self.operations_log.range(start=cutoff))
         
         safe_print(f"\n{self.BOLD}📊 Resumen de Operaciones (últimas {hours}h):{self.RESET}\n")
         
@@ -0,0 +1,478 @@
+"""
+Log de Eventos de Operaciones
+Log append-only en segmentos JSONL rotativos (data/operations_log/):
+
+- Cada evento es una línea {"seq", "type", "timestamp", "data"}; seq es un
+  offset global creciente que usan los lectores para retomar donde quedaron.
+- El segmento activo rota por tamaño o al cambiar el día; los segmentos viejos
+  se borran según la retención configurada.
+- Lecturas tail / por rango de tiempo y tipo sin cargar el historial completo,
+  y cursores que devuelven solo los eventos nuevos desde su último offset.
+- Páginas hacia atrás por seq (paginación por cursor) que saltean segmentos
+  sin el tipo o fuera del rango pedido, según un índice por segmento
+  (conteo por tipo y rango de timestamps) cacheado en memoria.
+
+Reemplaza a data/operations_log.json (reescrito completo en cada operación).
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger("operations_log")
+
+OPERATION_TYPES = frozenset({
+    'TRADE_EXECUTION', 'PREDICTION', 'ANALYSIS', 'TRADE_UPDATE', 'PORTFOLIO_UPDATE', 'ALERT',
+})
+
+DEFAULT_LOG_DIR = Path("data/operations_log")
+LEGACY_FILE = Path("data/operations_log.json")
+
+SEGMENT_PREFIX = "ops-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}"
+
+
+def _segment_seq(path: Path) -> int:
+    return int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+def operation_payload(operation: Dict) -> Dict:
+    """Payload de una operación: 'data' si existe; si no (p.ej. ALERT), el resto de los campos"""
+    data = operation.get('data')
+    if data is None:
+        data = {k: v for k, v in operation.items() if k not in ('type', 'timestamp')}
+    return data
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Lock exclusivo entre procesos sobre `path` (bloquea hasta obtenerlo)"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)  # LK_LOCK se rinde tras ~10 s: seguir esperando
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _parse_time(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_lines(path: Path, position: int = 0) -> Tuple[List[Dict], int]:
+    """Registros completos desde `position`; devuelve también la posición después del último"""
+    records = []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Línea a medio escribir: se lee en el próximo poll
+                position += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Línea corrupta en {path.name} (posición {position})")
+    except FileNotFoundError:
+        pass
+    return records, position
+
+
+class OperationsLog:
+    """
+    Uso:
+        log = OperationsLog()
+        log.append('PREDICTION', {'symbol': 'GGAL', ...})
+        log.tail(50, types={'TRADE_EXECUTION'})
+        log.range(start=datetime.now() - timedelta(hours=24))
+        cursor = log.cursor('daily_report')
+        nuevos = cursor.poll()
+    """
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, segment_max_bytes: int = 1_000_000,
+                 retention_days: Optional[int] = 30, max_segments: Optional[int] = 200,
+                 legacy_file=LEGACY_FILE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        # Varios procesos (bot, dashboard, scripts) pueden escribir el mismo log
+        self._lock_file = self.directory / ".lock"
+        # Estado del escritor: se carga al primer append
+        self._active: Optional[Path] = None
+        self._active_size = 0
+        self._active_day: Optional[str] = None
+        self._next_seq: Optional[int] = None
+        self._legacy_file = Path(legacy_file) if legacy_file else None
+        # Índice por segmento: path -> ((tamaño, mtime), resumen)
+        self._summaries: Dict[Path, Tuple[Tuple[int, int], Dict]] = {}
+
+    # ==================== SEGMENTOS ====================
+
+    def segments(self) -> List[Path]:
+        """Segmentos existentes, del más viejo al más nuevo"""
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"), key=_segment_seq)
+
+    def _last_record(self, path: Path) -> Optional[Dict]:
+        """Último registro completo del segmento (leyendo solo el final del archivo)"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                block = min(size, 64 * 1024)
+                f.seek(size - block)
+                lines = f.read(block).split(b'\n')
+        except OSError:
+            return None
+        for line in reversed(lines[:-1]):  # lines[-1] es vacío o una línea incompleta
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue
+        return None
+
+    def _load_writer_state(self):
+        segments = self.segments()
+        if not segments and self._legacy_file is not None and self._legacy_file.exists():
+            self._next_seq = 1
+            self._import_legacy()
+            segments = self.segments()
+        self._next_seq = 1
+        self._active = None
+        if segments:
+            active = segments[-1]
+            last = self._last_record(active)
+            self._next_seq = (last['seq'] + 1) if last else _segment_seq(active)
+            first = self._first_record(active)
+            self._active = active
+            self._active_size = active.stat().st_size
+            self._active_day = str(first.get('timestamp', ''))[:10] if first else None
+
+    def _first_record(self, path: Path) -> Optional[Dict]:
+        try:
+            with open(path, 'rb') as f:
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def _import_legacy(self):
+        """Migra data/operations_log.json (lista JSON) al log de segmentos"""
+        try:
+            with open(self._legacy_file, 'r', encoding='utf-8') as f:
+                operations = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo migrar {self._legacy_file}: {e}")
+            return
+        if not isinstance(operations, list):
+            return
+        for op in operations:
+            if isinstance(op, dict) and op.get('type') in OPERATION_TYPES:
+                self._append_locked(op['type'], operation_payload(op), op.get('timestamp'))
+        logger.info(f"Migradas {len(operations)} operaciones desde {self._legacy_file}")
+
+    def _rotate(self, day: str):
+        self._active = self.directory / _segment_name(self._next_seq)
+        self._active_size = 0
+        self._active_day = day
+        self._apply_retention()
+
+    def _apply_retention(self):
+        segments = [s for s in self.segments() if s != self._active]
+        to_delete = set()
+        if self.max_segments is not None and len(segments) >= self.max_segments:
+            to_delete.update(segments[:len(segments) - self.max_segments + 1])
+        if self.retention_days is not None:
+            cutoff = datetime.now().timestamp() - self.retention_days * 86400
+            # Un segmento se puede borrar si su último evento (≈ mtime) es anterior al cutoff
+            to_delete.update(s for s in segments if s.stat().st_mtime < cutoff)
+        for segment in to_delete:
+            try:
+                segment.unlink()
+            except OSError as e:
+                logger.warning(f"No se pudo borrar {segment.name}: {e}")
+
+    # ==================== ESCRITURA ====================
+
+    def append(self, op_type: str, data: Dict, timestamp: Optional[str] = None) -> Dict:
+        """Agrega un evento y devuelve el registro escrito (con su seq)"""
+        if op_type not in OPERATION_TYPES:
+            raise ValueError(f"Tipo de operación desconocido: {op_type}")
+        with self._lock, _file_lock(self._lock_file):
+            # Con el lock tomado ningún otro proceso asigna seq ni escribe:
+            # si el log cambió desde nuestro último append, retomar su estado
+            if self._next_seq is None or self._writer_state_stale():
+                self._load_writer_state()
+            return self._append_locked(op_type, data, timestamp)
+
+    def _writer_state_stale(self) -> bool:
+        """True si otro proceso escribió o rotó el segmento activo"""
+        segments = self.segments()
+        latest = segments[-1] if segments else None
+        if latest != self._active:
+            return True
+        return latest is not None and latest.stat().st_size != self._active_size
+
+    def _append_locked(self, op_type: str, data: Dict, timestamp: Optional[str]) -> Dict:
+        timestamp = timestamp or datetime.now().isoformat()
+        record = {'seq': self._next_seq, 'type': op_type, 'timestamp': timestamp, 'data': data}
+        line = (json.dumps(record, default=str, ensure_ascii=False) + '\n').encode('utf-8')
+
+        day = str(timestamp)[:10]
+        if self._active is None or self._active_size + len(line) > self.segment_max_bytes \
+                or day != self._active_day:
+            self._rotate(day)
+
+        with open(self._active, 'ab') as f:
+            f.write(line)
+        self._active_size += len(line)
+        self._next_seq += 1
+        return record
+
+    # ==================== LECTURA ====================
+
+    def _segments_from_seq(self, offset: int) -> List[Path]:
+        """Segmentos que pueden contener eventos con seq > offset"""
+        segments = self.segments()
+        starts = [_segment_seq(s) for s in segments]
+        idx = max(0, bisect_right(starts, offset + 1) - 1)
+        return segments[idx:]
+
+    def read_from(self, offset: int = 0, limit: Optional[int] = None,
+                  types: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Eventos con seq > offset en orden cronológico"""
+        types = set(types) if types else None
+        result = []
+        for segment in self._segments_from_seq(offset):
+            records, _ = _read_lines(segment)
+            for record in records:
+                if record.get('seq', 0) > offset and (types is None or record.get('type') in types):
+                    result.append(record)
+                    if limit is not None and len(result) >= limit:
+                        return result
+        return result
+
+    def tail(self, limit: int = 100, types: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Últimos `limit` eventos (en orden cronológico), leyendo segmentos desde el final"""
+        types = set(types) if types else None
+        result: List[Dict] = []
+        for segment in reversed(self.segments()):
+            missing = limit - len(result)
+            if missing <= 0:
+                break
+            records, _ = _read_lines(segment)
+            matching = [r for r in records if types is None or r.get('type') in types]
+            result = matching[-missing:] + result
+        return result
+
+    def range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              types: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Eventos con start <= timestamp < end, sin abrir segmentos fuera del rango"""
+        types = set(types) if types else None
+        segments = self.segments()
+        firsts = [self._segment_start(s) for s in segments]
+        for i, segment in enumerate(segments):
+            seg_start = firsts[i]
+            next_start = firsts[i + 1] if i + 1 < len(segments) else None
+            if end is not None and seg_start is not None and seg_start >= end:
+                break
+            if start is not None and next_start is not None and next_start < start:
+                continue  # Todo el segmento es anterior a start
+            records, _ = _read_lines(segment)
+            for record in records:
+                ts = _parse_time(record.get('timestamp'))
+                if ts is None:
+                    continue
+                if (start is None or ts >= start) and (end is None or ts < end) and \
+                        (types is None or record.get('type') in types):
+                    yield record
+
+    def page(self, before: Optional[int] = None, limit: int = 50, types: Optional[Iterable[str]] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Página de eventos del más nuevo al más viejo con seq < before (y since <= timestamp < until).
+
+        Returns:
+            (eventos, next_cursor); next_cursor es el `before` de la página
+            siguiente, o None si no quedan más.
+        """
+        types = set(types) if types else None
+        segments = self.segments()
+        if before is not None:
+            starts = [_segment_seq(s) for s in segments]
+            segments = segments[:bisect_left(starts, before)]
+
+        result: List[Dict] = []
+        for segment in reversed(segments):
+            summary = self.segment_summary(segment)
+            if types is not None and not any(summary['types'].get(t) for t in types):
+                continue
+            if since is not None and summary['last_ts'] is not None and summary['last_ts'] < since:
+                break  # Los segmentos anteriores son todavía más viejos
+            if until is not None and summary['first_ts'] is not None and summary['first_ts'] >= until:
+                continue
+            records, _ = _read_lines(segment)
+            for record in reversed(records):
+                if before is not None and record.get('seq', 0) >= before:
+                    continue
+                if types is not None and record.get('type') not in types:
+                    continue
+                if since is not None or until is not None:
+                    ts = _parse_time(record.get('timestamp'))
+                    if ts is None or (since is not None and ts < since) or (until is not None and ts >= until):
+                        continue
+                result.append(record)
+                if len(result) >= limit:
+                    return result, record['seq']
+        return result, None
+
+    def segment_summary(self, path: Path) -> Dict:
+        """Conteo por tipo y rango de timestamps del segmento (recalculado solo si cambió)"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return {'types': Counter(), 'first_ts': None, 'last_ts': None}
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._summaries.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        records, _ = _read_lines(path)
+        stamps = [ts for ts in (_parse_time(r.get('timestamp')) for r in records) if ts is not None]
+        summary = {
+            'types': Counter(r.get('type') for r in records),
+            'first_ts': min(stamps) if stamps else None,
+            'last_ts': max(stamps) if stamps else None,
+        }
+        if len(self._summaries) > 2 * (self.max_segments or 200):
+            self._summaries.clear()
+        self._summaries[path] = (key, summary)
+        return summary
+
+    def _segment_start(self, path: Path) -> Optional[datetime]:
+        first = self._first_record(path)
+        return _parse_time(first.get('timestamp')) if first else None
+
+    def last_seq(self) -> int:
+        segments = self.segments()
+        for segment in reversed(segments):
+            last = self._last_record(segment)
+            if last:
+                return last['seq']
+        return 0
+
+    def count(self) -> int:
+        """Eventos retenidos (por diferencia de offsets, sin leer los segmentos)"""
+        segments = self.segments()
+        if not segments:
+            return 0
+        return max(0, self.last_seq() - _segment_seq(segments[0]) + 1)
+
+    def cursor(self, name: Optional[str] = None, offset: int = 0) -> 'LogCursor':
+        """Cursor de lectura; con `name` el offset se persiste entre ejecuciones"""
+        return LogCursor(self, name=name, offset=offset)
+
+
+class LogCursor:
+    """Lector incremental: cada poll() devuelve solo los eventos nuevos desde el último offset"""
+
+    def __init__(self, log: OperationsLog, name: Optional[str] = None, offset: int = 0):
+        self.log = log
+        self.name = name
+        self.offset = offset
+        self._segment: Optional[Path] = None
+        self._position = 0
+        self._state_file = log.directory / "cursors" / f"{name}.json" if name else None
+        if self._state_file is not None and self._state_file.exists():
+            try:
+                with open(self._state_file, 'r', encoding='utf-8') as f:
+                    self.offset = json.load(f).get('offset', offset)
+            except (OSError, ValueError):
+                pass
+
+    def poll(self, limit: Optional[int] = None) -> List[Dict]:
+        """Eventos nuevos (seq > offset) en orden cronológico; avanza el offset"""
+        result = []
+        segments = self.log._segments_from_seq(self.offset)
+        if self._segment is not None and self._segment in segments:
+            segments = segments[segments.index(self._segment):]
+        else:
+            self._segment, self._position = None, 0
+
+        for segment in segments:
+            position = self._position if segment == self._segment else 0
+            records, end = _read_lines(segment, position)
+            for record in records:
+                if record.get('seq', 0) > self.offset:
+                    result.append(record)
+                    self.offset = record['seq']
+                    if limit is not None and len(result) >= limit:
+                        # Posición exacta desconocida dentro del bloque: re-escanear desde el inicio la próxima vez
+                        self._segment, self._position = segment, position
+                        self._save()
+                        return result
+            self._segment, self._position = segment, end
+        self._save()
+        return result
+
+    def reset(self, offset: int = 0):
+        self.offset = offset
+        self._segment, self._position = None, 0
+        self._save()
+
+    def _save(self):
+        if self._state_file is None:
+            return
+        self._state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'offset': self.offset, 'updated': datetime.now().isoformat()}, f)
+        os.replace(tmp, self._state_file)
+
+
+_default_log: Optional[OperationsLog] = None
+_default_lock = threading.Lock()
+
+
+def get_operations_log() -> OperationsLog:
+    """Instancia compartida del proceso (un solo escritor por proceso)"""
+    global _default_log
+    with _default_lock:
+        if _default_log is None:
+            _default_log = OperationsLog()
+        return _default_log
@@ -12,7 +12,7 @@ import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
 from src.models.market_data import MarketData
 
 
@@ -29,7 +29,7 @@ class PortfolioOptimizer:
         Get historical returns for multiple symbols.
         Returns empty DataFrame if not enough data or symbols have different lengths.
         """
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             returns_dict = {}
             min_required_days = 30  # Mínimo de días requeridos para optimización
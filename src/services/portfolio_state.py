@@ -0,0 +1,215 @@
+"""
+Estado del Portafolio en Memoria
+Las posiciones de my_portfolio.json viven en memoria y se comparten entre el
+bot, los syncs (IOL / Tienda Broker), el dashboard y los comandos de Telegram.
+
+- Lecturas: copia desde memoria; un stat del archivo (mtime, tamaño) detecta
+  si otro proceso lo modificó y solo en ese caso se relee.
+- Escrituras: se comparan con lo que hay en memoria por símbolo; si nada
+  cambió no hay versión nueva ni evento, solo se renueva last_updated en el
+  archivo (los otros procesos lo usan para saber que el sync corrió). Se
+  escribe siempre de forma atómica (tmp + os.replace).
+- Cada cambio se publica a los suscriptores con el diff (altas, bajas y
+  modificaciones por símbolo), así nadie necesita volver a leer el JSON.
+"""
+import copy
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.logger import get_logger
+
+logger = get_logger("portfolio_state")
+
+
+@dataclass
+class PortfolioChange:
+    """Diff publicado a los suscriptores"""
+    source: str
+    version: int
+    portfolio: List[Dict[str, Any]]
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+
+def _by_symbol(portfolio: Optional[List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    return {p.get("symbol"): p for p in portfolio or []}
+
+
+def diff_portfolios(old: Optional[List[Dict[str, Any]]],
+                    new: Optional[List[Dict[str, Any]]]) -> Tuple[List[str], List[str], List[str]]:
+    """(altas, bajas, modificados) por símbolo entre dos versiones del portafolio"""
+    old_map, new_map = _by_symbol(old), _by_symbol(new)
+    added = [s for s in new_map if s not in old_map]
+    removed = [s for s in old_map if s not in new_map]
+    changed = [s for s in new_map if s in old_map and new_map[s] != old_map[s]]
+    return added, removed, changed
+
+
+class PortfolioState:
+    """
+    Uso:
+        state = get_portfolio_state("my_portfolio.json")
+        positions = state.get()
+        state.replace(positions, source="dashboard")
+        state.merge(iol_positions, source="iol")
+        state.subscribe(lambda change: print(change.added, change.changed))
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.version = 0
+        self._positions: Optional[List[Dict[str, Any]]] = None
+        self._signature: Optional[Tuple] = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[PortfolioChange], None]] = []
+        self.stats = {'reads': 0, 'reloads': 0, 'writes': 0, 'unchanged': 0}
+
+    # ==================== ARCHIVO ====================
+
+    def _file_signature(self) -> Optional[Tuple]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> Optional[PortfolioChange]:
+        """Relee el archivo solo si cambió desde la última lectura/escritura propia"""
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return None
+
+        positions = None
+        if signature is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                positions = json.load(f).get("portfolio", [])
+        self.stats['reloads'] += 1
+
+        previous, was_loaded = self._positions, self._loaded
+        self._positions, self._signature, self._loaded = positions, signature, True
+        if was_loaded and positions != previous:
+            # Lo modificó otro proceso (otra instancia del dashboard, un script)
+            return self._record_change("file", previous, positions)
+        return None
+
+    def _write(self, positions: List[Dict[str, Any]]):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"portfolio": positions, "last_updated": datetime.now().isoformat()},
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        os.replace(tmp, self.path)
+        self._signature = self._file_signature()
+
+    def _record_change(self, source: str, old, new) -> PortfolioChange:
+        self.version += 1
+        added, removed, changed = diff_portfolios(old, new)
+        return PortfolioChange(source=source, version=self.version, portfolio=copy.deepcopy(new or []),
+                               added=added, removed=removed, changed=changed)
+
+    # ==================== LECTURA / ESCRITURA ====================
+
+    def get(self) -> Optional[List[Dict[str, Any]]]:
+        """Copia de las posiciones (None si el archivo no existe)"""
+        with self._lock:
+            change = self._refresh()
+            self.stats['reads'] += 1
+            positions = copy.deepcopy(self._positions)
+        self._publish(change)
+        return positions
+
+    def replace(self, portfolio: List[Dict[str, Any]], source: str = "save") -> Optional[PortfolioChange]:
+        """
+        Reemplaza el portafolio completo. Publica solo si difiere de lo que hay
+        en memoria; devuelve el cambio (None si no hubo).
+        """
+        return self._apply(lambda current: portfolio, source)
+
+    def merge(self, positions: List[Dict[str, Any]], source: str) -> Optional[PortfolioChange]:
+        """Aplica posiciones de un broker sobre las actuales (por símbolo)"""
+        def merged(current):
+            by_symbol = _by_symbol(current)
+            for position in positions:
+                by_symbol[position["symbol"]] = position
+            return list(by_symbol.values())
+        return self._apply(merged, source)
+
+    def _apply(self, build: Callable, source: str) -> Optional[PortfolioChange]:
+        with self._lock:
+            try:
+                external = self._refresh()
+            except (OSError, ValueError) as e:
+                # Archivo ilegible: se sobrescribe con el portafolio nuevo
+                logger.warning(f"No se pudo leer {self.path}: {e}")
+                external, self._positions, self._loaded = None, None, False
+
+            new = copy.deepcopy(list(build(self._positions)))
+            if self._loaded and self._positions == new:
+                # Mismas posiciones: sin evento, pero last_updated refleja este sync
+                self._write(self._positions)
+                self.stats['unchanged'] += 1
+                change = None
+            else:
+                self._write(new)
+                self.stats['writes'] += 1
+                change = self._record_change(source, self._positions, new)
+                self._positions, self._loaded = new, True
+        self._publish(external)
+        self._publish(change)
+        return change
+
+    # ==================== SUSCRIPTORES ====================
+
+    def subscribe(self, callback: Callable[[PortfolioChange], None]):
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[PortfolioChange], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _publish(self, change: Optional[PortfolioChange]):
+        if change is None:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Error en suscriptor del portafolio: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'version': self.version,
+                'positions': len(self._positions or []),
+                'subscribers': len(self._subscribers),
+            }
+
+
+_states: Dict[str, PortfolioState] = {}
+_states_lock = threading.Lock()
+
+
+def get_portfolio_state(path) -> PortfolioState:
+    """Estado compartido por archivo de portafolio"""
+    key = os.path.abspath(path)
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = PortfolioState(path)
+        return state
@@ -0,0 +1,250 @@
+"""
+Servicio de Predicciones para la API
+Sirve predicciones sin bloquear el event loop de FastAPI:
+
+- El trabajo de modelo (lectura de la DB, features, inferencia) corre en un
+  executor dedicado, nunca en el loop.
+- Single-flight: pedidos concurrentes del mismo símbolo comparten una sola
+  predicción en curso.
+- Micro-batching: los símbolos pedidos dentro de una ventana corta (ms) se
+  predicen juntos, con una pasada por modelo (PredictionService.generate_signals).
+- Caché hasta que entran datos nuevos: el resultado se descarta cuando se
+  publica la ingesta del símbolo (market_data_events, p.ej. DataCollector).
+  Para la ingesta de otros procesos (scripts/ingest_data.py) se compara cada
+  PREDICTION_CACHE_CHECK_SECONDS la marca de la última barra con la que se
+  usó al predecir. Los None (sin modelo o sin datos) no se cachean.
+- Latencias p50/p99 de los pedidos atendidos (get_stats).
+
+Todo el estado se toca solo desde el event loop, así que no necesita locks:
+los eventos de ingesta de otros hilos entran con call_soon_threadsafe.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.core.logger import get_logger
+from src.core.metrics import metrics
+from src.services.market_data_events import (
+    last_bar_markers, subscribe_market_data, unsubscribe_market_data
+)
+
+logger = get_logger("prediction_batcher")
+
+DEFAULT_CHECK_SECONDS = float(os.getenv('PREDICTION_CACHE_CHECK_SECONDS', '60'))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class PredictionBatcher:
+    """
+    Uso (desde código async):
+        batcher = PredictionBatcher()
+        result = await batcher.predict('GGAL')
+        results = await batcher.predict_many(['GGAL', 'YPFD'])
+    """
+
+    def __init__(self, service=None, threshold: float = 2.0, window_ms: float = 10.0,
+                 max_batch: int = 32, workers: int = 2, check_seconds: float = DEFAULT_CHECK_SECONDS,
+                 markers: Callable[[List[str]], Dict[str, Tuple]] = last_bar_markers,
+                 clock: Callable[[], float] = time.time, latency_window: int = 1000):
+        if service is None:
+            from src.services.prediction_service import PredictionService
+            service = PredictionService()
+        self.service = service
+        self.threshold = threshold
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.check_seconds = check_seconds
+        self.markers = markers
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prediction")
+
+        self._cache: Dict[str, Tuple[Optional[Tuple], Dict]] = {}  # símbolo -> (marca última barra, resultado)
+        # Una invalidación durante un batch en curso impide cachear su resultado (ya viejo)
+        self._generation: Counter = Counter()
+        self._epoch = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._check_task: Optional[asyncio.Task] = None
+        self._last_check = clock()
+        self._latencies: deque = deque(maxlen=latency_window)
+        self.stats = Counter()
+        subscribe_market_data(self._on_market_data)
+
+    # ==================== API ====================
+
+    async def predict(self, symbol: str) -> Optional[Dict]:
+        """Señal para un símbolo (None si no hay modelo o datos suficientes)"""
+        start = time.perf_counter()
+        try:
+            return await self._predict(symbol)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._latencies.append(elapsed)
+            metrics.observe("prediction_request_seconds", elapsed)
+
+    async def predict_many(self, symbols: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Varios símbolos: se encolan en el mismo tick y caen en el mismo batch"""
+        unique = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(*(self.predict(symbol) for symbol in unique))
+        return dict(zip(unique, results))
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Descarta la caché (p.ej. tras reentrenar un modelo o ingerir datos)"""
+        self.stats['invalidations'] += 1
+        if symbol is None:
+            self._epoch += 1
+            self._cache.clear()
+        else:
+            self._generation[symbol] += 1
+            self._cache.pop(symbol, None)
+
+    def get_stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        return {
+            **self.stats,
+            'cached_symbols': len(self._cache),
+            'inflight': len(self._inflight),
+            'latency_ms': {
+                'count': len(latencies),
+                'p50': percentile(latencies, 50) * 1000,
+                'p99': percentile(latencies, 99) * 1000,
+            },
+        }
+
+    def shutdown(self):
+        unsubscribe_market_data(self._on_market_data)
+        self.executor.shutdown(wait=False)
+
+    # ==================== INTERNOS ====================
+
+    def _on_market_data(self, symbols: List[str]):
+        """Evento de ingesta (puede llegar desde cualquier hilo)"""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._invalidate_symbols, symbols)
+        else:
+            self._invalidate_symbols(symbols)
+
+    def _invalidate_symbols(self, symbols: List[str]):
+        for symbol in symbols:
+            self.invalidate(symbol)
+
+    def _maybe_check_markers(self):
+        """Cada check_seconds, verifica en segundo plano si otro proceso ingirió datos"""
+        if not self._cache or self._check_task is not None:
+            return
+        now = self.clock()
+        if now - self._last_check < self.check_seconds:
+            return
+        self._last_check = now
+        self._check_task = self._loop.create_task(self._check_markers())
+
+    async def _check_markers(self):
+        symbols = list(self._cache)
+        try:
+            markers = await asyncio.get_running_loop().run_in_executor(self.executor, self.markers, symbols)
+        except Exception as e:
+            logger.warning(f"No se pudo verificar la última barra de {len(symbols)} símbolos: {e}")
+            return
+        finally:
+            self._check_task = None
+        for symbol in symbols:
+            cached = self._cache.get(symbol)
+            if cached is not None and cached[0] != markers.get(symbol):
+                self.stats['stale_invalidations'] += 1
+                self.invalidate(symbol)
+
+    def _compute(self, symbols: List[str]) -> Tuple[Dict[str, Tuple], Dict[str, Optional[Dict]]]:
+        """(marcas de última barra, señales); la marca se toma antes de predecir"""
+        try:
+            markers = self.markers(symbols)
+        except Exception as e:
+            logger.warning(f"No se pudo leer la última barra de {symbols}: {e}")
+            markers = {}
+        return markers, self.service.generate_signals(symbols, self.threshold)
+
+    async def _predict(self, symbol: str) -> Optional[Dict]:
+        self.stats['requests'] += 1
+        self._loop = asyncio.get_running_loop()
+        self._maybe_check_markers()
+        cached = self._cache.get(symbol)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached[1]
+
+        future = self._inflight.get(symbol)
+        if future is not None:
+            # Single-flight: esperar la predicción que ya está en curso
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight[symbol] = loop.create_future()
+        self._pending.append(symbol)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, symbols: List[str]):
+        self.stats['batches'] += 1
+        self.stats['batched_symbols'] += len(symbols)
+        metrics.inc("prediction_batches_total")
+        metrics.inc("prediction_batched_symbols_total", len(symbols))
+        loop = asyncio.get_running_loop()
+        generations = {symbol: (self._epoch, self._generation[symbol]) for symbol in symbols}
+        try:
+            markers, results = await loop.run_in_executor(self.executor, self._compute, symbols)
+            error = None
+        except Exception as e:
+            logger.error(f"Error en batch de predicciones {symbols}: {e}")
+            self.stats['errors'] += 1
+            markers, results, error = {}, {}, e
+
+        # Válido hasta la próxima ingesta del símbolo (errores y None no se cachean)
+        for symbol in symbols:
+            future = self._inflight.pop(symbol)
+            if error is not None:
+                future.set_exception(error)
+                continue
+            result = results.get(symbol)
+            if result is not None and generations[symbol] == (self._epoch, self._generation[symbol]):
+                self._cache[symbol] = (markers.get(symbol), result)
+            future.set_result(result)
+
+
+_batcher: Optional[PredictionBatcher] = None
+
+
+def get_prediction_batcher() -> PredictionBatcher:
+    """Instancia compartida del proceso de la API"""
+    global _batcher
+    if _batcher is None:
+        _batcher = PredictionBatcher(
+            window_ms=float(os.getenv('PREDICTION_BATCH_WINDOW_MS', '10')),
+            max_batch=int(os.getenv('PREDICTION_MAX_BATCH', '32')),
+            workers=int(os.getenv('PREDICTION_WORKERS', '2')),
+        )
+    return _batcher
@@ -11,9 +11,10 @@ import numpy as np
 import pandas as pd
 import ta
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
+from src.core.metrics import timed
 from src.models.market_data import MarketData
-from src.models.price_predictor import LSTMPricePredictor
+from src.services.model_registry import get_model_cache, get_model_client
 
 
 class PredictionService:
@@ -23,52 +24,15 @@ class PredictionService:
 
     def __init__(self, model_path="models"):
         self.model_path = model_path
-        self.models = {}
+        # Caché compartida por todos los servicios del proceso (LRU + hot-swap)
+        self.model_cache = get_model_cache(model_path)
 
     def load_model(self, symbol):
         """
         Load trained model for a symbol, with fallback to generic model.
         Returns None if model cannot be loaded (for graceful fallback).
         """
-        if symbol not in self.models:
-            predictor = LSTMPricePredictor()
-
-            # Try specific model first: models/SYMBOL_model.h5
-            specific_model_path = os.path.join(self.model_path, symbol)
-
-            # Try generic model: models/lstm_model.h5
-            generic_model_path = os.path.join(self.model_path, "lstm")
-
-            try:
-                # Check if specific model exists (predictor.load appends _model.h5)
-                if os.path.exists(f"{specific_model_path}_model.h5"):
-                    try:
-                        predictor.load(specific_model_path)
-                        self.models[symbol] = predictor
-                        return predictor
-                    except Exception as e:
-                        # Si falla cargar modelo específico, intentar genérico
-                        pass
-                
-                # Try generic model
-                if os.path.exists(f"{generic_model_path}_model.h5"):
-                    try:
-                        print(f"Using generic model for {symbol}")
-                        predictor.load(generic_model_path)
-                        self.models[symbol] = predictor
-                        return predictor
-                    except Exception as e:
-                        # Si también falla el genérico, retornar None
-                        pass
-                
-                # Si no se encontró ningún modelo, retornar None
-                return None
-                
-            except Exception as e:
-                # Cualquier otro error, retornar None para fallback
-                return None
-
-        return self.models.get(symbol)
+        return self.model_cache.get(symbol)
 
     def prepare_features(self, df):
         """
@@ -123,15 +87,17 @@ class PredictionService:
         feature_cols = ['close', 'rsi', 'macd', 'bb_width', 'sma_dist', 'vol_roc']
         return df[feature_cols]
 
+    @timed("db_read_seconds", query="recent_data")
     def get_recent_data(self, symbol, days=150):
         """
         Get recent data from database for feature engineering.
         Need more days than sequence length to calculate indicators.
         """
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
+            # Solo columnas del índice cubriente: "últimas N barras" sin ordenar ni leer la tabla
             records = (
-                db.query(MarketData)
+                db.query(MarketData.close, MarketData.volume)
                 .filter(MarketData.symbol == symbol)
                 .order_by(MarketData.timestamp.desc())
                 .limit(days)
@@ -149,50 +115,75 @@ class PredictionService:
         finally:
             db.close()
 
-    def predict_price(self, symbol):
+    def build_window(self, symbol):
         """
-        Predict next price for a symbol.
-        Returns:
-            dict with prediction, current_price, change_pct, or None if model fails
+        Last 60 rows of features for a symbol (model input), or None if there
+        is not enough data.
         """
-        predictor = self.load_model(symbol)
-        
-        # Si no hay modelo disponible, retornar None para usar fallback
-        if predictor is None:
-            return None
-        
         try:
-            # Get data
-            df_raw = self.get_recent_data(symbol)
-            
-            # Feature Engineering
-            df_features = self.prepare_features(df_raw)
-            
-            # Check if we have enough data after dropping NaNs
-            if len(df_features) < 60:
-                return None  # No hay suficientes datos
-            
-            # Take last 60 rows
-            recent_features = df_features.values[-60:]
-            
-            # Predict
-            prediction = predictor.predict(recent_features)
-            
+            df_features = self.prepare_features(self.get_recent_data(symbol))
+        except Exception:
+            return None
+        # Check if we have enough data after dropping NaNs
+        if len(df_features) < 60:
+            return None
+        return df_features.values[-60:]
+
+    @timed("model_inference_seconds", model="lstm")
+    def predict_prices(self, symbols):
+        """
+        Predict next price for several symbols with one forward pass per model.
+        Returns:
+            dict symbol -> prediction dict (as predict_price), or None if it fails
+        """
+        results = {symbol: None for symbol in symbols}
+        # Con MODEL_SERVER_ENABLED=1 el modelo vive en el model server
+        client = get_model_client()
+        items = []
+        for symbol in results:
+            # Si no hay modelo disponible no tiene sentido leer datos (fallback)
+            if client is None and self.load_model(symbol) is None:
+                continue
+            recent_features = self.build_window(symbol)
+            if recent_features is not None:
+                items.append((symbol, recent_features))
+        if not items:
+            return results
+
+        predictions = client.predict_batch(items) if client else None
+        if predictions is None:
+            predictions = [None] * len(items)
+        # Lo que el server no pudo predecir se intenta con la caché local
+        missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if missing:
+            local = self.model_cache.predict_batch([items[i] for i in missing])
+            for i, prediction in zip(missing, local):
+                predictions[i] = prediction
+
+        for (symbol, recent_features), prediction in zip(items, predictions):
+            if prediction is None:
+                continue
             # Get current price (last close from features)
-            current_price = recent_features[-1, 0] 
-            
-            # Prediction is the raw price
+            current_price = recent_features[-1, 0]
             predicted_price = float(prediction)
-            
             change_pct = ((predicted_price - current_price) / current_price) * 100
-
-            return {
+            results[symbol] = {
                 "symbol": symbol,
                 "current_price": float(current_price),
                 "predicted_price": float(predicted_price),
                 "change_pct": float(change_pct),
             }
-        except Exception as e:
+        return results
+
+    def predict_price(self, symbol):
+        """
+        Predict next price for a symbol.
+        Returns:
+            dict with prediction, current_price, change_pct, or None if model fails
+        """
+        try:
+            return self.predict_prices([symbol])[symbol]
+        except Exception:
             # Si hay error en la predicción, retornar None para usar fallback
             return None
 
@@ -262,6 +253,22 @@ class PredictionService:
         if prediction is None:
             return None
         
+        return self.signal_from_prediction(prediction, threshold)
+
+    def generate_signals(self, symbols, threshold=2.0):
+        """
+        Batched generate_signal (model only, no technical fallback).
+        Returns:
+            dict symbol -> signal dict, or None for symbols without prediction
+        """
+        return {
+            symbol: self.signal_from_prediction(prediction, threshold) if prediction else None
+            for symbol, prediction in self.predict_prices(symbols).items()
+        }
+
+    @staticmethod
+    def signal_from_prediction(prediction, threshold=2.0):
+        """BUY/SELL/HOLD signal and confidence from a price prediction."""
         change_pct = prediction["change_pct"]
 
         if change_pct > threshold:
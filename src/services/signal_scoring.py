@@ -0,0 +1,328 @@
+"""
+Scoring de Señales
+Función de puntaje de TradingBot.analyze_symbol (IA/técnico, RSI, MACD,
+precio vs SMA20 y sentimiento contra buy_threshold/sell_threshold) extraída
+como función pura, en dos formas:
+
+- score_signal(): un análisis (dicts tal como los arma el bot en vivo).
+- score_arrays(): la misma regla vectorizada sobre arrays/Series/DataFrames,
+  para puntuar toda la historia de un símbolo (score_history) o todo el
+  universo como matriz fecha x símbolo (score_universe) en una pasada.
+
+Para los mismos valores de entrada ambas dan exactamente el mismo puntaje
+(NaN en rsi/sma_20 equivale al None que entrega TechnicalAnalysisService; en
+macd se comporta como el float NaN del camino en vivo).
+
+Los indicadores de la historia usan las mismas fórmulas que la librería `ta`
+(RSI 14, MACD 12/26/9, SMA 20) y son causales: cada barra solo ve datos hasta
+ella misma. Las EMAs arrancan al inicio de la historia, mientras que el bot en
+vivo las calcula sobre sus últimas 100 barras, así que en las primeras barras
+de esa ventana los valores pueden diferir levemente.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+AI_THRESHOLD = 2.0  # threshold de PredictionService.generate_signal usado por el bot
+TECHNICAL_WEIGHT = 0.7  # peso de la señal de respaldo técnico frente al modelo IA
+
+Array = Union[np.ndarray, pd.Series, pd.DataFrame]
+
+
+# ==================== UN ANÁLISIS ====================
+
+def score_signal(ai_signal: Optional[Dict], technical: Optional[Dict],
+                 sentiment: Optional[Dict]) -> Tuple[int, List[str], List[str]]:
+    """
+    Puntaje del sistema de votación ponderada de analyze_symbol.
+
+    Args:
+        ai_signal: Resultado de PredictionService.generate_signal (o None)
+        technical: Resultado de TechnicalAnalysisService.get_full_analysis (o None)
+        sentiment: Resultado de get_market_sentiment (o None)
+
+    Returns:
+        (score, buy_factors, sell_factors)
+    """
+    score = 0
+    buy_factors = []
+    sell_factors = []
+
+    # A. AI Signal Impact (Max 30 pts) - con fallback a análisis técnico
+    ai_direction = None
+    ai_pred_change = 0.0
+    ai_source = "none"
+    if ai_signal:
+        ai_direction = ai_signal.get('signal')
+        ai_pred_change = ai_signal.get('change_pct', 0.0)
+        ai_source = ai_signal.get('source', 'ai_model')
+
+    if ai_direction == 'BUY':
+        # IA tiene más peso que análisis técnico
+        base_points = 30 if ai_pred_change > 2.0 else 15
+        points = base_points if ai_source == 'ai_model' else int(base_points * TECHNICAL_WEIGHT)
+        score += points
+        source_label = "IA" if ai_source == 'ai_model' else "Técnico"
+        buy_factors.append(f"{source_label} Bullish (+{points})")
+    elif ai_direction == 'SELL':
+        base_points = 30 if ai_pred_change < -2.0 else 15
+        points = base_points if ai_source == 'ai_model' else int(base_points * TECHNICAL_WEIGHT)
+        score -= points
+        source_label = "IA" if ai_source == 'ai_model' else "Técnico"
+        sell_factors.append(f"{source_label} Bearish (-{points})")
+
+    momentum = (technical or {}).get('momentum') or {}
+    trend = (technical or {}).get('trend') or {}
+
+    # B. Technical Signal Impact (Max 40 pts)
+    rsi = momentum.get('rsi')
+    if rsi:
+        if rsi < 30:  # Oversold
+            score += 20
+            buy_factors.append("RSI Oversold (+20)")
+        elif rsi > 70:  # Overbought
+            score -= 20
+            sell_factors.append("RSI Overbought (-20)")
+        elif 50 < rsi < 70:  # Bullish Trend
+            score += 5
+            buy_factors.append("RSI Uptrend (+5)")
+        elif 30 < rsi < 50:  # Bearish Trend
+            score -= 5
+            sell_factors.append("RSI Downtrend (-5)")
+
+    macd = momentum.get('macd')
+    macd_signal = momentum.get('macd_signal')
+    if macd is not None and macd_signal is not None:
+        if macd > macd_signal:
+            score += 15
+            buy_factors.append("MACD > Signal (+15)")
+        else:
+            score -= 15
+            sell_factors.append("MACD < Signal (-15)")
+
+    # C. Trend Analysis (Max 10 pts)
+    current_price = trend.get('current_price')
+    sma_20 = trend.get('sma_20')
+    if current_price and sma_20:
+        if current_price > sma_20:
+            score += 10
+            buy_factors.append("Price > SMA20 (+10)")
+        else:
+            score -= 10
+            sell_factors.append("Price < SMA20 (-10)")
+
+    # D. Sentiment Analysis Impact (Max 20 pts)
+    if sentiment and sentiment.get('sample_size', 0) > 0:
+        sentiment_score = sentiment.get('score', 0)
+        overall_sentiment = sentiment.get('overall_sentiment', 'NEUTRAL')
+        if overall_sentiment == 'POSITIVE':
+            points = 20 if sentiment_score > 0.3 else 15 if sentiment_score > 0.15 else 10
+            score += points
+            buy_factors.append(f"Sentiment Positive (+{points})")
+        elif overall_sentiment == 'NEGATIVE':
+            points = 20 if sentiment_score < -0.3 else 15 if sentiment_score < -0.15 else 10
+            score -= points
+            sell_factors.append(f"Sentiment Negative (-{points})")
+        # NEUTRAL no afecta el score
+
+    return score, buy_factors, sell_factors
+
+
+def classify_score(score: float, buy_threshold: float, sell_threshold: float) -> Tuple[str, str]:
+    """(señal, confianza) para un puntaje"""
+    if score >= buy_threshold:
+        return 'BUY', 'HIGH' if score >= (buy_threshold + 25) else 'MEDIUM'
+    if score <= sell_threshold:
+        return 'SELL', 'HIGH' if score <= (sell_threshold - 25) else 'MEDIUM'
+    return 'HOLD', 'LOW'
+
+
+def load_thresholds(config_file: str = "professional_config.json") -> Optional[Tuple[float, float]]:
+    """(buy_threshold, sell_threshold) de professional_config.json, o None si no existe"""
+    path = Path(config_file)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return config.get('buy_threshold', 30), config.get('sell_threshold', -30)
+
+
+# ==================== VECTORIZADO ====================
+
+def indicators(close: Union[pd.Series, pd.DataFrame]) -> Dict[str, Union[pd.Series, pd.DataFrame]]:
+    """
+    RSI(14), MACD(12, 26, 9) y SMA(20) con las fórmulas de `ta`, sobre una
+    serie de cierres o una matriz (una columna por símbolo).
+    """
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    ema_up = up.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    ema_down = down.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    rsi = (100 - (100 / (1 + ema_up / ema_down))).where(ema_down != 0, 100.0)
+
+    ema_fast = close.ewm(span=12, min_periods=12, adjust=False).mean()
+    ema_slow = close.ewm(span=26, min_periods=26, adjust=False).mean()
+    macd = ema_fast - ema_slow
+    macd_signal = macd.ewm(span=9, min_periods=9, adjust=False).mean()
+
+    sma_20 = close.rolling(window=20, min_periods=20).mean()
+    return {'rsi': rsi, 'macd': macd, 'macd_signal': macd_signal, 'close': close, 'sma_20': sma_20}
+
+
+def technical_fallback_change(rsi: Array, macd: Array, macd_signal: Array,
+                              price: Array, sma_20: Array) -> np.ndarray:
+    """
+    change_pct de PredictionService.generate_signal_from_technical (el respaldo
+    cuando no hay modelo IA); NaN donde el respaldo no da predicción.
+    """
+    rsi, macd, macd_signal, price, sma_20 = (np.asarray(a, dtype=float)
+                                             for a in (rsi, macd, macd_signal, price, sma_20))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi_factor = (50 - rsi) / 50 * 2
+        macd_diff = np.where((macd != 0) & (macd_signal != 0), macd - macd_signal, 0.0)
+        macd_factor = np.where(price > 0, macd_diff / price * 100, 0.0)
+        trend_factor = np.where(sma_20 > 0, (price - sma_20) / sma_20 * 100, 0.0)
+        change = (rsi_factor * 1.0) + (macd_factor * 0.5) + (trend_factor * 0.3)
+    # max(-5.0, min(5.0, nan)) da 5.0 en el camino en vivo
+    change = np.where(np.isnan(change), 5.0, np.clip(change, -5.0, 5.0))
+    # rsi/sma_20 None hacen fallar el respaldo; sin precio no hay predicción
+    return np.where(np.isnan(rsi) | np.isnan(sma_20) | (price == 0), np.nan, change)
+
+
+def score_arrays(rsi: Array, macd: Array, macd_signal: Array, price: Array, sma_20: Array,
+                 ai_change: Optional[Array] = None, ai_from_model: Union[bool, Array] = True,
+                 sentiment: Optional[Array] = None, sentiment_score: Optional[Array] = None) -> np.ndarray:
+    """
+    score_signal vectorizado (arrays de igual forma o broadcastables).
+
+    Args:
+        ai_change: change_pct de la predicción (NaN = sin predicción); la señal
+            BUY/SELL sale de AI_THRESHOLD como en generate_signal
+        ai_from_model: True si la predicción es del modelo IA, False si es el
+            respaldo técnico
+        sentiment: +1 POSITIVE, -1 NEGATIVE, 0 neutral o sin noticias
+        sentiment_score: score del sentimiento
+
+    Returns:
+        Puntajes enteros con la forma de las entradas
+    """
+    rsi, macd, macd_signal, price, sma_20 = (np.asarray(a, dtype=float)
+                                             for a in (rsi, macd, macd_signal, price, sma_20))
+    shape = np.broadcast(rsi, macd, macd_signal, price, sma_20).shape
+    score = np.zeros(shape, dtype=np.int64)
+
+    with np.errstate(invalid='ignore'):
+        # A. IA / respaldo técnico
+        if ai_change is not None:
+            change = np.asarray(ai_change, dtype=float)
+            buy = change > AI_THRESHOLD
+            sell = change < -AI_THRESHOLD
+            base = np.where(buy, np.where(change > 2.0, 30, 15), np.where(change < -2.0, 30, 15))
+            points = np.where(ai_from_model, base, (base * TECHNICAL_WEIGHT).astype(np.int64))
+            score += np.where(buy, points, np.where(sell, -points, 0))
+
+        # B. RSI (None/0 no suman) y MACD
+        rsi_points = np.select(
+            [rsi < 30, rsi > 70, (rsi > 50) & (rsi < 70), (rsi > 30) & (rsi < 50)],
+            [20, -20, 5, -5], 0)
+        score += np.where(np.isnan(rsi) | (rsi == 0), 0, rsi_points)
+        score += np.where(macd > macd_signal, 15, -15)
+
+        # C. Precio vs SMA20
+        has_trend = (price != 0) & (sma_20 != 0) & ~np.isnan(sma_20)
+        score += np.where(has_trend, np.where(price > sma_20, 10, -10), 0)
+
+        # D. Sentimiento
+        if sentiment is not None:
+            direction = np.asarray(sentiment)
+            value = np.asarray(sentiment_score if sentiment_score is not None else 0.0, dtype=float)
+            positive = np.where(value > 0.3, 20, np.where(value > 0.15, 15, 10))
+            negative = np.where(value < -0.3, 20, np.where(value < -0.15, 15, 10))
+            score += np.where(direction > 0, positive, np.where(direction < 0, -negative, 0))
+
+    return score
+
+
+def classify_scores(scores: Array, buy_threshold: float, sell_threshold: float) -> np.ndarray:
+    """classify_score vectorizado: array de 'BUY' / 'SELL' / 'HOLD'"""
+    scores = np.asarray(scores, dtype=float)
+    return np.where(scores >= buy_threshold, 'BUY', np.where(scores <= sell_threshold, 'SELL', 'HOLD'))
+
+
+def _score_indicators(ind: Dict, ai_change: Optional[Array], technical_fallback: bool) -> np.ndarray:
+    ai_from_model: Union[bool, np.ndarray] = True
+    if ai_change is None and technical_fallback:
+        ai_change = technical_fallback_change(ind['rsi'], ind['macd'], ind['macd_signal'],
+                                              ind['close'], ind['sma_20'])
+        ai_from_model = False
+    elif ai_change is not None and technical_fallback:
+        # Donde el modelo no predijo, el bot usa el respaldo técnico
+        model = np.asarray(ai_change, dtype=float)
+        fallback = technical_fallback_change(ind['rsi'], ind['macd'], ind['macd_signal'],
+                                             ind['close'], ind['sma_20'])
+        ai_from_model = ~np.isnan(model)
+        ai_change = np.where(ai_from_model, model, fallback)
+    return score_arrays(ind['rsi'], ind['macd'], ind['macd_signal'], ind['close'], ind['sma_20'],
+                        ai_change=ai_change, ai_from_model=ai_from_model)
+
+
+def score_history(df: pd.DataFrame, ai_change: Optional[pd.Series] = None,
+                  technical_fallback: bool = True,
+                  thresholds: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+    """
+    Puntaje de cada barra de un símbolo.
+
+    Args:
+        df: Barras con columna 'close' e índice temporal (p.ej. get_historical_data)
+        ai_change: change_pct del modelo por barra (NaN o None = sin modelo)
+        technical_fallback: Usar el respaldo técnico donde no hay modelo (como el bot)
+        thresholds: (buy, sell); por defecto los de professional_config.json
+
+    Returns:
+        DataFrame con los indicadores, 'score' y 'signal'
+    """
+    ind = indicators(df['close'].astype(float))
+    if ai_change is not None:
+        ai_change = ai_change.reindex(df.index)
+    scores = _score_indicators(ind, ai_change, technical_fallback)
+    buy_threshold, sell_threshold = thresholds or load_thresholds() or (30, -30)
+
+    result = pd.DataFrame(ind, index=df.index)
+    result['score'] = scores
+    result['signal'] = classify_scores(scores, buy_threshold, sell_threshold)
+    return result
+
+
+def score_universe(bars: pd.DataFrame, technical_fallback: bool = True) -> pd.DataFrame:
+    """
+    Matriz de puntajes fecha x símbolo en una sola pasada.
+
+    Args:
+        bars: Formato largo con columnas symbol, timestamp y close (filas de market_data)
+
+    Returns:
+        DataFrame (índice timestamp, una columna por símbolo); NaN donde el
+        símbolo no tiene barra
+    """
+    bars = bars.sort_values(['symbol', 'timestamp'])
+    # Cada columna es la historia propia del símbolo (alineada por número de barra):
+    # los huecos entre símbolos no alteran las EMAs y el resultado es el mismo
+    # que puntuar cada símbolo por separado
+    position = bars.groupby('symbol').cumcount()
+    aligned = bars.assign(position=position.values)
+    close = aligned.pivot(index='position', columns='symbol', values='close').astype(float)
+    timestamps = aligned.pivot(index='position', columns='symbol', values='timestamp')
+
+    scores = _score_indicators(indicators(close), None, technical_fallback).astype(float)
+    scores[close.isna().values] = np.nan
+
+    long = pd.DataFrame({
+        'timestamp': timestamps.values.ravel(),
+        'symbol': np.tile(close.columns.values, len(close)),
+        'score': scores.ravel(),
+    }).dropna(subset=['score'])
+    return long.pivot(index='timestamp', columns='symbol', values='score')
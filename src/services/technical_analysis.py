@@ -11,50 +11,99 @@ import numpy as np
 import pandas as pd
 import ta
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal
+from src.core.metrics import timed
 from src.models.market_data import MarketData
 
 
+def load_last_bars(db, symbol, limit):
+    """
+    Últimas `limit` barras diarias del símbolo en orden cronológico.
+
+    Recorre el índice cubriente (symbol, timestamp, OHLCV) de atrás hacia
+    adelante y se da vuelta en memoria, como PredictionService.get_recent_data.
+    """
+    records = (
+        db.query(MarketData.timestamp, MarketData.open, MarketData.high,
+                 MarketData.low, MarketData.close, MarketData.volume)
+        .filter(MarketData.symbol == symbol)
+        .order_by(MarketData.timestamp.desc())
+        .limit(limit)
+        .all()
+    )
+    records.reverse()
+    df = pd.DataFrame({
+        "timestamp": [r.timestamp for r in records],
+        "open": [r.open for r in records],
+        "high": [r.high for r in records],
+        "low": [r.low for r in records],
+        "close": [r.close for r in records],
+        "volume": [r.volume for r in records],
+    })
+    df.set_index("timestamp", inplace=True)
+    return df
+
+
 class TechnicalAnalysisService:
     """
     Service for calculating technical indicators and volatility metrics.
     Now integrates real-time prices from IOL.
     """
 
-    def __init__(self, iol_client=None):
+    def __init__(self, iol_client=None, bar_aggregator=None):
         """
         Args:
             iol_client: Optional IOLClient instance for real-time quotes
+            bar_aggregator: Optional IntradayBarAggregator providing intraday bars
         """
         self.iol_client = iol_client
+        self.bar_aggregator = bar_aggregator
 
+    @timed("db_read_seconds", query="historical_data")
     def get_historical_data(self, symbol, days=100):
-        """Load historical data from database as DataFrame."""
-        db = SessionLocal()
+        """Load the most recent `days` bars from the database as DataFrame (oldest first)."""
+        db = ReadSessionLocal()
         try:
-            records = (
-                db.query(MarketData)
-                .filter(MarketData.symbol == symbol)
-                .order_by(MarketData.timestamp)
-                .limit(days)
-                .all()
-            )
-
-            data = {
-                "timestamp": [r.timestamp for r in records],
-                "open": [r.open for r in records],
-                "high": [r.high for r in records],
-                "low": [r.low for r in records],
-                "close": [r.close for r in records],
-                "volume": [r.volume for r in records],
-            }
-
-            df = pd.DataFrame(data)
-            df.set_index("timestamp", inplace=True)
-            return df
+            return load_last_bars(db, symbol, days)
         finally:
             db.close()
 
+    def get_intraday_data(self, symbol, timeframe="5m", bars=100):
+        """
+        Load intraday OHLCV bars from the in-memory aggregator (no DB or API call).
+
+        Returns:
+            DataFrame with open/high/low/close/volume (empty if no aggregator/data)
+        """
+        if self.bar_aggregator is None:
+            return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+        return self.bar_aggregator.get_bars(symbol, timeframe=timeframe, n=bars)
+
+    def get_intraday_analysis(self, symbol, timeframe="5m", bars=100):
+        """
+        Technical analysis over intraday bars built from IOL quote snapshots.
+        Requires enough bars for the slowest indicator (SMA 50).
+        """
+        df = self.get_intraday_data(symbol, timeframe=timeframe, bars=bars)
+
+        if len(df) < 50:
+            raise ValueError(
+                f"Not enough intraday bars for {symbol} ({len(df)} {timeframe} bars)"
+            )
+
+        volatility = self.calculate_volatility_indicators(df)
+        momentum = self.calculate_momentum_indicators(df)
+        trend = self.calculate_trend_indicators(df)
+
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "volatility": volatility,
+            "momentum": momentum,
+            "trend": trend,
+            "signal": self._generate_signal(volatility, momentum, trend),
+        }
+
     def get_realtime_price(self, symbol):
         """
         Get real-time price from IOL. Falls back to latest DB price if IOL unavailable.
@@ -62,6 +111,18 @@ class TechnicalAnalysisService:
         Returns:
             dict with 'price', 'source', 'volume', 'timestamp'
         """
+        # Use the intraday feed when it already has a price (no extra API call)
+        if self.bar_aggregator is not None:
+            quote = self.bar_aggregator.get_latest_quote(symbol, max_age=120)
+            if quote:
+                # Mismo 'volume' que la cotización de IOL (acumulado del día)
+                return {
+                    "price": float(quote["price"]),
+                    "source": "IOL",
+                    "volume": quote["volume"],
+                    "timestamp": quote["timestamp"],
+                }
+
         # Try IOL first if client available
         if self.iol_client:
             try:
@@ -84,7 +145,7 @@ class TechnicalAnalysisService:
                 print(f"   ⚠️  IOL quote failed for {symbol}: {e}")
 
         # Fallback to database
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             record = (
                 db.query(MarketData)
@@ -6,6 +6,9 @@ import os
 import sys
 import time
 import threading
+import traceback
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Callable, Dict
 from pathlib import Path
 
@@ -18,6 +21,24 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     print("⚠️  requests no disponible, no se pueden recibir mensajes de Telegram")
 
+# Pool de ejecución de comandos: el polling solo despacha, los comandos corren en workers
+COMMAND_WORKERS = int(os.getenv("TELEGRAM_COMMAND_WORKERS", "4"))
+COMMAND_QUEUE_SIZE = int(os.getenv("TELEGRAM_COMMAND_QUEUE", "16"))  # en espera, además de los que corren
+COMMAND_TIMEOUT = float(os.getenv("TELEGRAM_COMMAND_TIMEOUT", "60"))
+COMMAND_TIMEOUTS = {
+    '/analyze': 300, '/analizar': 300,
+    '/daily_report': 180, '/reporte_diario': 180,
+    '/chart': 120, '/grafico': 120,
+}
+
+# Respuestas de solo lectura que se sirven desde caché durante RESPONSE_TTL segundos
+CACHED_COMMANDS = {'/status', '/estado', '/balance', '/saldo', '/portfolio', '/portafolio'}
+RESPONSE_TTL = float(os.getenv("TELEGRAM_RESPONSE_TTL", "15"))
+
+# Comandos de solo lectura: corren en paralelo. El resto (set_*, pausar, detener...)
+# se ejecuta de a uno por chat y en el orden en que llegó (/analyze también: puede operar)
+READ_ONLY_COMMANDS = CACHED_COMMANDS | {'/start', '/help', '/ayuda', 'message'}
+
 
 class TelegramCommandHandler:
     """
@@ -38,6 +59,17 @@ class TelegramCommandHandler:
         self.polling_thread = None
         self.last_update_id = 0
         
+        # Pool de comandos (ver _dispatch)
+        self.command_timeouts = dict(COMMAND_TIMEOUTS)
+        self.executor = ThreadPoolExecutor(max_workers=COMMAND_WORKERS, thread_name_prefix="telegram-cmd")
+        self._slots = threading.BoundedSemaphore(COMMAND_WORKERS + COMMAND_QUEUE_SIZE)
+        self._inflight = Counter()  # (chat_id, callback, args) -> ejecuciones en curso o en cola
+        self._responses = {}  # (chat_id, callback, args) -> (vence, mensajes enviados)
+        self._serial = {}  # chat_id -> comandos que esperan al que está corriendo
+        self._pool_lock = threading.Lock()
+        self._capture = threading.local()
+        self.command_stats = Counter()
+        
         if not self.bot_token:
             print("⚠️  TELEGRAM_BOT_TOKEN no configurado")
             return
@@ -56,6 +88,11 @@ class TelegramCommandHandler:
     
     def _send_message(self, chat_id, message, parse_mode=None):
         """Envía un mensaje a Telegram"""
+        # Respuesta de un comando cacheable: se guarda para servirla desde caché
+        captured = getattr(self._capture, 'messages', None)
+        if captured is not None:
+            captured.append((chat_id, message, parse_mode))
+        
         if not REQUESTS_AVAILABLE or not self.bot_token:
             print(f"⚠️  No se puede enviar mensaje: requests={REQUESTS_AVAILABLE}, token={'✅' if self.bot_token else '❌'}")
             return False
@@ -94,7 +131,6 @@ class TelegramCommandHandler:
             return False
         except Exception as e:
             print(f"❌ Error inesperado enviando mensaje: {e}")
-            import traceback
             traceback.print_exc()
             return False
     
@@ -304,32 +340,176 @@ Envía cualquier comando para interactuar conmigo.
                 args = text
                 print(f"💬 Mensaje libre recibido")
             
-            # Ejecutar comando si existe
+            # Ejecutar comando si existe (en el pool: el polling no espera)
             if command in self.all_commands:
-                try:
-                    print(f"⚙️  Ejecutando comando: {command}")
-                    self.all_commands[command](chat_id, args)
-                    print(f"✅ Comando {command} ejecutado exitosamente")
-                except Exception as e:
-                    error_msg = f"❌ Error ejecutando comando {command}: {e}"
-                    print(error_msg)
-                    import traceback
-                    traceback.print_exc()
-                    self._send_message(chat_id, error_msg)
+                self._dispatch(chat_id, command, args, self.all_commands[command])
             elif command == 'message':
                 # Mensaje libre - responder con ayuda
                 print("💡 Enviando mensaje de ayuda para mensaje libre")
-                self._send_message(chat_id, "💡 Envía /help para ver los comandos disponibles.")
+                self._dispatch(chat_id, command, args, self._reply_help_hint)
             else:
                 # Comando no reconocido
                 print(f"❓ Comando no reconocido: {command}")
-                self._send_message(chat_id, f"❓ Comando '{command}' no reconocido. Envía /help para ver comandos disponibles.")
+                self._dispatch(chat_id, command, command, self._reply_unknown_command)
         
         except Exception as e:
             print(f"❌ Error procesando mensaje: {e}")
-            import traceback
             traceback.print_exc()
     
+    def _reply_help_hint(self, chat_id, args):
+        self._send_message(chat_id, "💡 Envía /help para ver los comandos disponibles.")
+    
+    def _reply_unknown_command(self, chat_id, command):
+        self._send_message(chat_id, f"❓ Comando '{command}' no reconocido. Envía /help para ver comandos disponibles.")
+    
+    def _dispatch(self, chat_id, command, args, callback):
+        """
+        Encola un comando en el pool sin bloquear el polling.
+        - Un comando de solo lectura del mismo chat que todavía está en curso
+          no se vuelve a ejecutar (lo responde la ejecución en curso). Los que
+          cambian estado nunca se agrupan: /pausar, /reanudar, /pausar debe
+          terminar en pausa.
+        - Los comandos de CACHED_COMMANDS reenvían la respuesta anterior si
+          tiene menos de RESPONSE_TTL segundos.
+        - Si el pool está lleno se rechaza con un aviso.
+        - Solo los de READ_ONLY_COMMANDS (y las respuestas a mensajes libres o
+          comandos desconocidos) corren en paralelo; el resto se ejecuta de a
+          uno por chat en orden de llegada, así dos /set_* seguidos no pisan
+          la configuración y /pausar, /reanudar, /detener no se reordenan.
+        """
+        key = (str(chat_id), callback, args)
+        serial = command not in READ_ONLY_COMMANDS and command in self.all_commands
+        now = time.time()
+        with self._pool_lock:
+            if not serial and key in self._inflight:
+                self.command_stats['coalesced'] += 1
+                print(f"🔁 {command} ya está en curso para este chat - se agrupa con el anterior")
+                return
+            cached = self._responses.get(key) if command in CACHED_COMMANDS else None
+            if cached is not None and cached[0] <= now:
+                del self._responses[key]
+                cached = None
+            accepted = self._slots.acquire(blocking=False)
+            if accepted:
+                self._inflight[key] += 1
+        
+        if not accepted:
+            self.command_stats['rejected'] += 1
+            print(f"⚠️  Pool de comandos lleno - {command} rechazado")
+            threading.Thread(
+                target=self._send_message,
+                args=(chat_id, f"⏳ Hay demasiados comandos en curso. Reintentá {command} en unos segundos."),
+                daemon=True
+            ).start()
+            return
+        
+        if cached is not None:
+            self.command_stats['cache_hits'] += 1
+        job = (key, chat_id, command, args, callback, cached[1] if cached is not None else None)
+        
+        if serial:
+            with self._pool_lock:
+                waiting = self._serial.get(key[0])
+                if waiting is not None:
+                    # Hay otro comando del chat corriendo: sale cuando termine
+                    waiting.append(job)
+                    self.command_stats['serialized'] += 1
+                    return
+                self._serial[key[0]] = deque()
+        self._submit(job, serial)
+    
+    def _submit(self, job, serial):
+        key, chat_id, command, args, callback, cached_messages = job
+        future = self.executor.submit(self._run_command, key, chat_id, command, args, callback,
+                                      cached_messages, serial)
+        
+        timeout = self.command_timeouts.get(command, COMMAND_TIMEOUT)
+        timer = threading.Timer(timeout, self._on_command_timeout, (future, chat_id, command, timeout))
+        timer.daemon = True
+        timer.start()
+        future.add_done_callback(lambda _: timer.cancel())
+    
+    def _run_command(self, key, chat_id, command, args, callback, cached_messages=None, serial=False):
+        """Ejecuta un comando en un worker del pool (o reenvía su respuesta cacheada)"""
+        started = time.time()
+        try:
+            if cached_messages is not None:
+                print(f"⚡ {command} servido desde caché")
+                for message_chat_id, message, parse_mode in cached_messages:
+                    self._send_message(message_chat_id, message, parse_mode=parse_mode)
+                return
+            
+            print(f"⚙️  Ejecutando comando: {command}")
+            cacheable = command in CACHED_COMMANDS
+            if cacheable:
+                self._capture.messages = []
+            try:
+                callback(chat_id, args)
+                print(f"✅ Comando {command} ejecutado exitosamente")
+                if cacheable:
+                    messages = self._capture.messages
+                    # No cachear respuestas vacías ni de error
+                    if messages and not any(m[1].startswith('❌') for m in messages):
+                        with self._pool_lock:
+                            self._responses[key] = (time.time() + RESPONSE_TTL, messages)
+                else:
+                    # Un comando que puede cambiar el estado invalida las respuestas cacheadas del chat
+                    self.invalidate_responses(chat_id)
+            except Exception as e:
+                error_msg = f"❌ Error ejecutando comando {command}: {e}"
+                print(error_msg)
+                traceback.print_exc()
+                self._capture.messages = None
+                self._send_message(chat_id, error_msg)
+            finally:
+                self._capture.messages = None
+        finally:
+            next_job = None
+            with self._pool_lock:
+                self._inflight[key] -= 1
+                if self._inflight[key] <= 0:
+                    del self._inflight[key]
+                if serial:
+                    waiting = self._serial[key[0]]
+                    if waiting:
+                        next_job = waiting.popleft()
+                    else:
+                        del self._serial[key[0]]
+            self._slots.release()
+            self.command_stats['executed'] += 1
+            self.command_stats['busy_seconds'] += time.time() - started
+            if next_job is not None:
+                self._submit(next_job, serial=True)
+    
+    def _on_command_timeout(self, future, chat_id, command, timeout):
+        """El comando superó su tiempo: se avisa al usuario (el worker no se puede interrumpir)"""
+        if future.done():
+            return
+        self.command_stats['timeouts'] += 1
+        print(f"⏱️  {command} superó {timeout:.0f}s - sigue en curso")
+        self._send_message(
+            chat_id,
+            f"⏱️ {command} está tardando más de {timeout:.0f}s. Sigue en curso; te respondo cuando termine."
+        )
+    
+    def invalidate_responses(self, chat_id=None):
+        """Descarta respuestas cacheadas (de un chat o de todos)"""
+        with self._pool_lock:
+            if chat_id is None:
+                self._responses.clear()
+            else:
+                for key in [k for k in self._responses if k[0] == str(chat_id)]:
+                    del self._responses[key]
+    
+    def get_command_stats(self) -> Dict:
+        """Métricas del pool de comandos"""
+        with self._pool_lock:
+            return {
+                **self.command_stats,
+                'inflight': len(self._inflight),
+                'cached_responses': len(self._responses),
+            }
+    
     def _polling_loop(self):
         """Loop principal de polling"""
         print("🔄 Iniciando polling de Telegram...")
@@ -370,7 +550,6 @@ Envía cualquier comando para interactuar conmigo.
                             print(f"   ✅ Update {idx} procesado correctamente")
                         except Exception as proc_error:
                             print(f"   ❌ ERROR procesando update {idx}: {proc_error}")
-                            import traceback
                             traceback.print_exc()
                 else:
                     # Sin updates - esto es normal en polling
@@ -13,6 +13,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from src.services.telegram_bot import TelegramAlertBot
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
 
 class Monitor14Dias:
     def __init__(self):
@@ -133,18 +134,11 @@ El bot se monitoreará automáticamente y recibirás reportes diarios.
                 print(f"⚠️  Error leyendo trades: {e}")
         
         # Cargar análisis del día
-        if Path('data/operations_log.json').exists():
+        if DEFAULT_LOG_DIR.exists():
             try:
-                with open('data/operations_log.json', 'r', encoding='utf-8') as f:
-                    operations = json.load(f)
-                
-                today = datetime.now().date()
-                today_ops = [
-                    op for op in operations
-                    if datetime.fromisoformat(op['timestamp']).date() == today
-                ]
-                
-                analyses = [op for op in today_ops if op['type'] == 'ANALYSIS']
+                # Solo se leen los segmentos de hoy
+                today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+                analyses = list(get_operations_log().range(start=today_start, types={'ANALYSIS'}))
                 stats['analyses'] = len(analyses)
                 
                 # Contar señales
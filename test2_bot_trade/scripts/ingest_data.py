@@ -10,7 +10,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.connectors.yahoo_client import YahooFinanceClient
 from src.connectors.byma_client import BYMAClient
 from src.connectors.multi_source_client import MultiSourceDataClient
-from src.core.database import SessionLocal, init_db
+from src.core.database import SessionLocal, init_db, upsert
 from src.models.market_data import MarketData
 
 def ingest_symbol(symbol: str, period: str = "1y", days: int = None, use_multi_source: bool = True):
@@ -93,53 +93,27 @@ def ingest_symbol(symbol: str, period: str = "1y", days: int = None, use_multi_s
     # Store in database
     db = SessionLocal()
     try:
-        count = 0
-        updated = 0
-        for index, row in history.iterrows():
-            # Check if record already exists
-            existing = db.query(MarketData).filter(
-                MarketData.symbol == symbol,
-                MarketData.timestamp == index
-            ).first()
-            
-            if existing:
-                # Update existing record solo si hay cambios significativos
-                needs_update = (
-                    abs(existing.close - row['Close']) > 0.01 or
-                    abs(existing.volume - row['Volume']) > 0.01
-                )
-                if needs_update:
-                    existing.open = row['Open']
-                    existing.high = row['High']
-                    existing.low = row['Low']
-                    existing.close = row['Close']
-                    existing.volume = row['Volume']
-                    updated += 1
-            else:
-                # Create new record
-                market_data = MarketData(
-                    symbol=symbol,
-                    timestamp=index,
-                    open=row['Open'],
-                    high=row['High'],
-                    low=row['Low'],
-                    close=row['Close'],
-                    volume=row['Volume'],
-                    source='yahoo'
-                )
-                db.add(market_data)
-                count += 1
+        # Upsert por (símbolo, fecha): una sentencia por lote, sin consultar fila por fila
+        before = db.query(MarketData).filter(MarketData.symbol == symbol).count()
+        upsert(db, MarketData, [{
+            'symbol': symbol,
+            'timestamp': index,
+            'open': row['Open'],
+            'high': row['High'],
+            'low': row['Low'],
+            'close': row['Close'],
+            'volume': float(row['Volume']),
+            'source': 'yahoo'
+        } for index, row in history.iterrows()])
         
         db.commit()
-        if count > 0:
-            print(f"✓ Ingested {count} new records for {symbol}")
-        if updated > 0:
-            print(f"✓ Updated {updated} existing records for {symbol}")
-        if count == 0 and updated == 0:
-            print(f"ℹ️  No new or updated records for {symbol} (todos los datos ya existen)")
         
         # Show summary
         total = db.query(MarketData).filter(MarketData.symbol == symbol).count()
+        if total > before:
+            print(f"✓ Ingested {total - before} new records for {symbol}")
+        else:
+            print(f"ℹ️  No new records for {symbol} (existing bars refreshed)")
         print(f"  Total records in DB for {symbol}: {total}")
         
         # Si hay muy pocos registros y se solicitó 1 año, advertir
@@ -1,16 +1,31 @@
 """
 Script to retrain all models using the new multivariate architecture.
+Los símbolos se entrenan en paralelo con la TrainingFarm (ver --help).
 """
+import argparse
 import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.services.continuous_learning import ContinuousLearning
+from src.services.training_farm import TrainingFarm
 from src.core.database import SessionLocal
 from src.models.market_data import MarketData
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reentrena los modelos de todos los símbolos en paralelo")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (default: CPUs / threads)")
+    parser.add_argument("--threads-per-worker", type=int, default=2, help="Threads de TensorFlow por proceso")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--ensemble", action="store_true",
+                        help="Entrenar el ensemble de NeuralNetworkServiceComplete en lugar del LSTM")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Empezar de cero aunque la corrida anterior haya quedado incompleta")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     print("🚀 Starting Bulk Retraining for Multivariate LSTM Upgrade...")
     
     # 1. Try to load symbols from local portfolio first
@@ -47,20 +62,14 @@ def main():
         print("   2. Datos en la base de datos (ejecuta scripts/ingest_data.py primero)")
         return
     
-    cl = ContinuousLearning()
-    
-    # 2. Force retrain for each symbol
-    for symbol in symbols:
-        print(f"\n🔄 Processing {symbol}...")
-        try:
-            # We can use retrain_model directly
-            result = cl.retrain_model(symbol, epochs=30)
-            if result.get('success'):
-                print(f"✅ Success! Loss: {result['training_loss']:.4f}")
-            else:
-                print(f"❌ Failed: {result.get('error')}")
-        except Exception as e:
-            print(f"❌ Error processing {symbol}: {e}")
+    farm = TrainingFarm(workers=args.workers, threads_per_worker=args.threads_per_worker)
+    kind = 'ensemble' if args.ensemble else 'lstm'
+    print(f"\n🏭 Entrenando {len(symbols)} símbolos ({kind}) con {farm.workers} procesos "
+          f"× {farm.threads_per_worker} threads...")
+
+    # 3. Train all symbols in parallel (resumes an interrupted run)
+    report = farm.run(symbols, kind=kind, epochs=args.epochs, resume=not args.no_resume)
+    print(report.format())
 
     print("\n✨ All models updated to new architecture!")
 
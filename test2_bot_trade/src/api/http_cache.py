@@ -0,0 +1,135 @@
+"""
+Caché HTTP para la API REST de monitoreo
+- Respuestas JSON cacheadas en memoria por versión de la fuente (firma de
+  archivos o seq del log): mientras la fuente no cambie no se relee ni se
+  vuelve a serializar.
+- ETag (débil) + If-None-Match: si el cliente ya tiene la versión actual se
+  responde 304 sin cuerpo.
+- gzip para cuerpos grandes cuando el cliente lo acepta (el comprimido
+  también queda en caché).
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Flask, Response, request
+
+GZIP_MIN_BYTES = 1024
+
+
+def source_version(*paths) -> Tuple:
+    """
+    Versión de un conjunto de archivos/directorios: (mtime_ns, tamaño) de cada
+    archivo (en un directorio, de sus *.json). Un stat por archivo, sin leerlos.
+    """
+    version = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            try:
+                stat = file.stat()
+                version.append((file.name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append((file.name, None))
+    return tuple(version)
+
+
+def _accepts_gzip() -> bool:
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=5)
+
+
+class _Entry:
+    __slots__ = ('version', 'body', 'etag', 'gzipped')
+
+    def __init__(self, version: Hashable, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self.gzipped: Optional[bytes] = None
+
+
+class ResponseCache:
+    """
+    Uso:
+        cache = ResponseCache()
+        return cache.respond(('portfolio',), source_version(PORTFOLIO_FILE), build_payload)
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+
+    def respond(self, key: Hashable, version: Hashable, build: Callable[[], Any], status: int = 200) -> Response:
+        """Respuesta para `key`; `build()` solo se llama si la versión cambió"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                entry = None
+        if entry is None:
+            body = json.dumps(build(), default=str, ensure_ascii=False).encode('utf-8')
+            entry = _Entry(version, body)
+            with self._lock:
+                self.stats['misses'] += 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return self._response(entry, status)
+
+    def _response(self, entry: _Entry, status: int) -> Response:
+        if request.if_none_match.contains_weak(entry.etag):
+            self.stats['not_modified'] += 1
+            response = Response(status=304)
+            response.set_etag(entry.etag, weak=True)
+            return response
+
+        body = entry.body
+        response = Response(mimetype='application/json', status=status)
+        if len(body) >= GZIP_MIN_BYTES and _accepts_gzip():
+            if entry.gzipped is None:
+                entry.gzipped = _gzip(body)
+            body = entry.gzipped
+            response.headers['Content-Encoding'] = 'gzip'
+        response.set_data(body)
+        response.set_etag(entry.etag, weak=True)
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
+
+
+def install_conditional_responses(app: Flask):
+    """
+    ETag/304 y gzip para el resto de las respuestas JSON (las que no pasan por
+    ResponseCache): se calculan sobre el cuerpo ya generado.
+    """
+
+    @app.after_request
+    def _conditional(response: Response) -> Response:
+        if request.method != 'GET' or response.status_code != 200 or response.direct_passthrough \
+                or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers:
+            return response
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+        if response.status_code == 200 and response.content_length \
+                and response.content_length >= GZIP_MIN_BYTES and _accepts_gzip():
+            response.set_data(_gzip(response.get_data()))
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+        return response
@@ -12,16 +12,28 @@ import sys
 sys.path.append(os.path.abspath(os.path.dirname(__file__) + "/../.."))
 
 from pathlib import Path
+from src.api.http_cache import ResponseCache, install_conditional_responses, source_version
 from src.core.logger import get_logger
 from src.core.health_check import get_health_status
-from src.services.operation_notifier import OperationNotifier
 from src.services.advanced_learning import AdvancedLearningSystem
-from src.services.portfolio_persistence import load_portfolio
+from src.services.operations_log import get_operations_log
+from src.services.portfolio_persistence import PORTFOLIO_FILE, load_portfolio
 
 logger = get_logger("rest_api")
 
 app = Flask(__name__)
 CORS(app)  # Permitir CORS para integraciones
+install_conditional_responses(app)  # ETag/304 y gzip
+
+# Respuestas cacheadas por versión de la fuente (los monitores consultan cada pocos segundos)
+response_cache = ResponseCache()
+LEARNING_DATA_DIR = Path("data/learning")
+MAX_PAGE_SIZE = 500
+
+
+def _parse_datetime_arg(name: str) -> Optional[datetime]:
+    value = request.args.get(name)
+    return datetime.fromisoformat(value) if value else None
 
 
 @app.route('/api/health', methods=['GET'])
@@ -35,48 +47,54 @@ def health_check():
 def get_portfolio():
     """Obtiene portafolio actual"""
     try:
-        portfolio = load_portfolio()
-        total_value = sum(p.get('total_val', 0) for p in portfolio) if portfolio else 0
+        def build():
+            portfolio = load_portfolio()
+            total_value = sum(p.get('total_val', 0) for p in portfolio) if portfolio else 0
+            return {
+                'success': True,
+                'portfolio': portfolio or [],
+                'total_value': total_value,
+                'positions_count': len(portfolio) if portfolio else 0,
+            }
         
-        return jsonify({
-            'success': True,
-            'portfolio': portfolio or [],
-            'total_value': total_value,
-            'positions_count': len(portfolio) if portfolio else 0,
-        })
+        return response_cache.respond(('portfolio',), source_version(PORTFOLIO_FILE), build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/operations', methods=['GET'])
 def get_operations():
-    """Obtiene operaciones recientes"""
+    """
+    Obtiene operaciones (de la más nueva a la más vieja), paginadas por cursor
+    
+    Parámetros: limit, type, since/until (ISO), cursor (next_cursor de la página anterior)
+    """
     try:
-        from pathlib import Path
-        import json
-        
-        operations_file = Path("data/operations_log.json")
-        operations = []
+        operations_log = get_operations_log()
         
-        if operations_file.exists():
-            with open(operations_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        
-        # Filtrar por parámetros
-        limit = request.args.get('limit', 10, type=int)
+        limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_PAGE_SIZE)
         op_type = request.args.get('type', None)
+        cursor = request.args.get('cursor', None, type=int)
+        since = _parse_datetime_arg('since')
+        until = _parse_datetime_arg('until')
         
-        filtered = operations
-        if op_type:
-            filtered = [op for op in operations if op.get('type') == op_type]
-        
-        filtered = sorted(filtered, key=lambda x: x['timestamp'], reverse=True)[:limit]
+        def build():
+            operations, next_cursor = operations_log.page(
+                before=cursor, limit=limit, types={op_type} if op_type else None, since=since, until=until
+            )
+            return {
+                'success': True,
+                'operations': operations,
+                'next_cursor': next_cursor,
+                'total': operations_log.count(),
+            }
         
-        return jsonify({
-            'success': True,
-            'operations': filtered,
-            'total': len(operations),
-        })
+        # Una página ya recorrida (cursor) no cambia con eventos nuevos; la primera sí
+        version = cursor if cursor is not None else operations_log.last_seq()
+        key = ('operations', limit, op_type, cursor, since, until)
+        return response_cache.respond(key, version, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -85,13 +103,14 @@ def get_operations():
 def get_learning_summary():
     """Obtiene resumen de aprendizaje"""
     try:
-        learning_system = AdvancedLearningSystem()
-        summary = learning_system.get_learning_summary()
+        def build():
+            learning_system = AdvancedLearningSystem()
+            return {
+                'success': True,
+                'summary': learning_system.get_learning_summary(),
+            }
         
-        return jsonify({
-            'success': True,
-            'summary': summary,
-        })
+        return response_cache.respond(('learning',), source_version(LEARNING_DATA_DIR), build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -116,15 +135,16 @@ def bot_status():
 def get_alerts():
     """Obtiene alertas recientes"""
     try:
-        notifier = OperationNotifier(enable_telegram=False)
-        limit = request.args.get('limit', 10, type=int)
+        operations_log = get_operations_log()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_PAGE_SIZE)
         
-        alerts = notifier.get_recent_operations(limit)
+        def build():
+            return {
+                'success': True,
+                'alerts': operations_log.tail(limit),
+            }
         
-        return jsonify({
-            'success': True,
-            'alerts': alerts,
-        })
+        return response_cache.respond(('alerts', limit), operations_log.last_seq(), build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
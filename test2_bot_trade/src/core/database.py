@@ -1,14 +1,110 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import sqlite3
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.sql.expression import Select
+from sqlalchemy.pool import QueuePool
 
 from src.core.config import settings
 
 # Use SQLite for simplicity and portability
 DATABASE_URL = "sqlite:///./trading_bot.db"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})  # Needed for SQLite
+# Bot, dashboard, API and ingestion scripts share the same file: WAL lets readers
+# proceed while a writer commits, and busy_timeout waits instead of failing with
+# "database is locked" when two processes write at once.
+BUSY_TIMEOUT_MS = 30000
+READ_POOL_SIZE = 8
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # Safe with WAL; fsync only at checkpoints
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "temp_store": "MEMORY",
+    "cache_size": -16000,  # ~16 MB page cache per connection
+    "mmap_size": 268435456,
+    "foreign_keys": "ON",
+}
+
+
+def configure_sqlite_connection(dbapi_connection, read_only: bool = False):
+    """Applies the tuned pragmas to a raw sqlite3 connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def make_engines(url: str = DATABASE_URL, read_pool_size: int = READ_POOL_SIZE):
+    """
+    Creates the (writer, reader) engine pair for a SQLite database.
+
+    The writer pool holds a single connection, so writes in this process are
+    serialized instead of fighting over the file lock; readers get their own
+    pool of query-only connections that never block (or get blocked by) it.
+    """
+    connect_args = {"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000}
+    writer = create_engine(url, connect_args=connect_args, poolclass=QueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=BUSY_TIMEOUT_MS / 1000)
+    reader = create_engine(url, connect_args=connect_args, poolclass=QueuePool,
+                           pool_size=read_pool_size, max_overflow=read_pool_size)
+
+    @event.listens_for(writer, "connect")
+    def _configure_writer(dbapi_connection, connection_record):
+        configure_sqlite_connection(dbapi_connection)
+
+    @event.listens_for(reader, "connect")
+    def _configure_reader(dbapi_connection, connection_record):
+        configure_sqlite_connection(dbapi_connection, read_only=True)
+
+    return writer, reader
+
+
+engine, read_engine = make_engines()
+
+
+class RoutingSession(Session):
+    """
+    Session that only holds the single writer connection while it writes.
+
+    SELECTs go to the reader pool until the session flushes or executes a
+    write; from then until commit/rollback every statement uses the writer,
+    so the transaction still reads its own uncommitted rows. A session that
+    only reads never takes the writer, and one that writes releases it at
+    commit instead of keeping it for the session's whole lifetime.
+    """
+
+    def __init__(self, *args, writer=None, reader=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer if writer is not None else engine
+        self.reader = reader if reader is not None else read_engine
+        self._writing = False
+        event.listen(self, "after_transaction_end", self._transaction_ended)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._writing or self._flushing or not isinstance(clause, Select):
+            self._writing = True
+            return self.writer
+        return self.reader
+
+    @staticmethod
+    def _transaction_ended(session, transaction):
+        if transaction.parent is None:
+            session._writing = False
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def make_session_factory(writer=None, reader=None):
+    """Read/write-routing session factory for a (writer, reader) engine pair."""
+    return sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False,
+                        writer=writer, reader=reader)
+
+
+SessionLocal = make_session_factory()
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -22,6 +118,85 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Dependency for getting a read-only DB session (from the reader pool)."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """Raw read-only sqlite3 connection (health checks and ad-hoc queries)."""
+    conn = sqlite3.connect(engine.url.database, timeout=BUSY_TIMEOUT_MS / 1000)
+    configure_sqlite_connection(conn, read_only=True)
+    return conn
+
+
+def upsert(db, model, rows, index_elements=("symbol", "timestamp"), chunk_size: int = 500):
+    """
+    INSERT ... ON CONFLICT DO UPDATE in batches, keyed by a unique index.
+
+    Replaces the "query, then update or add" loop per row: one statement per
+    chunk keeps write transactions short. The caller commits.
+    """
+    rows = list(rows)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        stmt = sqlite_insert(model).values(chunk)
+        update_columns = {
+            name: stmt.excluded[name] for name in chunk[0] if name not in index_elements
+        }
+        db.execute(stmt.on_conflict_do_update(index_elements=list(index_elements), set_=update_columns))
+    return len(rows)
+
+
+# market_data schema migration: single-column indexes -> composite unique
+# (symbol, timestamp) plus a covering index for "last N bars for symbol".
+MARKET_DATA_INDEXES = {
+    "uq_market_data_symbol_timestamp":
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_market_data_symbol_timestamp ON market_data (symbol, timestamp)",
+    "ix_market_data_bars":
+        "CREATE INDEX IF NOT EXISTS ix_market_data_bars "
+        "ON market_data (symbol, timestamp, open, high, low, close, volume)",
+}
+LEGACY_MARKET_DATA_INDEXES = ("ix_market_data_symbol", "ix_market_data_id")
+
+
+def migrate_market_data(bind=None) -> int:
+    """
+    Brings an existing market_data table to the composite-index schema.
+
+    Duplicated (symbol, timestamp) rows are collapsed keeping the newest one
+    (highest id). Idempotent; returns the number of duplicate rows removed.
+    """
+    bind = bind or engine
+    with bind.begin() as conn:
+        existing = {
+            row[0] for row in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='market_data'"
+            )
+        }
+        has_table = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='market_data'"
+        ).first()
+        if not has_table or (set(MARKET_DATA_INDEXES) <= existing and not existing & set(LEGACY_MARKET_DATA_INDEXES)):
+            return 0
+
+        removed = conn.exec_driver_sql(
+            "DELETE FROM market_data WHERE id NOT IN "
+            "(SELECT MAX(id) FROM market_data GROUP BY symbol, timestamp)"
+        ).rowcount
+        for name in LEGACY_MARKET_DATA_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        for ddl in MARKET_DATA_INDEXES.values():
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql("ANALYZE market_data")
+    return removed
+
+
 def init_db():
     """Creates all tables in the database."""
     Base.metadata.create_all(bind=engine)
+    migrate_market_data()
@@ -1,13 +1,19 @@
-from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String
 
 from src.core.database import Base
 
 
 class MarketData(Base):
     __tablename__ = "market_data"
+    __table_args__ = (
+        # Una barra por (símbolo, fecha); las lecturas de "últimas N barras" se
+        # resuelven solo con el índice cubriente, sin ordenar ni ir a la tabla.
+        Index("uq_market_data_symbol_timestamp", "symbol", "timestamp", unique=True),
+        Index("ix_market_data_bars", "symbol", "timestamp", "open", "high", "low", "close", "volume"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String)
     timestamp = Column(DateTime, index=True)
 
     open = Column(Float)
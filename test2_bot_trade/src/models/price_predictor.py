@@ -7,6 +7,7 @@ import sys
 import os
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 # Optional TensorFlow import
 try:
@@ -95,25 +96,25 @@ class LSTMPricePredictor:
         # but MinMax on all columns is a standard starting point for LSTMs.
         scaled_data = self.scaler.fit_transform(data)
 
-        X, y = [], []
         # Target is always the first column (Close Price)
         target_col_idx = 0 
-        
-        for i in range(self.sequence_length, len(scaled_data) - self.prediction_days + 1):
-            X.append(scaled_data[i - self.sequence_length : i, :]) # All features
-            y.append(scaled_data[i : i + self.prediction_days, target_col_idx]) # Target only
+        n_samples = len(scaled_data) - self.sequence_length - self.prediction_days + 1
+        if n_samples <= 0:
+            return np.empty((0, self.sequence_length, scaled_data.shape[1])), np.empty((0, self.prediction_days))
 
-        X = np.array(X)
-        y = np.array(y)
+        # Ventanas como vistas strided (sin copiar): X[k] = scaled_data[k : k + sequence_length]
+        X = sliding_window_view(scaled_data, self.sequence_length, axis=0)[:n_samples].transpose(0, 2, 1)
+        y = sliding_window_view(scaled_data[self.sequence_length:, target_col_idx], self.prediction_days)[:n_samples]
 
-        # X shape is already [samples, time steps, features]
+        # X shape is [samples, time steps, features]
         return X, y
 
-    def train(self, data, epochs=50, batch_size=32, validation_split=0.2):
+    def train(self, data, epochs=50, batch_size=32, validation_split=0.2, verbose=1):
         """
         Train the LSTM model.
         Args:
             data: DataFrame or numpy array of features. First column must be target.
+            verbose: Keras verbosity (0 = silencioso, para entrenamientos en paralelo)
         """
         if not TF_AVAILABLE:
             raise ImportError("TensorFlow is required to train the model.")
@@ -129,7 +130,7 @@ class LSTMPricePredictor:
             self.build_model(input_shape=(X.shape[1], X.shape[2]))
 
         history = self.model.fit(
-            X, y, epochs=epochs, batch_size=batch_size, validation_split=validation_split, verbose=1
+            X, y, epochs=epochs, batch_size=batch_size, validation_split=validation_split, verbose=verbose
         )
 
         return history
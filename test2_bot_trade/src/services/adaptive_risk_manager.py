@@ -10,6 +10,8 @@ from typing import Dict, Optional
 
 import numpy as np
 
+from src.services.portfolio_risk import PortfolioRiskEngine
+
 
 class AdaptiveRiskManager:
     """
@@ -37,6 +39,8 @@ class AdaptiveRiskManager:
                 # Convertir multiplicadores ATR a porcentajes base
                 self.base_stop_loss_pct = 0.01 * stop_loss_mult  # Aproximación
                 self.base_take_profit_pct = 0.01 * take_profit_mult
+                self.max_portfolio_var_pct = config.get("max_portfolio_var_pct", 8) / 100
+                self.max_component_var_pct = config.get("max_component_var_pct", 40) / 100
 
                 print(f"✅ Configuración cargada desde {config_file}")
             except Exception as e:
@@ -55,6 +59,13 @@ class AdaptiveRiskManager:
         self.consecutive_losses = 0
         self.last_trade_date = None
 
+        # Riesgo del portafolio (VaR/CVaR) para el control pre-trade
+        self.portfolio_risk = PortfolioRiskEngine(
+            confidence=0.95,
+            max_var_pct=self.max_portfolio_var_pct,
+            max_component_pct=self.max_component_var_pct,
+        )
+
         # Archivo de persistencia
         self.history_file = "risk_manager_history.json"
         self._load_history()
@@ -66,6 +77,8 @@ class AdaptiveRiskManager:
         self.base_take_profit_pct = 0.03  # 3%
         self.max_daily_trades = 10
         self.max_daily_loss_pct = 0.05  # 5% del capital
+        self.max_portfolio_var_pct = 0.08  # VaR diario 95% del portafolio
+        self.max_component_var_pct = 0.40  # Aporte máximo de un símbolo al VaR
 
     def _load_history(self):
         """Carga historial de operaciones desde archivo"""
@@ -244,6 +257,22 @@ class AdaptiveRiskManager:
 
         return True, "OK"
 
+    def check_order_risk(self, symbol: str, side: str, quantity: int, price: float) -> tuple[bool, str, Dict]:
+        """
+        Verifica el riesgo de portafolio de una orden propuesta (VaR incremental).
+
+        Args:
+            symbol: Símbolo a operar
+            side: 'BUY' o 'SELL'
+            quantity: Cantidad
+            price: Precio de la orden
+
+        Returns:
+            (puede_operar, razón, métricas de VaR antes/después)
+        """
+        equity = self.current_capital + self.portfolio_risk.total_value
+        return self.portfolio_risk.check_order(symbol, side, quantity, price, equity)
+
     def record_trade(
         self,
         symbol: str,
@@ -349,6 +378,8 @@ class AdaptiveRiskManager:
             "daily_trades_count": self.daily_trades_count,
             "consecutive_losses": self.consecutive_losses,
             "drawdown": self._calculate_drawdown(),
+            "portfolio_var": self.portfolio_risk.var(),
+            "max_portfolio_var_pct": self.max_portfolio_var_pct,
         }
 
 
@@ -9,6 +9,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from src.services.search_index import get_search_index
+
 try:
     from src.services.verified_learning import VerifiedLearning
 except ImportError:
@@ -31,6 +33,9 @@ class AdvancedReasoningAgent:
         self.interests = self._load_interests()
         self.conversation_history = self._load_conversation_history()
         
+        # Índice invertido de memoria, logs y código (se mantiene en segundo plano)
+        self.search_index = get_search_index(str(bot_directory))
+        
         # Personalidad del agente - SIN LÍMITES, máxima autonomía
         self.personality = {
             'curiosity': 1.0,  # Máxima curiosidad - quiere aprender todo
@@ -506,25 +511,7 @@ class AdvancedReasoningAgent:
         """Busca información en la memoria del bot sobre un tema"""
         if not query or 'facts' not in self.memory:
             return []
-        
-        query_lower = query.lower()
-        matching_facts = []
-        
-        for fact in self.memory['facts']:
-            # Buscar en título, snippet y query guardado
-            title = fact.get('title', '').lower()
-            snippet = fact.get('snippet', '').lower()
-            fact_query = fact.get('query', '').lower()
-            
-            # Si hay coincidencia en alguno de los campos
-            if (query_lower in title or query_lower in snippet or 
-                query_lower in fact_query or any(word in title or word in snippet 
-                for word in query_lower.split() if len(word) > 3)):
-                matching_facts.append(fact)
-        
-        # Ordenar por relevancia (más recientes primero)
-        matching_facts.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        return matching_facts[:5]  # Top 5 resultados
+        return self.search_index.search_memory(query, self.memory['facts'], limit=5)  # Top 5 resultados
     
     def _generate_knowledge_response(self, reasoning: Dict) -> str:
         """Genera respuesta basada en conocimiento interno"""
@@ -639,56 +626,12 @@ class AdvancedReasoningAgent:
         return response
     
     def _search_logs_for_error(self, error_code: str = None) -> List[str]:
-        """Busca errores en los logs"""
-        errors = []
-        log_dir = self.bot_directory / "logs"
-        
-        if not log_dir.exists():
-            return errors
-        
-        # Buscar en archivos de log recientes
-        log_files = sorted(log_dir.glob("*.log"), key=lambda x: x.stat().st_mtime, reverse=True)[:3]
-        
-        for log_file in log_files:
-            try:
-                with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    for line in lines[-500:]:  # Últimas 500 líneas
-                        if 'ERROR' in line or 'Exception' in line or 'Error' in line:
-                            if error_code:
-                                if error_code in line:
-                                    errors.append(line.strip()[:200])
-                            else:
-                                errors.append(line.strip()[:200])
-            except Exception:
-                continue
-        
-        return errors[:10]  # Máximo 10 errores
+        """Busca errores en los logs (índice de los logs más recientes)"""
+        return self.search_index.search_logs(error_code, limit=10)  # Máximo 10 errores
     
     def _search_code_for_error(self, error_code: str = None) -> List[str]:
         """Busca referencias a errores en el código"""
-        references = []
-        code_dir = self.bot_directory / "src"
-        
-        if not code_dir.exists():
-            return references
-        
-        # Buscar en archivos Python
-        for py_file in code_dir.rglob("*.py"):
-            try:
-                with open(py_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    for i, line in enumerate(lines, 1):
-                        if error_code:
-                            if error_code in line and ('error' in line.lower() or 'status' in line.lower() or 'code' in line.lower()):
-                                references.append(f"{py_file.relative_to(self.bot_directory)}:{i} - {line.strip()[:100]}")
-                        else:
-                            if 'error' in line.lower() and ('code' in line.lower() or 'status' in line.lower()):
-                                references.append(f"{py_file.relative_to(self.bot_directory)}:{i} - {line.strip()[:100]}")
-            except Exception:
-                continue
-        
-        return references[:10]  # Máximo 10 referencias
+        return self.search_index.search_code(error_code, limit=10)  # Máximo 10 referencias
     
     def _handle_trading_intent(self, reasoning: Dict) -> str:
         """Maneja intenciones relacionadas con trading"""
@@ -10,6 +10,7 @@ from pathlib import Path
 
 from src.core.logger import get_logger
 from src.services.adaptive_risk_manager import AdaptiveRiskManager
+from src.services.learning_aggregates import get_learning_aggregates
 
 logger = get_logger("auto_configurator")
 
@@ -94,27 +95,13 @@ class AutoConfigurator:
         }
     
     def _analyze_signals_from_operations(self) -> Dict:
-        """MEJORA #5: Analiza señales generadas desde operations_log.json (no solo trades ejecutados)"""
-        operations_log_file = Path("data/operations_log.json")
+        """MEJORA #5: Analiza señales generadas en el log de operaciones (no solo trades ejecutados)"""
+        # Últimas 100 señales (buffer de los agregados incrementales del log de operaciones)
+        recent_analyses = get_learning_aggregates().recent_analyses(100)
         
-        if not operations_log_file.exists():
+        if not recent_analyses:
             return {}
         
-        try:
-            with open(operations_log_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        except Exception as e:
-            logger.error(f"Error leyendo operations_log.json para auto-configuración: {e}")
-            return {}
-        
-        analyses = [op for op in operations if op.get('type') == 'ANALYSIS']
-        
-        if not analyses:
-            return {}
-        
-        # Analizar últimas 100 señales
-        recent_analyses = analyses[-100:] if len(analyses) > 100 else analyses
-        
         signal_stats = {
             'total_signals': len(recent_analyses),
             'buy_signals': 0,
@@ -129,11 +116,7 @@ class AutoConfigurator:
         }
         
         scores = []
-        for analysis in recent_analyses:
-            data = analysis.get('data', {})
-            score = data.get('score', 0)
-            signal = data.get('final_signal', 'HOLD')
-            
+        for score, signal, *_ in recent_analyses:
             scores.append(score)
             
             if signal == 'BUY':
@@ -6,6 +6,10 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 
+from src.services.pattern_engine import (
+    CANDLESTICK_DESCRIPTIONS, CANDLESTICK_GROUPS, candlestick_patterns, pattern_score
+)
+
 
 class CandlestickAnalyzer:
     """Analiza patrones de velas japonesas"""
@@ -49,45 +53,21 @@ class CandlestickAnalyzer:
         if len(df) < 3:
             return {'error': 'Datos insuficientes', 'score': 0}
         
-        # Tomar últimas velas
-        recent_df = df.tail(lookback).copy()
+        # Tomar últimas velas (la primera vela de la ventana no usa contexto previo)
+        recent_df = df.tail(lookback)
+        hits = self._detect_patterns(recent_df)
         
         detected_patterns = []
         total_score = 0
         
-        # Analizar cada patrón
-        for i in range(len(recent_df) - 1, -1, -1):  # Desde la más reciente hacia atrás
-            if i >= len(recent_df):
-                continue
-                
-            current = recent_df.iloc[i]
-            
-            # Patrones de 1 vela
-            if i >= 0:
-                pattern = self._detect_single_candle(current, recent_df, i)
-                if pattern:
-                    detected_patterns.append(pattern)
-                    score = self._get_pattern_score(pattern)
-                    total_score += score
-            
-            # Patrones de 2 velas
-            if i >= 1:
-                prev = recent_df.iloc[i-1]
-                pattern = self._detect_two_candle(current, prev, recent_df, i)
-                if pattern:
-                    detected_patterns.append(pattern)
-                    score = self._get_pattern_score(pattern)
-                    total_score += score
-            
-            # Patrones de 3 velas
-            if i >= 2:
-                prev1 = recent_df.iloc[i-1]
-                prev2 = recent_df.iloc[i-2]
-                pattern = self._detect_three_candle(current, prev1, prev2, recent_df, i)
-                if pattern:
-                    detected_patterns.append(pattern)
-                    score = self._get_pattern_score(pattern)
-                    total_score += score
+        # Desde la más reciente hacia atrás: 1 vela, 2 velas, 3 velas
+        for i in range(len(recent_df) - 1, -1, -1):
+            for group in CANDLESTICK_GROUPS:
+                for name in group:
+                    if hits[name][i]:
+                        pattern = {'pattern': name, 'description': CANDLESTICK_DESCRIPTIONS[name], 'position': i}
+                        detected_patterns.append(pattern)
+                        total_score += self._get_pattern_score(pattern)
         
         # Eliminar duplicados (mismo patrón en diferentes posiciones)
         unique_patterns = []
@@ -105,153 +85,30 @@ class CandlestickAnalyzer:
             'descriptions': [p['description'] for p in unique_patterns]
         }
     
-    def _detect_single_candle(self, candle: pd.Series, df: pd.DataFrame, idx: int) -> Optional[Dict]:
-        """Detecta patrones de 1 vela"""
-        open_price = candle['open']
-        high = candle['high']
-        low = candle['low']
-        close = candle['close']
-        
-        body = abs(close - open_price)
-        upper_shadow = high - max(open_price, close)
-        lower_shadow = min(open_price, close) - low
-        total_range = high - low
-        
-        if total_range == 0:
-            return None
-        
-        body_ratio = body / total_range
-        upper_ratio = upper_shadow / total_range
-        lower_ratio = lower_shadow / total_range
-        
-        # Doji (cuerpo muy pequeño)
-        if body_ratio < 0.1:
-            # Verificar contexto (soporte/resistencia)
-            if idx > 0:
-                prev_close = df.iloc[idx-1]['close']
-                if close < prev_close * 0.98:  # En soporte
-                    return {'pattern': 'DOJI_BULLISH', 'description': 'Doji en soporte', 'position': idx}
-                elif close > prev_close * 1.02:  # En resistencia
-                    return {'pattern': 'DOJI_BEARISH', 'description': 'Doji en resistencia', 'position': idx}
-        
-        # Hammer (cuerpo pequeño, sombra inferior larga)
-        if body_ratio < 0.3 and lower_ratio > 0.6 and upper_ratio < 0.1:
-            if close > open_price:  # Vela alcista
-                return {'pattern': 'HAMMER', 'description': 'Hammer (alcista)', 'position': idx}
-        
-        # Inverted Hammer (cuerpo pequeño, sombra superior larga)
-        if body_ratio < 0.3 and upper_ratio > 0.6 and lower_ratio < 0.1:
-            if close > open_price:  # Vela alcista
-                return {'pattern': 'INVERTED_HAMMER', 'description': 'Inverted Hammer (alcista)', 'position': idx}
-        
-        # Hanging Man (similar a Hammer pero en resistencia)
-        if body_ratio < 0.3 and lower_ratio > 0.6 and upper_ratio < 0.1:
-            if close < open_price and idx > 0:  # Vela bajista en resistencia
-                prev_high = df.iloc[idx-1]['high']
-                if high > prev_high * 0.99:
-                    return {'pattern': 'HANGING_MAN', 'description': 'Hanging Man (bajista)', 'position': idx}
-        
-        # Shooting Star (sombra superior larga, cuerpo pequeño)
-        if body_ratio < 0.3 and upper_ratio > 0.6 and lower_ratio < 0.1:
-            if close < open_price:  # Vela bajista
-                return {'pattern': 'SHOOTING_STAR', 'description': 'Shooting Star (bajista)', 'position': idx}
+    def analyze_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Detecta patrones de velas en todo el historial (para backtests y scanners)
         
-        return None
+        Args:
+            df: DataFrame con OHLCV
+            
+        Returns:
+            DataFrame con una columna booleana por patrón y 'score' por vela
+        """
+        hits = self._detect_patterns(df)
+        result = pd.DataFrame(hits, index=df.index)
+        result['score'] = pattern_score(hits, self._all_scores())
+        return result
     
-    def _detect_two_candle(self, current: pd.Series, prev: pd.Series, df: pd.DataFrame, idx: int) -> Optional[Dict]:
-        """Detecta patrones de 2 velas"""
-        prev_open = prev['open']
-        prev_close = prev['close']
-        prev_high = prev['high']
-        prev_low = prev['low']
-        
-        curr_open = current['open']
-        curr_close = current['close']
-        curr_high = current['high']
-        curr_low = current['low']
-        
-        # Bullish Engulfing
-        if (prev_close < prev_open and  # Vela anterior bajista
-            curr_close > curr_open and  # Vela actual alcista
-            curr_open < prev_close and  # Abre por debajo del cierre anterior
-            curr_close > prev_open):  # Cierra por encima de la apertura anterior
-            return {'pattern': 'BULLISH_ENGULFING', 'description': 'Bullish Engulfing', 'position': idx}
-        
-        # Bearish Engulfing
-        if (prev_close > prev_open and  # Vela anterior alcista
-            curr_close < curr_open and  # Vela actual bajista
-            curr_open > prev_close and  # Abre por encima del cierre anterior
-            curr_close < prev_open):  # Cierra por debajo de la apertura anterior
-            return {'pattern': 'BEARISH_ENGULFING', 'description': 'Bearish Engulfing', 'position': idx}
-        
-        # Piercing Pattern
-        if (prev_close < prev_open and  # Vela anterior bajista
-            curr_close > curr_open and  # Vela actual alcista
-            curr_open < prev_low and  # Abre por debajo del mínimo anterior
-            curr_close > (prev_open + prev_close) / 2):  # Cierra en la mitad superior del cuerpo anterior
-            return {'pattern': 'PIERCING_PATTERN', 'description': 'Piercing Pattern', 'position': idx}
-        
-        # Dark Cloud Cover
-        if (prev_close > prev_open and  # Vela anterior alcista
-            curr_close < curr_open and  # Vela actual bajista
-            curr_open > prev_high and  # Abre por encima del máximo anterior
-            curr_close < (prev_open + prev_close) / 2):  # Cierra en la mitad inferior del cuerpo anterior
-            return {'pattern': 'DARK_CLOUD', 'description': 'Dark Cloud Cover', 'position': idx}
-        
-        # Bullish Harami
-        if (prev_close < prev_open and  # Vela anterior bajista
-            curr_open > prev_close and  # Abre por encima del cierre anterior
-            curr_close < prev_open):  # Cierra por debajo de la apertura anterior
-            body_prev = abs(prev_close - prev_open)
-            body_curr = abs(curr_close - curr_open)
-            if body_curr < body_prev * 0.5:  # Cuerpo actual mucho más pequeño
-                return {'pattern': 'BULLISH_HARAMI', 'description': 'Bullish Harami', 'position': idx}
-        
-        # Bearish Harami
-        if (prev_close > prev_open and  # Vela anterior alcista
-            curr_open < prev_close and  # Abre por debajo del cierre anterior
-            curr_close > prev_open):  # Cierra por encima de la apertura anterior
-            body_prev = abs(prev_close - prev_open)
-            body_curr = abs(curr_close - curr_open)
-            if body_curr < body_prev * 0.5:  # Cuerpo actual mucho más pequeño
-                return {'pattern': 'BEARISH_HARAMI', 'description': 'Bearish Harami', 'position': idx}
-        
-        return None
+    def _detect_patterns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Columnas booleanas por patrón (una pasada vectorizada)"""
+        return candlestick_patterns(df['open'].values, df['high'].values,
+                                    df['low'].values, df['close'].values)
     
-    def _detect_three_candle(self, current: pd.Series, prev1: pd.Series, prev2: pd.Series, 
-                            df: pd.DataFrame, idx: int) -> Optional[Dict]:
-        """Detecta patrones de 3 velas"""
-        # Morning Star
-        if (prev2['close'] < prev2['open'] and  # Primera vela bajista
-            abs(prev1['close'] - prev1['open']) / (prev1['high'] - prev1['low']) < 0.3 and  # Segunda vela pequeña (estrella)
-            current['close'] > current['open'] and  # Tercera vela alcista
-            current['close'] > (prev2['open'] + prev2['close']) / 2):  # Cierra en mitad superior de primera
-            return {'pattern': 'MORNING_STAR', 'description': 'Morning Star', 'position': idx}
-        
-        # Evening Star
-        if (prev2['close'] > prev2['open'] and  # Primera vela alcista
-            abs(prev1['close'] - prev1['open']) / (prev1['high'] - prev1['low']) < 0.3 and  # Segunda vela pequeña (estrella)
-            current['close'] < current['open'] and  # Tercera vela bajista
-            current['close'] < (prev2['open'] + prev2['close']) / 2):  # Cierra en mitad inferior de primera
-            return {'pattern': 'EVENING_STAR', 'description': 'Evening Star', 'position': idx}
-        
-        # Three White Soldiers
-        if (len(df) >= 3 and idx >= 2):
-            three_candles = df.iloc[idx-2:idx+1]
-            if all(c['close'] > c['open'] for _, c in three_candles.iterrows()):  # Todas alcistas
-                if all(three_candles.iloc[i]['close'] > three_candles.iloc[i-1]['close'] 
-                       for i in range(1, len(three_candles))):  # Cada una más alta
-                    return {'pattern': 'THREE_WHITE_SOLDIERS', 'description': 'Three White Soldiers', 'position': idx}
-        
-        # Three Black Crows
-        if (len(df) >= 3 and idx >= 2):
-            three_candles = df.iloc[idx-2:idx+1]
-            if all(c['close'] < c['open'] for _, c in three_candles.iterrows()):  # Todas bajistas
-                if all(three_candles.iloc[i]['close'] < three_candles.iloc[i-1]['close'] 
-                       for i in range(1, len(three_candles))):  # Cada una más baja
-                    return {'pattern': 'THREE_BLACK_CROWS', 'description': 'Three Black Crows', 'position': idx}
-        
-        return None
+    def _all_scores(self) -> Dict[str, int]:
+        scores = {name: info['score'] for name, info in self.bullish_patterns.items()}
+        scores.update({name: info['score'] for name, info in self.bearish_patterns.items()})
+        return scores
     
     def _get_pattern_score(self, pattern: Dict) -> int:
         """Obtiene score de un patrón"""
@@ -226,12 +226,10 @@ class ChatInterface:
                         context['portfolio_size'] = len(portfolio_data)
             
             # 3. Cargar operaciones recientes
-            operations_file = Path("data/operations_log.json")
-            if operations_file.exists():
-                with open(operations_file, 'r', encoding='utf-8') as f:
-                    operations = json.load(f)
-                    if operations:
-                        context['recent_operations'] = operations[-20:]  # Últimas 20 operaciones
+            from src.services.operations_log import get_operations_log
+            operations = get_operations_log().tail(20)  # Últimas 20 operaciones
+            if operations:
+                context['recent_operations'] = operations
             
             # 4. Verificar estado del bot
             bot_pid_file = Path("bot.pid")
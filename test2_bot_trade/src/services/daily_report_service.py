@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 from src.core.logger import get_logger
+from src.services.operations_log import get_operations_log
 
 logger = get_logger("daily_report")
 
@@ -19,7 +20,7 @@ class DailyReportService:
     def __init__(self, telegram_bot=None):
         self.telegram_bot = telegram_bot
         self.trades_file = Path("trades.json")
-        self.operations_file = Path("data/operations_log.json")
+        self.operations_log = get_operations_log()
         self.portfolio_file = Path("my_portfolio.json")
         self.reports_dir = Path("data/daily_reports")
         self.reports_dir.mkdir(parents=True, exist_ok=True)
@@ -39,14 +40,15 @@ class DailyReportService:
         
         report_date = date.strftime("%Y-%m-%d")
         
+        day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + timedelta(days=1)
+        
         # Cargar datos
         trades = self._load_trades()
-        operations = self._load_operations()
+        operations = self._load_operations(day_start, day_end)
         portfolio = self._load_portfolio()
         
         # Filtrar datos del día
-        day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
         
         day_trades = [
             t for t in trades
@@ -202,14 +204,11 @@ class DailyReportService:
             logger.error(f"Error cargando trades: {e}")
             return []
     
-    def _load_operations(self) -> List[Dict]:
-        """Carga operaciones desde operations_log.json"""
-        if not self.operations_file.exists():
-            return []
-        
+    def _load_operations(self, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> List[Dict]:
+        """Carga operaciones del log de eventos (solo los segmentos del rango pedido)"""
         try:
-            with open(self.operations_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return list(self.operations_log.range(start=start, end=end))
         except Exception as e:
             logger.error(f"Error cargando operaciones: {e}")
             return []
@@ -12,7 +12,7 @@ from typing import List, Dict, Optional
 import time
 import pandas as pd
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal, SessionLocal, upsert
 from src.models.market_data import MarketData
 from src.connectors.iol_client import IOLClient
 from src.connectors.byma_client import BYMAClient
@@ -47,7 +47,7 @@ class DataCollector:
         Returns:
             True si tiene suficientes datos, False en caso contrario
         """
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             count = db.query(MarketData).filter(
                 MarketData.symbol == symbol
@@ -125,36 +125,20 @@ class DataCollector:
                 if not history.empty:
                     logger.info(f"✅ Obtenidos {len(history)} registros históricos desde {source_name} para {symbol}")
                     
-                    # Guardar todos los registros en la base de datos
-                    for index, row in history.iterrows():
-                        # Verificar si ya existe
-                        existing = db.query(MarketData).filter(
-                            MarketData.symbol == symbol,
-                            MarketData.timestamp == index
-                        ).first()
-                        
-                        if existing:
-                            # Actualizar
-                            existing.open = row.get('Open', row.get('open', 0))
-                            existing.high = row.get('High', row.get('high', 0))
-                            existing.low = row.get('Low', row.get('low', 0))
-                            existing.close = row.get('Close', row.get('close', 0))
-                            existing.volume = row.get('Volume', row.get('volume', 0))
-                            existing.source = source_name.lower().replace(' ', '_')
-                        else:
-                            # Crear nuevo
-                            new_record = MarketData(
-                                symbol=symbol,
-                                timestamp=index,
-                                open=row.get('Open', row.get('open', 0)),
-                                high=row.get('High', row.get('high', 0)),
-                                low=row.get('Low', row.get('low', 0)),
-                                close=row.get('Close', row.get('close', 0)),
-                                volume=row.get('Volume', row.get('volume', 0)),
-                                source=source_name.lower().replace(' ', '_')
-                            )
-                            db.add(new_record)
-                            records_added += 1
+                    # Guardar todos los registros en la base de datos (upsert por símbolo+fecha)
+                    source = source_name.lower().replace(' ', '_')
+                    before = db.query(MarketData).filter(MarketData.symbol == symbol).count()
+                    upsert(db, MarketData, [{
+                        'symbol': symbol,
+                        'timestamp': index,
+                        'open': row.get('Open', row.get('open', 0)),
+                        'high': row.get('High', row.get('high', 0)),
+                        'low': row.get('Low', row.get('low', 0)),
+                        'close': row.get('Close', row.get('close', 0)),
+                        'volume': float(row.get('Volume', row.get('volume', 0)) or 0),
+                        'source': source
+                    } for index, row in history.iterrows()])
+                    records_added = db.query(MarketData).filter(MarketData.symbol == symbol).count() - before
                     
                     db.commit()
                     
@@ -273,7 +257,7 @@ class DataCollector:
         Returns:
             Dict con estado por símbolo: {symbol: {'has_data': bool, 'record_count': int}}
         """
-        db = SessionLocal()
+        db = ReadSessionLocal()
         status = {}
         
         try:
@@ -11,6 +11,7 @@ import numpy as np
 import pandas as pd
 
 from src.core.logger import get_logger
+from src.services.learning_aggregates import get_learning_aggregates
 
 logger = get_logger("enhanced_learning")
 
@@ -129,7 +130,7 @@ class TimeBasedLearning:
         self.data_file = Path(data_file)
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
         self.time_stats = self._load_stats()
-        self.operations_log_file = Path("data/operations_log.json")
+        self.aggregates = get_learning_aggregates()
     
     def _load_stats(self) -> Dict:
         """Carga estadísticas por horario"""
@@ -176,95 +177,8 @@ class TimeBasedLearning:
         self._save_stats()
     
     def _analyze_temporal_patterns_from_operations(self) -> Dict:
-        """MEJORA #2: Analiza patrones temporales desde operations_log.json"""
-        if not self.operations_log_file.exists():
-            return {}
-        
-        try:
-            with open(self.operations_log_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        except Exception as e:
-            logger.error(f"Error leyendo operations_log.json para análisis temporal: {e}")
-            return {}
-        
-        analyses = [op for op in operations if op.get('type') == 'ANALYSIS']
-        
-        if not analyses:
-            return {}
-        
-        # Estadísticas temporales mejoradas
-        hour_stats = {}  # Por hora del día
-        day_stats = {}   # Por día de semana
-        hour_score_stats = {}  # Scores promedio por hora
-        
-        for analysis in analyses:
-            data = analysis.get('data', {})
-            score = data.get('score', 0)
-            signal = data.get('final_signal', 'HOLD')
-            timestamp = analysis.get('timestamp')
-            
-            if not timestamp:
-                continue
-            
-            try:
-                dt = datetime.fromisoformat(timestamp)
-                hour = dt.hour
-                day_of_week = dt.strftime('%A')
-                
-                # Estadísticas por hora
-                if hour not in hour_stats:
-                    hour_stats[hour] = {
-                        'total_analyses': 0,
-                        'total_score': 0,
-                        'avg_score': 0,
-                        'buy_signals': 0,
-                        'sell_signals': 0,
-                        'hold_signals': 0,
-                        'high_scores': 0,  # Scores > 30
-                        'very_high_scores': 0  # Scores > 50
-                    }
-                
-                hour_stats[hour]['total_analyses'] += 1
-                hour_stats[hour]['total_score'] += score
-                hour_stats[hour]['avg_score'] = hour_stats[hour]['total_score'] / hour_stats[hour]['total_analyses']
-                
-                if signal == 'BUY':
-                    hour_stats[hour]['buy_signals'] += 1
-                elif signal == 'SELL':
-                    hour_stats[hour]['sell_signals'] += 1
-                else:
-                    hour_stats[hour]['hold_signals'] += 1
-                
-                if score > 30:
-                    hour_stats[hour]['high_scores'] += 1
-                if score > 50:
-                    hour_stats[hour]['very_high_scores'] += 1
-                
-                # Estadísticas por día de semana
-                if day_of_week not in day_stats:
-                    day_stats[day_of_week] = {
-                        'total_analyses': 0,
-                        'total_score': 0,
-                        'avg_score': 0,
-                        'buy_signals': 0
-                    }
-                
-                day_stats[day_of_week]['total_analyses'] += 1
-                day_stats[day_of_week]['total_score'] += score
-                day_stats[day_of_week]['avg_score'] = day_stats[day_of_week]['total_score'] / day_stats[day_of_week]['total_analyses']
-                
-                if signal == 'BUY':
-                    day_stats[day_of_week]['buy_signals'] += 1
-                    
-            except Exception as e:
-                logger.debug(f"Error procesando timestamp {timestamp}: {e}")
-                continue
-        
-        return {
-            'hour_stats': hour_stats,
-            'day_stats': day_stats,
-            'total_analyses': len(analyses)
-        }
+        """MEJORA #2: Patrones temporales de los análisis (agregados incrementales del log de operaciones)"""
+        return self.aggregates.temporal_view()
     
     def get_best_hours(self) -> List[Dict]:
         """Retorna las mejores horas para trading - MEJORADO con análisis desde operations_log"""
@@ -363,7 +277,7 @@ class MarketConditionLearning:
         self.data_file = Path(data_file)
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
         self.conditions = self._load_conditions()
-        self.operations_log_file = Path("data/operations_log.json")
+        self.aggregates = get_learning_aggregates()
     
     def _load_conditions(self) -> Dict:
         """Carga historial de condiciones de mercado"""
@@ -419,88 +333,8 @@ class MarketConditionLearning:
         self._save_conditions()
     
     def _analyze_market_conditions_from_operations(self) -> Dict:
-        """MEJORA #6: Analiza condiciones de mercado desde operations_log.json"""
-        if not self.operations_log_file.exists():
-            return {}
-        
-        try:
-            with open(self.operations_log_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        except Exception as e:
-            logger.error(f"Error leyendo operations_log.json para condiciones de mercado: {e}")
-            return {}
-        
-        analyses = [op for op in operations if op.get('type') == 'ANALYSIS']
-        
-        if not analyses:
-            return {}
-        
-        # Analizar últimas 200 operaciones
-        recent_analyses = analyses[-200:] if len(analyses) > 200 else analyses
-        
-        condition_stats = {}
-        
-        for analysis in recent_analyses:
-            data = analysis.get('data', {})
-            score = data.get('score', 0)
-            signal = data.get('final_signal', 'HOLD')
-            technical = data.get('technical', {})
-            
-            # Extraer condiciones técnicas si están disponibles
-            rsi = technical.get('rsi', 50) if technical else 50
-            macd = technical.get('macd', 0) if technical else 0
-            volume_ratio = technical.get('volume_ratio', 1.0) if technical else 1.0
-            
-            # Categorizar condiciones
-            if rsi < 30:
-                rsi_category = 'OVERSOLD'
-            elif rsi > 70:
-                rsi_category = 'OVERBOUGHT'
-            else:
-                rsi_category = 'NEUTRAL'
-            
-            # Categorizar tendencia por MACD
-            if macd > 0:
-                trend = 'BULLISH'
-            elif macd < 0:
-                trend = 'BEARISH'
-            else:
-                trend = 'NEUTRAL'
-            
-            # Categorizar volatilidad por volumen
-            if volume_ratio > 1.5:
-                volatility = 'HIGH'
-            elif volume_ratio < 0.7:
-                volatility = 'LOW'
-            else:
-                volatility = 'MEDIUM'
-            
-            condition_key = f"{volatility}_{trend}_{rsi_category}"
-            
-            if condition_key not in condition_stats:
-                condition_stats[condition_key] = {
-                    'total_analyses': 0,
-                    'total_score': 0,
-                    'avg_score': 0,
-                    'buy_signals': 0,
-                    'high_scores': 0,  # Scores > 30
-                    'volatility': volatility,
-                    'trend': trend,
-                    'rsi_category': rsi_category
-                }
-            
-            stats = condition_stats[condition_key]
-            stats['total_analyses'] += 1
-            stats['total_score'] += score
-            stats['avg_score'] = stats['total_score'] / stats['total_analyses']
-            
-            if signal == 'BUY':
-                stats['buy_signals'] += 1
-            
-            if score > 30:
-                stats['high_scores'] += 1
-        
-        return condition_stats
+        """MEJORA #6: Condiciones de mercado de los últimos 200 análisis (buffer de los agregados)"""
+        return self.aggregates.market_conditions_view(200)
     
     def get_best_conditions(self) -> List[Dict]:
         """Retorna las mejores condiciones de mercado para trading - MEJORADO"""
@@ -632,7 +466,7 @@ class StrategyPerformanceTracker:
         self.data_file = Path(data_file)
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
         self.strategy_stats = self._load_stats()
-        self.operations_log_file = Path("data/operations_log.json")
+        self.aggregates = get_learning_aggregates()
     
     def _load_stats(self) -> Dict:
         """Carga estadísticas de estrategias"""
@@ -653,87 +487,8 @@ class StrategyPerformanceTracker:
             logger.error(f"Error guardando estadísticas de estrategias: {e}")
     
     def _analyze_strategies_from_operations(self) -> Dict:
-        """Analiza performance de estrategias desde operations_log.json"""
-        if not self.operations_log_file.exists():
-            return {}
-        
-        try:
-            with open(self.operations_log_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        except Exception as e:
-            logger.error(f"Error leyendo operations_log.json para análisis de estrategias: {e}")
-            return {}
-        
-        analyses = [op for op in operations if op.get('type') == 'ANALYSIS']
-        
-        if not analyses:
-            return {}
-        
-        # Estrategias conocidas
-        known_strategies = [
-            'regime_detection', 'multi_timeframe', 'order_flow', 'seasonal',
-            'fractal', 'anomaly', 'volume_profile', 'monte_carlo',
-            'pattern_recognition', 'pairs_trading', 'elliott_wave',
-            'smart_money', 'meta_learner', 'candlestick', 'correlation',
-            'neural_network', 'macroeconomic'
-        ]
-        
-        strategy_stats = {}
-        
-        for analysis in analyses:
-            data = analysis.get('data', {})
-            score = data.get('score', 0)
-            signal = data.get('final_signal', 'HOLD')
-            buy_factors = data.get('buy_factors', [])
-            sell_factors = data.get('sell_factors', [])
-            
-            # Extraer estrategias de buy_factors y sell_factors
-            # Formato esperado: "Strategy Name (+score)" o "Strategy Name (score)"
-            all_factors = buy_factors + sell_factors
-            
-            for factor in all_factors:
-                # Buscar nombres de estrategias en los factores
-                for strategy in known_strategies:
-                    if strategy.lower().replace('_', ' ') in factor.lower() or strategy in factor:
-                        if strategy not in strategy_stats:
-                            strategy_stats[strategy] = {
-                                'total_uses': 0,
-                                'total_score_contribution': 0,
-                                'avg_score_contribution': 0,
-                                'buy_signals': 0,
-                                'sell_signals': 0,
-                                'hold_signals': 0,
-                                'high_contribution': 0  # Contribuciones > 5
-                            }
-                        
-                        strategy_stats[strategy]['total_uses'] += 1
-                        
-                        # Intentar extraer el score de la contribución
-                        try:
-                            # Buscar número en el factor
-                            import re
-                            numbers = re.findall(r'[-+]?\d+', factor)
-                            if numbers:
-                                contribution = int(numbers[-1])  # Último número
-                                strategy_stats[strategy]['total_score_contribution'] += abs(contribution)
-                                strategy_stats[strategy]['avg_score_contribution'] = (
-                                    strategy_stats[strategy]['total_score_contribution'] / 
-                                    strategy_stats[strategy]['total_uses']
-                                )
-                                
-                                if abs(contribution) > 5:
-                                    strategy_stats[strategy]['high_contribution'] += 1
-                        except:
-                            pass
-                        
-                        if signal == 'BUY':
-                            strategy_stats[strategy]['buy_signals'] += 1
-                        elif signal == 'SELL':
-                            strategy_stats[strategy]['sell_signals'] += 1
-                        else:
-                            strategy_stats[strategy]['hold_signals'] += 1
-        
-        return strategy_stats
+        """Performance de estrategias según los factores de los análisis (agregados incrementales)"""
+        return self.aggregates.strategy_view()
     
     def get_strategy_performance(self) -> Dict:
         """Retorna performance de cada estrategia"""
@@ -825,7 +580,7 @@ class EnhancedLearningSystem:
         self.strategy_tracker = StrategyPerformanceTracker()  # MEJORA #4
         self.insights_file = Path("data/learning/insights.json")
         self.insights_file.parent.mkdir(parents=True, exist_ok=True)
-        self.operations_log_file = Path("data/operations_log.json")
+        self.aggregates = get_learning_aggregates()
     
     def learn_from_trade(self, symbol: str, pnl: float, pnl_pct: float, signal: str,
                         confidence: str, market_conditions: Dict):
@@ -840,100 +595,8 @@ class EnhancedLearningSystem:
         self.market_learning.record_trade(market_conditions, pnl)
     
     def _analyze_operations_log(self) -> Dict:
-        """Analiza operations_log.json para generar insights desde análisis (no solo trades)"""
-        if not self.operations_log_file.exists():
-            return {}
-        
-        try:
-            with open(self.operations_log_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
-        except Exception as e:
-            logger.error(f"Error leyendo operations_log.json: {e}")
-            return {}
-        
-        # Filtrar solo análisis
-        analyses = [op for op in operations if op.get('type') == 'ANALYSIS']
-        
-        if not analyses:
-            return {}
-        
-        # Analizar por símbolo
-        symbol_stats = {}
-        hour_stats = {}
-        signal_stats = {'BUY': 0, 'SELL': 0, 'HOLD': 0}
-        
-        for analysis in analyses:
-            data = analysis.get('data', {})
-            symbol = data.get('symbol')
-            score = data.get('score', 0)
-            signal = data.get('final_signal', 'HOLD')
-            timestamp = analysis.get('timestamp')
-            
-            if not symbol:
-                continue
-            
-            # Estadísticas por símbolo
-            if symbol not in symbol_stats:
-                symbol_stats[symbol] = {
-                    'total_analyses': 0,
-                    'total_score': 0,
-                    'avg_score': 0,
-                    'buy_signals': 0,
-                    'sell_signals': 0,
-                    'hold_signals': 0,
-                    'high_scores': 0  # Scores > 30
-                }
-            
-            symbol_stats[symbol]['total_analyses'] += 1
-            symbol_stats[symbol]['total_score'] += score
-            symbol_stats[symbol]['avg_score'] = symbol_stats[symbol]['total_score'] / symbol_stats[symbol]['total_analyses']
-            
-            if signal == 'BUY':
-                symbol_stats[symbol]['buy_signals'] += 1
-                signal_stats['BUY'] += 1
-            elif signal == 'SELL':
-                symbol_stats[symbol]['sell_signals'] += 1
-                signal_stats['SELL'] += 1
-            else:
-                symbol_stats[symbol]['hold_signals'] += 1
-                signal_stats['HOLD'] += 1
-            
-            if score > 30:
-                symbol_stats[symbol]['high_scores'] += 1
-            
-            # Estadísticas por hora
-            if timestamp:
-                try:
-                    dt = datetime.fromisoformat(timestamp)
-                    hour = dt.hour
-                    
-                    if hour not in hour_stats:
-                        hour_stats[hour] = {
-                            'total_analyses': 0,
-                            'total_score': 0,
-                            'avg_score': 0,
-                            'buy_signals': 0,
-                            'high_scores': 0
-                        }
-                    
-                    hour_stats[hour]['total_analyses'] += 1
-                    hour_stats[hour]['total_score'] += score
-                    hour_stats[hour]['avg_score'] = hour_stats[hour]['total_score'] / hour_stats[hour]['total_analyses']
-                    
-                    if signal == 'BUY':
-                        hour_stats[hour]['buy_signals'] += 1
-                    
-                    if score > 30:
-                        hour_stats[hour]['high_scores'] += 1
-                except:
-                    pass
-        
-        return {
-            'symbol_stats': symbol_stats,
-            'hour_stats': hour_stats,
-            'signal_stats': signal_stats,
-            'total_analyses': len(analyses)
-        }
+        """Estadísticas de los análisis (no solo trades) por símbolo, hora y señal, ya agregadas"""
+        return self.aggregates.enhanced_view()
     
     def _generate_insights_from_analyses(self, analysis_data: Dict) -> Dict:
         """Genera insights desde análisis (no solo trades)"""
@@ -0,0 +1,581 @@
+"""
+Feature Store - Matriz de features por símbolo calculada una sola vez
+Compartida por predicción, evaluación, optimización y reentrenamiento.
+
+- Definiciones de features versionadas (FeatureSet): si cambia la definición
+  se reconstruye la matriz completa
+- Cuando llegan barras nuevas solo se calculan las filas nuevas (usando una
+  cola de barras crudas como contexto para los indicadores)
+- Persistencia columnar compacta: un .npz por símbolo con una columna
+  float32 por feature
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import ta
+
+from src.core.logger import get_logger
+
+logger = get_logger("feature_store")
+
+FEATURE_STORE_DIR = Path("data/features")
+
+
+# ==================== DEFINICIONES DE FEATURES ====================
+
+def compute_lstm_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Features del LSTM (PredictionService / ContinuousLearning).
+    Target column (Close) MUST be first.
+    """
+    df = df.copy()
+
+    # 1. Momentum: RSI
+    df['rsi'] = ta.momentum.rsi(df['close'], window=14)
+
+    # 2. Trend: MACD
+    macd = ta.trend.MACD(df['close'])
+    df['macd'] = macd.macd()
+
+    # 3. Volatility: Bollinger Band Width
+    bb = ta.volatility.BollingerBands(df['close'], window=20)
+    bb_upper = bb.bollinger_hband()
+    bb_lower = bb.bollinger_lband()
+    bb_middle = bb.bollinger_mavg()
+    # Evitar división por cero
+    df['bb_width'] = np.where(
+        bb_middle != 0,
+        (bb_upper - bb_lower) / bb_middle,
+        0
+    )
+
+    # 4. Trend strength: Distance from SMA 20
+    sma = ta.trend.SMAIndicator(df['close'], window=20)
+    sma_values = sma.sma_indicator()
+    # Evitar división por cero
+    df['sma_dist'] = np.where(
+        sma_values != 0,
+        (df['close'] - sma_values) / sma_values,
+        0
+    )
+
+    # 5. Volume: ROC
+    df['vol_roc'] = df['volume'].pct_change()
+
+    # Reemplazar infinitos y NaN
+    df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    df.dropna(inplace=True)
+
+    # Verificar que no queden infinitos
+    if not np.isfinite(df.select_dtypes(include=[np.number]).values).all():
+        # Si aún hay infinitos, reemplazarlos con 0
+        df.replace([np.inf, -np.inf], 0, inplace=True)
+
+    # Select and order columns: Close MUST be first for the predictor to identify target
+    return df[LSTM_FEATURE_COLUMNS]
+
+
+def _rsi(prices, period=14):
+    delta = pd.Series(prices).diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / (loss + 1e-10)
+    return 100 - (100 / (1 + rs))
+
+
+def _atr(high, low, close, period=14):
+    tr1 = pd.Series(high) - pd.Series(low)
+    tr2 = abs(pd.Series(high) - pd.Series(close).shift())
+    tr3 = abs(pd.Series(low) - pd.Series(close).shift())
+    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    return tr.rolling(window=period).mean()
+
+
+def _adx(high, low, close, period=14):
+    plus_dm = pd.Series(high).diff()
+    minus_dm = pd.Series(low).diff() * -1
+    plus_dm[plus_dm < 0] = 0
+    minus_dm[minus_dm < 0] = 0
+    tr = _atr(high, low, close, period)
+    plus_di = 100 * (plus_dm.rolling(window=period).mean() / (tr + 1e-10))
+    minus_di = 100 * (minus_dm.rolling(window=period).mean() / (tr + 1e-10))
+    dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
+    return dx.rolling(window=period).mean()
+
+
+def _stochastic(high, low, close, k_period=14, d_period=3):
+    lowest_low = pd.Series(low).rolling(window=k_period).min()
+    highest_high = pd.Series(high).rolling(window=k_period).max()
+    k = 100 * ((close - lowest_low) / (highest_high - lowest_low + 1e-10))
+    d = k.rolling(window=d_period).mean()
+    return k, d
+
+
+def compute_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Indicadores de NeuralNetworkServiceComplete (25+ columnas sobre OHLCV)"""
+    df.columns = [c.lower() for c in df.columns]
+
+    high = df['high'].values
+    low = df['low'].values
+    close = df['close'].values
+    volume = df['volume'].values if 'volume' in df.columns else np.zeros(len(df))
+
+    # Los indicadores se calculan sobre arrays: trabajar con índice posicional
+    # y restaurar el índice original al final
+    index = df.index
+    df = df.reset_index(drop=True)
+
+    # 1. RSI (14 y 21)
+    df['rsi_14'] = _rsi(close, 14)
+    df['rsi_21'] = _rsi(close, 21)
+
+    # 2. MACD
+    ema_12 = pd.Series(close).ewm(span=12, adjust=False).mean()
+    ema_26 = pd.Series(close).ewm(span=26, adjust=False).mean()
+    df['macd'] = ema_12 - ema_26
+    df['macd_signal'] = pd.Series(df['macd']).ewm(span=9, adjust=False).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal']
+
+    # 3. Bollinger Bands
+    sma_20 = pd.Series(close).rolling(window=20).mean()
+    std_20 = pd.Series(close).rolling(window=20).std()
+    df['bb_upper'] = sma_20 + (std_20 * 2)
+    df['bb_lower'] = sma_20 - (std_20 * 2)
+    df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / (sma_20 + 1e-10)
+    df['bb_position'] = (close - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'] + 1e-10)
+
+    # 4. ATR
+    df['atr'] = _atr(high, low, close, 14)
+
+    # 5. SMAs
+    df['sma_20'] = pd.Series(close).rolling(window=20).mean()
+    df['sma_50'] = pd.Series(close).rolling(window=50).mean()
+    df['sma_200'] = pd.Series(close).rolling(window=200).mean()
+
+    # 6. EMAs
+    df['ema_12'] = pd.Series(close).ewm(span=12, adjust=False).mean()
+    df['ema_26'] = pd.Series(close).ewm(span=26, adjust=False).mean()
+
+    # 7. ADX
+    df['adx'] = _adx(high, low, close, 14)
+
+    # 8. Stochastic
+    df['stoch_k'], df['stoch_d'] = _stochastic(high, low, close, 14, 3)
+
+    # 9. Features derivadas
+    df['returns'] = pd.Series(close).pct_change()
+    df['volatility'] = pd.Series(df['returns']).rolling(window=20).std()
+    df['momentum'] = close / (pd.Series(close).shift(10) + 1e-10) - 1
+
+    # 10. Volumen relativo
+    if len(volume) > 0 and volume.sum() > 0:
+        df['volume_sma'] = pd.Series(volume).rolling(window=20).mean()
+        df['volume_ratio'] = volume / (df['volume_sma'] + 1e-10)
+    else:
+        df['volume_ratio'] = 1.0
+
+    # Rellenar NaN
+    df = df.bfill().ffill().fillna(0)
+    df.index = index
+    return df
+
+
+def compute_nn_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Las 27 columnas que usa el ensemble de NeuralNetworkServiceComplete"""
+    df = df.copy()
+    if 'volume' not in df.columns:
+        df['volume'] = 0.0
+    return compute_technical_indicators(df)[NN_FEATURE_COLUMNS]
+
+
+LSTM_FEATURE_COLUMNS = ['close', 'rsi', 'macd', 'bb_width', 'sma_dist', 'vol_roc']
+
+NN_FEATURE_COLUMNS = [
+    'open', 'high', 'low', 'close', 'volume',
+    'rsi_14', 'rsi_21',
+    'macd', 'macd_signal', 'macd_hist',
+    'bb_upper', 'bb_lower', 'bb_width', 'bb_position',
+    'atr',
+    'sma_20', 'sma_50', 'sma_200',
+    'ema_12', 'ema_26',
+    'adx',
+    'stoch_k', 'stoch_d',
+    'returns', 'volatility', 'momentum',
+    'volume_ratio'
+]
+
+
+class FeatureSet:
+    """
+    Definición versionada de un conjunto de features.
+
+    Subir `version` al cambiar la lógica de `compute` invalida las matrices
+    guardadas (se reconstruyen completas en la próxima actualización).
+    """
+
+    def __init__(self, name: str, version: int, inputs: Sequence[str], columns: Sequence[str],
+                 compute: Callable[[pd.DataFrame], pd.DataFrame], warmup: int):
+        """
+        Args:
+            name: Nombre del conjunto (también nombre del directorio en disco)
+            version: Versión de la definición
+            inputs: Columnas crudas que necesita compute
+            columns: Columnas que produce compute, en orden
+            compute: Función df crudo -> df de features (mismo índice, puede descartar filas)
+            warmup: Barras crudas previas necesarias para calcular una fila nueva
+        """
+        self.name = name
+        self.version = version
+        self.inputs = list(inputs)
+        self.columns = list(columns)
+        self.compute = compute
+        self.warmup = warmup
+
+    @property
+    def signature(self) -> str:
+        digest = hashlib.sha1(json.dumps([self.inputs, self.columns]).encode()).hexdigest()[:12]
+        return f"{self.name}:v{self.version}:{digest}"
+
+
+FEATURE_SETS: Dict[str, FeatureSet] = {
+    'lstm_basic': FeatureSet('lstm_basic', 1, ['close', 'volume'], LSTM_FEATURE_COLUMNS,
+                             compute_lstm_features, warmup=300),
+    'nn_complete': FeatureSet('nn_complete', 1, ['open', 'high', 'low', 'close', 'volume'],
+                              NN_FEATURE_COLUMNS, compute_nn_features, warmup=400),
+}
+
+
+# ==================== STORE ====================
+
+class _FeatureFrame:
+    """Estado en memoria de un (símbolo, feature set)"""
+
+    __slots__ = ('signature', 'columns', 'index', 'values', 'raw_tail')
+
+    def __init__(self, signature: str, columns: List[str], index: np.ndarray,
+                 values: np.ndarray, raw_tail: pd.DataFrame):
+        self.signature = signature
+        self.columns = columns
+        self.index = index          # int64 (ns desde epoch)
+        self.values = values        # float32 (filas x columnas)
+        self.raw_tail = raw_tail    # últimas `warmup` barras crudas (contexto)
+
+
+class FeatureStore:
+    """
+    Almacén de matrices de features por símbolo con actualización incremental.
+
+    Uso:
+        store = get_feature_store()
+        store.update_from_db('GGAL', 'lstm_basic')
+        features = store.get('GGAL', 'lstm_basic', n=60)
+    """
+
+    def __init__(self, base_dir: Path = FEATURE_STORE_DIR, persist: bool = True):
+        self.base_dir = Path(base_dir)
+        self.persist = persist
+        self._frames: Dict[tuple, _FeatureFrame] = {}
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {
+            'full_builds': 0,
+            'incremental_updates': 0,
+            'rows_computed': 0,
+            'unchanged': 0,
+            'gaps': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def get(self, symbol: str, feature_set: str = 'lstm_basic', n: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Últimas n filas de features (float32) indexadas por timestamp, o None si no hay"""
+        frame = self._get_frame(symbol, feature_set)
+        if frame is None:
+            return None
+        index, values = frame.index, frame.values
+        if n is not None:
+            index, values = index[-n:], values[-n:]
+        return pd.DataFrame(values, index=pd.to_datetime(index), columns=frame.columns)
+
+    def get_matrix(self, symbol: str, feature_set: str = 'lstm_basic', n: Optional[int] = None) -> Optional[np.ndarray]:
+        """Igual que get pero devuelve directamente el array float32 (sin copiar)"""
+        frame = self._get_frame(symbol, feature_set)
+        if frame is None:
+            return None
+        return frame.values if n is None else frame.values[-n:]
+
+    def last_timestamp(self, symbol: str, feature_set: str = 'lstm_basic') -> Optional[pd.Timestamp]:
+        """Timestamp de la última barra cruda incorporada"""
+        frame = self._get_frame(symbol, feature_set)
+        if frame is None or frame.raw_tail.empty:
+            return None
+        return frame.raw_tail.index[-1]
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+
+    def update(self, symbol: str, raw_df: pd.DataFrame, feature_set: str = 'lstm_basic') -> int:
+        """
+        Incorpora barras crudas y calcula solo las filas de features nuevas.
+
+        La última barra guardada se recalcula si cambió (barra del día aún abierta).
+
+        Args:
+            raw_df: OHLCV con DatetimeIndex o columna 'timestamp'/'date'
+
+        Returns:
+            Cantidad de filas de features agregadas o recalculadas
+        """
+        definition = FEATURE_SETS[feature_set]
+        raw = self._normalize_raw(raw_df, definition)
+        if raw is None:
+            raise ValueError("Se necesitan timestamps (DatetimeIndex o columna 'timestamp'/'date')")
+        if raw.empty:
+            return 0
+
+        key = (symbol, feature_set)
+        with self._lock_for(key):
+            frame = self._get_frame(symbol, feature_set)
+            compatible = frame is not None and frame.signature == definition.signature \
+                and not frame.raw_tail.empty
+
+            if compatible and raw.index[0] > frame.raw_tail.index[-1] and len(raw) < definition.warmup:
+                # Hueco entre lo guardado y raw, y raw no alcanza como contexto propio:
+                # encadenarlo calcularía los indicadores como si las barras fueran contiguas
+                logger.warning(f"Hueco en {symbol} ({feature_set}) entre {frame.raw_tail.index[-1]} "
+                               f"y {raw.index[0]}: no se actualiza la matriz")
+                self.stats['gaps'] += 1
+                return 0
+
+            if not compatible or raw.index[0] > frame.raw_tail.index[-1]:
+                # Sin historia compatible (o hay un hueco y raw trae su propio contexto): construir todo
+                frame = self._build(definition, raw)
+                self.stats['full_builds'] += 1
+                rows = len(frame.index)
+            else:
+                last_ts = frame.raw_tail.index[-1]
+                new = raw[raw.index >= last_ts]
+                if new.empty or (len(new) == 1 and np.allclose(
+                        new.values, frame.raw_tail.iloc[[-1]].values, equal_nan=True)):
+                    self.stats['unchanged'] += 1
+                    return 0
+
+                context = pd.concat([frame.raw_tail[frame.raw_tail.index < last_ts], new])
+                if len(frame.raw_tail) < definition.warmup:
+                    # Historia corta: toda la historia cruda está en el contexto
+                    frame = self._build(definition, context)
+                    self.stats['full_builds'] += 1
+                    rows = len(frame.index)
+                else:
+                    rows = self._append(frame, definition, context, last_ts)
+                    self.stats['incremental_updates'] += 1
+
+            self._frames[key] = frame
+            self.stats['rows_computed'] += rows
+            if self.persist:
+                self._save(symbol, feature_set, frame)
+            return rows
+
+    def update_from_db(self, symbol: str, feature_set: str = 'lstm_basic') -> int:
+        """Lee de MarketData solo las barras posteriores a la última incorporada"""
+        from src.core.database import SessionLocal
+        from src.models.market_data import MarketData
+
+        definition = FEATURE_SETS[feature_set]
+        last_ts = self.last_timestamp(symbol, feature_set)
+        frame = self._get_frame(symbol, feature_set)
+        if frame is not None and frame.signature != definition.signature:
+            last_ts = None  # Definición nueva: releer todo
+
+        db = SessionLocal()
+        try:
+            query = db.query(MarketData).filter(MarketData.symbol == symbol)
+            if last_ts is not None:
+                query = query.filter(MarketData.timestamp >= last_ts.to_pydatetime())
+            records = query.order_by(MarketData.timestamp).all()
+        finally:
+            db.close()
+
+        if not records:
+            return 0
+        raw = pd.DataFrame(
+            [{'timestamp': r.timestamp, **{col: getattr(r, col) for col in definition.inputs}} for r in records]
+        )
+        return self.update(symbol, raw, feature_set)
+
+    def features_for(self, symbol: str, raw_df: pd.DataFrame, feature_set: str,
+                     n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Actualiza con raw_df y devuelve las features del rango que cubre raw_df
+        (nunca filas posteriores a su última barra: sin lookahead en backtests).
+
+        Si raw_df no trae timestamps, o la matriz guardada no cubre su última
+        barra (ventana vieja o con hueco), se calculan en el momento sin guardar.
+        """
+        definition = FEATURE_SETS[feature_set]
+        raw = self._normalize_raw(raw_df, definition)
+        if raw is None:
+            features = definition.compute(self._lowercase(raw_df)).astype(np.float32)
+            return features if n is None else features.tail(n)
+        if raw.empty:
+            return pd.DataFrame(columns=definition.columns, dtype=np.float32)
+
+        self.update(symbol, raw_df, feature_set)
+        start, end = raw.index[0], raw.index[-1]
+        frame = self._get_frame(symbol, feature_set)
+        if frame is None or end.value not in frame.index:
+            features = definition.compute(raw).astype(np.float32)
+        else:
+            # Filas de la matriz dentro del rango [start, end] (índices ordenados)
+            lo, hi = np.searchsorted(frame.index, [start.value, end.value], side='left')
+            features = pd.DataFrame(frame.values[lo:hi + 1], index=pd.to_datetime(frame.index[lo:hi + 1]),
+                                    columns=frame.columns)
+        return features if n is None else features.tail(n)
+
+    def invalidate(self, symbol: Optional[str] = None, feature_set: Optional[str] = None):
+        """Descarta matrices en memoria y en disco"""
+        for key in list(self._frames):
+            if (symbol is None or key[0] == symbol) and (feature_set is None or key[1] == feature_set):
+                del self._frames[key]
+        if self.persist:
+            for name in ([feature_set] if feature_set else FEATURE_SETS):
+                directory = self.base_dir / name
+                pattern = f"{self._safe_name(symbol)}.npz" if symbol else "*.npz"
+                for path in directory.glob(pattern):
+                    path.unlink()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _lock_for(self, key) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _lowercase(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df.columns = [str(c).lower() for c in df.columns]
+        return df
+
+    def _normalize_raw(self, raw_df: pd.DataFrame, definition: FeatureSet) -> Optional[pd.DataFrame]:
+        """Columnas crudas del feature set con DatetimeIndex ordenado y sin duplicados"""
+        df = self._lowercase(raw_df)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            time_col = next((c for c in ('timestamp', 'date', 'datetime') if c in df.columns), None)
+            if time_col is None:
+                return None
+            df = df.set_index(pd.to_datetime(df[time_col]))
+        if df.index.tz is not None:
+            df.index = df.index.tz_convert(None)
+        if 'volume' in definition.inputs and 'volume' not in df.columns:
+            df['volume'] = 0.0
+        df = df[definition.inputs].astype(np.float64)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        df.index.name = None
+        return df
+
+    def _build(self, definition: FeatureSet, raw: pd.DataFrame) -> _FeatureFrame:
+        features = definition.compute(raw)
+        return _FeatureFrame(
+            signature=definition.signature,
+            columns=list(definition.columns),
+            index=features.index.values.astype('datetime64[ns]').astype(np.int64),
+            values=np.ascontiguousarray(features.values, dtype=np.float32),
+            raw_tail=raw.tail(definition.warmup)
+        )
+
+    def _append(self, frame: _FeatureFrame, definition: FeatureSet,
+                context: pd.DataFrame, since: pd.Timestamp) -> int:
+        """Calcula las filas >= since sobre el contexto y reemplaza/agrega en la matriz"""
+        features = definition.compute(context)
+        features = features[features.index >= since]
+        since_ns = since.value
+        keep = frame.index < since_ns
+
+        frame.index = np.concatenate([
+            frame.index[keep], features.index.values.astype('datetime64[ns]').astype(np.int64)
+        ])
+        frame.values = np.concatenate([frame.values[keep], features.values.astype(np.float32)])
+        frame.raw_tail = context.tail(definition.warmup)
+        return len(features)
+
+    def _get_frame(self, symbol: str, feature_set: str) -> Optional[_FeatureFrame]:
+        key = (symbol, feature_set)
+        frame = self._frames.get(key)
+        if frame is None and self.persist:
+            frame = self._load(symbol, feature_set)
+            if frame is not None:
+                self._frames[key] = frame
+        return frame
+
+    @staticmethod
+    def _safe_name(symbol: str) -> str:
+        return "".join(c if c.isalnum() or c in "._-" else "_" for c in symbol)
+
+    def _path(self, symbol: str, feature_set: str) -> Path:
+        return self.base_dir / feature_set / f"{self._safe_name(symbol)}.npz"
+
+    def _save(self, symbol: str, feature_set: str, frame: _FeatureFrame):
+        """Una columna float32 por feature + contexto crudo, escritura atómica"""
+        path = self._path(symbol, feature_set)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            arrays = {f"col::{name}": frame.values[:, i] for i, name in enumerate(frame.columns)}
+            arrays.update({f"raw::{name}": frame.raw_tail[name].values for name in frame.raw_tail.columns})
+            arrays['index'] = frame.index
+            arrays['raw_index'] = frame.raw_tail.index.values.astype('datetime64[ns]').astype(np.int64)
+            meta = {
+                'signature': frame.signature,
+                'columns': frame.columns,
+                'raw_columns': list(frame.raw_tail.columns),
+                'updated_at': datetime.now().isoformat()
+            }
+            arrays['meta'] = np.array(json.dumps(meta))
+
+            tmp_path = path.with_suffix('.tmp.npz')
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar features de {symbol} ({feature_set}): {e}")
+
+    def _load(self, symbol: str, feature_set: str) -> Optional[_FeatureFrame]:
+        path = self._path(symbol, feature_set)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                columns = meta['columns']
+                values = np.column_stack([data[f"col::{name}"] for name in columns]).astype(np.float32)
+                raw_tail = pd.DataFrame(
+                    {name: data[f"raw::{name}"] for name in meta['raw_columns']},
+                    index=pd.to_datetime(data['raw_index'])
+                )
+                return _FeatureFrame(meta['signature'], columns, data['index'], values, raw_tail)
+        except Exception as e:
+            logger.warning(f"Features corruptas para {symbol} ({feature_set}), se reconstruyen: {e}")
+            return None
+
+
+_default_store: Optional[FeatureStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    """Instancia compartida por todos los servicios del proceso"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = FeatureStore()
+        return _default_store
@@ -1,18 +1,158 @@
 
+import hashlib
 import random
 import numpy as np
 from deap import base, creator, tools, algorithms
 import pandas as pd
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 
+from src.services.fast_backtester import FastBacktesterV2
+
 # Configurar logging
 logger = logging.getLogger('genetic_optimizer')
 
+INVALID_FITNESS = -999999.0
+
+# Datos de precios precargados en cada proceso del pool (símbolo -> DataFrame)
+_WORKER_DATA = {}
+
+
+def _init_worker(price_data):
+    """Inicializador del pool: los datos viajan una sola vez por proceso"""
+    _WORKER_DATA.clear()
+    _WORKER_DATA.update(price_data)
+
+
+def decode_individual(individual):
+    """Genoma -> configuración de la estrategia"""
+    return {
+        'rsi_period': int(individual[0]),
+        'rsi_overbought': int(individual[1]),
+        'rsi_oversold': int(individual[2]),
+        'sma_fast': int(individual[3]),
+        'sma_slow': int(individual[4]),
+        'stop_loss': float(individual[5]),
+        'take_profit': float(individual[6])
+    }
+
+
+def genome_key(config):
+    """Clave de la caché de fitness (floats redondeados para absorber ruido numérico)"""
+    return tuple(round(v, 6) if isinstance(v, float) else v for v in config.values())
+
+
+def data_fingerprint(price_data):
+    """
+    Identifica los datos de una corrida (símbolos, cantidad de barras, última
+    barra y suma de cierres): el fitness cacheado solo vale para esos datos.
+    """
+    digest = hashlib.sha1()
+    for symbol in sorted(price_data):
+        df = price_data[symbol]
+        close = df['close'] if 'close' in df.columns else df.iloc[:, 0]
+        digest.update(f"{symbol}|{len(df)}|{df.index[-1]}|{float(close.sum()):.6f};".encode())
+    return digest.hexdigest()
+
+
+def _backtest_fitness(config, df, symbol):
+    backtester = FastBacktesterV2(initial_capital=10000.0, commission=0.001)
+    result = backtester.run_fast_backtest(
+        symbol=symbol,
+        df=df,
+        buy_threshold=config.get('buy_threshold', 50.0),
+        sell_threshold=config.get('sell_threshold', -50.0),
+        max_position_size=config.get('max_position_size', 0.1),
+        stop_loss=config.get('stop_loss', 0.02),
+        take_profit=config.get('take_profit', 0.05)
+    )
+    # Fitness basado en múltiples métricas
+    return (
+        result.get('total_return', 0) * 100 +  # Return
+        result.get('win_rate', 0) * 50 +        # Win rate
+        result.get('sharpe_ratio', 0) * 10 -   # Sharpe
+        abs(result.get('max_drawdown', 0)) * 100  # Penalizar drawdown
+    )
+
+
+def evaluate_config(config, price_data=None):
+    """
+    Fitness de una configuración: promedio del backtest sobre todos los símbolos
+    con datos (en el pool usa los datos precargados del proceso).
+    """
+    # Validaciones básicas (genes inválidos penalizados)
+    if config['sma_fast'] >= config['sma_slow']:
+        return INVALID_FITNESS  # Penalización fuerte
+    if config['rsi_oversold'] >= config['rsi_overbought']:
+        return INVALID_FITNESS
+
+    price_data = _WORKER_DATA if price_data is None else price_data
+    try:
+        scores = [_backtest_fitness(config, df.copy(), symbol)
+                  for symbol, df in price_data.items() if df is not None and len(df) > 100]
+        if scores:
+            return float(np.mean(scores))
+    except Exception as e:
+        logger.warning(f"Error en backtest rápido, usando simulación: {e}")
+
+    # Fallback a simulación si no hay datos
+    return simulate_fast_backtest(config)
+
+
+def simulate_fast_backtest(config):
+    """
+    Simulación rápida de estrategia para optimización
+    En producción, esto llamaría al Backtester real.
+    Aquí simulamos un score basado en 'calidad' conceptual de parámetros para probar el algoritmo.
+    """
+    # "Goldilocks zone" simulator (para verificar que el GA converge)
+    # RSI 14, OB 70, OS 30, SMA 9/21, SL 0.02, TP 0.05 es el "óptimo teórico" oculto
+
+    score = 1000 # Capital inicial base
+
+    # Distancia al óptimo (mientras más lejos, menos ganancia)
+    diff_rsi = abs(config['rsi_period'] - 14)
+    diff_ob = abs(config['rsi_overbought'] - 70)
+    diff_os = abs(config['rsi_oversold'] - 30)
+    diff_sma = abs(config['sma_fast'] - 9) + abs(config['sma_slow'] - 21)
+
+    # Penalización por riesgo
+    risk_ratio = config['take_profit'] / config['stop_loss']
+    if risk_ratio < 1.0:
+        score -= 500 # Mal R:R
+
+    penalty = (diff_rsi * 10) + (diff_ob * 5) + (diff_os * 5) + (diff_sma * 2)
+
+    # Randomness noise
+    noise = random.randint(-50, 50)
+
+    final_profit = score - penalty + noise
+    return max(0, final_profit)
+
+
+def _evaluate_chunk(configs):
+    return [evaluate_config(config) for config in configs]
+
 class GeneticOptimizer:
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', data_service=None, workers=None):
+        """
+        Args:
+            data_dir: Directorio base de resultados
+            data_service: Servicio con get_historical_data (si no hay, se usa la simulación)
+            workers: Procesos para evaluar la población (default: 1 = serial, sin pool)
+        """
         self.data_dir = Path(data_dir)
+        self.data_service = data_service
+        self.workers = workers or 1
+        # (huella de los datos, genome_key) -> fitness: se reutiliza entre generaciones
+        # y entre corridas solo si los símbolos y sus datos son los mismos
+        self.fitness_cache = {}
+        self._price_data = {}
+        self._data_key = data_fingerprint(self._price_data)
         self.results_dir = self.data_dir / "optimization_results"
         self.results_dir.mkdir(parents=True, exist_ok=True)
         
@@ -71,93 +211,110 @@ class GeneticOptimizer:
         Función de Fitness: Evalúa qué tan buena es una configuración
         Retorna: (Profit,)
         """
-        # Decodificar genes
-        config = {
-            'rsi_period': int(individual[0]),
-            'rsi_overbought': int(individual[1]),
-            'rsi_oversold': int(individual[2]),
-            'sma_fast': int(individual[3]),
-            'sma_slow': int(individual[4]),
-            'stop_loss': float(individual[5]),
-            'take_profit': float(individual[6])
-        }
-        
-        # Validaciones básicas (genes inválidos penalizados)
-        if config['sma_fast'] >= config['sma_slow']:
-            return (-999999.0,) # Penalización fuerte
-            
-        if config['rsi_oversold'] >= config['rsi_overbought']:
-             return (-999999.0,)
-             
-        # Usar Fast Backtester V2 para evaluación real
-        try:
-            from src.services.fast_backtester import FastBacktesterV2
-            
-            # Obtener datos históricos si están disponibles
-            if hasattr(self, 'data_service') and self.data_service:
-                df = self.data_service.get_historical_data('GGAL', period='1y')
-                if df is not None and len(df) > 100:
-                    backtester = FastBacktesterV2(initial_capital=10000.0, commission=0.001)
-                    result = backtester.run_fast_backtest(
-                        symbol='GGAL',
-                        df=df,
-                        buy_threshold=config.get('buy_threshold', 50.0),
-                        sell_threshold=config.get('sell_threshold', -50.0),
-                        max_position_size=config.get('max_position_size', 0.1),
-                        stop_loss=config.get('stop_loss', 0.02),
-                        take_profit=config.get('take_profit', 0.05)
-                    )
-                    # Retornar fitness basado en múltiples métricas
-                    fitness = (
-                        result.get('total_return', 0) * 100 +  # Return
-                        result.get('win_rate', 0) * 50 +        # Win rate
-                        result.get('sharpe_ratio', 0) * 10 -   # Sharpe
-                        abs(result.get('max_drawdown', 0)) * 100  # Penalizar drawdown
-                    )
-                    return (fitness,)
-            
-            # Fallback a simulación si no hay datos
-            profit = self._simulate_fast_backtest(config)
-            return (profit,)
-        except Exception as e:
-            logger.warning(f"Error en backtest rápido, usando simulación: {e}")
-            profit = self._simulate_fast_backtest(config)
-            return (profit,)
+        config = decode_individual(individual)
+        key = (self._data_key, genome_key(config))
+        if key not in self.fitness_cache:
+            self.fitness_cache[key] = evaluate_config(config, self._price_data)
+        return (self.fitness_cache[key],)
 
     def _simulate_fast_backtest(self, config):
+        return simulate_fast_backtest(config)
+
+    def _load_price_data(self, symbols):
+        """Historial de cada símbolo (una sola descarga por optimización)"""
+        price_data = {}
+        if not self.data_service:
+            return price_data
+        for symbol in symbols:
+            try:
+                df = self.data_service.get_historical_data(symbol, period='1y')
+                if df is not None and len(df) > 100:
+                    price_data[symbol] = df
+            except Exception as e:
+                logger.warning(f"No se pudieron cargar datos de {symbol}: {e}")
+        return price_data
+
+    def _evaluate_population(self, individuals, executor):
         """
-        Simulación rápida de estrategia para optimización
-        En producción, esto llamaría al Backtester real.
-        Aquí simulamos un score basado en 'calidad' conceptual de parámetros para probar el algoritmo.
+        Evalúa individuos con caché por genoma: solo los genomas nuevos (y únicos)
+        se simulan, repartidos en chunks entre los procesos del pool.
+
+        Returns:
+            (evaluados, aciertos de caché)
         """
-        # "Goldilocks zone" simulator (para verificar que el GA converge)
-        # RSI 14, OB 70, OS 30, SMA 9/21, SL 0.02, TP 0.05 es el "óptimo teórico" oculto
-        
-        score = 1000 # Capital inicial base
-        
-        # Distancia al óptimo (mientras más lejos, menos ganancia)
-        diff_rsi = abs(config['rsi_period'] - 14)
-        diff_ob = abs(config['rsi_overbought'] - 70)
-        diff_os = abs(config['rsi_oversold'] - 30)
-        diff_sma = abs(config['sma_fast'] - 9) + abs(config['sma_slow'] - 21)
-        
-        # Penalización por riesgo
-        risk_ratio = config['take_profit'] / config['stop_loss'] 
-        if risk_ratio < 1.0: 
-            score -= 500 # Mal R:R
-            
-        penalty = (diff_rsi * 10) + (diff_ob * 5) + (diff_os * 5) + (diff_sma * 2)
-        
-        # Randomness noise
-        noise = random.randint(-50, 50)
-        
-        final_profit = score - penalty + noise
-        return max(0, final_profit)
+        configs = [decode_individual(ind) for ind in individuals]
+        keys = [(self._data_key, genome_key(config)) for config in configs]
 
-    def optimize(self, symbol, generations=5, population_size=10):
-        """Ejecuta la optimización genética"""
+        pending = {}
+        for key, config in zip(keys, configs):
+            if key not in self.fitness_cache and key not in pending:
+                pending[key] = config
+
+        if pending:
+            pending_keys = list(pending)
+            if executor is None:
+                results = [evaluate_config(pending[k], self._price_data) for k in pending_keys]
+            else:
+                n_chunks = min(len(pending_keys), self.workers * 4)
+                chunks = [pending_keys[i::n_chunks] for i in range(n_chunks)]
+                results_by_key = {}
+                for chunk, chunk_results in zip(chunks, executor.map(_evaluate_chunk, [[pending[k] for k in c] for c in chunks])):
+                    results_by_key.update(zip(chunk, chunk_results))
+                results = [results_by_key[k] for k in pending_keys]
+            self.fitness_cache.update(zip(pending_keys, results))
+
+        for ind, key in zip(individuals, keys):
+            ind.fitness.values = (self.fitness_cache[key],)
+        return len(pending), len(individuals) - len(pending)
+
+    def _evolve(self, population, executor, cxpb, mutpb, ngen, stats, halloffame, max_seconds=None, verbose=True):
+        """
+        Mismo esquema que algorithms.eaSimple, con evaluación en paralelo y
+        memoizada y con tiempos por generación en el logbook.
+        """
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals', 'cache_hits', 'seconds'] + (stats.fields if stats else [])
+        start = time.perf_counter()
+
+        def record(gen, individuals, gen_start):
+            nevals, hits = self._evaluate_population(individuals, executor)
+            if halloffame is not None:
+                halloffame.update(population)
+            record_stats = stats.compile(population) if stats else {}
+            logbook.record(gen=gen, nevals=nevals, cache_hits=hits,
+                           seconds=round(time.perf_counter() - gen_start, 4), **record_stats)
+            if verbose:
+                print(logbook.stream)
+
+        invalid_ind = [ind for ind in population if not ind.fitness.valid]
+        record(0, invalid_ind, time.perf_counter())
+
+        for gen in range(1, ngen + 1):
+            if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                logger.info(f"Presupuesto de tiempo agotado en la generación {gen - 1}")
+                break
+            gen_start = time.perf_counter()
+            offspring = self.toolbox.select(population, len(population))
+            offspring = algorithms.varAnd(offspring, self.toolbox, cxpb, mutpb)
+            invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            population[:] = offspring
+            record(gen, invalid_ind, gen_start)
+
+        return population, logbook
+
+    def optimize(self, symbol, generations=5, population_size=10, symbols=None, max_seconds=None):
+        """
+        Ejecuta la optimización genética
+
+        Args:
+            symbol: Símbolo principal (nombre de los resultados)
+            symbols: Símbolos para el fitness multi-símbolo (default: [symbol])
+            max_seconds: Presupuesto de tiempo; corta la evolución al agotarse
+        """
         print(f"🧬 Iniciando evolución para {symbol}...")
         
+        self._price_data = self._load_price_data(symbols or [symbol])
+        self._data_key = data_fingerprint(self._price_data)
         population = self.toolbox.population(n=population_size)
         hof = tools.HallOfFame(1) # El mejor de todos
         
@@ -166,22 +323,22 @@ class GeneticOptimizer:
         stats.register("min", np.min)
         stats.register("max", np.max)
         
-        # Algoritmo evolucionario simple
-        pop, logbook = algorithms.eaSimple(population, self.toolbox, 
-                                          cxpb=0.5, mutpb=0.2, 
-                                          ngen=generations, stats=stats, 
-                                          halloffame=hof, verbose=True)
+        # Algoritmo evolucionario simple (evaluación en paralelo con datos precargados)
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                           initargs=(self._price_data,))
+        try:
+            pop, logbook = self._evolve(population, executor,
+                                        cxpb=0.5, mutpb=0.2,
+                                        ngen=generations, stats=stats,
+                                        halloffame=hof, max_seconds=max_seconds, verbose=True)
+        finally:
+            if executor is not None:
+                executor.shutdown()
                                           
         best_ind = hof[0]
-        best_config = {
-            'rsi_period': int(best_ind[0]),
-            'rsi_overbought': int(best_ind[1]),
-            'rsi_oversold': int(best_ind[2]),
-            'sma_fast': int(best_ind[3]),
-            'sma_slow': int(best_ind[4]),
-            'stop_loss': float(best_ind[5]),
-            'take_profit': float(best_ind[6])
-        }
+        best_config = decode_individual(best_ind)
         
         print(f"🏆 Mejor configuración encontrada: {best_config}")
         print(f"💰 Profit estimado: ${best_ind.fitness.values[0]:.2f}")
@@ -200,7 +357,10 @@ class GeneticOptimizer:
             history.append({
                 'gen': gen['gen'],
                 'avg': gen['avg'],
-                'max': gen['max']
+                'max': gen['max'],
+                'nevals': gen['nevals'],
+                'cache_hits': gen['cache_hits'],
+                'seconds': gen['seconds']
             })
             
         data = {
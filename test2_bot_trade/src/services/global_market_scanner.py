@@ -5,14 +5,23 @@ Sistema que escanea el mercado completo y encuentra oportunidades de trading aut
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import logging
 import json
 from collections import defaultdict
 
 logger = logging.getLogger('global_market_scanner')
 
+# Marcador de "no hay resultado en caché" (None es un resultado válido: sin oportunidad)
+_CACHE_MISS = object()
+
+# Barras mínimas de la etapa 1: momentum de 20 barras + sus 20 retornos
+PREFILTER_MIN_BARS = 21
+DEEP_MIN_BARS = 30
+
 class GlobalMarketScanner:
     """
     Escanea el mercado completo y encuentra oportunidades de trading
@@ -40,11 +49,19 @@ class GlobalMarketScanner:
         self.scan_cache = {}
         self.cache_ttl = timedelta(minutes=5)  # Cache por 5 minutos
         
+        # Caché incremental por símbolo: solo se re-evalúan símbolos con barras nuevas
+        self.symbol_cache = {}
+        self._symbol_cache_lock = threading.Lock()
+        
         # Configuración
         self.min_score_threshold = 30.0  # Score mínimo para considerar oportunidad
         self.max_opportunities = 50  # Máximo de oportunidades a retornar
         self.min_volume = 1000000  # Volumen mínimo diario
         self.min_price = 1.0  # Precio mínimo (evitar penny stocks)
+        self.deep_scan_top_k = 60  # Símbolos que pasan al análisis profundo
+        self.prefilter_period = '2mo'  # Ventana corta de la etapa 1 (alcanza para el panel de 30 barras)
+        self.deep_period = '3mo'  # Histórico completo, solo para los candidatos
+        self.max_workers = 8  # Concurrencia máxima (descarga y análisis)
         
         # Estadísticas
         self.scan_stats = {
@@ -56,91 +73,331 @@ class GlobalMarketScanner:
     def scan_market(self, 
                    categories: List[str] = None,
                    max_symbols: int = 500,
-                   use_cache: bool = True) -> List[Dict]:
+                   use_cache: bool = True,
+                   top_k: Optional[int] = None,
+                   max_workers: Optional[int] = None,
+                   progress_callback: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         Escanea el mercado completo y encuentra oportunidades
         
+        El escaneo se hace en dos etapas:
+        1. Prefiltro vectorizado sobre un panel (símbolos × tiempo) con todos los
+           símbolos: liquidez, volatilidad y ranking de momentum.
+        2. Análisis profundo solo sobre los top-K del prefiltro, en un pool de
+           workers con concurrencia acotada.
+        
         Args:
             categories: Categorías a escanear (None = todas)
             max_symbols: Máximo de símbolos a analizar
-            use_cache: Usar caché si está disponible
+            use_cache: Usar caché si está disponible (resultado global y por símbolo)
+            top_k: Cantidad de símbolos que pasan a la etapa 2 (None = self.deep_scan_top_k)
+            max_workers: Workers concurrentes (None = self.max_workers)
+            progress_callback: Función que recibe cada evento de progreso
             
         Returns:
             Lista de oportunidades ordenadas por score
         """
+        opportunities = []
+        for event in self.iter_scan(categories=categories,
+                                    max_symbols=max_symbols,
+                                    use_cache=use_cache,
+                                    top_k=top_k,
+                                    max_workers=max_workers):
+            if progress_callback:
+                try:
+                    progress_callback(event)
+                except Exception as e:
+                    logger.debug(f"Error en progress_callback: {e}")
+            if event['stage'] == 'done':
+                opportunities = event['opportunities']
+        return opportunities
+    
+    def iter_scan(self,
+                  categories: List[str] = None,
+                  max_symbols: int = 500,
+                  use_cache: bool = True,
+                  top_k: Optional[int] = None,
+                  max_workers: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Ejecuta el escaneo en dos etapas emitiendo eventos de progreso
+        
+        Cada evento es un dict con 'stage' ('prefilter', 'deep', 'done'),
+        'done'/'total' y, en la etapa 'deep', la oportunidad parcial encontrada
+        (o None). El último evento ('done') contiene la lista final ordenada.
+        """
         try:
             # Verificar caché
             if use_cache and self._is_cache_valid():
                 logger.info("Usando resultados de caché")
-                return self.scan_cache.get('opportunities', [])
+                cached = self.scan_cache.get('opportunities', [])
+                yield {'stage': 'done', 'done': len(cached), 'total': len(cached),
+                       'opportunities': cached, 'from_cache': True}
+                return
             
             logger.info(f"🔍 Iniciando escaneo global del mercado...")
             start_time = datetime.now()
+            top_k = top_k or self.deep_scan_top_k
+            max_workers = max(1, max_workers or self.max_workers)
             
-            # 1. Obtener todos los instrumentos
-            from src.services.iol_universe_loader import IOLUniverseLoader
-            universe_loader = IOLUniverseLoader(self.iol_client)
-            
-            if categories is None:
-                categories = ['acciones', 'cedears']  # Por defecto, acciones y CEDEARs
+            all_symbols = self._load_universe(categories, max_symbols)
+            logger.info(f"📊 Analizando {len(all_symbols)} símbolos...")
             
-            all_instruments = universe_loader.get_all_instruments(categories)
+            # 1. Etapa 1: ventana corta en paralelo + prefiltro vectorizado
+            histories = self._fetch_histories(all_symbols, max_workers,
+                                              period=self.prefilter_period, min_bars=PREFILTER_MIN_BARS)
+            yield {'stage': 'prefilter', 'done': len(histories), 'total': len(all_symbols)}
             
-            # 2. Combinar todos los símbolos
-            all_symbols = []
-            for category, symbols in all_instruments.items():
-                all_symbols.extend(symbols[:max_symbols // len(all_instruments)])
+            panel = self._build_panel(histories)
+            candidates = self._prefilter_panel(panel, top_k)
+            prefilter_elapsed = (datetime.now() - start_time).total_seconds()
+            logger.info(f"   Prefiltro: {len(candidates)}/{len(histories)} candidatos "
+                        f"en {prefilter_elapsed:.1f}s")
             
-            all_symbols = all_symbols[:max_symbols]
-            logger.info(f"📊 Analizando {len(all_symbols)} símbolos...")
-            
-            # 3. Escanear cada símbolo
+            # 2. Etapa 2: histórico completo y análisis profundo solo sobre los candidatos
+            #    (la última barra de la ventana corta alcanza para validar el caché)
             opportunities = []
-            scanned = 0
-            
-            for symbol in all_symbols:
-                try:
-                    opportunity = self._scan_symbol(symbol)
+            rescored = 0
+            done = 0
+            total = len(candidates)
+            with ThreadPoolExecutor(max_workers=max_workers,
+                                    thread_name_prefix='market_scan') as executor:
+                futures = {}
+                for symbol in candidates:
+                    cached = (self._get_cached_symbol_result(symbol, histories[symbol])
+                              if use_cache else _CACHE_MISS)
+                    if cached is not _CACHE_MISS:
+                        done += 1
+                        if cached and cached['score'] >= self.min_score_threshold:
+                            opportunities.append(cached)
+                        yield {'stage': 'deep', 'done': done, 'total': total,
+                               'symbol': symbol, 'opportunity': cached, 'cached': True}
+                        continue
+                    futures[executor.submit(self._deep_scan, symbol)] = symbol
+                
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    done += 1
+                    rescored += 1
+                    try:
+                        opportunity = future.result()
+                    except Exception as e:
+                        logger.debug(f"Error escaneando {symbol}: {e}")
+                        opportunity = None
+                    self._store_symbol_result(symbol, histories[symbol], opportunity)
                     if opportunity and opportunity['score'] >= self.min_score_threshold:
                         opportunities.append(opportunity)
-                    scanned += 1
                     
                     # Log progreso cada 50 símbolos
-                    if scanned % 50 == 0:
-                        logger.info(f"   Procesados: {scanned}/{len(all_symbols)} ({len(opportunities)} oportunidades)")
-                
-                except Exception as e:
-                    logger.debug(f"Error escaneando {symbol}: {e}")
-                    continue
+                    if done % 50 == 0:
+                        logger.info(f"   Procesados: {done}/{total} ({len(opportunities)} oportunidades)")
+                    yield {'stage': 'deep', 'done': done, 'total': total,
+                           'symbol': symbol, 'opportunity': opportunity, 'cached': False}
             
-            # 4. Ordenar por score (mayor a menor)
+            # 3. Ordenar por score (mayor a menor) y limitar resultados
             opportunities.sort(key=lambda x: x['score'], reverse=True)
-            
-            # 5. Limitar resultados
             opportunities = opportunities[:self.max_opportunities]
             
-            # 6. Actualizar estadísticas
+            # 4. Actualizar estadísticas
             elapsed = (datetime.now() - start_time).total_seconds()
             self.scan_stats['total_scans'] += 1
             self.scan_stats['opportunities_found'] += len(opportunities)
             self.scan_stats['last_scan_time'] = datetime.now()
-            
-            # 7. Guardar en caché
+            self.scan_stats['total_symbols_available'] = len(all_symbols)
+            self.scan_stats['symbols_scanned'] = len(histories)
+            self.scan_stats['symbols_deep_scanned'] = total
+            self.scan_stats['symbols_rescored'] = rescored
+            self.scan_stats['prefilter_time_s'] = prefilter_elapsed
+            self.scan_stats['last_scan_duration_s'] = elapsed
+            
+            # 5. Guardar en caché
             self.scan_cache = {
                 'opportunities': opportunities,
                 'timestamp': datetime.now(),
-                'symbols_scanned': scanned
+                'symbols_scanned': len(histories)
             }
             
-            logger.info(f"✅ Escaneo completado: {len(opportunities)} oportunidades encontradas en {elapsed:.1f}s")
+            logger.info(f"✅ Escaneo completado: {len(opportunities)} oportunidades encontradas en {elapsed:.1f}s "
+                        f"({rescored} re-evaluados, {total - rescored} desde caché)")
             
-            return opportunities
+            yield {'stage': 'done', 'done': total, 'total': total,
+                   'opportunities': opportunities, 'from_cache': False}
             
         except Exception as e:
             logger.error(f"Error en escaneo global: {e}")
             import traceback
             traceback.print_exc()
+            yield {'stage': 'done', 'done': 0, 'total': 0, 'opportunities': [], 'error': str(e)}
+    
+    def _load_universe(self, categories: Optional[List[str]], max_symbols: int) -> List[str]:
+        """Obtiene la lista de símbolos a escanear desde el universo IOL"""
+        from src.services.iol_universe_loader import IOLUniverseLoader
+        universe_loader = IOLUniverseLoader(self.iol_client)
+        
+        if categories is None:
+            categories = ['acciones', 'cedears']  # Por defecto, acciones y CEDEARs
+        
+        all_instruments = universe_loader.get_all_instruments(categories)
+        if not all_instruments:
             return []
+        
+        # Combinar todos los símbolos (sin duplicados, preservando orden)
+        all_symbols = []
+        for category, symbols in all_instruments.items():
+            all_symbols.extend(symbols[:max_symbols // len(all_instruments)])
+        
+        return list(dict.fromkeys(all_symbols))[:max_symbols]
+    
+    def _fetch_history(self, symbol: str, period: str, min_bars: int) -> Optional[pd.DataFrame]:
+        """Histórico normalizado (columnas capitalizadas) o None si no alcanza"""
+        df = self.data_service.get_historical_data(symbol, period=period)
+        if df is None or len(df) < min_bars:
+            return None
+        df = df.copy()
+        df.columns = [c.capitalize() for c in df.columns]
+        if 'Close' not in df.columns:
+            return None
+        return df
+    
+    def _fetch_histories(self, symbols: List[str], max_workers: int,
+                         period: str = '2mo', min_bars: int = PREFILTER_MIN_BARS) -> Dict[str, pd.DataFrame]:
+        """
+        Descarga los históricos de todos los símbolos en paralelo (I/O bound)
+        
+        Returns:
+            Dict símbolo -> DataFrame normalizado (columnas capitalizadas)
+        """
+        histories = {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='market_fetch') as executor:
+            futures = {executor.submit(self._fetch_history, symbol, period, min_bars): symbol
+                       for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.debug(f"Error obteniendo histórico de {symbol}: {e}")
+                    continue
+                if df is not None:
+                    histories[symbol] = df
+        
+        # Orden del universo (no el de llegada): el ranking desempata igual en cada escaneo
+        return {symbol: histories[symbol] for symbol in symbols if symbol in histories}
+    
+    def _build_panel(self, histories: Dict[str, pd.DataFrame], window: int = 30) -> Dict:
+        """
+        Construye un panel de sección cruzada (símbolos × tiempo) con las últimas
+        `window` barras de cada símbolo, alineadas por posición
+        
+        Returns:
+            Dict con 'symbols', 'close' y 'volume' (arrays 2D float64)
+        """
+        symbols = list(histories.keys())
+        close = np.full((len(symbols), window), np.nan)
+        volume = np.full((len(symbols), window), np.nan)
+        
+        for i, symbol in enumerate(symbols):
+            df = histories[symbol]
+            closes = df['Close'].to_numpy(dtype=float)[-window:]
+            close[i, window - len(closes):] = closes
+            if 'Volume' in df.columns:
+                volumes = df['Volume'].to_numpy(dtype=float)[-window:]
+                volume[i, window - len(volumes):] = volumes
+        
+        return {'symbols': symbols, 'close': close, 'volume': volume}
+    
+    def _prefilter_panel(self, panel: Dict, top_k: int) -> List[str]:
+        """
+        Prefiltro vectorizado: liquidez, volatilidad y ranking de momentum
+        
+        Aplica los mismos filtros básicos que `_passes_basic_filters` sobre todo
+        el panel de una vez y rankea a los sobrevivientes combinando momentum
+        (5 y 20 barras), aumento de volumen y volatilidad.
+        
+        Returns:
+            Lista de hasta `top_k` símbolos ordenados por ranking
+        """
+        symbols = panel['symbols']
+        if not symbols:
+            return []
+        
+        close = panel['close']
+        volume = panel['volume']
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            last_price = close[:, -1]
+            avg_volume = np.nanmean(volume[:, -20:], axis=1)
+            recent_volume = np.nanmean(volume[:, -5:], axis=1)
+            returns = np.diff(close[:, -21:], axis=1) / close[:, -21:-1]
+            volatility = np.nanstd(returns, axis=1)
+            momentum_short = close[:, -1] / close[:, -5] - 1
+            momentum_long = close[:, -1] / close[:, -20] - 1
+            volume_ratio = recent_volume / avg_volume
+        
+        # Filtros de liquidez (los símbolos sin volumen no se descartan por volumen)
+        has_volume = ~np.isnan(avg_volume)
+        passes = (last_price >= self.min_price) & np.isfinite(momentum_long)
+        passes &= ~has_volume | (avg_volume >= self.min_volume)
+        passes &= np.isfinite(volatility) & (volatility > 0)
+        
+        # Ranking: percentil de momentum + percentil de volumen relativo + penalización
+        # leve por volatilidad extrema (activos que se mueven pero no caóticos)
+        def pct_rank(values):
+            values = np.where(np.isfinite(values), values, -np.inf)
+            order = values.argsort().argsort()
+            return order / max(len(values) - 1, 1)
+        
+        rank_score = (
+            pct_rank(np.abs(momentum_short)) +
+            pct_rank(np.abs(momentum_long)) +
+            0.5 * pct_rank(np.nan_to_num(volume_ratio, nan=1.0)) -
+            0.25 * pct_rank(volatility)
+        )
+        rank_score = np.where(passes, rank_score, -np.inf)
+        
+        order = np.argsort(-rank_score, kind='stable')
+        selected = [symbols[i] for i in order[:top_k] if np.isfinite(rank_score[i])]
+        return selected
+    
+    def _deep_scan(self, symbol: str) -> Optional[Dict]:
+        """Etapa 2: descarga el histórico completo de un candidato y lo analiza"""
+        df = self._fetch_history(symbol, self.deep_period, DEEP_MIN_BARS)
+        if df is None:
+            return None
+        return self._analyze_history(symbol, df)
+    
+    def _analyze_history(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
+        """Análisis profundo (etapa 2) sobre un histórico ya descargado"""
+        if not self._passes_basic_filters(df, symbol):
+            return None
+        return self._build_opportunity(symbol, df)
+    
+    @staticmethod
+    def _last_bar_key(df: pd.DataFrame):
+        """
+        Identifica la última barra de un histórico (índice + cierre); no depende
+        del largo, así la ventana corta de la etapa 1 valida el resultado de la 2
+        """
+        return (str(df.index[-1]), float(df['Close'].iloc[-1]))
+    
+    def _get_cached_symbol_result(self, symbol: str, df: pd.DataFrame):
+        """
+        Caché incremental por símbolo: si no llegaron barras nuevas desde el
+        último escaneo se reutiliza el resultado anterior sin re-evaluar
+        """
+        with self._symbol_cache_lock:
+            entry = self.symbol_cache.get(symbol)
+        if entry and entry['last_bar'] == self._last_bar_key(df):
+            return entry['opportunity']
+        return _CACHE_MISS
+    
+    def _store_symbol_result(self, symbol: str, df: pd.DataFrame, opportunity: Optional[Dict]):
+        """Guarda el resultado de un símbolo en el caché incremental"""
+        with self._symbol_cache_lock:
+            self.symbol_cache[symbol] = {
+                'last_bar': self._last_bar_key(df),
+                'opportunity': opportunity
+            }
     
     def _scan_symbol(self, symbol: str) -> Optional[Dict]:
         """
@@ -159,44 +416,49 @@ class GlobalMarketScanner:
             if not self._passes_basic_filters(df, symbol):
                 return None
             
-            # 3. Análisis rápido (usar estrategias del bot si está disponible)
-            analysis_result = self._quick_analysis(symbol, df)
-            
-            if not analysis_result:
-                return None
-            
-            # 4. Calcular score total
-            total_score = analysis_result.get('score', 0)
-            
-            # 5. Determinar señal
-            signal = 'BUY' if total_score > 0 else 'SELL' if total_score < -self.min_score_threshold else None
-            
-            if signal is None:
-                return None
-            
-            # 6. Calcular confianza
-            confidence = self._calculate_confidence(analysis_result, df)
-            
-            # 7. Información adicional
-            current_price = df['Close'].iloc[-1] if 'Close' in df.columns else df['close'].iloc[-1]
-            volume = df['Volume'].iloc[-1] if 'Volume' in df.columns else df['volume'].iloc[-1] if 'volume' in df.columns else 0
-            
-            return {
-                'symbol': symbol,
-                'signal': signal,
-                'score': abs(total_score),
-                'confidence': confidence,
-                'current_price': float(current_price),
-                'volume': float(volume),
-                'analysis': analysis_result,
-                'timestamp': datetime.now().isoformat(),
-                'factors': analysis_result.get('factors', [])
-            }
+            # 3. Análisis y construcción de la oportunidad
+            return self._build_opportunity(symbol, df)
             
         except Exception as e:
             logger.debug(f"Error escaneando {symbol}: {e}")
             return None
     
+    def _build_opportunity(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
+        """Ejecuta el análisis rápido y arma el dict de oportunidad"""
+        # Análisis rápido (usar estrategias del bot si está disponible)
+        analysis_result = self._quick_analysis(symbol, df)
+        
+        if not analysis_result:
+            return None
+        
+        # Calcular score total
+        total_score = analysis_result.get('score', 0)
+        
+        # Determinar señal
+        signal = 'BUY' if total_score > 0 else 'SELL' if total_score < -self.min_score_threshold else None
+        
+        if signal is None:
+            return None
+        
+        # Calcular confianza
+        confidence = self._calculate_confidence(analysis_result, df)
+        
+        # Información adicional
+        current_price = df['Close'].iloc[-1] if 'Close' in df.columns else df['close'].iloc[-1]
+        volume = df['Volume'].iloc[-1] if 'Volume' in df.columns else df['volume'].iloc[-1] if 'volume' in df.columns else 0
+        
+        return {
+            'symbol': symbol,
+            'signal': signal,
+            'score': abs(total_score),
+            'confidence': confidence,
+            'current_price': float(current_price),
+            'volume': float(volume),
+            'analysis': analysis_result,
+            'timestamp': datetime.now().isoformat(),
+            'factors': analysis_result.get('factors', [])
+        }
+    
     def _passes_basic_filters(self, df: pd.DataFrame, symbol: str) -> bool:
         """Filtros básicos para descartar símbolos"""
         try:
@@ -254,8 +516,9 @@ class GlobalMarketScanner:
             score = 0
             factors = []
             
-            # Asegurar nombres de columnas
-            df.columns = [c.capitalize() for c in df.columns]
+            # Asegurar nombres de columnas (sin mutar el DataFrame del caller,
+            # que puede estar compartido con el caché del escaneo)
+            df = df.rename(columns=lambda c: c.capitalize())
             
             prices = df['Close'].values
             volumes = df['Volume'].values if 'Volume' in df.columns else np.ones(len(df))
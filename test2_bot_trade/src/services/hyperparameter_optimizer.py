@@ -1,22 +1,79 @@
 """
 Optimización Automática de Hiperparámetros
-Grid Search, Random Search y Bayesian Optimization para modelos LSTM
+Grid Search, Random Search, Successive Halving y Hyperband para modelos LSTM
 """
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import json
+import math
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from src.core.logger import get_logger
-from src.core.database import SessionLocal
-from src.models.market_data import MarketData
 from src.models.price_predictor import LSTMPricePredictor
 from src.services.continuous_learning import ContinuousLearning
+from src.services.training_farm import _init_worker
 
 logger = get_logger("hyperparameter_optimizer")
 
+# Estado de cada proceso de trials: features del símbolo y ventanas ya armadas por sequence_length
+_TRIAL_DATA = {'features': None, 'windows': {}}
+
+
+def _init_trial_worker(threads: int, slot_counter, feature_data: np.ndarray):
+    """Fija threads de TensorFlow y deja las features cargadas una vez por proceso"""
+    _init_worker(threads, slot_counter)
+    _TRIAL_DATA['features'] = feature_data
+    _TRIAL_DATA['windows'] = {}
+
+
+def _trial_windows(sequence_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Ventanas (X, y) cacheadas: los trials con el mismo sequence_length las comparten"""
+    if sequence_length not in _TRIAL_DATA['windows']:
+        predictor = LSTMPricePredictor(sequence_length=sequence_length, prediction_days=1)
+        x, y = predictor.prepare_data(_TRIAL_DATA['features'])
+        _TRIAL_DATA['windows'][sequence_length] = (
+            np.ascontiguousarray(x, dtype=np.float32), np.ascontiguousarray(y, dtype=np.float32)
+        )
+    return _TRIAL_DATA['windows'][sequence_length]
+
+
+def _run_trial(trial: Dict) -> Dict:
+    """
+    Entrena una configuración hasta trial['epochs'], continuando desde los pesos
+    guardados en el rung anterior (start_epoch > 0).
+    """
+    params = trial['params']
+    try:
+        x, y = _trial_windows(int(params.get('sequence_length', 60)))
+        predictor = LSTMPricePredictor(sequence_length=int(params.get('sequence_length', 60)), prediction_days=1)
+        model = predictor.build_model(input_shape=(x.shape[1], x.shape[2]))
+        if trial['start_epoch'] > 0:
+            model.load_weights(trial['weights_path'])
+
+        history = model.fit(
+            x, y,
+            epochs=trial['epochs'],
+            initial_epoch=trial['start_epoch'],
+            batch_size=int(params.get('batch_size', 32)),
+            validation_split=trial['validation_split'],
+            verbose=0
+        )
+        model.save_weights(trial['weights_path'])
+        return {
+            'id': trial['id'],
+            'val_loss': float(min(history.history['val_loss'])),
+            'train_loss': float(min(history.history['loss'])),
+        }
+    except Exception as e:
+        return {'id': trial['id'], 'error': str(e)}
+
 
 class HyperparameterOptimizer:
     """Optimizador automático de hiperparámetros"""
@@ -25,6 +82,16 @@ class HyperparameterOptimizer:
         self.continuous_learning = ContinuousLearning()
         self.optimization_history = []
     
+    def _load_feature_data(self, symbol: str) -> np.ndarray:
+        """Matriz de features del símbolo desde el feature store compartido"""
+        feature_store = self.continuous_learning.feature_store
+        feature_store.update_from_db(symbol, 'lstm_basic')
+        feature_data = feature_store.get_matrix(symbol, 'lstm_basic')
+        
+        if feature_data is None or len(feature_data) < 200:
+            raise ValueError("Datos insuficientes para optimización (mínimo 200 registros)")
+        return feature_data
+    
     def grid_search(self, symbol: str, param_grid: Dict, 
                    validation_split: float = 0.2) -> Dict:
         """
@@ -38,22 +105,8 @@ class HyperparameterOptimizer:
         """
         logger.info(f"Iniciando Grid Search para {symbol}")
         
-        # Cargar datos
-        db = SessionLocal()
-        try:
-            records = db.query(MarketData).filter(
-                MarketData.symbol == symbol
-            ).order_by(MarketData.timestamp).all()
-            
-            if len(records) < 200:
-                raise ValueError("Datos insuficientes para optimización (mínimo 200 registros)")
-            
-            df = pd.DataFrame([{'close': r.close, 'volume': r.volume} for r in records])
-            df_features = self.continuous_learning.prepare_features(df)
-            feature_data = df_features.values
-            
-        finally:
-            db.close()
+        # Cargar features (calculadas una sola vez en el feature store)
+        feature_data = self._load_feature_data(symbol)
         
         # Generar todas las combinaciones
         from itertools import product
@@ -147,22 +200,8 @@ class HyperparameterOptimizer:
         """
         logger.info(f"Iniciando Random Search para {symbol} ({n_iter} iteraciones)")
         
-        # Cargar datos
-        db = SessionLocal()
-        try:
-            records = db.query(MarketData).filter(
-                MarketData.symbol == symbol
-            ).order_by(MarketData.timestamp).all()
-            
-            if len(records) < 200:
-                raise ValueError("Datos insuficientes para optimización")
-            
-            df = pd.DataFrame([{'close': r.close, 'volume': r.volume} for r in records])
-            df_features = self.continuous_learning.prepare_features(df)
-            feature_data = df_features.values
-            
-        finally:
-            db.close()
+        # Cargar features (calculadas una sola vez en el feature store)
+        feature_data = self._load_feature_data(symbol)
         
         best_score = float('inf')
         best_params = None
@@ -230,6 +269,185 @@ class HyperparameterOptimizer:
         
         return optimization_result
     
+    # ------------------------------------------------------------------
+    # Successive Halving / Hyperband
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _sample_params(param_distributions: Dict, n: int) -> List[Dict]:
+        configs = []
+        for _ in range(n):
+            params = {}
+            for param_name, param_values in param_distributions.items():
+                value = np.random.choice(param_values)
+                params[param_name] = value.item() if hasattr(value, 'item') else value
+            configs.append(params)
+        return configs
+
+    def _run_trials(self, executor, trials: List[Dict]) -> List[Dict]:
+        return list(executor.map(_run_trial, trials))
+
+    def _run_bracket(self, executor, configs: List[Dict], min_epochs: int, max_epochs: int,
+                     eta: int, validation_split: float, run_dir: Path, first_id: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Un bracket de successive halving: entrena todas las configuraciones
+        min_epochs, promueve la mejor 1/eta y multiplica las épocas por eta
+        hasta llegar a max_epochs. La configuración que sobrevive al bracket
+        siempre termina entrenada max_epochs.
+
+        Returns:
+            (resultados del último rung de cada configuración, épocas entrenadas en total)
+        """
+        trials = [
+            {'id': f"t{first_id + i}", 'params': params, 'start_epoch': 0,
+             'weights_path': str(run_dir / f"t{first_id + i}.weights.h5"),
+             'validation_split': validation_split}
+            for i, params in enumerate(configs)
+        ]
+        final_results = {}
+        total_epochs = 0
+        epochs = min(min_epochs, max_epochs)
+
+        while trials:
+            rung = [dict(trial, epochs=epochs) for trial in trials]
+            outcomes = {r['id']: r for r in self._run_trials(executor, rung)}
+            total_epochs += sum(epochs - t['start_epoch'] for t in rung)
+
+            scored = []
+            for trial in rung:
+                outcome = outcomes.get(trial['id'], {})
+                if 'error' in outcome or 'val_loss' not in outcome:
+                    logger.error(f"Error con parámetros {trial['params']}: {outcome.get('error')}")
+                    continue
+                result = {
+                    'params': trial['params'],
+                    'val_loss': outcome['val_loss'],
+                    'train_loss': outcome['train_loss'],
+                    'epochs_trained': epochs,
+                }
+                final_results[trial['id']] = result
+                scored.append((outcome['val_loss'], trial))
+
+            logger.info(f"  Rung {epochs} épocas: {len(scored)} configuraciones, "
+                        f"mejor val_loss {min((v for v, _ in scored), default=float('nan')):.6f}")
+
+            if epochs >= max_epochs or not scored:
+                break
+            scored.sort(key=lambda item: item[0])
+            keep = max(1, len(scored) // eta)
+            trials = [dict(trial, start_epoch=epochs) for _, trial in scored[:keep]]
+            # Con una sola sobreviviente no queda nada que comparar: completa max_epochs
+            # de una vez (así todo finalista compite con el presupuesto completo)
+            epochs = max_epochs if keep == 1 else min(max_epochs, epochs * eta)
+
+        return list(final_results.values()), total_epochs
+
+    def _budget_search(self, symbol: str, method: str, brackets: List[Tuple[int, int]],
+                       param_distributions: Dict, max_epochs: int, eta: int,
+                       validation_split: float, workers: Optional[int], threads_per_worker: int) -> Dict:
+        start = time.perf_counter()
+        feature_data = self._load_feature_data(symbol)
+
+        run_dir = Path("data/hyperparameter_trials") / f"{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        ctx = multiprocessing.get_context('spawn')
+        slot_counter = ctx.Value('i', 0)
+
+        results = []
+        total_epochs = 0
+        n_configs = 0
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_trial_worker,
+                                     initargs=(threads_per_worker, slot_counter, feature_data)) as executor:
+                for n, min_epochs in brackets:
+                    logger.info(f"Bracket: {n} configuraciones desde {min_epochs} épocas")
+                    configs = self._sample_params(param_distributions, n)
+                    bracket_results, bracket_epochs = self._run_bracket(
+                        executor, configs, min_epochs, max_epochs, eta, validation_split, run_dir, first_id=n_configs
+                    )
+                    results.extend(bracket_results)
+                    total_epochs += bracket_epochs
+                    n_configs += n
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+        # Solo compiten las configuraciones entrenadas con el presupuesto completo
+        finalists = [r for r in results if r['epochs_trained'] >= max_epochs] or results
+        best = min(finalists, key=lambda r: r['val_loss'], default=None)
+        best_params = None
+        best_score = float('inf')
+        if best is not None:
+            best_score = best['val_loss']
+            best_params = best['params'].copy()
+            best_params['val_loss'] = best_score
+            best_params['epochs'] = best['epochs_trained']
+
+        optimization_result = {
+            'symbol': symbol,
+            'method': method,
+            'timestamp': datetime.now().isoformat(),
+            'n_configurations': n_configs,
+            'max_epochs': max_epochs,
+            'eta': eta,
+            'total_epochs_trained': total_epochs,
+            'elapsed_seconds': round(time.perf_counter() - start, 2),
+            'best_params': best_params,
+            'best_score': best_score,
+            'all_results': results,
+        }
+
+        self.optimization_history.append(optimization_result)
+        self._save_history()
+
+        logger.info(f"{method} completado: {n_configs} configuraciones, {total_epochs} épocas "
+                    f"(vs {n_configs * max_epochs} entrenando todo). Mejor val_loss: {best_score:.6f}")
+        logger.info(f"Mejores parámetros: {best_params}")
+
+        return optimization_result
+
+    def successive_halving(self, symbol: str, param_distributions: Dict, n_configs: int = 27,
+                           min_epochs: int = 3, max_epochs: int = 27, eta: int = 3,
+                           validation_split: float = 0.2, workers: Optional[int] = None,
+                           threads_per_worker: int = 2) -> Dict:
+        """
+        Successive Halving: entrena n_configs configuraciones aleatorias pocas
+        épocas y solo sigue entrenando la mejor fracción (1/eta) en cada rung.
+
+        Args:
+            symbol: Símbolo a optimizar
+            param_distributions: Valores posibles (sequence_length, batch_size);
+                                 las épocas las define el presupuesto
+            n_configs: Configuraciones del primer rung
+            min_epochs: Épocas del primer rung
+            max_epochs: Épocas de las configuraciones finalistas
+            eta: Factor de reducción entre rungs
+            workers: Procesos de entrenamiento en paralelo (default: CPUs / threads)
+        """
+        logger.info(f"Iniciando Successive Halving para {symbol} ({n_configs} configuraciones)")
+        return self._budget_search(symbol, 'successive_halving', [(n_configs, min_epochs)],
+                                   param_distributions, max_epochs, eta, validation_split,
+                                   workers, threads_per_worker)
+
+    def hyperband(self, symbol: str, param_distributions: Dict, max_epochs: int = 27,
+                  eta: int = 3, validation_split: float = 0.2, workers: Optional[int] = None,
+                  threads_per_worker: int = 2) -> Dict:
+        """
+        Hyperband: varios brackets de successive halving, desde muchas
+        configuraciones con pocas épocas hasta pocas configuraciones entrenadas completas.
+        """
+        s_max = int(math.log(max_epochs) / math.log(eta) + 1e-9)
+        brackets = []
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            min_epochs = max(1, int(round(max_epochs * eta ** -s)))
+            brackets.append((n, min_epochs))
+
+        logger.info(f"Iniciando Hyperband para {symbol} ({len(brackets)} brackets)")
+        return self._budget_search(symbol, 'hyperband', brackets, param_distributions,
+                                   max_epochs, eta, validation_split, workers, threads_per_worker)
+
     def optimize_trading_thresholds(self, symbol: str, 
                                    threshold_range: Tuple[float, float] = (0.5, 5.0),
                                    step: float = 0.5) -> Dict:
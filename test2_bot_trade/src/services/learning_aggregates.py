@@ -0,0 +1,397 @@
+"""
+Agregados Materializados de Aprendizaje
+Estadísticas de los eventos ANALYSIS (por símbolo, hora, día de semana,
+estrategia y señales) mantenidas de forma incremental a medida que se registran
+eventos en el log de operaciones, en lugar de recorrer todo el historial en
+cada consulta.
+
+- Cada evento se aplica una sola vez: el estado guarda el offset (seq) del
+  último evento aplicado y sync() lee con un cursor del log solo los bytes
+  agregados desde la lectura anterior.
+- Las vistas por ventana (condiciones de mercado, auto-configuración) usan un
+  buffer circular con los últimos análisis.
+- El estado se persiste compacto en data/learning/analysis_aggregates.json.
+- rebuild/verify recalculan desde el log para comprobar consistencia:
+      python -m src.services.learning_aggregates --verify
+"""
+import argparse
+import json
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.core.logger import get_logger
+from src.services.operations_log import LogCursor, OperationsLog, get_operations_log
+
+logger = get_logger("learning_aggregates")
+
+DEFAULT_STATE_FILE = Path("data/learning/analysis_aggregates.json")
+RECENT_WINDOW = 200
+
+# Estrategias conocidas (nombres tal como aparecen en buy_factors/sell_factors)
+KNOWN_STRATEGIES = [
+    'regime_detection', 'multi_timeframe', 'order_flow', 'seasonal',
+    'fractal', 'anomaly', 'volume_profile', 'monte_carlo',
+    'pattern_recognition', 'pairs_trading', 'elliott_wave',
+    'smart_money', 'meta_learner', 'candlestick', 'correlation',
+    'neural_network', 'macroeconomic'
+]
+_NUMBER_RE = re.compile(r'[-+]?\d+')
+
+
+def market_condition(technical: Optional[Dict]) -> Tuple[str, str, str]:
+    """(volatilidad, tendencia, categoría RSI) a partir de los indicadores del análisis"""
+    rsi = technical.get('rsi', 50) if technical else 50
+    macd = technical.get('macd', 0) if technical else 0
+    volume_ratio = technical.get('volume_ratio', 1.0) if technical else 1.0
+
+    if rsi < 30:
+        rsi_category = 'OVERSOLD'
+    elif rsi > 70:
+        rsi_category = 'OVERBOUGHT'
+    else:
+        rsi_category = 'NEUTRAL'
+
+    # Tendencia por MACD
+    if macd > 0:
+        trend = 'BULLISH'
+    elif macd < 0:
+        trend = 'BEARISH'
+    else:
+        trend = 'NEUTRAL'
+
+    # Volatilidad por volumen
+    if volume_ratio > 1.5:
+        volatility = 'HIGH'
+    elif volume_ratio < 0.7:
+        volatility = 'LOW'
+    else:
+        volatility = 'MEDIUM'
+
+    return volatility, trend, rsi_category
+
+
+def _bump(stats: Dict, score: float, count_key: str = 'total_analyses',
+          total_key: str = 'total_score', avg_key: str = 'avg_score'):
+    """Contador + media acumulada"""
+    stats[count_key] += 1
+    stats[total_key] += score
+    stats[avg_key] = stats[total_key] / stats[count_key]
+
+
+class LearningAggregates:
+    """Estado materializado de los análisis del log de operaciones"""
+
+    def __init__(self, state_file=DEFAULT_STATE_FILE, operations_log: Optional[OperationsLog] = None,
+                 save_every: int = 50, load: bool = True):
+        self.state_file = Path(state_file)
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.log = operations_log or get_operations_log()
+        self.save_every = save_every
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._reset()
+        if load:
+            self._load()
+
+    # ==================== ESTADO ====================
+
+    def _reset(self):
+        self.offset = 0
+        # Cursor del log (segmento + posición en bytes); se crea al sincronizar
+        self._cursor: Optional[LogCursor] = None
+        self.total_analyses = 0
+        self.signal_stats = {'BUY': 0, 'SELL': 0, 'HOLD': 0}
+        self.symbol_stats: Dict[str, Dict] = {}
+        self.symbol_hour_stats: Dict[int, Dict] = {}
+        self.hour_stats: Dict[int, Dict] = {}
+        self.day_stats: Dict[str, Dict] = {}
+        self.strategy_stats: Dict[str, Dict] = {}
+        # Últimos análisis: [score, señal, volatilidad, tendencia, categoría RSI]
+        self.recent: deque = deque(maxlen=RECENT_WINDOW)
+
+    def to_dict(self) -> Dict:
+        return {
+            'offset': self.offset,
+            'total_analyses': self.total_analyses,
+            'signal_stats': self.signal_stats,
+            'symbol_stats': self.symbol_stats,
+            'symbol_hour_stats': self.symbol_hour_stats,
+            'hour_stats': self.hour_stats,
+            'day_stats': self.day_stats,
+            'strategy_stats': self.strategy_stats,
+            'recent': list(self.recent),
+        }
+
+    def _from_dict(self, state: Dict):
+        self._reset()
+        self.offset = state.get('offset', 0)
+        self.total_analyses = state.get('total_analyses', 0)
+        self.signal_stats.update(state.get('signal_stats', {}))
+        self.symbol_stats = state.get('symbol_stats', {})
+        # JSON guarda las horas como string: restaurar claves enteras
+        self.symbol_hour_stats = {int(h): s for h, s in state.get('symbol_hour_stats', {}).items()}
+        self.hour_stats = {int(h): s for h, s in state.get('hour_stats', {}).items()}
+        self.day_stats = state.get('day_stats', {})
+        self.strategy_stats = state.get('strategy_stats', {})
+        self.recent.extend(state.get('recent', []))
+
+    def _load(self):
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self._from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"Estado de agregados ilegible, se reconstruye desde el log: {e}")
+            self._reset()
+
+    def save(self):
+        with self._lock:
+            tmp = self.state_file.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, separators=(',', ':'), default=str)
+            os.replace(tmp, self.state_file)
+            self._pending = 0
+
+    # ==================== ACTUALIZACIÓN ====================
+
+    def apply(self, record: Dict):
+        """Aplica un evento del log (los que no son ANALYSIS solo avanzan el offset)"""
+        with self._lock:
+            self.offset = max(self.offset, record.get('seq', self.offset))
+            if record.get('type') != 'ANALYSIS':
+                return
+            data = record.get('data') or {}
+            score = data.get('score', 0) or 0
+            signal = data.get('final_signal', 'HOLD')
+            symbol = data.get('symbol')
+            self.total_analyses += 1
+
+            dt = None
+            timestamp = record.get('timestamp')
+            if timestamp:
+                try:
+                    dt = datetime.fromisoformat(timestamp)
+                except (TypeError, ValueError):
+                    dt = None
+
+            # Por hora y día de semana (todos los análisis con timestamp)
+            if dt is not None:
+                hour = self.hour_stats.setdefault(dt.hour, {
+                    'total_analyses': 0, 'total_score': 0, 'avg_score': 0,
+                    'buy_signals': 0, 'sell_signals': 0, 'hold_signals': 0,
+                    'high_scores': 0, 'very_high_scores': 0
+                })
+                _bump(hour, score)
+                hour[{'BUY': 'buy_signals', 'SELL': 'sell_signals'}.get(signal, 'hold_signals')] += 1
+                hour['high_scores'] += score > 30
+                hour['very_high_scores'] += score > 50
+
+                day = self.day_stats.setdefault(dt.strftime('%A'), {
+                    'total_analyses': 0, 'total_score': 0, 'avg_score': 0, 'buy_signals': 0
+                })
+                _bump(day, score)
+                day['buy_signals'] += signal == 'BUY'
+
+            # Por símbolo (y horas de los análisis con símbolo)
+            if symbol:
+                stats = self.symbol_stats.setdefault(symbol, {
+                    'total_analyses': 0, 'total_score': 0, 'avg_score': 0,
+                    'buy_signals': 0, 'sell_signals': 0, 'hold_signals': 0, 'high_scores': 0
+                })
+                _bump(stats, score)
+                key = {'BUY': 'buy_signals', 'SELL': 'sell_signals'}.get(signal, 'hold_signals')
+                stats[key] += 1
+                self.signal_stats[signal if signal in ('BUY', 'SELL') else 'HOLD'] += 1
+                stats['high_scores'] += score > 30
+
+                if dt is not None:
+                    hour = self.symbol_hour_stats.setdefault(dt.hour, {
+                        'total_analyses': 0, 'total_score': 0, 'avg_score': 0,
+                        'buy_signals': 0, 'high_scores': 0
+                    })
+                    _bump(hour, score)
+                    hour['buy_signals'] += signal == 'BUY'
+                    hour['high_scores'] += score > 30
+
+            self._apply_strategies(data, signal)
+            self.recent.append([score, signal, *market_condition(data.get('technical', {}))])
+
+    def _apply_strategies(self, data: Dict, signal: str):
+        for factor in list(data.get('buy_factors', [])) + list(data.get('sell_factors', [])):
+            factor = str(factor)
+            factor_lower = factor.lower()
+            for strategy in KNOWN_STRATEGIES:
+                if strategy.replace('_', ' ') not in factor_lower and strategy not in factor:
+                    continue
+                stats = self.strategy_stats.setdefault(strategy, {
+                    'total_uses': 0, 'total_score_contribution': 0, 'avg_score_contribution': 0,
+                    'buy_signals': 0, 'sell_signals': 0, 'hold_signals': 0,
+                    'high_contribution': 0  # Contribuciones > 5
+                })
+                stats['total_uses'] += 1
+                # Score de la contribución: último número del factor ("Strategy (+12)")
+                numbers = _NUMBER_RE.findall(factor)
+                if numbers:
+                    contribution = int(numbers[-1])
+                    stats['total_score_contribution'] += abs(contribution)
+                    stats['avg_score_contribution'] = stats['total_score_contribution'] / stats['total_uses']
+                    stats['high_contribution'] += abs(contribution) > 5
+                stats[{'BUY': 'buy_signals', 'SELL': 'sell_signals'}.get(signal, 'hold_signals')] += 1
+
+    def observe(self, record: Dict):
+        """Hook del escritor: aplica el evento recién registrado (o se pone al día si hay hueco)"""
+        with self._lock:
+            if record.get('seq') != self.offset + 1:
+                self.sync()
+                return
+            self.apply(record)
+            self._pending += 1
+            if self._pending >= self.save_every:
+                self.save()
+
+    def sync(self) -> int:
+        """Aplica los eventos posteriores al offset guardado; devuelve cuántos se aplicaron"""
+        with self._lock:
+            if self._cursor is None or self._cursor.offset > self.offset:
+                self._cursor = self.log.cursor(offset=self.offset)
+            try:
+                # Solo lo escrito desde el poll anterior (no se releen los segmentos completos)
+                records = [r for r in self._cursor.poll() if r.get('seq', 0) > self.offset]
+            except Exception as e:
+                logger.error(f"Error leyendo log de operaciones: {e}")
+                return 0
+            for record in records:
+                self.apply(record)
+            if records or self._pending:
+                self.save()
+            return len(records)
+
+    def rebuild(self) -> 'LearningAggregates':
+        """Recalcula el estado completo desde el log retenido"""
+        with self._lock:
+            self._reset()
+            self.sync()
+        return self
+
+    def verify(self, tolerance: float = 1e-6) -> Dict:
+        """Compara el estado materializado con una reconstrucción desde el log"""
+        self.sync()
+        # Reconstrucción en memoria (no se persiste)
+        fresh = LearningAggregates(self.state_file, self.log, load=False)
+        for record in self.log.read_from(0):
+            fresh.apply(record)
+
+        differences = []
+        current, expected = self.to_dict(), fresh.to_dict()
+        for key in expected:
+            if not _close(current[key], expected[key], tolerance):
+                differences.append(key)
+        first = self.log.read_from(0, limit=1)
+        return {
+            'consistent': not differences,
+            'differences': differences,
+            'offset': self.offset,
+            'total_analyses': self.total_analyses,
+            # Si la retención ya borró eventos, el estado incluye historia que el log no tiene
+            'history_complete': not first or first[0].get('seq') == 1,
+        }
+
+    # ==================== VISTAS ====================
+
+    def enhanced_view(self) -> Dict:
+        """Formato de EnhancedLearningSystem._analyze_operations_log"""
+        self.sync()
+        if not self.total_analyses:
+            return {}
+        return {
+            'symbol_stats': self.symbol_stats,
+            'hour_stats': self.symbol_hour_stats,
+            'signal_stats': dict(self.signal_stats),
+            'total_analyses': self.total_analyses,
+        }
+
+    def temporal_view(self) -> Dict:
+        """Formato de TimeBasedLearning._analyze_temporal_patterns_from_operations"""
+        self.sync()
+        if not self.total_analyses:
+            return {}
+        return {
+            'hour_stats': self.hour_stats,
+            'day_stats': self.day_stats,
+            'total_analyses': self.total_analyses,
+        }
+
+    def strategy_view(self) -> Dict:
+        self.sync()
+        return self.strategy_stats
+
+    def recent_analyses(self, limit: int = RECENT_WINDOW) -> List[List]:
+        """Últimos análisis como [score, señal, volatilidad, tendencia, categoría RSI]"""
+        self.sync()
+        return list(self.recent)[-limit:]
+
+    def market_conditions_view(self, limit: int = RECENT_WINDOW) -> Dict:
+        """Formato de MarketConditionLearning._analyze_market_conditions_from_operations"""
+        condition_stats = {}
+        for score, signal, volatility, trend, rsi_category in self.recent_analyses(limit):
+            condition_key = f"{volatility}_{trend}_{rsi_category}"
+            stats = condition_stats.setdefault(condition_key, {
+                'total_analyses': 0, 'total_score': 0, 'avg_score': 0,
+                'buy_signals': 0, 'high_scores': 0,  # Scores > 30
+                'volatility': volatility, 'trend': trend, 'rsi_category': rsi_category
+            })
+            _bump(stats, score)
+            stats['buy_signals'] += signal == 'BUY'
+            stats['high_scores'] += score > 30
+        return condition_stats
+
+
+def _close(a, b, tolerance: float) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k], tolerance) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_close(x, y, tolerance) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= tolerance * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+_shared: Optional[LearningAggregates] = None
+_shared_lock = threading.Lock()
+
+
+def get_learning_aggregates() -> LearningAggregates:
+    """Instancia compartida del proceso (la usan todos los componentes de aprendizaje)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LearningAggregates()
+        return _shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregados materializados de aprendizaje")
+    parser.add_argument('--rebuild', action='store_true', help="Reconstruir el estado desde el log")
+    parser.add_argument('--verify', action='store_true', help="Comparar el estado con una reconstrucción")
+    args = parser.parse_args()
+
+    aggregates = get_learning_aggregates()
+    if args.rebuild:
+        aggregates.rebuild()
+        print(f"✅ Reconstruido: {aggregates.total_analyses} análisis (offset {aggregates.offset})")
+    if args.verify or not args.rebuild:
+        report = aggregates.verify()
+        status = "✅ Consistente" if report['consistent'] else f"❌ Diferencias en: {', '.join(report['differences'])}"
+        print(f"{status} | {report['total_analyses']} análisis | offset {report['offset']}")
+        if not report['history_complete']:
+            print("⚠️  El log ya no contiene los primeros eventos (retención): la verificación es parcial")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,11 @@ from datetime import datetime, timedelta
 import logging
 import warnings
 import json
+import time
 from typing import Dict, List, Tuple, Optional
+
+from src.services.feature_store import NN_FEATURE_COLUMNS, compute_technical_indicators, get_feature_store
+from src.services.training_farm import multi_horizon_windows, sequence_windows
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger('neural_network_complete')
@@ -57,11 +61,13 @@ class NeuralNetworkServiceComplete:
         self.ensemble_models = {}  # Para ensemble
         self.base_model = None  # Para transfer learning
         self.performance_history = {}
+        self.feature_store = get_feature_store()
         
         # Parámetros
         self.lookback = 60
         self.prediction_days = 5  # Horizonte principal
         self.prediction_horizons = [1, 3, 5, 10, 20]  # Multi-horizonte
+        self.last_inference = {}  # Latencia y tamaño del último batch de inferencia
         
         # Configurar GPU
         try:
@@ -75,126 +81,35 @@ class NeuralNetworkServiceComplete:
     # ==================== FASE 1: MULTI-FEATURE ENGINEERING ====================
     
     def _calculate_technical_indicators(self, df):
-        """Calcula 25+ indicadores técnicos"""
+        """Calcula 25+ indicadores técnicos (definición compartida con el feature store)"""
         try:
-            df.columns = [c.lower() for c in df.columns]
-            
-            high = df['high'].values
-            low = df['low'].values
-            close = df['close'].values
-            volume = df['volume'].values if 'volume' in df.columns else np.zeros(len(df))
-            
-            # 1. RSI (14 y 21)
-            df['rsi_14'] = self._calculate_rsi(close, 14)
-            df['rsi_21'] = self._calculate_rsi(close, 21)
-            
-            # 2. MACD
-            ema_12 = pd.Series(close).ewm(span=12, adjust=False).mean()
-            ema_26 = pd.Series(close).ewm(span=26, adjust=False).mean()
-            df['macd'] = ema_12 - ema_26
-            df['macd_signal'] = pd.Series(df['macd']).ewm(span=9, adjust=False).mean()
-            df['macd_hist'] = df['macd'] - df['macd_signal']
-            
-            # 3. Bollinger Bands
-            sma_20 = pd.Series(close).rolling(window=20).mean()
-            std_20 = pd.Series(close).rolling(window=20).std()
-            df['bb_upper'] = sma_20 + (std_20 * 2)
-            df['bb_lower'] = sma_20 - (std_20 * 2)
-            df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / (sma_20 + 1e-10)
-            df['bb_position'] = (close - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'] + 1e-10)
-            
-            # 4. ATR
-            df['atr'] = self._calculate_atr(high, low, close, 14)
-            
-            # 5. SMAs
-            df['sma_20'] = pd.Series(close).rolling(window=20).mean()
-            df['sma_50'] = pd.Series(close).rolling(window=50).mean()
-            df['sma_200'] = pd.Series(close).rolling(window=200).mean()
-            
-            # 6. EMAs
-            df['ema_12'] = pd.Series(close).ewm(span=12, adjust=False).mean()
-            df['ema_26'] = pd.Series(close).ewm(span=26, adjust=False).mean()
-            
-            # 7. ADX
-            df['adx'] = self._calculate_adx(high, low, close, 14)
-            
-            # 8. Stochastic
-            df['stoch_k'], df['stoch_d'] = self._calculate_stochastic(high, low, close, 14, 3)
-            
-            # 9. Features derivadas
-            df['returns'] = pd.Series(close).pct_change()
-            df['volatility'] = pd.Series(df['returns']).rolling(window=20).std()
-            df['momentum'] = close / (pd.Series(close).shift(10) + 1e-10) - 1
-            
-            # 10. Volumen relativo
-            if len(volume) > 0 and volume.sum() > 0:
-                df['volume_sma'] = pd.Series(volume).rolling(window=20).mean()
-                df['volume_ratio'] = volume / (df['volume_sma'] + 1e-10)
-            else:
-                df['volume_ratio'] = 1.0
-            
-            # Rellenar NaN
-            df = df.fillna(method='bfill').fillna(method='ffill').fillna(0)
-            
-            return df
-            
+            return compute_technical_indicators(df)
         except Exception as e:
             logger.error(f"Error calculando indicadores: {e}")
             return df
     
-    def _calculate_rsi(self, prices, period=14):
-        delta = pd.Series(prices).diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / (loss + 1e-10)
-        return 100 - (100 / (1 + rs))
+    def _get_features(self, symbol, df):
+        """Features del símbolo desde el feature store (solo calcula las barras nuevas)"""
+        return self.feature_store.features_for(symbol, df, 'nn_complete')
     
-    def _calculate_atr(self, high, low, close, period=14):
-        tr1 = pd.Series(high) - pd.Series(low)
-        tr2 = abs(pd.Series(high) - pd.Series(close).shift())
-        tr3 = abs(pd.Series(low) - pd.Series(close).shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(window=period).mean()
-    
-    def _calculate_adx(self, high, low, close, period=14):
-        plus_dm = pd.Series(high).diff()
-        minus_dm = pd.Series(low).diff() * -1
-        plus_dm[plus_dm < 0] = 0
-        minus_dm[minus_dm < 0] = 0
-        tr = self._calculate_atr(high, low, close, period)
-        plus_di = 100 * (plus_dm.rolling(window=period).mean() / (tr + 1e-10))
-        minus_di = 100 * (minus_dm.rolling(window=period).mean() / (tr + 1e-10))
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
-        return dx.rolling(window=period).mean()
-    
-    def _calculate_stochastic(self, high, low, close, k_period=14, d_period=3):
-        lowest_low = pd.Series(low).rolling(window=k_period).min()
-        highest_high = pd.Series(high).rolling(window=k_period).max()
-        k = 100 * ((close - lowest_low) / (highest_high - lowest_low + 1e-10))
-        d = k.rolling(window=d_period).mean()
-        return k, d
-    
-    def _prepare_data(self, df, prediction_days=5):
+    def _prepare_data(self, df, prediction_days=5, symbol=None):
         """Prepara datos con múltiples features"""
-        df.columns = [c.lower() for c in df.columns]
-        df = self._calculate_technical_indicators(df.copy())
-        
+        if symbol is not None:
+            df = self._get_features(symbol, df)
+        else:
+            df.columns = [c.lower() for c in df.columns]
+            df = self._calculate_technical_indicators(df.copy())
+        return self._prepare_from_features(df, prediction_days)
+    
+    def _prepare_from_features(self, df, prediction_days=5):
+        """
+        Escala las features y arma las ventanas (vistas strided, sin copiar).
+        Con una lista de horizontes, y tiene una columna por horizonte.
+        """
         if len(df) < self.lookback + 20:
             return None, None, None, None
         
-        feature_cols = [
-            'open', 'high', 'low', 'close', 'volume',
-            'rsi_14', 'rsi_21',
-            'macd', 'macd_signal', 'macd_hist',
-            'bb_upper', 'bb_lower', 'bb_width', 'bb_position',
-            'atr',
-            'sma_20', 'sma_50', 'sma_200',
-            'ema_12', 'ema_26',
-            'adx',
-            'stoch_k', 'stoch_d',
-            'returns', 'volatility', 'momentum',
-            'volume_ratio'
-        ]
+        feature_cols = NN_FEATURE_COLUMNS
         
         available_cols = [col for col in feature_cols if col in df.columns]
         if len(available_cols) < 5:
@@ -206,20 +121,17 @@ class NeuralNetworkServiceComplete:
         scaler = RobustScaler()
         scaled_data = scaler.fit_transform(data)
         
-        x_train, y_train = [], []
-        for i in range(self.lookback, len(scaled_data) - prediction_days):
-            x_train.append(scaled_data[i-self.lookback:i])
-            close_idx = available_cols.index('close')
-            y_train.append(scaled_data[i+prediction_days, close_idx])
-        
-        x_train, y_train = np.array(x_train), np.array(y_train)
-        x_train = np.reshape(x_train, (x_train.shape[0], x_train.shape[1], x_train.shape[2]))
+        close_idx = available_cols.index('close')
+        if isinstance(prediction_days, (list, tuple)):
+            x_train, y_train = multi_horizon_windows(scaled_data, self.lookback, prediction_days, close_idx)
+        else:
+            x_train, y_train = sequence_windows(scaled_data, self.lookback, prediction_days, close_idx)
         
         return x_train, y_train, scaler, available_cols
     
     # ==================== FASE 1: ARQUITECTURAS MEJORADAS ====================
     
-    def build_lstm_model(self, input_shape):
+    def build_lstm_model(self, input_shape, outputs=1):
         """LSTM Bidirectional mejorado"""
         model = Sequential()
         model.add(Bidirectional(LSTM(units=128, return_sequences=True), input_shape=input_shape))
@@ -233,11 +145,11 @@ class NeuralNetworkServiceComplete:
         model.add(Dropout(0.2))
         model.add(Dense(units=16, activation='relu'))
         model.add(Dropout(0.2))
-        model.add(Dense(units=1))
+        model.add(Dense(units=outputs))
         model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.001), loss='huber', metrics=['mae', 'mse'])
         return model
     
-    def build_gru_model(self, input_shape):
+    def build_gru_model(self, input_shape, outputs=1):
         """GRU (más rápido que LSTM)"""
         model = Sequential()
         model.add(Bidirectional(GRU(units=128, return_sequences=True), input_shape=input_shape))
@@ -248,11 +160,11 @@ class NeuralNetworkServiceComplete:
         model.add(Dropout(0.2))
         model.add(Dense(units=16, activation='relu'))
         model.add(Dropout(0.2))
-        model.add(Dense(units=1))
+        model.add(Dense(units=outputs))
         model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.001), loss='huber', metrics=['mae', 'mse'])
         return model
     
-    def build_cnn_lstm_model(self, input_shape):
+    def build_cnn_lstm_model(self, input_shape, outputs=1):
         """CNN-LSTM (para patrones)"""
         model = Sequential()
         model.add(Conv1D(filters=64, kernel_size=3, activation='relu', input_shape=input_shape))
@@ -264,7 +176,7 @@ class NeuralNetworkServiceComplete:
         model.add(Dropout(0.3))
         model.add(Dense(units=16, activation='relu'))
         model.add(Dropout(0.2))
-        model.add(Dense(units=1))
+        model.add(Dense(units=outputs))
         model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.001), loss='huber', metrics=['mae', 'mse'])
         return model
     
@@ -280,16 +192,17 @@ class NeuralNetworkServiceComplete:
         x_augmented.append(x_train + noise)
         y_augmented.append(y_train)
         
-        return np.vstack(x_augmented), np.hstack(y_augmented)
+        return np.vstack(x_augmented), np.concatenate(y_augmented)
     
     # ==================== FASE 2: ENSEMBLE ====================
     
     def train_ensemble(self, symbol, df, epochs=50, batch_size=32, validation_split=0.2):
-        """Entrena ensemble de modelos"""
+        """Entrena ensemble de modelos (una salida por horizonte de prediction_horizons)"""
         print(f"🧠 Entrenando ENSEMBLE de redes neuronales para {symbol}...")
         
         try:
-            x_train, y_train, scaler, feature_cols = self._prepare_data(df, self.prediction_days)
+            horizons = list(self.prediction_horizons)
+            x_train, y_train, scaler, feature_cols = self._prepare_data(df, horizons, symbol=symbol)
             if x_train is None:
                 return False
             
@@ -300,9 +213,9 @@ class NeuralNetworkServiceComplete:
             
             # Entrenar múltiples modelos
             models = {
-                'lstm': self.build_lstm_model(input_shape),
-                'gru': self.build_gru_model(input_shape),
-                'cnn_lstm': self.build_cnn_lstm_model(input_shape)
+                'lstm': self.build_lstm_model(input_shape, outputs=len(horizons)),
+                'gru': self.build_gru_model(input_shape, outputs=len(horizons)),
+                'cnn_lstm': self.build_cnn_lstm_model(input_shape, outputs=len(horizons))
             }
             
             callbacks = [
@@ -345,7 +258,8 @@ class NeuralNetworkServiceComplete:
                 'weights': model_weights,
                 'scaler': scaler,
                 'feature_cols': feature_cols,
-                'input_shape': input_shape
+                'input_shape': input_shape,
+                'horizons': horizons
             }
             
             joblib.dump(self.ensemble_models[symbol], self.models_dir / f"{symbol}_ensemble.pkl")
@@ -361,53 +275,100 @@ class NeuralNetworkServiceComplete:
     
     # ==================== FASE 2: PREDICCIÓN MULTI-HORIZONTE ====================
     
-    def predict_multi_horizon(self, symbol, df):
-        """Predice múltiples horizontes temporales"""
-        predictions = {}
+    def _load_ensemble(self, symbol):
+        """Ensemble del símbolo (memoria o disco), con su scaler ya ajustado; None si no existe"""
+        if symbol not in self.ensemble_models:
+            ensemble_path = self.models_dir / f"{symbol}_ensemble.pkl"
+            if ensemble_path.exists():
+                try:
+                    self.ensemble_models[symbol] = joblib.load(ensemble_path)
+                except Exception as e:
+                    logger.warning(f"Error cargando ensemble para {symbol}: {e}")
+        return self.ensemble_models.get(symbol)
+    
+    def _ensemble_horizons(self, ensemble_data):
+        # Ensembles entrenados antes del multi-horizonte: una sola salida (horizonte principal)
+        return list(ensemble_data.get('horizons', [self.prediction_days]))
+    
+    def predict_ensemble_batch(self, symbol_dfs):
+        """
+        Predicción de todos los horizontes para varios símbolos en una sola pasada.
+        
+        Las features se calculan una vez por símbolo y se escalan con el scaler
+        guardado junto al ensemble. Cada modelo corre una única vez sobre el batch
+        apilado de los símbolos que lo usan; cada salida del modelo es un horizonte.
+        
+        Args:
+            symbol_dfs: Dict símbolo -> DataFrame OHLCV
+        
+        Returns:
+            Dict símbolo -> {horizonte: precio predicho}
+        """
+        start = time.perf_counter()
         
-        for horizon in self.prediction_horizons:
+        # 1. Última ventana escalada de cada símbolo
+        windows = {}
+        for symbol, df in symbol_dfs.items():
+            ensemble_data = self._load_ensemble(symbol)
+            if ensemble_data is None:
+                continue
             try:
-                x_train, y_train, scaler, feature_cols = self._prepare_data(df, horizon)
-                if x_train is None:
+                df.columns = [c.lower() for c in df.columns]
+                last_data = self._get_features(symbol, df)[ensemble_data['feature_cols']].tail(self.lookback).values
+                if len(last_data) < self.lookback:
                     continue
-                
-                # Usar ensemble si existe
-                if symbol in self.ensemble_models:
-                    ensemble_data = self.ensemble_models[symbol]
-                    models = ensemble_data['models']
-                    weights = ensemble_data['weights']
-                    
-                    # Preparar input
-                    df.columns = [c.lower() for c in df.columns]
-                    df = self._calculate_technical_indicators(df.copy())
-                    last_data = df[feature_cols].tail(self.lookback).values
-                    scaled_input = scaler.transform(last_data)
-                    x_test = np.reshape(scaled_input, (1, self.lookback, len(feature_cols)))
-                    
-                    # Predicciones de cada modelo
-                    preds = []
-                    for model_name, model in models.items():
-                        pred_scaled = model.predict(x_test, verbose=0)[0][0]
-                        preds.append(pred_scaled * weights[model_name])
-                    
-                    predicted_scaled = sum(preds)
-                else:
-                    # Fallback a modelo simple
-                    continue
-                
-                # Invertir escala
-                close_idx = feature_cols.index('close')
-                dummy_row = np.zeros((1, len(feature_cols)))
-                dummy_row[0, close_idx] = predicted_scaled
-                predicted_price = scaler.inverse_transform(dummy_row)[0, close_idx]
-                
-                predictions[horizon] = predicted_price
-                
+                windows[symbol] = ensemble_data['scaler'].transform(last_data)
+            except Exception as e:
+                logger.warning(f"Error preparando input de {symbol}: {e}")
+        
+        # 2. Un forward pass por modelo con todas las ventanas que lo usan
+        batches = {}
+        for symbol in windows:
+            for model_name, model in self.ensemble_models[symbol]['models'].items():
+                batches.setdefault(id(model), (model, []))[1].append((symbol, model_name))
+        
+        predicted_scaled = {}
+        failed = set()
+        for model, members in batches.values():
+            try:
+                x_batch = np.stack([windows[symbol] for symbol, _ in members]).astype(np.float32)
+                outputs = np.asarray(model(x_batch, training=False))
             except Exception as e:
-                logger.warning(f"Error prediciendo horizonte {horizon} para {symbol}: {e}")
+                logger.warning(f"Error en inferencia para {[s for s, _ in members]}: {e}")
+                failed.update(symbol for symbol, _ in members)
+                continue
+            for (symbol, model_name), output in zip(members, outputs):
+                weight = self.ensemble_models[symbol]['weights'][model_name]
+                predicted_scaled[symbol] = predicted_scaled.get(symbol, 0.0) + output * weight
         
+        # 3. Invertir escala (todos los horizontes de un símbolo juntos)
+        predictions = {}
+        for symbol, scaled in predicted_scaled.items():
+            if symbol in failed:
+                continue
+            ensemble_data = self.ensemble_models[symbol]
+            feature_cols = ensemble_data['feature_cols']
+            horizons = self._ensemble_horizons(ensemble_data)
+            close_idx = feature_cols.index('close')
+            dummy_rows = np.zeros((len(horizons), len(feature_cols)))
+            dummy_rows[:, close_idx] = scaled
+            prices = ensemble_data['scaler'].inverse_transform(dummy_rows)[:, close_idx]
+            predictions[symbol] = {horizon: float(price) for horizon, price in zip(horizons, prices)}
+        
+        self.last_inference = {
+            'latency_ms': (time.perf_counter() - start) * 1000,
+            'symbols': len(predictions),
+            'model_calls': len(batches),
+            'timestamp': datetime.now().isoformat()
+        }
+        logger.debug(f"Inferencia ensemble: {self.last_inference['symbols']} símbolos, "
+                     f"{self.last_inference['model_calls']} llamadas, {self.last_inference['latency_ms']:.1f}ms")
         return predictions
     
+    def predict_multi_horizon(self, symbol, df):
+        """Predice múltiples horizontes temporales"""
+        return self.predict_ensemble_batch({symbol: df}).get(symbol, {})
+    
     # ==================== FASE 3: MONITOREO Y REENTRENAMIENTO ====================
     
     def monitor_performance(self, symbol, actual_price, predicted_price):
@@ -468,48 +429,19 @@ class NeuralNetworkServiceComplete:
     
     def predict(self, symbol, df):
         """Predicción principal usando ensemble y multi-horizonte"""
-        # Cargar ensemble si existe
-        ensemble_path = self.models_dir / f"{symbol}_ensemble.pkl"
-        if ensemble_path.exists() and symbol not in self.ensemble_models:
-            try:
-                self.ensemble_models[symbol] = joblib.load(ensemble_path)
-            except Exception as e:
-                logger.warning(f"Error cargando ensemble para {symbol}: {e}")
-        
-        # Si no hay ensemble, entrenar uno
-        if symbol not in self.ensemble_models:
+        # Si no hay ensemble (ni en memoria ni en disco), entrenar uno
+        if self._load_ensemble(symbol) is None:
             print(f"⚠️ No hay ensemble para {symbol}, entrenando...")
             success = self.train_ensemble(symbol, df, epochs=30)
             if not success:
                 return None, 0, 0
         
         try:
-            ensemble_data = self.ensemble_models[symbol]
-            scaler = ensemble_data['scaler']
-            feature_cols = ensemble_data['feature_cols']
-            models = ensemble_data['models']
-            weights = ensemble_data['weights']
-            
-            # Preparar datos
-            df.columns = [c.lower() for c in df.columns]
-            df = self._calculate_technical_indicators(df.copy())
-            last_data = df[feature_cols].tail(self.lookback).values
-            scaled_input = scaler.transform(last_data)
-            x_test = np.reshape(scaled_input, (1, self.lookback, len(feature_cols)))
-            
-            # Predicción ensemble (horizonte 5 días)
-            preds = []
-            for model_name, model in models.items():
-                pred_scaled = model.predict(x_test, verbose=0)[0][0]
-                preds.append(pred_scaled * weights[model_name])
-            
-            predicted_scaled = sum(preds)
-            
-            # Invertir escala
-            close_idx = feature_cols.index('close')
-            dummy_row = np.zeros((1, len(feature_cols)))
-            dummy_row[0, close_idx] = predicted_scaled
-            predicted_price = scaler.inverse_transform(dummy_row)[0, close_idx]
+            # Predicción ensemble (horizonte principal, 5 días)
+            forecasts = self.predict_multi_horizon(symbol, df)
+            if self.prediction_days not in forecasts:
+                return None, 0, 0
+            predicted_price = forecasts[self.prediction_days]
             
             current_price = df['close'].iloc[-1]
             change_pct = ((predicted_price - current_price) / current_price) * 100
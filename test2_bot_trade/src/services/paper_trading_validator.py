@@ -10,6 +10,8 @@ from typing import Dict, List, Optional
 import json
 import logging
 
+from src.services.walk_forward import WalkForwardEngine, signal_scores, simulate
+
 logger = logging.getLogger('paper_trading_validator')
 
 class PaperTradingValidator:
@@ -84,111 +86,34 @@ class PaperTradingValidator:
             }
     
     def _simulate_trading(self, symbol: str, df: pd.DataFrame, config: Dict) -> Dict:
-        """Simula trading con la estrategia"""
-        capital = self.initial_capital
-        position = 0.0
-        position_price = 0.0
-        trades = []
-        equity_curve = [capital]
-        
-        buy_threshold = config.get('buy_threshold', 50.0)
-        sell_threshold = config.get('sell_threshold', -50.0)
-        max_position_size = config.get('max_position_size', 0.1)
-        stop_loss = config.get('stop_loss', 0.05)
-        take_profit = config.get('take_profit', 0.10)
-        commission = config.get('commission', 0.001)
-        
+        """Simula trading con la estrategia (kernel compartido con el walk-forward)"""
         prices = df['Close'].values if 'Close' in df.columns else df['close'].values
-        
+        prices = prices.astype(float)
+
         # Simular señales (en producción vendrían del análisis real)
-        if 'Score' in df.columns:
-            scores = df['Score'].values
-        else:
-            # Simular señales
-            returns = np.diff(prices) / prices[:-1]
-            scores = np.concatenate([[0], returns * 100])
-        
-        for i in range(len(df)):
-            current_price = prices[i]
-            current_score = scores[i] if i < len(scores) else 0
-            
-            # Gestión de posición existente
-            if position > 0:
-                pnl_pct = (current_price - position_price) / position_price
-                
-                # Stop Loss
-                if pnl_pct <= -stop_loss:
-                    capital = position * current_price * (1 - commission)
-                    trades.append({
-                        'entry': position_price,
-                        'exit': current_price,
-                        'pnl_pct': pnl_pct,
-                        'reason': 'stop_loss',
-                        'entry_time': df.index[i] if hasattr(df.index[i], 'isoformat') else str(i),
-                        'exit_time': df.index[i]
-                    })
-                    position = 0.0
-                    position_price = 0.0
-                
-                # Take Profit
-                elif pnl_pct >= take_profit:
-                    capital = position * current_price * (1 - commission)
-                    trades.append({
-                        'entry': position_price,
-                        'exit': current_price,
-                        'pnl_pct': pnl_pct,
-                        'reason': 'take_profit',
-                        'entry_time': df.index[i] if hasattr(df.index[i], 'isoformat') else str(i),
-                        'exit_time': df.index[i]
-                    })
-                    position = 0.0
-                    position_price = 0.0
-                
-                # Señal de venta
-                elif current_score <= sell_threshold:
-                    capital = position * current_price * (1 - commission)
-                    trades.append({
-                        'entry': position_price,
-                        'exit': current_price,
-                        'pnl_pct': pnl_pct,
-                        'reason': 'signal',
-                        'entry_time': df.index[i] if hasattr(df.index[i], 'isoformat') else str(i),
-                        'exit_time': df.index[i]
-                    })
-                    position = 0.0
-                    position_price = 0.0
-            
-            # Señal de compra
-            elif current_score >= buy_threshold and position == 0:
-                position_size = capital * max_position_size
-                position = (position_size / current_price) * (1 - commission)
-                position_price = current_price
-                capital -= position_size
-            
-            # Actualizar equity
-            if position > 0:
-                equity = capital + (position * current_price)
-            else:
-                equity = capital
-            equity_curve.append(equity)
-        
-        # Cerrar posición final
-        if position > 0:
-            final_price = prices[-1]
-            capital = position * final_price * (1 - commission)
+        scores = signal_scores(prices, df)
+
+        sim = simulate(prices, scores, config, self.initial_capital)
+
+        def _time(i):
+            return df.index[i] if hasattr(df.index[i], 'isoformat') else str(i)
+
+        trades = []
+        for trade in sim['trades']:
             trades.append({
-                'entry': position_price,
-                'exit': final_price,
-                'pnl_pct': (final_price - position_price) / position_price,
-                'reason': 'close',
-                'entry_time': df.index[-1] if hasattr(df.index[-1], 'isoformat') else str(len(df)-1),
-                'exit_time': df.index[-1]
+                'entry': trade['entry'],
+                'exit': trade['exit'],
+                'pnl_pct': trade['pnl_pct'],
+                'reason': trade['reason'],
+                'entry_time': _time(trade['entry_idx']),
+                'exit_time': df.index[trade['exit_idx']]
             })
-        
+
+        equity_curve = sim['equity_curve'].tolist()
         return {
             'trades': trades,
             'equity_curve': equity_curve,
-            'final_capital': equity_curve[-1] if equity_curve else capital
+            'final_capital': equity_curve[-1] if equity_curve else self.initial_capital
         }
     
     def _calculate_validation_metrics(self, results: Dict) -> Dict:
@@ -322,6 +247,68 @@ class PaperTradingValidator:
                 'error': str(e)
             }
     
+    def walk_forward_validation(self,
+                                symbols: List[str],
+                                strategy_configs: List[Dict],
+                                data_service=None,
+                                price_data: Optional[Dict[str, pd.DataFrame]] = None,
+                                train_days: int = 120,
+                                test_days: int = 20,
+                                step_days: Optional[int] = None,
+                                anchored: bool = False,
+                                period: str = '2y',
+                                workers: Optional[int] = None) -> Dict:
+        """
+        Validación walk-forward: folds train/test rolling-origin por símbolo,
+        evaluando todas las configuraciones en paralelo.
+
+        Args:
+            symbols: Símbolos a validar
+            strategy_configs: Configuraciones candidatas
+            data_service: Servicio de datos (si no se pasa price_data)
+            price_data: Datos ya cargados {símbolo: DataFrame}
+            train_days / test_days / step_days: Tamaño de las ventanas (en barras)
+            anchored: Si True, el train crece desde el inicio del historial
+            workers: Procesos en paralelo (default: CPUs)
+
+        Returns:
+            Dict con curvas de equity fuera de muestra, métricas por fold y de estabilidad
+        """
+        try:
+            price_data = dict(price_data or {})
+            # Una sola descarga por símbolo; los folds trabajan sobre rebanadas de los mismos arrays
+            for symbol in symbols:
+                if symbol not in price_data and data_service is not None:
+                    price_data[symbol] = data_service.get_historical_data(symbol, period=period)
+            price_data = {s: df for s, df in price_data.items()
+                          if s in symbols and df is not None and len(df) >= train_days + test_days}
+            if not price_data:
+                return {'success': False, 'error': 'Datos insuficientes'}
+
+            engine = WalkForwardEngine(initial_capital=self.initial_capital, workers=workers)
+            report = engine.run(price_data, strategy_configs, train_size=train_days,
+                                test_size=test_days, step=step_days, anchored=anchored)
+            report.update({
+                'symbols': list(price_data),
+                'train_days': train_days,
+                'test_days': test_days,
+                'anchored': anchored,
+                'validation_date': datetime.now().isoformat(),
+                'success': True
+            })
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = self.results_dir / f"walk_forward_{timestamp}.json"
+            with open(filepath, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+            logger.info(f"Walk-forward guardado: {filepath} ({report['total_folds']} folds)")
+
+            return report
+
+        except Exception as e:
+            logger.error(f"Error en validación walk-forward: {e}")
+            return {'success': False, 'error': str(e)}
+
     def get_validation_summary(self) -> Dict:
         """Obtiene resumen de todas las validaciones"""
         summary = {
@@ -0,0 +1,265 @@
+"""
+Pattern Engine - Detección vectorizada de patrones de velas y gráficos
+Calcula columnas booleanas para todo el historial OHLCV (o un panel
+símbolos × tiempo) en una sola pasada de NumPy.
+
+Las reglas son las mismas que usan CandlestickAnalyzer y PatternRecognizer;
+el análisis en vivo es un recorte de esta salida.
+
+Todas las funciones aceptan arrays 1D (tiempo) o 2D (símbolos × tiempo):
+el tiempo es siempre el último eje.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Tuple
+
+# Orden de evaluación por grupo: en cada vela gana el primer patrón que
+# cumple su condición (igual que los `return` encadenados del analizador)
+SINGLE_CANDLE_PATTERNS = ['DOJI_BULLISH', 'DOJI_BEARISH', 'HAMMER', 'INVERTED_HAMMER',
+                          'HANGING_MAN', 'SHOOTING_STAR']
+TWO_CANDLE_PATTERNS = ['BULLISH_ENGULFING', 'BEARISH_ENGULFING', 'PIERCING_PATTERN',
+                       'DARK_CLOUD', 'BULLISH_HARAMI', 'BEARISH_HARAMI']
+THREE_CANDLE_PATTERNS = ['MORNING_STAR', 'EVENING_STAR', 'THREE_WHITE_SOLDIERS',
+                         'THREE_BLACK_CROWS']
+CANDLESTICK_GROUPS = [SINGLE_CANDLE_PATTERNS, TWO_CANDLE_PATTERNS, THREE_CANDLE_PATTERNS]
+
+# Descripción que reporta el analizador al detectar cada patrón
+CANDLESTICK_DESCRIPTIONS = {
+    'DOJI_BULLISH': 'Doji en soporte',
+    'DOJI_BEARISH': 'Doji en resistencia',
+    'HAMMER': 'Hammer (alcista)',
+    'INVERTED_HAMMER': 'Inverted Hammer (alcista)',
+    'HANGING_MAN': 'Hanging Man (bajista)',
+    'SHOOTING_STAR': 'Shooting Star (bajista)',
+    'BULLISH_ENGULFING': 'Bullish Engulfing',
+    'BEARISH_ENGULFING': 'Bearish Engulfing',
+    'PIERCING_PATTERN': 'Piercing Pattern',
+    'DARK_CLOUD': 'Dark Cloud Cover',
+    'BULLISH_HARAMI': 'Bullish Harami',
+    'BEARISH_HARAMI': 'Bearish Harami',
+    'MORNING_STAR': 'Morning Star',
+    'EVENING_STAR': 'Evening Star',
+    'THREE_WHITE_SOLDIERS': 'Three White Soldiers',
+    'THREE_BLACK_CROWS': 'Three Black Crows',
+}
+
+# Patrones gráficos y cantidad de velas de la ventana que evalúa cada uno
+CHART_PATTERN_WINDOWS = {
+    'DOUBLE_BOTTOM': 20,
+    'DOUBLE_TOP': 20,
+    'HEAD_AND_SHOULDERS': 15,
+    'INVERSE_H&S': 15,
+    'ASCENDING_TRIANGLE': 15,
+    'DESCENDING_TRIANGLE': 15,
+    'BULL_FLAG': 10,
+    'BEAR_FLAG': 10,
+}
+
+# Pares (i, j) de mínimos/máximos que compara el doble suelo/techo en su ventana de 20
+_DOUBLE_PAIRS: List[Tuple[int, int]] = [(i, j) for i in range(20 - 10) for j in range(i + 5, 20 - 2)]
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Desplaza hacia adelante en el eje del tiempo rellenando con NaN"""
+    shifted = np.full_like(values, np.nan)
+    shifted[..., periods:] = values[..., :-periods]
+    return shifted
+
+
+def candlestick_patterns(open_, high, low, close) -> Dict[str, np.ndarray]:
+    """
+    Detecta todos los patrones de velas en cada barra.
+
+    Las velas sin historia previa (inicio del array) no cumplen patrones que
+    necesitan contexto. En cada grupo (1, 2 y 3 velas) se marca como mucho un
+    patrón por barra, respetando el orden de evaluación del analizador.
+
+    Returns:
+        Dict patrón -> array booleano con la forma de la entrada
+    """
+    o, h, l, c = (_as_float(x) for x in (open_, high, low, close))
+    o1, h1, l1, c1 = (_shift(x, 1) for x in (o, h, l, c))
+    o2, c2 = _shift(o, 2), _shift(c, 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # --- 1 vela ---
+        body = np.abs(c - o)
+        upper_shadow = h - np.maximum(o, c)
+        lower_shadow = np.minimum(o, c) - l
+        total_range = h - l
+        has_range = total_range != 0
+        body_ratio = body / total_range
+        upper_ratio = upper_shadow / total_range
+        lower_ratio = lower_shadow / total_range
+
+        doji = has_range & (body_ratio < 0.1)
+        small_body = has_range & (body_ratio < 0.3)
+        long_lower = small_body & (lower_ratio > 0.6) & (upper_ratio < 0.1)
+        long_upper = small_body & (upper_ratio > 0.6) & (lower_ratio < 0.1)
+        bullish = c > o
+        bearish = c < o
+
+        conditions = {
+            'DOJI_BULLISH': doji & (c < c1 * 0.98),
+            'DOJI_BEARISH': doji & (c > c1 * 1.02),
+            'HAMMER': long_lower & bullish,
+            'INVERTED_HAMMER': long_upper & bullish,
+            'HANGING_MAN': long_lower & bearish & (h > h1 * 0.99),
+            'SHOOTING_STAR': long_upper & bearish,
+        }
+
+        # --- 2 velas ---
+        prev_bullish = c1 > o1
+        prev_bearish = c1 < o1
+        prev_mid = (o1 + c1) / 2
+        small_vs_prev = body < np.abs(c1 - o1) * 0.5
+
+        conditions.update({
+            'BULLISH_ENGULFING': prev_bearish & bullish & (o < c1) & (c > o1),
+            'BEARISH_ENGULFING': prev_bullish & bearish & (o > c1) & (c < o1),
+            'PIERCING_PATTERN': prev_bearish & bullish & (o < l1) & (c > prev_mid),
+            'DARK_CLOUD': prev_bullish & bearish & (o > h1) & (c < prev_mid),
+            'BULLISH_HARAMI': prev_bearish & (o > c1) & (c < o1) & small_vs_prev,
+            'BEARISH_HARAMI': prev_bullish & (o < c1) & (c > o1) & small_vs_prev,
+        })
+
+        # --- 3 velas ---
+        star = np.abs(c1 - o1) / (h1 - l1) < 0.3
+        first_mid = (o2 + c2) / 2
+        has_third = ~np.isnan(c2)
+
+        conditions.update({
+            'MORNING_STAR': (c2 < o2) & star & bullish & (c > first_mid),
+            'EVENING_STAR': (c2 > o2) & star & bearish & (c < first_mid),
+            'THREE_WHITE_SOLDIERS': has_third & (c2 > o2) & prev_bullish & bullish & (c1 > c2) & (c > c1),
+            'THREE_BLACK_CROWS': has_third & (c2 < o2) & prev_bearish & bearish & (c1 < c2) & (c < c1),
+        })
+
+    # Un patrón por grupo y por vela: el primero que cumple gana
+    for group in CANDLESTICK_GROUPS:
+        taken = np.zeros(c.shape, dtype=bool)
+        for name in group:
+            hit = conditions[name] & ~taken
+            conditions[name] = hit
+            taken |= hit
+
+    return conditions
+
+
+def _rolling_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """Vista (..., n_ventanas, window) sin copiar; la ventana k termina en la barra k + window - 1"""
+    return sliding_window_view(values, window, axis=-1)
+
+
+def _align(result: np.ndarray, window: int, length: int) -> np.ndarray:
+    """Ubica el resultado por ventana en la barra donde termina (False sin ventana completa)"""
+    aligned = np.zeros(result.shape[:-1] + (length,), dtype=bool)
+    aligned[..., window - 1:] = result
+    return aligned
+
+
+def _double_pattern(values: np.ndarray, close_last: np.ndarray, bottom: bool) -> np.ndarray:
+    """Doble suelo (bottom=True) o doble techo sobre todas las ventanas de 20 velas"""
+    windows = _rolling_windows(values, 20)
+    found = np.zeros(windows.shape[:-1], dtype=bool)
+    for i, j in _DOUBLE_PAIRS:
+        first, second = windows[..., i], windows[..., j]
+        similar = np.abs(first - second) / first < 0.02
+        if bottom:
+            middle = windows[..., i + 1:j].max(axis=-1)
+            found |= similar & (middle > first * 1.03) & (close_last > middle)
+        else:
+            middle = windows[..., i + 1:j].min(axis=-1)
+            found |= similar & (middle < first * 0.97) & (close_last < middle)
+    return found
+
+
+def _head_and_shoulders(extremes: np.ndarray, necks: np.ndarray, close_last: np.ndarray,
+                        inverse: bool) -> np.ndarray:
+    """H&S (máximos) o H&S inverso (mínimos) sobre todas las ventanas de 15 velas"""
+    windows = _rolling_windows(extremes, 15)
+    neck_windows = _rolling_windows(necks, 15)
+    found = np.zeros(windows.shape[:-1], dtype=bool)
+    for i in range(2, 13):
+        left, head, right = windows[..., i - 2], windows[..., i], windows[..., i + 2]
+        symmetric = np.abs(left - right) / left < 0.05
+        if inverse:
+            neckline = neck_windows[..., i - 2:i + 3].max(axis=-1)
+            found |= (head < left * 0.97) & (head < right * 0.97) & symmetric & (close_last > neckline)
+        else:
+            neckline = neck_windows[..., i - 2:i + 3].min(axis=-1)
+            found |= (head > left * 1.03) & (head > right * 1.03) & symmetric & (close_last < neckline)
+    return found
+
+
+def chart_patterns(high, low, close) -> Dict[str, np.ndarray]:
+    """
+    Evalúa los patrones gráficos en cada barra sobre la ventana que termina en ella.
+
+    La barra t vale True si el patrón se detecta usando las últimas N velas
+    hasta t (N según CHART_PATTERN_WINDOWS). Las barras sin ventana completa
+    quedan en False.
+
+    Returns:
+        Dict patrón -> array booleano con la forma de la entrada
+    """
+    h, l, c = (_as_float(x) for x in (high, low, close))
+    length = c.shape[-1]
+    results = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if length >= 20:
+            close_last = c[..., 19:]
+            results['DOUBLE_BOTTOM'] = _double_pattern(l, close_last, bottom=True)
+            results['DOUBLE_TOP'] = _double_pattern(h, close_last, bottom=False)
+
+        if length >= 15:
+            close_last = c[..., 14:]
+            results['HEAD_AND_SHOULDERS'] = _head_and_shoulders(h, l, close_last, inverse=False)
+            results['INVERSE_H&S'] = _head_and_shoulders(l, h, close_last, inverse=True)
+
+            high_windows = _rolling_windows(h, 15)
+            low_windows = _rolling_windows(l, 15)
+
+            resistance = high_windows[..., -5:].max(axis=-1)
+            touches_resistance = (np.abs(high_windows - resistance[..., None]) / resistance[..., None] < 0.01).sum(axis=-1)
+            low_slope = (low_windows[..., -1] - low_windows[..., 0]) / 15
+            results['ASCENDING_TRIANGLE'] = ((touches_resistance >= 2) & (low_slope > 0) &
+                                             (close_last > resistance * 0.98))
+
+            support = low_windows[..., -5:].min(axis=-1)
+            touches_support = (np.abs(low_windows - support[..., None]) / support[..., None] < 0.01).sum(axis=-1)
+            high_slope = (high_windows[..., -1] - high_windows[..., 0]) / 15
+            results['DESCENDING_TRIANGLE'] = ((touches_support >= 2) & (high_slope < 0) &
+                                              (close_last < support * 1.02))
+
+        if length >= 10:
+            close_windows = _rolling_windows(c, 10)
+            consolidation = close_windows[..., -6:]
+            consolidation_range = ((consolidation.max(axis=-1) - consolidation.min(axis=-1)) /
+                                   consolidation.mean(axis=-1))
+            tight = consolidation_range < 0.03
+            first, fourth = close_windows[..., 0], close_windows[..., 3]
+            results['BULL_FLAG'] = ((fourth - first) / first > 0.05) & tight
+            results['BEAR_FLAG'] = ((first - fourth) / first > 0.05) & tight
+
+    aligned = {}
+    for name, window in CHART_PATTERN_WINDOWS.items():
+        if name in results:
+            aligned[name] = _align(results[name], window, length)
+        else:
+            aligned[name] = np.zeros(c.shape, dtype=bool)
+    return aligned
+
+
+def pattern_score(patterns: Dict[str, np.ndarray], scores: Dict[str, float]) -> np.ndarray:
+    """Suma por barra de los scores de los patrones detectados"""
+    total = None
+    for name, hits in patterns.items():
+        contribution = hits * scores.get(name, 0)
+        total = contribution if total is None else total + contribution
+    return total
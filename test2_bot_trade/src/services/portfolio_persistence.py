@@ -3,16 +3,14 @@ Portfolio persistence
 Save and load portfolio from JSON file
 """
 
-import json
-import os
 import traceback
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import requests
 
 from src.connectors.iol_client import IOLClient
 from src.connectors.tienda_broker_client import get_tienda_broker_portfolio
+from src.services.portfolio_state import PortfolioChange, get_portfolio_state
 
 PORTFOLIO_FILE = "my_portfolio.json"
 
@@ -48,7 +46,7 @@ def sync_from_tienda_broker() -> bool:
         merged_portfolio = list(current_dict.values())
 
         print("   Step 4: Saving portfolio...")
-        save_portfolio(merged_portfolio)
+        save_portfolio(merged_portfolio, source="tienda_broker")
         print(f"✅ Portfolio synced! {len(tb_assets)} assets from Tienda Broker.")
         print(f"   Total assets after merge: {len(merged_portfolio)}")
         return True
@@ -80,16 +78,14 @@ def get_dolar_mep() -> float:
     return 1050.0
 
 
-def save_portfolio(portfolio: List[Dict[str, Any]]) -> bool:
-    """Save portfolio to JSON file."""
+def save_portfolio(portfolio: List[Dict[str, Any]], source: str = "save") -> bool:
+    """
+    Save portfolio to JSON file.
+    Only writes (atomically) and notifies subscribers when it differs from the
+    in-memory state.
+    """
     try:
-        with open(PORTFOLIO_FILE, "w", encoding="utf-8") as f:
-            json.dump(
-                {"portfolio": portfolio, "last_updated": datetime.now().isoformat()},
-                f,
-                indent=2,
-                ensure_ascii=False,
-            )
+        get_portfolio_state(PORTFOLIO_FILE).replace(portfolio, source=source)
         return True
     except Exception as e:
         print(f"Error saving portfolio: {e}")
@@ -97,19 +93,26 @@ def save_portfolio(portfolio: List[Dict[str, Any]]) -> bool:
 
 
 def load_portfolio() -> Optional[List[Dict[str, Any]]]:
-    """Load portfolio from JSON file."""
+    """
+    Load portfolio (a copy of the in-memory state).
+    The JSON file is only re-read when it changed on disk.
+    """
     try:
-        if os.path.exists(PORTFOLIO_FILE):
-            with open(PORTFOLIO_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                from typing import cast
-                return cast(List[Dict[str, Any]], data.get("portfolio", []))
-        return None
+        return get_portfolio_state(PORTFOLIO_FILE).get()
     except Exception as e:
         print(f"Error loading portfolio: {e}")
         return None
 
 
+def subscribe_portfolio_changes(callback: Callable[[PortfolioChange], None]):
+    """Register a callback for portfolio changes (IOL/Tienda Broker syncs, saves, external edits)."""
+    get_portfolio_state(PORTFOLIO_FILE).subscribe(callback)
+
+
+def unsubscribe_portfolio_changes(callback: Callable[[PortfolioChange], None]):
+    get_portfolio_state(PORTFOLIO_FILE).unsubscribe(callback)
+
+
 def sync_from_iol(iol_client: IOLClient) -> bool:
     """
     Synchronize local portfolio with IOL account.
@@ -174,7 +177,7 @@ def sync_from_iol(iol_client: IOLClient) -> bool:
 
             merged_portfolio = list(current_dict.values())
 
-            save_portfolio(merged_portfolio)
+            save_portfolio(merged_portfolio, source="iol")
             print(f"✅ Portfolio synced! {len(new_portfolio)} assets from IOL.")
             return True
         else:
@@ -342,7 +345,7 @@ def update_prices_from_iol(iol_client: IOLClient) -> bool:
             total_value += asset.get("total_val", 0)
 
         if updated_count > 0:
-            save_portfolio(portfolio)
+            save_portfolio(portfolio, source="iol_prices")
             print(f"✅ Updated prices for {updated_count} assets.")
             print(f"   New Total Value: ${total_value:,.2f}")
             return True
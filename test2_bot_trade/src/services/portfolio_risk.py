@@ -0,0 +1,293 @@
+"""
+Motor de Riesgo del Portafolio
+VaR / CVaR paramétricos (normal) del portafolio completo, VaR marginal y por
+componente, y el riesgo incremental de una orden antes de enviarla.
+
+- Posiciones (valor en ARS por símbolo) y matriz de covarianza de retornos
+  diarios viven como arrays de NumPy; la covarianza se calcula una vez desde
+  market_data y se reutiliza hasta que vence (`cov_ttl`).
+- Se mantienen cacheados Σw y w'Σw: el VaR de una orden propuesta sale en
+  O(1) (w'Σw + 2δ(Σw)ᵢ + δ²Σᵢᵢ) y aplicar una orden ejecutada es O(N).
+- Símbolos sin historia suficiente usan una volatilidad diaria por defecto y
+  correlación cero con el resto.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.logger import get_logger
+
+logger = get_logger("portfolio_risk")
+
+DEFAULT_DAILY_VOL = 0.03  # 3% diario para símbolos sin historia
+MIN_OBSERVATIONS = 20
+MAX_DAILY_RETURN = 0.5  # Saltos mayores son splits / cambios de unidad en market_data, no riesgo
+
+
+def position_value(position: Dict) -> float:
+    """Valor de una posición de my_portfolio.json"""
+    value = position.get('total_val')
+    if value:
+        return float(value)
+    price = position.get('last_price') or position.get('avg_price') or 0.0
+    return float(position.get('quantity', 0) or 0) * float(price)
+
+
+def load_returns(symbols: Iterable[str], lookback: int = 250) -> pd.DataFrame:
+    """Retornos diarios (columnas = símbolos) de las últimas `lookback` barras de market_data"""
+    from src.core.database import read_engine
+
+    symbols = sorted(set(symbols))
+    if not symbols:
+        return pd.DataFrame()
+    placeholders = ", ".join(f":s{i}" for i in range(len(symbols)))
+    query = f"SELECT symbol, timestamp, close FROM market_data WHERE symbol IN ({placeholders})"
+    with read_engine.connect() as conn:
+        bars = pd.read_sql_query(query, conn, params={f"s{i}": s for i, s in enumerate(symbols)},
+                                 parse_dates=['timestamp'])
+    if bars.empty:
+        return pd.DataFrame()
+    close = bars.dropna(subset=['close']).pivot_table(index='timestamp', columns='symbol', values='close')
+    # Retornos por símbolo sobre sus propias barras (sin rellenar huecos entre mercados)
+    returns = {s: close[s].dropna().pct_change().iloc[-lookback:] for s in close.columns}
+    returns = pd.DataFrame(returns).replace([np.inf, -np.inf], np.nan)
+    return returns.mask(returns.abs() > MAX_DAILY_RETURN)
+
+
+class PortfolioRiskEngine:
+    """
+    Uso:
+        engine = PortfolioRiskEngine(confidence=0.95)
+        engine.set_returns(load_returns(symbols))
+        engine.set_positions(portfolio)
+        engine.var(), engine.cvar(), engine.component_var()
+        allowed, reason, metrics = engine.check_order('GGAL', 'BUY', 100, 7800.0, equity=1_000_000)
+    """
+
+    def __init__(self, confidence: float = 0.95, horizon_days: int = 1,
+                 max_var_pct: float = 0.08, max_component_pct: float = 0.40,
+                 cov_ttl: float = 6 * 3600):
+        self.confidence = confidence
+        self.horizon_days = horizon_days
+        self.max_var_pct = max_var_pct
+        self.max_component_pct = max_component_pct
+        self.cov_ttl = cov_ttl
+
+        normal = NormalDist()
+        z = normal.inv_cdf(confidence)
+        scale = math.sqrt(horizon_days)
+        self._var_factor = z * scale
+        self._cvar_factor = normal.pdf(z) / (1 - confidence) * scale
+
+        self._lock = threading.Lock()
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._cov = np.zeros((0, 0))
+        self._values = np.zeros(0)
+        self._sigma_w = np.zeros(0)
+        self._variance = 0.0
+        self._cov_loaded_at: Optional[float] = None
+        self.stats = Counter()
+
+    # ==================== ESTADO ====================
+
+    def _grow(self, symbols: Iterable[str]):
+        """Agrega símbolos sin historia (vol por defecto, correlación cero)"""
+        new = [s for s in symbols if s not in self._index]
+        if not new:
+            return
+        n, k = len(self.symbols), len(new)
+        cov = np.zeros((n + k, n + k))
+        cov[:n, :n] = self._cov
+        cov[range(n, n + k), range(n, n + k)] = DEFAULT_DAILY_VOL ** 2
+        self._cov = cov
+        self._values = np.concatenate([self._values, np.zeros(k)])
+        self._sigma_w = np.concatenate([self._sigma_w, np.zeros(k)])
+        for symbol in new:
+            self._index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+    def _recompute(self):
+        self._sigma_w = self._cov @ self._values
+        self._variance = float(self._values @ self._sigma_w)
+
+    def set_returns(self, returns: pd.DataFrame):
+        """Recalcula la covarianza (conserva las posiciones actuales)"""
+        cov = returns.cov(min_periods=MIN_OBSERVATIONS) if not returns.empty else pd.DataFrame()
+        with self._lock:
+            held = dict(zip(self.symbols, self._values))
+            self.symbols = list(cov.columns)
+            self._index = {s: i for i, s in enumerate(self.symbols)}
+            matrix = cov.to_numpy(dtype=float, copy=True)
+            # Sin historia suficiente: vol por defecto y covarianza cero
+            diagonal = np.diag(matrix).copy()
+            missing = ~np.isfinite(diagonal)
+            matrix[~np.isfinite(matrix)] = 0.0
+            matrix[missing, missing] = DEFAULT_DAILY_VOL ** 2
+            self._cov = matrix
+            self._values = np.zeros(len(self.symbols))
+            self._grow(held)
+            for symbol, value in held.items():
+                self._values[self._index[symbol]] = value
+            self._recompute()
+            self._cov_loaded_at = time.time()
+
+    def refresh(self, symbols: Iterable[str], lookback: int = 250):
+        """Carga retornos de market_data para los símbolos (más los que ya están en cartera)"""
+        with self._lock:
+            held = [s for s, v in zip(self.symbols, self._values) if v]
+        start = time.perf_counter()
+        self.set_returns(load_returns(set(symbols) | set(held), lookback))
+        logger.info(f"Covarianza de {len(self.symbols)} símbolos en {time.perf_counter() - start:.2f}s")
+
+    def is_stale(self) -> bool:
+        return self._cov_loaded_at is None or time.time() - self._cov_loaded_at > self.cov_ttl
+
+    def set_positions(self, portfolio: Optional[List[Dict]]):
+        """Reemplaza las posiciones (lista de my_portfolio.json)"""
+        positions: Dict[str, float] = {}
+        for p in portfolio or []:
+            symbol = p.get('symbol')
+            if symbol:
+                positions[symbol] = positions.get(symbol, 0.0) + position_value(p)
+        with self._lock:
+            self._grow(positions)
+            self._values = np.zeros(len(self.symbols))
+            for symbol, value in positions.items():
+                self._values[self._index[symbol]] = value
+            self._recompute()
+
+    def apply_order(self, symbol: str, side: str, quantity: float, price: float):
+        """Refleja una orden ejecutada (O(N): actualiza Σw y w'Σw sin recalcular todo)"""
+        with self._lock:
+            self._grow([symbol])
+            i = self._index[symbol]
+            delta = self._order_delta(i, side, quantity, price)
+            self._variance += 2 * delta * self._sigma_w[i] + delta * delta * self._cov[i, i]
+            self._sigma_w += delta * self._cov[:, i]
+            self._values[i] += delta
+
+    # ==================== MÉTRICAS ====================
+
+    @property
+    def total_value(self) -> float:
+        return float(self._values.sum())
+
+    def _sigma(self, variance: float) -> float:
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def var(self) -> float:
+        """VaR del portafolio (ARS) al nivel de confianza y horizonte configurados"""
+        return self._var_factor * self._sigma(self._variance)
+
+    def cvar(self) -> float:
+        """CVaR / Expected Shortfall (ARS), normal"""
+        return self._cvar_factor * self._sigma(self._variance)
+
+    def marginal_var(self) -> Dict[str, float]:
+        """∂VaR/∂wᵢ: VaR extra por cada peso adicional en el símbolo"""
+        with self._lock:
+            sigma = self._sigma(self._variance)
+            if sigma == 0:
+                return {s: 0.0 for s in self.symbols}
+            marginal = self._var_factor * self._sigma_w / sigma
+            return dict(zip(self.symbols, marginal.tolist()))
+
+    def component_var(self) -> Dict[str, float]:
+        """Aporte de cada posición al VaR (suman el VaR total); solo posiciones abiertas"""
+        with self._lock:
+            sigma = self._sigma(self._variance)
+            if sigma == 0:
+                return {}
+            component = self._values * self._var_factor * self._sigma_w / sigma
+            held = np.nonzero(self._values)[0]
+            return {self.symbols[i]: float(component[i]) for i in held}
+
+    def _order_delta(self, i: int, side: str, quantity: float, price: float) -> float:
+        value = float(quantity) * float(price)
+        if side.upper() == 'SELL':
+            # No se puede vender más de lo que hay en cartera
+            return -min(value, max(self._values[i], 0.0))
+        return value
+
+    def incremental_var(self, symbol: str, side: str, quantity: float, price: float) -> Tuple[float, float]:
+        """(VaR después de la orden, cambio de VaR) sin modificar el estado"""
+        with self._lock:
+            return self._incremental(symbol, side, quantity, price)[:2]
+
+    def _incremental(self, symbol, side, quantity, price):
+        i = self._index.get(symbol)
+        if i is None:
+            delta = 0.0 if side.upper() == 'SELL' else float(quantity) * float(price)
+            variance = self._variance + delta * delta * DEFAULT_DAILY_VOL ** 2
+            component = delta * delta * DEFAULT_DAILY_VOL ** 2
+        else:
+            delta = self._order_delta(i, side, quantity, price)
+            cov_ii = self._cov[i, i]
+            variance = self._variance + 2 * delta * self._sigma_w[i] + delta * delta * cov_ii
+            component = (self._values[i] + delta) * (self._sigma_w[i] + delta * cov_ii)
+        var_after = self._var_factor * self._sigma(variance)
+        share = component / variance if variance > 0 else 0.0
+        return var_after, var_after - self._var_factor * self._sigma(self._variance), share
+
+    def check_order(self, symbol: str, side: str, quantity: float, price: float,
+                    equity: float) -> Tuple[bool, str, Dict]:
+        """
+        Control pre-trade: bloquea la orden si aumenta el riesgo y deja el VaR
+        del portafolio por encima de `max_var_pct` del equity, o si el símbolo
+        pasaría a aportar más de `max_component_pct` del VaR. El tope por
+        componente solo aplica con más de 1/max_component_pct posiciones: las
+        participaciones suman 1, así que con menos alguna siempre lo supera.
+        """
+        with self._lock:
+            var_after, incremental, share = self._incremental(symbol, side, quantity, price)
+            held = int(np.count_nonzero(self._values))
+            i = self._index.get(symbol)
+            if side.upper() == 'BUY' and (i is None or not self._values[i]):
+                held += 1  # La orden abre una posición nueva
+        self.stats['checks'] += 1
+        metrics = {
+            'var_before': var_after - incremental,
+            'var_after': var_after,
+            'incremental_var': incremental,
+            'var_pct': var_after / equity if equity > 0 else 0.0,
+            'component_share': share,
+        }
+        if incremental <= 0:
+            return True, "OK", metrics
+        if equity > 0 and var_after > self.max_var_pct * equity:
+            self.stats['blocked'] += 1
+            return False, (f"VaR del portafolio tras la orden ${var_after:,.0f} "
+                           f"({metrics['var_pct']*100:.1f}%) supera el {self.max_var_pct*100:.0f}% del capital"), metrics
+        if held * self.max_component_pct > 1 and share > self.max_component_pct:
+            self.stats['blocked'] += 1
+            return False, (f"{symbol} aportaría {share*100:.0f}% del VaR del portafolio "
+                           f"(máximo {self.max_component_pct*100:.0f}%)"), metrics
+        return True, "OK", metrics
+
+    def get_report(self) -> Dict:
+        var = self.var()
+        total_value = self.total_value
+        return {
+            'total_value': total_value,
+            'var': var,
+            'cvar': self.cvar(),
+            'var_pct': var / total_value if total_value > 0 else 0.0,
+            'confidence': self.confidence,
+            'horizon_days': self.horizon_days,
+            'component_var': self.component_var(),
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'symbols': len(self.symbols),
+            'positions': int(np.count_nonzero(self._values)),
+            'cov_age_s': time.time() - self._cov_loaded_at if self._cov_loaded_at else None,
+        }
@@ -9,11 +9,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import numpy as np
 import pandas as pd
-import ta
 
 from src.core.database import SessionLocal
 from src.models.market_data import MarketData
 from src.models.price_predictor import LSTMPricePredictor
+from src.services.feature_store import compute_lstm_features, get_feature_store
 
 
 class PredictionService:
@@ -24,6 +24,7 @@ class PredictionService:
     def __init__(self, model_path="models"):
         self.model_path = model_path
         self.models = {}
+        self.feature_store = get_feature_store()
 
     def load_model(self, symbol):
         """
@@ -74,54 +75,9 @@ class PredictionService:
         """
         Generate technical indicators for machine learning features.
         Target column (Close) MUST be first.
-        Match logic with ContinuousLearning.
+        Shared definition with ContinuousLearning (feature store 'lstm_basic').
         """
-        df = df.copy()
-        
-        # 1. Momentum: RSI
-        df['rsi'] = ta.momentum.rsi(df['close'], window=14)
-        
-        # 2. Trend: MACD
-        macd = ta.trend.MACD(df['close'])
-        df['macd'] = macd.macd()
-        
-        # 3. Volatility: Bollinger Band Width
-        bb = ta.volatility.BollingerBands(df['close'], window=20)
-        bb_upper = bb.bollinger_hband()
-        bb_lower = bb.bollinger_lband()
-        bb_middle = bb.bollinger_mavg()
-        # Evitar división por cero
-        df['bb_width'] = np.where(
-            bb_middle != 0,
-            (bb_upper - bb_lower) / bb_middle,
-            0
-        )
-        
-        # 4. Trend strength: Distance from SMA 20
-        sma = ta.trend.SMAIndicator(df['close'], window=20)
-        sma_values = sma.sma_indicator()
-        # Evitar división por cero
-        df['sma_dist'] = np.where(
-            sma_values != 0,
-            (df['close'] - sma_values) / sma_values,
-            0
-        )
-        
-        # 5. Volume: ROC
-        df['vol_roc'] = df['volume'].pct_change()
-        
-        # Reemplazar infinitos y NaN
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-        df.dropna(inplace=True)
-        
-        # Verificar que no queden infinitos
-        if not np.isfinite(df.select_dtypes(include=[np.number]).values).all():
-            # Si aún hay infinitos, reemplazarlos con 0
-            df.replace([np.inf, -np.inf], 0, inplace=True)
-        
-        # Select and order columns: Close MUST be first
-        feature_cols = ['close', 'rsi', 'macd', 'bb_width', 'sma_dist', 'vol_roc']
-        return df[feature_cols]
+        return compute_lstm_features(df)
 
     def get_recent_data(self, symbol, days=150):
         """
@@ -162,19 +118,14 @@ class PredictionService:
             return None
         
         try:
-            # Get data
-            df_raw = self.get_recent_data(symbol)
-            
-            # Feature Engineering
-            df_features = self.prepare_features(df_raw)
+            # Features desde el feature store: solo se calculan las barras nuevas
+            self.feature_store.update_from_db(symbol, 'lstm_basic')
+            recent_features = self.feature_store.get_matrix(symbol, 'lstm_basic', n=60)
             
             # Check if we have enough data after dropping NaNs
-            if len(df_features) < 60:
+            if recent_features is None or len(recent_features) < 60:
                 return None  # No hay suficientes datos
             
-            # Take last 60 rows
-            recent_features = df_features.values[-60:]
-            
             # Predict
             prediction = predictor.predict(recent_features)
             
@@ -10,6 +10,7 @@ from threading import Thread
 from src.core.logger import get_logger
 from src.connectors.iol_client import IOLClient
 from src.services.realtime_alerts import RealtimeAlertSystem
+from src.services.trigger_engine import TriggerEngine, quote_watchlist
 
 logger = get_logger("price_monitor")
 
@@ -21,6 +22,7 @@ class PriceMonitor:
         self.iol_client = IOLClient()
         self.alert_system = RealtimeAlertSystem()
         self.price_alerts = []  # Lista de alertas de precio configuradas
+        self.engine = TriggerEngine()  # Alertas no disparadas indexadas por símbolo y nivel
         self.monitoring = False
         self.monitor_thread = None
     
@@ -45,6 +47,7 @@ class PriceMonitor:
         }
         
         self.price_alerts.append(alert)
+        self.engine.add(id(alert), symbol, target_price, direction, payload=alert)
         try:
             logger.info(f"Alerta de precio agregada: {symbol} {direction} ${target_price}")
         except (ValueError, IOError):
@@ -55,12 +58,14 @@ class PriceMonitor:
     def remove_price_alert(self, symbol: str, target_price: Optional[float] = None):
         """Elimina alerta(s) de precio"""
         if target_price:
-            self.price_alerts = [
-                a for a in self.price_alerts
-                if not (a['symbol'] == symbol and a['target_price'] == target_price)
-            ]
+            removed = [a for a in self.price_alerts
+                       if a['symbol'] == symbol and a['target_price'] == target_price]
         else:
-            self.price_alerts = [a for a in self.price_alerts if a['symbol'] != symbol]
+            removed = [a for a in self.price_alerts if a['symbol'] == symbol]
+        removed_ids = {id(a) for a in removed}
+        self.price_alerts = [a for a in self.price_alerts if id(a) not in removed_ids]
+        for alert_id in removed_ids:
+            self.engine.remove(alert_id)
         
         try:
             logger.info(f"Alerta(s) de precio eliminada(s) para {symbol}")
@@ -68,53 +73,45 @@ class PriceMonitor:
             pass  # Ignorar errores de logging si el archivo está cerrado
     
     def check_price_alerts(self):
-        """Verifica todas las alertas de precio"""
-        for alert in self.price_alerts:
-            if alert['triggered']:
-                continue
-            
+        """Verifica todas las alertas de precio (una cotización por símbolo del watchlist)"""
+        prices = quote_watchlist(self.iol_client, self.engine.watchlist())
+        return self.on_prices(prices)
+    
+    def on_prices(self, prices: Dict[str, float]) -> List[Dict]:
+        """
+        Procesa un tick de precios (del polling o de un stream de cotizaciones)
+        y dispara las alertas cuyo nivel fue cruzado.
+        """
+        triggered_alerts = []
+        for fired in self.engine.on_prices(prices):
+            alert = fired.trigger.payload
+            current_price = fired.price
             try:
-                quote = self.iol_client.get_quote(alert['symbol'])
-                
-                if 'error' in quote:
-                    continue
-                
-                current_price = quote.get('ultimoPrecio', 0)
-                
-                if not current_price:
-                    continue
+                alert['triggered'] = True
+                alert['triggered_at'] = datetime.now().isoformat()
+                alert['triggered_price'] = current_price
+                triggered_alerts.append(alert)
                 
-                # Verificar si se alcanzó el precio objetivo
-                triggered = False
-                if alert['direction'] == 'above' and current_price >= alert['target_price']:
-                    triggered = True
-                elif alert['direction'] == 'below' and current_price <= alert['target_price']:
-                    triggered = True
+                # Enviar alerta
+                self.alert_system.alert_price_alert(
+                    symbol=alert['symbol'],
+                    current_price=current_price,
+                    target_price=alert['target_price'],
+                    direction=alert['direction'],
+                    level=alert['level']
+                )
                 
-                if triggered:
-                    alert['triggered'] = True
-                    alert['triggered_at'] = datetime.now().isoformat()
-                    alert['triggered_price'] = current_price
-                    
-                    # Enviar alerta
-                    self.alert_system.alert_price_alert(
-                        symbol=alert['symbol'],
-                        current_price=current_price,
-                        target_price=alert['target_price'],
-                        direction=alert['direction'],
-                        level=alert['level']
-                    )
-                    
-                    try:
-                        logger.info(f"Alerta de precio activada: {alert['symbol']} ${current_price}")
-                    except (ValueError, IOError):
-                        pass  # Ignorar errores de logging si el archivo está cerrado
+                try:
+                    logger.info(f"Alerta de precio activada: {alert['symbol']} ${current_price}")
+                except (ValueError, IOError):
+                    pass  # Ignorar errores de logging si el archivo está cerrado
             
             except Exception as e:
                 try:
                     logger.error(f"Error verificando alerta de precio {alert['symbol']}: {e}")
                 except (ValueError, IOError):
                     pass  # Ignorar errores de logging si el archivo está cerrado
+        return triggered_alerts
     
     def start_monitoring(self, interval: int = 60):
         """Inicia monitoreo continuo de precios"""
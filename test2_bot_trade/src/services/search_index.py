@@ -0,0 +1,329 @@
+"""
+Índice Invertido del Agente de Razonamiento
+Búsquedas del AdvancedReasoningAgent (memoria, logs y código) resueltas contra
+un índice token -> entradas en lugar de releer el disco en cada pregunta.
+
+- Código: solo se indexan las líneas candidatas (las que mencionan error,
+  status o code); cada archivo se reindexa únicamente si cambia su
+  (mtime, tamaño).
+- Logs: se sigue cada archivo por offset y se leen solo los bytes nuevos; si
+  el archivo rota (otro inode o se achica) se reindexa desde su cola. Se
+  conservan las últimas `max_log_lines` líneas de error de los
+  `max_log_files` logs más recientes.
+- Memoria: los hechos nuevos se indexan al consultar; si la lista se recortó
+  o se reemplazó se reindexa (como máximo ~1000 hechos).
+- Un thread en segundo plano refresca código y logs cada `interval` segundos;
+  las consultas no tocan el disco.
+"""
+import os
+import re
+import threading
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.logger import get_logger
+
+logger = get_logger("search_index")
+
+TOKEN_RE = re.compile(r'[^\W\d_]+|\d+')
+CODE_KEYWORDS = ('error', 'status', 'code')
+LOG_KEYWORDS = ('ERROR', 'Exception', 'Error')
+LOG_TAIL_BYTES = 256 * 1024
+
+
+def tokenize(text: str) -> Set[str]:
+    """Tokens en minúsculas (palabras y números por separado: 'HTTP401' -> http, 401)"""
+    return set(TOKEN_RE.findall(text.lower()))
+
+
+class _Postings:
+    """Entradas (id -> dato) y su índice invertido token -> ids"""
+
+    def __init__(self):
+        self.entries: Dict[int, Tuple] = {}
+        self.tokens: Dict[int, Set[str]] = {}
+        self.index: Dict[str, Set[int]] = {}
+        self._next_id = 0
+
+    def add(self, entry: Tuple, text: str) -> int:
+        entry_id = self._next_id
+        self._next_id += 1
+        tokens = tokenize(text)
+        self.entries[entry_id] = entry
+        self.tokens[entry_id] = tokens
+        for token in tokens:
+            self.index.setdefault(token, set()).add(entry_id)
+        return entry_id
+
+    def remove(self, entry_id: int):
+        self.entries.pop(entry_id, None)
+        for token in self.tokens.pop(entry_id, ()):
+            ids = self.index.get(token)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.index[token]
+
+    def clear(self):
+        self.entries.clear()
+        self.tokens.clear()
+        self.index.clear()
+
+    def lookup(self, tokens: Iterable[str]) -> Counter:
+        """id -> cantidad de tokens de la consulta que contiene"""
+        scores = Counter()
+        for token in tokens:
+            for entry_id in self.index.get(token, ()):
+                scores[entry_id] += 1
+        return scores
+
+
+class SearchIndex:
+    """
+    Uso:
+        index = get_search_index(bot_directory)
+        index.search_logs('401')
+        index.search_code('401')
+        index.search_memory('riesgo merval', agent.memory['facts'])
+    """
+
+    def __init__(self, bot_directory: str = ".", interval: float = 30.0,
+                 max_log_files: int = 3, max_log_lines: int = 500):
+        self.bot_directory = Path(bot_directory)
+        self.code_dir = self.bot_directory / "src"
+        self.log_dir = self.bot_directory / "logs"
+        self.interval = interval
+        self.max_log_files = max_log_files
+        self.max_log_lines = max_log_lines
+
+        self._lock = threading.RLock()
+        self._code = _Postings()
+        self._code_files: Dict[Path, Tuple[Tuple, List[int]]] = {}  # archivo -> (firma, ids)
+        self._logs = _Postings()
+        self._log_files: Dict[Path, Dict] = {}  # archivo -> {inode, mtime, offset, ids, partial}
+        self._memory = _Postings()
+        self._memory_state: Tuple = (None, 0, None)  # (lista, hechos indexados, primer hecho)
+        self._refreshed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== MANTENIMIENTO ====================
+
+    def start(self):
+        """Inicia el refresco periódico en segundo plano"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="search-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refrescando índice de búsqueda: {e}")
+            self._stop.wait(self.interval)
+
+    def refresh(self):
+        """Reindexa solo los archivos de código y logs que cambiaron"""
+        with self._lock:
+            self._refresh_code()
+            self._refresh_logs()
+            self._refreshed = True
+
+    def _ensure_fresh(self):
+        # Primera consulta antes de que el thread termine su primera pasada
+        if not self._refreshed:
+            self.refresh()
+
+    def _refresh_code(self):
+        current = set(self.code_dir.rglob("*.py")) if self.code_dir.exists() else set()
+        for path in set(self._code_files) - current:
+            for entry_id in self._code_files.pop(path)[1]:
+                self._code.remove(entry_id)
+
+        for path in current:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            known = self._code_files.get(path)
+            if known is not None and known[0] == signature:
+                continue
+            if known is not None:
+                for entry_id in known[1]:
+                    self._code.remove(entry_id)
+            self._code_files[path] = (signature, self._index_code_file(path))
+
+    def _index_code_file(self, path: Path) -> List[int]:
+        ids = []
+        relative = str(path.relative_to(self.bot_directory))
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line_no, line in enumerate(f, 1):
+                    lower = line.lower()
+                    if not any(keyword in lower for keyword in CODE_KEYWORDS):
+                        continue
+                    generic = 'error' in lower and ('code' in lower or 'status' in lower)
+                    text = f"{relative}:{line_no} - {line.strip()[:100]}"
+                    ids.append(self._code.add((text, generic), line))
+        except OSError:
+            pass
+        return ids
+
+    def _refresh_logs(self):
+        if self.log_dir.exists():
+            logs = []
+            for path in self.log_dir.glob("*.log"):
+                try:
+                    logs.append((path.stat().st_mtime, path))
+                except OSError:
+                    continue
+            recent = {path for _, path in sorted(logs, reverse=True)[:self.max_log_files]}
+        else:
+            recent = set()
+
+        for path in set(self._log_files) - recent:
+            self._drop_log(path)
+        for path in recent:
+            self._tail_log(path)
+
+    def _drop_log(self, path: Path):
+        for entry_id in self._log_files.pop(path)['ids']:
+            self._logs.remove(entry_id)
+
+    def _tail_log(self, path: Path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        state = self._log_files.get(path)
+        if state is not None and (state['inode'] != stat.st_ino or stat.st_size < state['offset']):
+            # Rotación: el archivo es otro
+            self._drop_log(path)
+            state = None
+        if state is None:
+            offset = max(0, stat.st_size - LOG_TAIL_BYTES)
+            state = self._log_files[path] = {
+                'inode': stat.st_ino, 'offset': offset, 'ids': deque(),
+                'partial': b'', 'skip_first': offset > 0,
+            }
+        state['mtime'] = stat.st_mtime
+        if stat.st_size == state['offset']:
+            return
+
+        with open(path, 'rb') as f:
+            f.seek(state['offset'])
+            chunk = f.read(stat.st_size - state['offset'])
+        state['offset'] += len(chunk)
+        lines = (state['partial'] + chunk).split(b'\n')
+        state['partial'] = lines.pop()  # línea incompleta: se completa en el próximo refresco
+        if state.pop('skip_first', False) and lines:
+            lines.pop(0)  # empezamos a leer a mitad de una línea
+
+        ids = state['ids']
+        for raw in lines:
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if not any(keyword in line for keyword in LOG_KEYWORDS):
+                continue
+            ids.append(self._logs.add((line[:200], path), line))
+            if len(ids) > self.max_log_lines:
+                self._logs.remove(ids.popleft())
+
+    def _sync_memory(self, facts: List[Dict]):
+        indexed_list, count, first = self._memory_state
+        if facts is not indexed_list or len(facts) < count or (count and facts[0] is not first):
+            self._memory.clear()
+            count = 0
+        for position in range(count, len(facts)):
+            fact = facts[position]
+            text = f"{fact.get('title', '')} {fact.get('snippet', '')} {fact.get('query', '')}"
+            self._memory.add((fact, tokenize(fact.get('query', ''))), text)
+        self._memory_state = (facts, len(facts), facts[0] if facts else None)
+
+    # ==================== CONSULTAS ====================
+
+    def search_logs(self, error_code: str = None, limit: int = 10) -> List[str]:
+        """Líneas de error de los logs recientes, las más nuevas primero"""
+        with self._lock:
+            self._ensure_fresh()
+            if error_code:
+                ids = self._logs.lookup(tokenize(error_code))
+                needed = len(tokenize(error_code))
+                matching = [i for i, hits in ids.items() if hits == needed]
+            else:
+                matching = list(self._logs.entries)
+            # Primero el log modificado más recientemente; dentro de cada log los
+            # ids crecen con el orden de lectura (mayor id = línea más nueva)
+            mtimes = {path: state['mtime'] for path, state in self._log_files.items()}
+            matching.sort(key=lambda i: (mtimes.get(self._logs.entries[i][1], 0), i), reverse=True)
+            return [self._logs.entries[i][0] for i in matching[:limit]]
+
+    def search_code(self, error_code: str = None, limit: int = 10) -> List[str]:
+        """Referencias a errores en el código, las de más coincidencias primero"""
+        with self._lock:
+            self._ensure_fresh()
+            if error_code:
+                query = tokenize(error_code)
+                scores = self._code.lookup(query | {'error', 'status', 'code'})
+                code_hits = self._code.lookup(query)
+                ranked = sorted((i for i, hits in code_hits.items() if hits == len(query)),
+                                key=lambda i: (-scores[i], self._code.entries[i][0]))
+            else:
+                ranked = sorted((i for i, entry in self._code.entries.items() if entry[1]),
+                                key=lambda i: self._code.entries[i][0])
+            return [self._code.entries[i][0] for i in ranked[:limit]]
+
+    def search_memory(self, query: str, facts: List[Dict], limit: int = 5) -> List[Dict]:
+        """
+        Hechos de memoria relevantes para la consulta: primero los que cubren
+        más palabras de la consulta, a igualdad los más recientes.
+        """
+        if not query or not facts:
+            return []
+        words = tokenize(query)
+        significant = {word for word in words if len(word) > 3}
+        with self._lock:
+            self._sync_memory(facts)
+            scores = self._memory.lookup(significant or words)
+            ranked = []
+            for entry_id, hits in scores.items():
+                fact, fact_query = self._memory.entries[entry_id]
+                # Misma consulta que la que originó el hecho: máxima relevancia
+                bonus = len(words) if words <= fact_query else 0
+                ranked.append((hits + bonus, fact.get('timestamp', ''), fact))
+        ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [fact for _, _, fact in ranked[:limit]]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'code_files': len(self._code_files),
+                'code_lines': len(self._code.entries),
+                'log_files': len(self._log_files),
+                'log_lines': len(self._logs.entries),
+                'memory_facts': len(self._memory.entries),
+                'tokens': len(self._code.index) + len(self._logs.index) + len(self._memory.index),
+            }
+
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(bot_directory: str = ".") -> SearchIndex:
+    """Índice compartido por directorio del bot (con su thread de refresco ya iniciado)"""
+    key = os.path.abspath(bot_directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SearchIndex(bot_directory)
+            index.start()
+        return index
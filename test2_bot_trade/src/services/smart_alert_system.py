@@ -10,6 +10,7 @@ from pathlib import Path
 from src.core.logger import get_logger
 from src.services.telegram_bot import TelegramAlertBot
 from src.services.enhanced_learning_system import EnhancedLearningSystem
+from src.services.operations_log import get_operations_log
 
 logger = get_logger("smart_alert_system")
 
@@ -20,7 +21,7 @@ class SmartAlertSystem:
     def __init__(self):
         self.telegram_bot = TelegramAlertBot()
         self.learning_system = EnhancedLearningSystem()
-        self.operations_log_file = Path("data/operations_log.json")
+        self.operations_log = get_operations_log()
         self.alert_history_file = Path("data/alert_history.json")
         self.alert_history_file.parent.mkdir(parents=True, exist_ok=True)
         self.last_alert_times = {}  # Para evitar spam
@@ -71,19 +72,13 @@ class SmartAlertSystem:
     
     def check_opportunities(self) -> List[Dict]:
         """MEJORA #8: Detecta oportunidades de trading actuales"""
-        if not self.operations_log_file.exists():
-            return []
-        
         try:
-            with open(self.operations_log_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
+            # Analizar últimos 50 análisis (tail del log, sin cargar el historial)
+            recent_analyses = self.operations_log.tail(50, types={'ANALYSIS'})
         except Exception as e:
-            logger.error(f"Error leyendo operations_log.json: {e}")
+            logger.error(f"Error leyendo log de operaciones: {e}")
             return []
         
-        # Analizar últimas 50 operaciones
-        recent_analyses = [op for op in operations if op.get('type') == 'ANALYSIS'][-50:]
-        
         opportunities = []
         
         # Agrupar por símbolo y encontrar los mejores
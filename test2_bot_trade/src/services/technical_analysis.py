@@ -11,10 +11,38 @@ import numpy as np
 import pandas as pd
 import ta
 
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal, SessionLocal
 from src.models.market_data import MarketData
 
 
+def load_last_bars(db, symbol, limit):
+    """
+    Últimas `limit` barras diarias del símbolo en orden cronológico.
+
+    Recorre el índice cubriente (symbol, timestamp, OHLCV) de atrás hacia
+    adelante y se da vuelta en memoria, como PredictionService.get_recent_data.
+    """
+    records = (
+        db.query(MarketData.timestamp, MarketData.open, MarketData.high,
+                 MarketData.low, MarketData.close, MarketData.volume)
+        .filter(MarketData.symbol == symbol)
+        .order_by(MarketData.timestamp.desc())
+        .limit(limit)
+        .all()
+    )
+    records.reverse()
+    df = pd.DataFrame({
+        "timestamp": [r.timestamp for r in records],
+        "open": [r.open for r in records],
+        "high": [r.high for r in records],
+        "low": [r.low for r in records],
+        "close": [r.close for r in records],
+        "volume": [r.volume for r in records],
+    })
+    df.set_index("timestamp", inplace=True)
+    return df
+
+
 class TechnicalAnalysisService:
     """
     Service for calculating technical indicators and volatility metrics.
@@ -29,29 +57,10 @@ class TechnicalAnalysisService:
         self.iol_client = iol_client
 
     def get_historical_data(self, symbol, days=100):
-        """Load historical data from database as DataFrame."""
-        db = SessionLocal()
+        """Load the most recent `days` bars from the database as DataFrame (oldest first)."""
+        db = ReadSessionLocal()
         try:
-            records = (
-                db.query(MarketData)
-                .filter(MarketData.symbol == symbol)
-                .order_by(MarketData.timestamp)
-                .limit(days)
-                .all()
-            )
-
-            data = {
-                "timestamp": [r.timestamp for r in records],
-                "open": [r.open for r in records],
-                "high": [r.high for r in records],
-                "low": [r.low for r in records],
-                "close": [r.close for r in records],
-                "volume": [r.volume for r in records],
-            }
-
-            df = pd.DataFrame(data)
-            df.set_index("timestamp", inplace=True)
-            return df
+            return load_last_bars(db, symbol, days)
         finally:
             db.close()
 
@@ -2,10 +2,14 @@
 Trailing Stop Loss - Maximiza ganancias protegiendo capital
 Mueve el stop loss automáticamente cuando el precio sube
 """
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 import json
+import os
+
+from src.services.trigger_engine import ABOVE, BELOW, TriggerEngine
 
 
 class TrailingStopLoss:
@@ -26,6 +30,14 @@ class TrailingStopLoss:
         self.positions_file = Path("trailing_stops.json")
         self.trailing_stops = self._load_trailing_stops()
         
+        # Cada posición solo se re-evalúa cuando el precio cruza uno de sus niveles:
+        # el stop (below), un nuevo máximo o el precio de activación (above)
+        self.engine = TriggerEngine()
+        self._batch_depth = 0
+        self._dirty = False
+        for symbol in self.trailing_stops:
+            self._arm(symbol)
+        
     def _load_trailing_stops(self) -> Dict:
         """Carga trailing stops guardados"""
         if not self.positions_file.exists():
@@ -38,13 +50,48 @@ class TrailingStopLoss:
             return {}
     
     def _save_trailing_stops(self):
-        """Guarda trailing stops"""
+        """Guarda trailing stops (dentro de un batch, solo marca el estado como modificado)"""
+        if self._batch_depth:
+            self._dirty = True
+            return
         try:
-            with open(self.positions_file, 'w') as f:
+            tmp_path = self.positions_file.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
                 json.dump(self.trailing_stops, f, indent=2)
+            os.replace(tmp_path, self.positions_file)
+            self._dirty = False
         except Exception as e:
             print(f"⚠️  Error guardando trailing stops: {e}")
     
+    @contextmanager
+    def batched_saves(self):
+        """Agrupa todos los cambios del bloque en una sola escritura a disco"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._save_trailing_stops()
+    
+    def _arm(self, symbol: str):
+        """(Re)registra los niveles de la posición en el motor de triggers"""
+        position = self.trailing_stops.get(symbol)
+        if position is None:
+            self.engine.remove_symbol(symbol)
+            return
+        self.engine.add((symbol, 'stop'), symbol, position['current_stop_loss'], BELOW)
+        self.engine.add((symbol, 'high'), symbol, position['highest_price'], ABOVE, strict=True)
+        if position['activated']:
+            self.engine.remove((symbol, 'activation'))
+        else:
+            activation_price = position['entry_price'] * (1 + position['activation_pct'] / 100)
+            self.engine.add((symbol, 'activation'), symbol, activation_price, ABOVE)
+    
+    def watchlist(self) -> List[str]:
+        """Símbolos a cotizar en cada tick"""
+        return self.engine.watchlist()
+    
     def add_position(
         self, 
         symbol: str, 
@@ -78,6 +125,7 @@ class TrailingStopLoss:
             'last_update': datetime.now().isoformat()
         }
         
+        self._arm(symbol)
         self._save_trailing_stops()
         
         print(f"✅ Trailing stop activado para {symbol}")
@@ -173,6 +221,7 @@ class TrailingStopLoss:
             
             # Remover de tracking (se venderá)
             del self.trailing_stops[symbol]
+            self.engine.remove_symbol(symbol)
             self._save_trailing_stops()
             
             return {
@@ -182,15 +231,20 @@ class TrailingStopLoss:
                 'current_price': current_price,
                 'stop_price': active_stop,
                 'entry_price': entry_price,
+                'quantity': position['quantity'],
                 'gain_pct': gain
             }
         
+        self._arm(symbol)
         return None
     
     def update_all(self, prices: Dict[str, float]) -> list:
         """
         Actualiza todos los trailing stops
         
+        Solo se re-evalúan los símbolos cuyo precio cruzó alguno de sus niveles
+        y el estado se guarda una sola vez al final.
+        
         Args:
             prices: Dict con {symbol: current_price}
             
@@ -199,8 +253,9 @@ class TrailingStopLoss:
         """
         actions = []
         
-        for symbol in list(self.trailing_stops.keys()):
-            if symbol in prices:
+        with self.batched_saves():
+            fired_symbols = dict.fromkeys(fired.trigger.symbol for fired in self.engine.on_prices(prices))
+            for symbol in fired_symbols:
                 action = self.update(symbol, prices[symbol])
                 if action:
                     actions.append(action)
@@ -211,6 +266,7 @@ class TrailingStopLoss:
         """Remueve trailing stop para un símbolo"""
         if symbol in self.trailing_stops:
             del self.trailing_stops[symbol]
+            self.engine.remove_symbol(symbol)
             self._save_trailing_stops()
             print(f"✅ Trailing stop removido para {symbol}")
     
@@ -0,0 +1,471 @@
+"""
+Training Farm - Entrenamiento paralelo de modelos para muchos símbolos
+Reparte trabajos (símbolo × arquitectura) entre procesos con un número fijo
+de threads por proceso, guarda el progreso para retomar un reentrenamiento
+interrumpido y reporta el throughput en muestras/segundo.
+
+Trabajos soportados:
+- 'lstm': LSTMPricePredictor por símbolo (modelos de ContinuousLearning)
+- 'ensemble': una arquitectura del ensemble de NeuralNetworkServiceComplete
+  (lstm / gru / cnn_lstm); cuando terminan las tres se arma el ensemble
+"""
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.core.logger import get_logger
+
+logger = get_logger("training_farm")
+
+ENSEMBLE_ARCHITECTURES = ('lstm', 'gru', 'cnn_lstm')
+
+# Directorios por defecto de cada tipo de modelo (ContinuousLearning / NeuralNetworkServiceComplete)
+DEFAULT_MODEL_PATHS = {'lstm': "models", 'ensemble': "data/models"}
+
+
+# ==================== VENTANAS ====================
+
+def sequence_windows(data: np.ndarray, lookback: int, horizon: int, target_col: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ventanas de entrenamiento como vistas strided (sin copiar los datos).
+
+    X[k] = data[k : k + lookback] e y[k] = data[k + lookback + horizon, target_col],
+    igual que el loop `for i in range(lookback, len(data) - horizon)`.
+
+    Returns:
+        X de forma (muestras, lookback, features) e y de forma (muestras,)
+    """
+    n_samples = len(data) - lookback - horizon
+    if n_samples <= 0:
+        return np.empty((0, lookback, data.shape[1])), np.empty((0,))
+    x = sliding_window_view(data, lookback, axis=0)[:n_samples].transpose(0, 2, 1)
+    y = data[lookback + horizon:, target_col][:n_samples]
+    return x, y
+
+
+def multi_horizon_windows(data: np.ndarray, lookback: int, horizons, target_col: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Como sequence_windows pero con un target por horizonte:
+    y[k, j] = data[k + lookback + horizons[j], target_col].
+
+    Returns:
+        X de forma (muestras, lookback, features) e y de forma (muestras, len(horizons))
+    """
+    n_samples = len(data) - lookback - max(horizons)
+    if n_samples <= 0:
+        return np.empty((0, lookback, data.shape[1])), np.empty((0, len(horizons)))
+    x = sliding_window_view(data, lookback, axis=0)[:n_samples].transpose(0, 2, 1)
+    y = np.stack([data[lookback + h:lookback + h + n_samples, target_col] for h in horizons], axis=1)
+    return x, y
+
+
+def make_window_batches(x: np.ndarray, y: np.ndarray, indices: np.ndarray, batch_size: int = 32,
+                        noise_factor: float = 0.0, shuffle: bool = True):
+    """
+    Secuencia de Keras que materializa cada batch desde las vistas strided.
+
+    Con noise_factor > 0 cada batch incluye además una copia con ruido
+    (data augmentation sin duplicar el dataset en memoria).
+    """
+    from tensorflow import keras
+
+    class WindowBatches(keras.utils.Sequence):
+        def __init__(self):
+            super().__init__()
+            self.order = np.array(indices)
+
+        def __len__(self):
+            return math.ceil(len(self.order) / batch_size)
+
+        def __getitem__(self, i):
+            idx = self.order[i * batch_size:(i + 1) * batch_size]
+            x_batch = np.ascontiguousarray(x[idx], dtype=np.float32)
+            y_batch = np.asarray(y[idx], dtype=np.float32)
+            if noise_factor > 0:
+                noisy = x_batch + np.random.normal(0, noise_factor, x_batch.shape).astype(np.float32)
+                x_batch = np.concatenate([x_batch, noisy])
+                y_batch = np.concatenate([y_batch, y_batch])
+            return x_batch, y_batch
+
+        def on_epoch_end(self):
+            if shuffle:
+                np.random.shuffle(self.order)
+
+    return WindowBatches()
+
+
+# ==================== WORKERS ====================
+
+def _init_worker(threads: int, slot_counter):
+    """Fija threads (y CPUs, si el sistema lo permite) antes de importar TensorFlow"""
+    threads = str(threads)
+    os.environ['OMP_NUM_THREADS'] = threads
+    os.environ['MKL_NUM_THREADS'] = threads
+    os.environ['TF_NUM_INTRAOP_THREADS'] = threads
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+    if hasattr(os, 'sched_setaffinity'):
+        with slot_counter.get_lock():
+            slot = slot_counter.value
+            slot_counter.value += 1
+        cpus = sorted(os.sched_getaffinity(0))
+        n = int(threads)
+        start = (slot * n) % len(cpus)
+        os.sched_setaffinity(0, {cpus[(start + i) % len(cpus)] for i in range(n)})
+
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(int(threads))
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+
+def _run_job(job: Dict) -> Dict:
+    """Punto de entrada de cada proceso: ejecuta un trabajo y mide el throughput"""
+    start = time.perf_counter()
+    try:
+        if job['kind'] == 'lstm':
+            result = _train_lstm(job)
+        elif job['kind'] == 'ensemble':
+            result = _train_ensemble_architecture(job)
+        elif job['kind'] == 'ensemble_assemble':
+            result = _assemble_ensemble(job)
+        else:
+            raise ValueError(f"Tipo de trabajo desconocido: {job['kind']}")
+        result['status'] = 'done'
+    except Exception as e:
+        result = {'status': 'failed', 'error': str(e)}
+
+    result['seconds'] = time.perf_counter() - start
+    samples = result.get('samples', 0)
+    result['samples_per_sec'] = samples / result['seconds'] if result['seconds'] > 0 else 0.0
+    return result
+
+
+def _train_lstm(job: Dict) -> Dict:
+    from src.models.price_predictor import LSTMPricePredictor
+    from src.services.feature_store import get_feature_store
+
+    feature_data = get_feature_store().get_matrix(job['symbol'], 'lstm_basic')
+    if feature_data is None or len(feature_data) < 100:
+        raise ValueError("Not enough data for training")
+
+    predictor = LSTMPricePredictor(sequence_length=60, prediction_days=1)
+    history = predictor.train(feature_data, epochs=job['epochs'], batch_size=job['batch_size'],
+                              validation_split=job['validation_split'], verbose=0)
+
+    os.makedirs(job['model_path'], exist_ok=True)
+    predictor.save(os.path.join(job['model_path'], job['symbol']))
+
+    n_windows = len(feature_data) - predictor.sequence_length - predictor.prediction_days + 1
+    n_train = int(n_windows * (1 - job['validation_split']))
+    epochs_run = len(history.history['loss'])
+    return {
+        'training_loss': float(history.history['loss'][-1]),
+        'validation_loss': float(history.history['val_loss'][-1]),
+        'epochs_run': epochs_run,
+        'samples': n_train * epochs_run,
+    }
+
+
+def _train_ensemble_architecture(job: Dict) -> Dict:
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
+    from src.services.neural_network_service_complete import NeuralNetworkServiceComplete
+
+    service = NeuralNetworkServiceComplete(data_dir=job['model_path'])
+    symbol, arch = job['symbol'], job['arch']
+    features = service.feature_store.get(symbol, 'nn_complete')
+    if features is None:
+        raise ValueError("Sin features para el símbolo")
+
+    horizons = list(service.prediction_horizons)
+    x, y, _, _ = service._prepare_from_features(features, horizons)
+    if x is None or len(x) == 0:
+        raise ValueError("Datos insuficientes")
+
+    # Validación: las últimas ventanas (como validation_split de Keras)
+    split = int(len(x) * (1 - job['validation_split']))
+    train_batches = make_window_batches(x, y, np.arange(split), batch_size=job['batch_size'],
+                                        noise_factor=0.01)
+    validation = (np.ascontiguousarray(x[split:], dtype=np.float32), np.asarray(y[split:], dtype=np.float32))
+
+    model = getattr(service, f"build_{arch}_model")((x.shape[1], x.shape[2]), outputs=len(horizons))
+    callbacks = [
+        EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True, verbose=0),
+        ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-7, verbose=0),
+        ModelCheckpoint(str(service.models_dir / f"{symbol}_{arch}_best.h5"),
+                        monitor='val_loss', save_best_only=True, verbose=0),
+    ]
+    history = model.fit(train_batches, validation_data=validation, epochs=job['epochs'],
+                        callbacks=callbacks, verbose=0)
+    model.save(str(service.models_dir / f"{symbol}_{arch}.h5"))
+
+    epochs_run = len(history.history['loss'])
+    return {
+        'val_loss': float(min(history.history['val_loss'])),
+        'epochs_run': epochs_run,
+        'samples': split * 2 * epochs_run,  # Cada batch incluye su copia con ruido
+    }
+
+
+def _assemble_ensemble(job: Dict) -> Dict:
+    """Arma el ensemble con los modelos entrenados (mismo formato que train_ensemble)"""
+    import joblib
+    from tensorflow.keras.models import load_model
+    from src.services.neural_network_service_complete import NeuralNetworkServiceComplete
+
+    service = NeuralNetworkServiceComplete(data_dir=job['model_path'])
+    symbol = job['symbol']
+    features = service.feature_store.get(symbol, 'nn_complete')
+    horizons = list(service.prediction_horizons)
+    x, _, scaler, feature_cols = service._prepare_from_features(features, horizons)
+
+    model_weights = {arch: 1.0 / (val_loss + 1e-10) for arch, val_loss in job['val_losses'].items()}
+    total_weight = sum(model_weights.values())
+    model_weights = {k: v / total_weight for k, v in model_weights.items()}
+
+    ensemble = {
+        'models': {arch: load_model(str(service.models_dir / f"{symbol}_{arch}.h5"))
+                   for arch in job['val_losses']},
+        'weights': model_weights,
+        'scaler': scaler,
+        'feature_cols': feature_cols,
+        'input_shape': (x.shape[1], x.shape[2]),
+        'horizons': horizons
+    }
+    joblib.dump(ensemble, service.models_dir / f"{symbol}_ensemble.pkl")
+    return {'weights': model_weights}
+
+
+# ==================== FARM ====================
+
+@dataclass
+class FarmReport:
+    """Resumen de una corrida de la farm"""
+    run_id: str
+    jobs_total: int = 0
+    jobs_done: int = 0
+    jobs_resumed: int = 0
+    jobs_failed: int = 0
+    wall_seconds: float = 0.0
+    samples: int = 0
+    results: Dict[str, Dict] = field(default_factory=dict)
+
+    @property
+    def samples_per_sec(self) -> float:
+        return self.samples / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"🏭 Training farm {self.run_id}: {self.jobs_done}/{self.jobs_total} trabajos "
+            f"({self.jobs_resumed} retomados, {self.jobs_failed} fallidos) en {self.wall_seconds:.1f}s",
+            f"   Throughput: {self.samples_per_sec:,.0f} muestras/s ({self.samples:,} muestras)"
+        ]
+        for job_id, result in sorted(self.results.items()):
+            if result.get('status') == 'done' and result.get('samples'):
+                lines.append(f"   {job_id:<32} {result['seconds']:>7.1f}s  "
+                             f"{result['samples_per_sec']:>10,.0f} muestras/s")
+            elif result.get('status') == 'failed':
+                lines.append(f"   {job_id:<32} ❌ {result.get('error')}")
+        return "\n".join(lines)
+
+
+class TrainingFarm:
+    """
+    Entrena modelos de muchos símbolos en paralelo.
+
+    Uso:
+        farm = TrainingFarm(workers=4, threads_per_worker=2)
+        report = farm.run(['GGAL', 'YPF'], kind='lstm', epochs=30)
+        print(report.format())
+    """
+
+    def __init__(self, model_path: Optional[str] = None, workers: Optional[int] = None,
+                 threads_per_worker: int = 2, state_file: str = "data/training_farm_state.json"):
+        """
+        Args:
+            model_path: Directorio de los modelos (default: el de cada servicio)
+            workers: Procesos en paralelo (default: CPUs / threads_per_worker)
+            threads_per_worker: Threads de TensorFlow por proceso (evita sobresuscribir cores)
+            state_file: JSON de progreso para retomar una corrida interrumpida
+        """
+        cpus = os.cpu_count() or 1
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.workers = workers or max(1, cpus // self.threads_per_worker)
+        self.model_path = model_path
+        self.state_file = Path(state_file)
+
+    def _model_path(self, kind: str) -> str:
+        return self.model_path or DEFAULT_MODEL_PATHS[kind]
+
+    # ------------------------------------------------------------------
+    # Estado / checkpoint
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Optional[Dict]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, state: Dict):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, default=str)
+        os.replace(tmp_path, self.state_file)
+
+    def _initial_state(self, kind: str, resume: bool) -> Dict:
+        """Estado de la corrida anterior si quedó incompleta (solo con sus trabajos terminados)"""
+        state = self._load_state() if resume else None
+        if state and state.get('finished_at') is None and state.get('kind') == kind:
+            logger.info(f"Retomando corrida {state['run_id']}")
+            # Los fallidos se reintentan: su resultado viejo no debe habilitar dependientes
+            state['jobs'] = {job_id: r for job_id, r in state['jobs'].items() if r.get('status') == 'done'}
+            return state
+        return {
+            'run_id': datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'kind': kind,
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'jobs': {}
+        }
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def _prepare_features(self, symbols: List[str], feature_set: str) -> List[str]:
+        """Actualiza el feature store en el proceso principal; los workers solo leen el .npz"""
+        from src.services.feature_store import get_feature_store
+
+        store = get_feature_store()
+        ready = []
+        for symbol in symbols:
+            try:
+                store.update_from_db(symbol, feature_set)
+                if store.get_matrix(symbol, feature_set) is not None:
+                    ready.append(symbol)
+                else:
+                    logger.warning(f"Sin datos para {symbol}, se omite")
+            except Exception as e:
+                logger.warning(f"No se pudieron preparar features de {symbol}: {e}")
+        return ready
+
+    def _build_jobs(self, symbols: List[str], kind: str, epochs: int, batch_size: int,
+                    validation_split: float) -> List[Dict]:
+        common = {'model_path': self._model_path(kind), 'epochs': epochs, 'batch_size': batch_size,
+                  'validation_split': validation_split}
+        if kind == 'lstm':
+            return [{'id': f"lstm:{s}", 'kind': 'lstm', 'symbol': s, **common} for s in symbols]
+        return [{'id': f"ensemble:{s}:{arch}", 'kind': 'ensemble', 'symbol': s, 'arch': arch, **common}
+                for s in symbols for arch in ENSEMBLE_ARCHITECTURES]
+
+    def run(self, symbols: List[str], kind: str = 'lstm', epochs: int = 30, batch_size: int = 32,
+            validation_split: float = 0.2, resume: bool = True) -> FarmReport:
+        """
+        Entrena todos los símbolos.
+
+        Args:
+            kind: 'lstm' (modelos de ContinuousLearning) o 'ensemble'
+            resume: Si la corrida anterior quedó incompleta, saltear los trabajos ya terminados
+        """
+        feature_set = 'lstm_basic' if kind == 'lstm' else 'nn_complete'
+        symbols = self._prepare_features(symbols, feature_set)
+        jobs = self._build_jobs(symbols, kind, epochs, batch_size, validation_split)
+
+        state = self._initial_state(kind, resume)
+
+        report = FarmReport(run_id=state['run_id'])
+        done = {job_id for job_id, r in state['jobs'].items() if r.get('status') == 'done'}
+        pending = [job for job in jobs if job['id'] not in done]
+        report.jobs_resumed = len(jobs) - len(pending)
+        report.jobs_total = len(jobs)
+
+        # Ensembles: se arman cuando terminan sus tres arquitecturas
+        assemble_pending = {s for s in symbols if f"ensemble:{s}:assemble" not in done} if kind == 'ensemble' else set()
+        if kind == 'ensemble':
+            report.jobs_total += len(symbols)
+            report.jobs_resumed += len(symbols) - len(assemble_pending)
+
+        self._save_state(state)
+        start = time.perf_counter()
+
+        ctx = multiprocessing.get_context('spawn')  # TensorFlow no es fork-safe
+        slot_counter = ctx.Value('i', 0)
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(self.threads_per_worker, slot_counter)) as executor:
+            futures = {executor.submit(_run_job, job): job for job in pending}
+            futures.update(self._submit_ready_assemblies(executor, state, assemble_pending))
+
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = futures.pop(future)
+                    result = future.result()
+                    result.update({'symbol': job['symbol'], 'finished_at': datetime.now().isoformat()})
+                    state['jobs'][job['id']] = result
+                    self._save_state(state)
+
+                    if result['status'] == 'done':
+                        logger.info(f"{job['id']}: {result['seconds']:.1f}s, "
+                                    f"{result['samples_per_sec']:,.0f} muestras/s")
+                    else:
+                        logger.warning(f"{job['id']} falló: {result.get('error')}")
+
+                futures.update(self._submit_ready_assemblies(executor, state, assemble_pending))
+
+        report.wall_seconds = time.perf_counter() - start
+        for job_id, result in state['jobs'].items():
+            report.results[job_id] = result
+            if result.get('status') == 'done':
+                report.jobs_done += 1
+                if job_id not in done:
+                    report.samples += result.get('samples', 0)
+            else:
+                report.jobs_failed += 1
+
+        if report.jobs_failed == 0:
+            state['finished_at'] = datetime.now().isoformat()
+        state['last_report'] = {
+            'wall_seconds': report.wall_seconds,
+            'samples': report.samples,
+            'samples_per_sec': report.samples_per_sec
+        }
+        self._save_state(state)
+        return report
+
+    def _submit_ready_assemblies(self, executor, state: Dict, assemble_pending: set) -> Dict:
+        """Envía el armado de ensembles cuyas tres arquitecturas terminaron bien en esta corrida"""
+        submitted = {}
+        for symbol in list(assemble_pending):
+            arch_results = {arch: state['jobs'].get(f"ensemble:{symbol}:{arch}") for arch in ENSEMBLE_ARCHITECTURES}
+            if any(r is None for r in arch_results.values()):
+                continue  # Todavía entrenando
+            assemble_pending.discard(symbol)
+            failed = [arch for arch, r in arch_results.items() if r.get('status') != 'done']
+            if failed:
+                # Sin las tres arquitecturas no se arma: queda fallido y se reintenta al retomar
+                state['jobs'][f"ensemble:{symbol}:assemble"] = {
+                    'status': 'failed', 'symbol': symbol, 'seconds': 0.0, 'samples_per_sec': 0.0,
+                    'error': f"Arquitecturas fallidas: {', '.join(failed)}"
+                }
+                continue
+            val_losses = {arch: r['val_loss'] for arch, r in arch_results.items()}
+            job = {'id': f"ensemble:{symbol}:assemble", 'kind': 'ensemble_assemble', 'symbol': symbol,
+                   'model_path': self._model_path('ensemble'), 'val_losses': val_losses}
+            submitted[executor.submit(_run_job, job)] = job
+        return submitted
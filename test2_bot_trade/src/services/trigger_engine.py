@@ -0,0 +1,161 @@
+"""
+Motor de Triggers por Precio
+Niveles de disparo indexados por símbolo (un heap por dirección) para trailing
+stops y alertas de precio: cada precio nuevo dispara todos los niveles cruzados
+en O(k log n), sin recorrer triggers que no se cruzaron.
+
+- 'below': dispara cuando precio <= nivel (stops). Heap de máximos.
+- 'above': dispara cuando precio >= nivel (alertas, nuevos máximos). Heap de mínimos.
+
+Los triggers se eliminan o re-nivelan de forma perezosa (las entradas viejas
+del heap se descartan al llegar al tope).
+"""
+import heapq
+import itertools
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional
+
+ABOVE = 'above'
+BELOW = 'below'
+
+
+class Trigger(NamedTuple):
+    key: Hashable
+    symbol: str
+    direction: str
+    level: float
+    strict: bool
+    payload: Any
+
+
+class Fired(NamedTuple):
+    trigger: Trigger
+    price: float
+
+
+class TriggerEngine:
+    """Triggers de precio por símbolo con heaps above/below"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._triggers: Dict[Hashable, Trigger] = {}
+        self._versions: Dict[Hashable, int] = {}
+        self._heaps: Dict[str, Dict[str, list]] = {}
+        self._seq = itertools.count()
+        self._compacted: Dict[tuple, int] = {}
+
+    def add(self, key: Hashable, symbol: str, level: float, direction: str,
+            payload: Any = None, strict: bool = False) -> Trigger:
+        """
+        Registra (o re-nivela) un trigger.
+
+        Args:
+            key: Identificador único; volver a agregar la misma key reemplaza el trigger
+            strict: Si True, exige cruzar el nivel (> / <) en lugar de tocarlo
+        """
+        if direction not in (ABOVE, BELOW):
+            raise ValueError(f"Dirección inválida: {direction}")
+        trigger = Trigger(key=key, symbol=symbol, direction=direction, level=float(level),
+                          strict=strict, payload=payload)
+        with self._lock:
+            if self._triggers.get(key) == trigger:
+                return trigger  # Sin cambios: no dejar entradas viejas en el heap
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            self._triggers[key] = trigger
+            heaps = self._heaps.setdefault(symbol, {ABOVE: [], BELOW: []})
+            sort_level = trigger.level if direction == ABOVE else -trigger.level
+            heap = heaps[direction]
+            heapq.heappush(heap, (sort_level, next(self._seq), key, version))
+            if len(heap) > 32 and len(heap) > 2 * self._compacted.get((symbol, direction), 0):
+                # Compactar entradas obsoletas (amortizado: solo cuando el heap duplica su tamaño)
+                heap[:] = [entry for entry in heap if self._is_live(entry[2], entry[3])]
+                heapq.heapify(heap)
+                self._compacted[(symbol, direction)] = len(heap)
+        return trigger
+
+    def remove(self, key: Hashable) -> Optional[Trigger]:
+        """Elimina un trigger (su entrada en el heap se descarta al llegar al tope)"""
+        with self._lock:
+            trigger = self._triggers.pop(key, None)
+            if trigger is not None:
+                self._versions[key] += 1
+            return trigger
+
+    def remove_symbol(self, symbol: str) -> List[Trigger]:
+        with self._lock:
+            removed = [t for t in self._triggers.values() if t.symbol == symbol]
+            for trigger in removed:
+                del self._triggers[trigger.key]
+                self._versions[trigger.key] += 1
+            self._heaps.pop(symbol, None)
+            return removed
+
+    def _is_live(self, key, version) -> bool:
+        return key in self._triggers and self._versions.get(key) == version
+
+    def on_price(self, symbol: str, price: float) -> List[Fired]:
+        """
+        Procesa un precio: saca y devuelve todos los triggers cruzados del símbolo.
+        Los triggers disparados se eliminan; el llamador los vuelve a agregar si corresponde.
+        """
+        fired = []
+        with self._lock:
+            heaps = self._heaps.get(symbol)
+            if heaps is None:
+                return fired
+            for direction in (BELOW, ABOVE):
+                heap = heaps[direction]
+                while heap:
+                    sort_level, _, key, version = heap[0]
+                    if not self._is_live(key, version):
+                        heapq.heappop(heap)
+                        continue
+                    level = sort_level if direction == ABOVE else -sort_level
+                    trigger = self._triggers[key]
+                    if direction == ABOVE:
+                        crossed = price > level if trigger.strict else price >= level
+                    else:
+                        crossed = price < level if trigger.strict else price <= level
+                    if not crossed:
+                        break
+                    heapq.heappop(heap)
+                    del self._triggers[key]
+                    self._versions[key] += 1
+                    fired.append(Fired(trigger, price))
+            if not heaps[ABOVE] and not heaps[BELOW]:
+                self._heaps.pop(symbol, None)
+        return fired
+
+    def on_prices(self, prices: Dict[str, float]) -> List[Fired]:
+        """Procesa un tick de varios símbolos (solo los que tienen triggers)"""
+        fired = []
+        for symbol, price in prices.items():
+            if price and symbol in self._heaps:
+                fired.extend(self.on_price(symbol, price))
+        return fired
+
+    def watchlist(self) -> List[str]:
+        """Símbolos con al menos un trigger activo (los que hay que cotizar en cada tick)"""
+        with self._lock:
+            return sorted({t.symbol for t in self._triggers.values()})
+
+    def get(self, key: Hashable) -> Optional[Trigger]:
+        return self._triggers.get(key)
+
+    def __len__(self):
+        return len(self._triggers)
+
+
+def quote_watchlist(iol_client, symbols: Iterable[str]) -> Dict[str, float]:
+    """Una cotización por símbolo del watchlist (no una por trigger)"""
+    prices = {}
+    for symbol in dict.fromkeys(symbols):
+        try:
+            quote = iol_client.get_quote(symbol)
+            price = quote.get('ultimoPrecio') if isinstance(quote, dict) and 'error' not in quote else None
+            if price:
+                prices[symbol] = price
+        except Exception:
+            continue
+    return prices
@@ -0,0 +1,367 @@
+"""
+Walk-Forward Validation Engine
+Validación rolling-origin de configuraciones de estrategia: divide el historial
+en folds train/test, elige la mejor configuración en cada train y la evalúa
+fuera de muestra, en paralelo por símbolo y reutilizando un único kernel de
+simulación sobre arrays numpy compartidos.
+
+Si numba está instalado el kernel se compila (y se cachea en disco); si no,
+corre el mismo código en Python puro.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Optional numba import
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Códigos de salida de los trades del kernel
+EXIT_REASONS = ('stop_loss', 'take_profit', 'signal', 'close')
+
+DEFAULT_STRATEGY = {
+    'buy_threshold': 50.0,
+    'sell_threshold': -50.0,
+    'max_position_size': 0.1,
+    'stop_loss': 0.05,
+    'take_profit': 0.10,
+    'commission': 0.001,
+}
+
+
+@njit(cache=True)
+def simulate_kernel(prices, scores, initial_capital, buy_threshold, sell_threshold,
+                    max_position_size, stop_loss, take_profit, commission):
+    """
+    Simulación long-only barra a barra (misma lógica que PaperTradingValidator).
+
+    Returns:
+        equity (n + 1), y por trade: precio de entrada, de salida, pnl_pct,
+        código de salida, índice de entrada e índice de salida; más la cantidad de trades
+    """
+    n = len(prices)
+    equity = np.empty(n + 1)
+    equity[0] = initial_capital
+    entries = np.empty(n + 1)
+    exits = np.empty(n + 1)
+    pnls = np.empty(n + 1)
+    reasons = np.empty(n + 1, dtype=np.int64)
+    entry_idx = np.empty(n + 1, dtype=np.int64)
+    exit_idx = np.empty(n + 1, dtype=np.int64)
+    n_trades = 0
+
+    capital = initial_capital
+    position = 0.0
+    position_price = 0.0
+    opened_at = 0
+
+    for i in range(n):
+        price = prices[i]
+        if position > 0:
+            pnl_pct = (price - position_price) / position_price
+            reason = -1
+            if pnl_pct <= -stop_loss:
+                reason = 0
+            elif pnl_pct >= take_profit:
+                reason = 1
+            elif scores[i] <= sell_threshold:
+                reason = 2
+            if reason >= 0:
+                capital += position * price * (1 - commission)
+                entries[n_trades] = position_price
+                exits[n_trades] = price
+                pnls[n_trades] = pnl_pct
+                reasons[n_trades] = reason
+                entry_idx[n_trades] = opened_at
+                exit_idx[n_trades] = i
+                n_trades += 1
+                position = 0.0
+                position_price = 0.0
+        elif scores[i] >= buy_threshold:
+            position_size = capital * max_position_size
+            position = (position_size / price) * (1 - commission)
+            position_price = price
+            capital -= position_size
+            opened_at = i
+
+        equity[i + 1] = capital + position * price
+
+    # Cerrar posición final
+    if position > 0:
+        price = prices[n - 1]
+        entries[n_trades] = position_price
+        exits[n_trades] = price
+        pnls[n_trades] = (price - position_price) / position_price
+        reasons[n_trades] = 3
+        entry_idx[n_trades] = opened_at
+        exit_idx[n_trades] = n - 1
+        n_trades += 1
+
+    return equity, entries, exits, pnls, reasons, entry_idx, exit_idx, n_trades
+
+
+def signal_scores(prices: np.ndarray, df: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """Scores de la estrategia: columna Score si existe, si no momentum simple (retorno % de la barra)"""
+    if df is not None and 'Score' in df.columns:
+        return df['Score'].to_numpy(dtype=float)
+    scores = np.zeros(len(prices))
+    if len(prices) > 1:
+        scores[1:] = np.diff(prices) / prices[:-1] * 100
+    return scores
+
+
+def simulate(prices: np.ndarray, scores: np.ndarray, config: Dict, initial_capital: float) -> Dict:
+    """Corre el kernel con una configuración y devuelve trades/equity como estructuras Python"""
+    cfg = {**DEFAULT_STRATEGY, **{k: v for k, v in config.items() if k in DEFAULT_STRATEGY}}
+    equity, entries, exits, pnls, reasons, entry_idx, exit_idx, n_trades = simulate_kernel(
+        np.ascontiguousarray(prices, dtype=np.float64), np.ascontiguousarray(scores, dtype=np.float64),
+        float(initial_capital), float(cfg['buy_threshold']), float(cfg['sell_threshold']),
+        float(cfg['max_position_size']), float(cfg['stop_loss']), float(cfg['take_profit']),
+        float(cfg['commission'])
+    )
+    trades = [
+        {'entry': float(entries[t]), 'exit': float(exits[t]), 'pnl_pct': float(pnls[t]),
+         'reason': EXIT_REASONS[reasons[t]], 'entry_idx': int(entry_idx[t]), 'exit_idx': int(exit_idx[t])}
+        for t in range(n_trades)
+    ]
+    return {'trades': trades, 'equity_curve': equity, 'final_capital': float(equity[-1])}
+
+
+def window_metrics(equity: np.ndarray, pnls: Sequence[float]) -> Dict:
+    """Métricas de una ventana (mismas definiciones que PaperTradingValidator)"""
+    equity = np.asarray(equity, dtype=float)
+    total_return = equity[-1] / equity[0] - 1 if equity[0] else 0.0
+    running_max = np.maximum.accumulate(equity)
+    max_drawdown = float(np.min((equity - running_max) / running_max)) if len(equity) else 0.0
+    returns = np.diff(equity) / equity[:-1]
+    sharpe = float(np.mean(returns) / (np.std(returns) + 1e-10) * np.sqrt(252)) if len(returns) > 1 else 0.0
+    pnls = np.asarray(pnls, dtype=float)
+    wins = pnls[pnls > 0].sum()
+    losses = abs(pnls[pnls <= 0].sum())
+    return {
+        'total_return': float(total_return),
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe,
+        'total_trades': int(len(pnls)),
+        'win_rate': float((pnls > 0).mean()) if len(pnls) else 0.0,
+        'profit_factor': float(wins / losses) if losses > 0 else (float('inf') if wins > 0 else 0.0),
+    }
+
+
+def make_folds(n_bars: int, train_size: int, test_size: int, step: Optional[int] = None,
+               anchored: bool = False) -> List[Tuple[int, int, int, int]]:
+    """
+    Folds rolling-origin (train_start, train_end, test_start, test_end), con test
+    inmediatamente después de train. anchored=True hace crecer el train desde el inicio.
+    """
+    step = step or test_size
+    folds = []
+    train_end = train_size
+    while train_end + test_size <= n_bars:
+        train_start = 0 if anchored else train_end - train_size
+        folds.append((train_start, train_end, train_end, train_end + test_size))
+        train_end += step
+    return folds
+
+
+def strategy_config_from_professional(config: Dict) -> Dict:
+    """Traduce professional_config.json a la configuración que simula el validador"""
+    strategy = {
+        'buy_threshold': float(config.get('buy_threshold', DEFAULT_STRATEGY['buy_threshold'])),
+        'sell_threshold': float(config.get('sell_threshold', DEFAULT_STRATEGY['sell_threshold'])),
+    }
+    if 'max_position_size_pct' in config:
+        strategy['max_position_size'] = float(config['max_position_size_pct']) / 100
+    for key in ('stop_loss', 'take_profit', 'commission'):
+        if key in config:
+            strategy[key] = float(config[key])
+    return strategy
+
+
+def load_professional_config(path: str = "professional_config.json") -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return strategy_config_from_professional(json.load(f))
+
+
+# ==================== EJECUCIÓN EN PARALELO ====================
+
+# Arrays de precios/scores por símbolo, cargados una vez por proceso del pool
+_SHARED_ARRAYS: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _init_worker(arrays: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+    _SHARED_ARRAYS.clear()
+    _SHARED_ARRAYS.update(arrays)
+
+
+def _run_symbol_fold(task: Tuple) -> Dict:
+    """Un fold de un símbolo: todas las configuraciones en train (in-sample) y en test"""
+    symbol, fold_id, (train_start, train_end, test_start, test_end), configs, initial_capital, select_by = task
+    prices, scores = _SHARED_ARRAYS[symbol]
+
+    in_sample, out_sample = [], []
+    for config in configs:
+        sim = simulate(prices[train_start:train_end], scores[train_start:train_end], config, initial_capital)
+        in_sample.append(window_metrics(sim['equity_curve'], [t['pnl_pct'] for t in sim['trades']]))
+        sim = simulate(prices[test_start:test_end], scores[test_start:test_end], config, initial_capital)
+        metrics = window_metrics(sim['equity_curve'], [t['pnl_pct'] for t in sim['trades']])
+        metrics['equity_curve'] = sim['equity_curve']
+        out_sample.append(metrics)
+
+    selected = int(np.argmax([m[select_by] for m in in_sample]))
+    return {
+        'symbol': symbol,
+        'fold': fold_id,
+        'bounds': (train_start, train_end, test_start, test_end),
+        'in_sample': in_sample,
+        'out_of_sample': out_sample,
+        'selected': selected,
+    }
+
+
+def _stability(fold_returns: List[float], fold_sharpes: List[float], fold_drawdowns: List[float],
+               in_sample_returns: List[float]) -> Dict:
+    returns = np.asarray(fold_returns, dtype=float)
+    mean_is = float(np.mean(in_sample_returns)) if in_sample_returns else 0.0
+    return {
+        'folds': int(len(returns)),
+        'mean_fold_return': float(returns.mean()) if len(returns) else 0.0,
+        'std_fold_return': float(returns.std()) if len(returns) else 0.0,
+        'positive_folds_pct': float((returns > 0).mean()) if len(returns) else 0.0,
+        'mean_fold_sharpe': float(np.mean(fold_sharpes)) if fold_sharpes else 0.0,
+        'worst_fold_drawdown': float(np.min(fold_drawdowns)) if fold_drawdowns else 0.0,
+        # Walk-forward efficiency: retorno fuera de muestra / retorno en muestra
+        'walk_forward_efficiency': float(returns.mean() / mean_is) if len(returns) and mean_is else 0.0,
+    }
+
+
+def _chain_equity(curves: List[np.ndarray], initial_capital: float) -> np.ndarray:
+    """Encadena las curvas de test de cada fold en una curva fuera de muestra continua"""
+    chained = [np.array([initial_capital])]
+    level = initial_capital
+    for curve in curves:
+        scaled = curve[1:] / curve[0] * level
+        chained.append(scaled)
+        if len(scaled):
+            level = scaled[-1]
+    return np.concatenate(chained)
+
+
+class WalkForwardEngine:
+    """
+    Uso:
+        engine = WalkForwardEngine(initial_capital=100000, workers=4)
+        report = engine.run({'GGAL': df, 'YPFD': df2}, [config_a, config_b],
+                            train_size=120, test_size=20)
+    """
+
+    def __init__(self, initial_capital: float = 100000.0, workers: Optional[int] = None):
+        self.initial_capital = initial_capital
+        self.workers = workers or os.cpu_count() or 1
+
+    @staticmethod
+    def prepare_arrays(price_data: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        arrays = {}
+        for symbol, df in price_data.items():
+            if df is None or df.empty:
+                continue
+            close_col = 'Close' if 'Close' in df.columns else 'close'
+            prices = df[close_col].to_numpy(dtype=np.float64)
+            arrays[symbol] = (prices, signal_scores(prices, df))
+        return arrays
+
+    def run(self, price_data: Dict[str, pd.DataFrame], configs: Sequence[Dict], train_size: int = 120,
+            test_size: int = 20, step: Optional[int] = None, anchored: bool = False,
+            select_by: str = 'sharpe_ratio') -> Dict:
+        """
+        Ejecuta el walk-forward de todas las configuraciones sobre todos los símbolos.
+
+        Returns:
+            Dict con, por configuración: curva de equity fuera de muestra por símbolo,
+            métricas por fold y de estabilidad; y la cadena walk-forward (la config
+            elegida en cada train, evaluada en su test)
+        """
+        configs = [dict(c) for c in configs]
+        arrays = self.prepare_arrays(price_data)
+        tasks = []
+        for symbol, (prices, _) in arrays.items():
+            for fold_id, bounds in enumerate(make_folds(len(prices), train_size, test_size, step, anchored)):
+                tasks.append((symbol, fold_id, bounds, configs, self.initial_capital, select_by))
+
+        if self.workers > 1 and len(tasks) > 1:
+            chunksize = max(1, len(tasks) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(arrays,)) as executor:
+                fold_results = list(executor.map(_run_symbol_fold, tasks, chunksize=chunksize))
+        else:
+            _init_worker(arrays)
+            fold_results = [_run_symbol_fold(task) for task in tasks]
+
+        return self._aggregate(fold_results, configs, list(arrays))
+
+    def _aggregate(self, fold_results: List[Dict], configs: List[Dict], symbols: List[str]) -> Dict:
+        by_symbol = {symbol: sorted((r for r in fold_results if r['symbol'] == symbol), key=lambda r: r['fold'])
+                     for symbol in symbols}
+
+        config_reports = []
+        for c, config in enumerate(configs):
+            per_symbol = {}
+            all_returns, all_sharpes, all_drawdowns, all_is = [], [], [], []
+            for symbol, folds in by_symbol.items():
+                if not folds:
+                    continue
+                oos = [f['out_of_sample'][c] for f in folds]
+                returns = [m['total_return'] for m in oos]
+                per_symbol[symbol] = {
+                    'equity_curve': _chain_equity([m['equity_curve'] for m in oos], self.initial_capital).tolist(),
+                    'fold_returns': returns,
+                    'stability': _stability(returns, [m['sharpe_ratio'] for m in oos],
+                                            [m['max_drawdown'] for m in oos],
+                                            [f['in_sample'][c]['total_return'] for f in folds]),
+                }
+                all_returns += returns
+                all_sharpes += [m['sharpe_ratio'] for m in oos]
+                all_drawdowns += [m['max_drawdown'] for m in oos]
+                all_is += [f['in_sample'][c]['total_return'] for f in folds]
+            config_reports.append({
+                'config': config,
+                'symbols': per_symbol,
+                'stability': _stability(all_returns, all_sharpes, all_drawdowns, all_is),
+            })
+
+        # Cadena walk-forward: en cada fold, la config elegida en train evaluada en test
+        walk_forward = {}
+        for symbol, folds in by_symbol.items():
+            if not folds:
+                continue
+            chosen = [f['out_of_sample'][f['selected']] for f in folds]
+            returns = [m['total_return'] for m in chosen]
+            walk_forward[symbol] = {
+                'selected_configs': [f['selected'] for f in folds],
+                'equity_curve': _chain_equity([m['equity_curve'] for m in chosen], self.initial_capital).tolist(),
+                'stability': _stability(returns, [m['sharpe_ratio'] for m in chosen],
+                                        [m['max_drawdown'] for m in chosen],
+                                        [f['in_sample'][f['selected']]['total_return'] for f in folds]),
+            }
+
+        best = max(range(len(configs)), key=lambda c: config_reports[c]['stability']['mean_fold_return'],
+                   default=None)
+        return {
+            'configs': config_reports,
+            'walk_forward': walk_forward,
+            'best_config_index': best,
+            'total_folds': len(fold_results),
+            'numba': NUMBA_AVAILABLE,
+        }
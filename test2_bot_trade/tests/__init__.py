@@ -0,0 +1,3 @@
+"""
+Test suite del bot de prueba (test2_bot_trade)
+"""
@@ -0,0 +1,14 @@
+"""
+Configuración compartida para tests (pytest fixtures)
+"""
+import os
+import sys
+from pathlib import Path
+
+# Agregar el directorio del bot al path (su propio paquete src)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Configurar variables de entorno para testing
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+os.environ['TESTING'] = 'true'
@@ -0,0 +1,42 @@
+"""
+Tests unitarios para la ingesta de barras (upsert por símbolo y fecha)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.database import make_engines, make_session_factory, upsert
+from src.models.market_data import MarketData
+
+BASE = datetime(2024, 1, 1)
+
+
+def bar(day, close=100.0):
+    return {'symbol': 'GGAL', 'timestamp': BASE + timedelta(days=day), 'open': close, 'high': close,
+            'low': close, 'close': close, 'volume': 1000.0, 'source': 'test'}
+
+
+@pytest.fixture
+def session(tmp_path):
+    writer, reader = make_engines(f"sqlite:///{tmp_path / 'test.db'}")
+    MarketData.__table__.create(bind=writer)
+    session = make_session_factory(writer, reader)()
+    yield session
+    session.close()
+    writer.dispose()
+    reader.dispose()
+
+
+class TestUpsert:
+    """Tests para upsert"""
+
+    def test_existing_and_repeated_bars_do_not_fail_the_batch(self, session):
+        """Barras ya guardadas o repetidas en el lote se actualizan en lugar de romper la ingesta"""
+        upsert(session, MarketData, [bar(0), bar(1)])
+        session.commit()
+
+        upsert(session, MarketData, [bar(1, close=105.0), bar(2), bar(2, close=107.0)])
+        session.commit()
+
+        closes = [r.close for r in session.query(MarketData.close).order_by(MarketData.timestamp)]
+        assert closes == [100.0, 105.0, 107.0]
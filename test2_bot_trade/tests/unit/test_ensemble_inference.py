@@ -0,0 +1,81 @@
+"""
+Tests unitarios para la inferencia multi-horizonte del ensemble (una pasada por modelo)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from src.services.feature_store import FeatureStore
+from src.services.neural_network_service_complete import NeuralNetworkServiceComplete
+
+
+def bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'open': close * 0.99, 'high': close * 1.01, 'low': close * 0.98,
+        'close': close, 'volume': rng.integers(1_000, 5_000, n).astype(float),
+    }, index=pd.bdate_range('2022-01-03', periods=n))
+
+
+class FakeModel:
+    """Modelo que devuelve una salida fija por horizonte y cuenta las llamadas"""
+
+    def __init__(self, outputs):
+        self.outputs = np.asarray(outputs, dtype=np.float32)
+        self.calls = []
+
+    def __call__(self, x, training=False):
+        self.calls.append(x.shape)
+        return np.tile(self.outputs, (len(x), 1))
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = NeuralNetworkServiceComplete(data_dir=str(tmp_path / "models"))
+    service.feature_store = FeatureStore(persist=False)
+    return service
+
+
+def ensemble_for(service, symbol, df, models, horizons):
+    _, _, scaler, feature_cols = service._prepare_from_features(service._get_features(symbol, df), horizons)
+    weights = {name: 1.0 / len(models) for name in models}
+    data = {'models': models, 'weights': weights, 'scaler': scaler, 'feature_cols': feature_cols}
+    if len(horizons) > 1:
+        data['horizons'] = horizons
+    service.ensemble_models[symbol] = data
+    return data
+
+
+class TestEnsembleInference:
+    """Tests para predict_ensemble_batch"""
+
+    def test_one_call_per_model_for_all_symbols(self, service):
+        """Los símbolos que comparten modelos se infieren en un solo batch"""
+        horizons = [1, 3, 5, 10, 20]
+        lstm, gru = FakeModel([0.1, 0.2, 0.3, 0.4, 0.5]), FakeModel([0.3, 0.4, 0.5, 0.6, 0.7])
+        dfs = {'GGAL': bars(400, 1), 'YPF': bars(400, 2)}
+        for symbol, df in dfs.items():
+            ensemble_for(service, symbol, df, {'lstm': lstm, 'gru': gru}, horizons)
+
+        predictions = service.predict_ensemble_batch(dfs)
+
+        assert len(lstm.calls) == len(gru.calls) == 1
+        assert lstm.calls[0] == (2, service.lookback, len(service.ensemble_models['GGAL']['feature_cols']))
+        assert service.last_inference['model_calls'] == 2 and service.last_inference['symbols'] == 2
+        for symbol in dfs:
+            prices = predictions[symbol]
+            assert list(prices) == horizons
+            # Cada horizonte es una salida distinta del modelo (antes salían todos iguales)
+            assert len(set(prices.values())) == len(horizons)
+            assert prices[1] < prices[20]
+
+    def test_legacy_single_output_reports_main_horizon(self, service):
+        """Un ensemble sin 'horizons' (una salida) solo informa el horizonte principal"""
+        df = bars(400, 3)
+        ensemble_for(service, 'ALUA', df, {'lstm': FakeModel([0.2])}, [service.prediction_days])
+
+        assert list(service.predict_multi_horizon('ALUA', df)) == [service.prediction_days]
+        assert service.predict_ensemble_batch({'PAMP': df}) == {}
@@ -0,0 +1,80 @@
+"""
+Tests unitarios para el Feature Store (actualización incremental, rango y huecos)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.feature_store import FEATURE_SETS, FeatureStore
+
+
+def bars(n, start='2022-01-03', seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.bdate_range(start, periods=n)
+    return pd.DataFrame({
+        'open': close * 0.99, 'high': close * 1.01, 'low': close * 0.98,
+        'close': close, 'volume': rng.integers(1_000, 5_000, n).astype(float),
+    }, index=index)
+
+
+@pytest.fixture
+def store():
+    return FeatureStore(persist=False)
+
+
+class TestFeatureStore:
+    """Tests para FeatureStore"""
+
+    def test_incremental_update_matches_full_build(self, store):
+        """Agregar barras nuevas calcula solo esas filas y da lo mismo que reconstruir"""
+        raw = bars(700)
+        store.update('GGAL', raw.iloc[:650], 'lstm_basic')
+        # 50 barras nuevas + la última guardada, que se recalcula
+        assert store.update('GGAL', raw.iloc[600:], 'lstm_basic') == 51
+        assert store.stats['incremental_updates'] == 1
+
+        reference = FeatureStore(persist=False)
+        reference.update('GGAL', raw, 'lstm_basic')
+        np.testing.assert_allclose(store.get('GGAL').to_numpy(), reference.get('GGAL').to_numpy(), rtol=1e-5)
+
+    def test_features_for_is_limited_to_input_range(self, store):
+        """Una ventana vieja no recibe filas posteriores a su última barra (sin lookahead)"""
+        raw = bars(700)
+        store.update('GGAL', raw, 'nn_complete')
+
+        window = raw.iloc[200:500]
+        features = store.features_for('GGAL', window, 'nn_complete')
+        assert features.index[0] >= window.index[0]
+        assert features.index[-1] == window.index[-1]
+        assert len(features) == 300
+        # Son las filas guardadas (calculadas con todo el contexto previo)
+        pd.testing.assert_frame_equal(features, store.get('GGAL', 'nn_complete').iloc[200:500])
+        assert len(store.features_for('GGAL', window, 'nn_complete', n=60)) == 60
+
+    def test_gap_does_not_chain_short_window(self, store):
+        """Barras posteriores a un hueco no se encadenan a la matriz guardada"""
+        raw = bars(900)
+        store.update('GGAL', raw.iloc[:500], 'lstm_basic')
+        stored = store.get('GGAL')
+
+        after_gap = raw.iloc[700:800]  # Menos barras que el warmup del feature set
+        assert len(after_gap) < FEATURE_SETS['lstm_basic'].warmup
+        assert store.update('GGAL', after_gap, 'lstm_basic') == 0
+        assert store.stats['gaps'] == 1
+        pd.testing.assert_frame_equal(store.get('GGAL'), stored)
+
+        # features_for calcula en el momento sobre la ventana, sin mezclar con lo guardado
+        features = store.features_for('GGAL', after_gap, 'lstm_basic')
+        expected = FEATURE_SETS['lstm_basic'].compute(after_gap).astype(np.float32)
+        pd.testing.assert_frame_equal(features, expected, check_freq=False)
+
+    def test_gap_with_enough_context_rebuilds(self, store):
+        """Si las barras nuevas alcanzan como contexto propio, la matriz se reconstruye contigua"""
+        raw = bars(1200)
+        store.update('GGAL', raw.iloc[:300], 'lstm_basic')
+        store.update('GGAL', raw.iloc[500:], 'lstm_basic')
+
+        assert store.stats['full_builds'] == 2 and store.stats['gaps'] == 0
+        assert store.get('GGAL').index[0] > raw.index[500]
+        assert store.last_timestamp('GGAL') == raw.index[-1]
@@ -0,0 +1,82 @@
+"""
+Tests unitarios para el optimizador genético (caché de fitness y pool de procesos)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.services.genetic_optimizer as genetic_optimizer
+from src.services.genetic_optimizer import GeneticOptimizer, data_fingerprint
+
+
+def prices(n=150, drift=0.0):
+    close = 100 + np.arange(n) * drift + np.sin(np.arange(n))
+    return pd.DataFrame({'close': close}, index=pd.bdate_range('2023-01-02', periods=n))
+
+
+class FakeDataService:
+    def __init__(self, data):
+        self.data = data
+
+    def get_historical_data(self, symbol, period='1y'):
+        return self.data[symbol]
+
+
+@pytest.fixture
+def backtests(monkeypatch):
+    """Reemplaza el backtest por una función determinística de los datos y cuenta las llamadas"""
+    calls = []
+
+    def fake_backtest(config, df, symbol):
+        calls.append(symbol)
+        return float(df['close'].iloc[-1]) - config['stop_loss']
+
+    monkeypatch.setattr(genetic_optimizer, '_backtest_fitness', fake_backtest)
+    return calls
+
+
+class TestGeneticOptimizer:
+    """Tests para GeneticOptimizer"""
+
+    def test_cache_is_scoped_to_symbols_and_data(self, tmp_path, backtests):
+        """Otra corrida con otros símbolos o datos más nuevos no reutiliza fitness viejos"""
+        data = {'GGAL': prices(drift=0.1), 'YPF': prices(drift=0.5)}
+        optimizer = GeneticOptimizer(data_dir=str(tmp_path), data_service=FakeDataService(data))
+        genome = genetic_optimizer.creator.Individual([14, 70, 30, 9, 21, 0.02, 0.05])
+
+        optimizer.optimize('GGAL', generations=1, population_size=6, symbols=['GGAL'])
+        first = optimizer._evaluate_strategy(genome)
+        calls = len(backtests)
+        # Mismos datos: sale de la caché
+        assert optimizer._evaluate_strategy(genome) == first and len(backtests) == calls
+
+        optimizer.optimize('GGAL', generations=0, population_size=6, symbols=['YPF'])
+        calls = len(backtests)
+        assert optimizer._evaluate_strategy(genome) != first
+        assert backtests[calls:] == ['YPF']
+
+        data['GGAL'] = prices(n=151, drift=0.1)
+        optimizer.optimize('GGAL', generations=0, population_size=6, symbols=['GGAL'])
+        calls = len(backtests)
+        assert optimizer._evaluate_strategy(genome) != first
+        assert backtests[calls:] == ['GGAL']
+
+    def test_fingerprint_changes_with_data(self):
+        """La huella cambia con los símbolos, la cantidad de barras y los precios"""
+        base = {'GGAL': prices()}
+        assert data_fingerprint(base) == data_fingerprint({'GGAL': prices()})
+        assert data_fingerprint(base) != data_fingerprint({'YPF': prices()})
+        assert data_fingerprint(base) != data_fingerprint({'GGAL': prices(n=151)})
+        assert data_fingerprint(base) != data_fingerprint({'GGAL': prices(drift=0.01)})
+
+    def test_serial_by_default(self, tmp_path, backtests, monkeypatch):
+        """Sin workers explícitos no se levanta un pool de procesos"""
+        def no_pool(*args, **kwargs):
+            raise AssertionError("No debería crear un ProcessPoolExecutor")
+
+        monkeypatch.setattr(genetic_optimizer, 'ProcessPoolExecutor', no_pool)
+        optimizer = GeneticOptimizer(data_dir=str(tmp_path), data_service=FakeDataService({'GGAL': prices()}))
+        assert optimizer.workers == 1
+        best, _ = optimizer.optimize('GGAL', generations=1, population_size=6)
+        assert set(best) == {'rsi_period', 'rsi_overbought', 'rsi_oversold', 'sma_fast', 'sma_slow',
+                             'stop_loss', 'take_profit'}
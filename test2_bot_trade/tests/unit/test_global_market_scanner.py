@@ -0,0 +1,78 @@
+"""
+Tests unitarios para el escaneo en dos etapas de GlobalMarketScanner
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.global_market_scanner import GlobalMarketScanner
+
+
+class FakeDataService:
+    """Históricos sintéticos; registra qué período se pidió para cada símbolo"""
+
+    def __init__(self, n_symbols=20, bars=60):
+        rng = np.random.default_rng(3)
+        index = pd.date_range('2025-01-01', periods=bars, freq='B')
+        self.frames = {}
+        for i in range(n_symbols):
+            drift = (i - n_symbols / 2) * 0.002
+            close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.02, bars)))
+            self.frames[f"S{i:02d}"] = pd.DataFrame(
+                {'close': close, 'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                 'volume': 2_000_000.0}, index=index)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_historical_data(self, symbol, period='1mo'):
+        with self._lock:
+            self.calls.append((symbol, period))
+        bars = {'2mo': 42, '3mo': 60}[period]
+        return self.frames[symbol].iloc[-bars:]
+
+
+@pytest.fixture
+def scanner():
+    data = FakeDataService()
+    scanner = GlobalMarketScanner(iol_client=None, data_service=data)
+    scanner._load_universe = lambda categories, max_symbols: list(data.frames)
+    scanner.min_score_threshold = 0
+    return scanner
+
+
+class TestTwoStageScan:
+    """Tests para iter_scan / scan_market"""
+
+    def test_full_history_only_for_candidates(self, scanner):
+        """La etapa 1 pide la ventana corta de todos; la completa solo los top-K"""
+        scanner.scan_market(top_k=5, max_workers=4)
+        calls = scanner.data_service.calls
+        short = {s for s, period in calls if period == scanner.prefilter_period}
+        full = {s for s, period in calls if period == scanner.deep_period}
+        assert len(short) == 20
+        assert len(full) == 5 and full <= short
+        assert scanner.get_scan_stats()['symbols_deep_scanned'] == 5
+
+    def test_symbol_cache_honours_use_cache(self, scanner):
+        """Sin barras nuevas se reutiliza el resultado; use_cache=False re-evalúa todo"""
+        analyzed = []
+        original = scanner._analyze_history
+
+        def counting(symbol, df):
+            analyzed.append(symbol)
+            return original(symbol, df)
+
+        scanner._analyze_history = counting
+        scanner.scan_market(top_k=5)
+        assert len(analyzed) == 5
+
+        scanner.scan_cache = {}  # Solo el caché por símbolo
+        scanner.scan_market(top_k=5)
+        assert len(analyzed) == 5
+        assert scanner.get_scan_stats()['symbols_rescored'] == 0
+
+        scanner.scan_market(top_k=5, use_cache=False)
+        assert len(analyzed) == 10
+        assert scanner.get_scan_stats()['symbols_rescored'] == 5
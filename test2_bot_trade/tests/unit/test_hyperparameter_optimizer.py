@@ -0,0 +1,66 @@
+"""
+Tests unitarios para successive halving / Hyperband (presupuesto de épocas por rung)
+"""
+import pytest
+
+from src.services.hyperparameter_optimizer import HyperparameterOptimizer
+
+
+class FakeExecutor:
+    """Ejecuta los trials en el proceso: val_loss = lr / épocas (más épocas, mejor)"""
+
+    def __init__(self):
+        self.rungs = []
+
+    def map(self, fn, trials):
+        trials = list(trials)
+        self.rungs.append([(t['id'], t['start_epoch'], t['epochs']) for t in trials])
+        return [{'id': t['id'], 'val_loss': t['params']['lr'] / t['epochs'], 'train_loss': 0.0} for t in trials]
+
+
+@pytest.fixture
+def optimizer():
+    # Sin ContinuousLearning: _run_bracket no necesita el feature store
+    return HyperparameterOptimizer.__new__(HyperparameterOptimizer)
+
+
+def configs(n):
+    return [{'lr': float(i + 1)} for i in range(n)]
+
+
+class TestSuccessiveHalving:
+    """Tests para _run_bracket"""
+
+    def test_promotes_best_third_and_resumes_epochs(self, optimizer, tmp_path):
+        """9 configuraciones: 1 → 3 → 9 épocas, solo se pagan las épocas nuevas"""
+        executor = FakeExecutor()
+        results, total_epochs = optimizer._run_bracket(executor, configs(9), min_epochs=1, max_epochs=9,
+                                                       eta=3, validation_split=0.2, run_dir=tmp_path)
+
+        assert [len(rung) for rung in executor.rungs] == [9, 3, 1]
+        assert executor.rungs[1] == [('t0', 1, 3), ('t1', 1, 3), ('t2', 1, 3)]
+        assert total_epochs == 9 * 1 + 3 * 2 + 1 * 6
+        best = min(results, key=lambda r: r['val_loss'])
+        assert best['params'] == {'lr': 1.0} and best['epochs_trained'] == 9
+
+    def test_single_survivor_trains_to_max_epochs(self, optimizer, tmp_path):
+        """Cuando queda una sola configuración antes de max_epochs, completa el presupuesto"""
+        executor = FakeExecutor()
+        results, total_epochs = optimizer._run_bracket(executor, configs(3), min_epochs=1, max_epochs=27,
+                                                       eta=3, validation_split=0.2, run_dir=tmp_path)
+
+        assert executor.rungs[-1] == [('t0', 1, 27)]
+        assert max(r['epochs_trained'] for r in results) == 27
+        assert total_epochs == 3 + 26
+
+    def test_failed_trials_are_dropped(self, optimizer, tmp_path):
+        """Un trial con error no se promueve ni aparece en los resultados"""
+        class FailingExecutor(FakeExecutor):
+            def map(self, fn, trials):
+                outcomes = super().map(fn, trials)
+                return [{'id': o['id'], 'error': 'boom'} if o['id'] == 't0' else o for o in outcomes]
+
+        results, _ = optimizer._run_bracket(FailingExecutor(), configs(3), min_epochs=1, max_epochs=3,
+                                            eta=3, validation_split=0.2, run_dir=tmp_path)
+        assert {r['params']['lr'] for r in results} == {2.0, 3.0}
+        assert max(results, key=lambda r: r['epochs_trained'])['params'] == {'lr': 2.0}
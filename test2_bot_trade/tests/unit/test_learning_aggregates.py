@@ -0,0 +1,98 @@
+"""
+Tests unitarios para los agregados materializados de aprendizaje (sync incremental por cursor)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import src.services.operations_log as operations_log
+from src.services.learning_aggregates import LearningAggregates
+from src.services.operations_log import OperationsLog
+
+BASE = datetime(2024, 3, 4, 11, 0)
+
+
+def analysis(log, i, signal='BUY'):
+    return log.append('ANALYSIS', {
+        'symbol': f"SYM{i % 3}", 'score': 10 + i, 'final_signal': signal,
+        'buy_factors': [f"Regime Detection (+{i % 7})"],
+        'technical': {'rsi': 25 + i, 'macd': 1, 'volume_ratio': 1.0},
+    }, (BASE + timedelta(minutes=30 * i)).isoformat())
+
+
+@pytest.fixture
+def log(tmp_path):
+    return OperationsLog(tmp_path / "ops", segment_max_bytes=2_000, retention_days=None,
+                         max_segments=None, legacy_file=None)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Registra (segmento, posición inicial) de cada lectura de líneas del log"""
+    calls = []
+    original = operations_log._read_lines
+
+    def spy(path, position=0):
+        calls.append((path.name, position))
+        return original(path, position)
+
+    monkeypatch.setattr(operations_log, '_read_lines', spy)
+    return calls
+
+
+class TestLearningAggregates:
+    """Tests para LearningAggregates"""
+
+    def test_sync_reads_only_the_new_tail(self, tmp_path, log, reads):
+        """Después del primer sync solo se lee desde la posición en bytes del último evento"""
+        for i in range(30):
+            analysis(log, i)
+        aggregates = LearningAggregates(tmp_path / "state.json", log)
+        assert aggregates.sync() == 30
+        assert len(log.segments()) > 1
+
+        reads.clear()
+        assert aggregates.sync() == 0
+        record = analysis(log, 30, signal='SELL')
+        assert aggregates.sync() == 1
+        # Ninguna lectura arrancó desde el inicio de un segmento ya leído
+        active = log.segments()[-1].name
+        assert reads and all(name == active and position > 0 for name, position in reads)
+        assert aggregates.offset == record['seq'] and aggregates.total_analyses == 31
+
+    def test_observe_then_sync_does_not_double_count(self, tmp_path, log):
+        """Un evento aplicado por el hook del escritor no se vuelve a aplicar al sincronizar"""
+        aggregates = LearningAggregates(tmp_path / "state.json", log)
+        for i in range(5):
+            aggregates.observe(analysis(log, i))
+        analysis(log, 5)  # Escrito por otro proceso: lo trae sync
+        assert aggregates.sync() == 1
+        assert aggregates.total_analyses == 6
+        assert aggregates.verify()['consistent']
+
+    def test_state_resumes_from_saved_offset(self, tmp_path, log):
+        """Otra instancia carga el estado guardado y solo aplica los eventos posteriores"""
+        for i in range(10):
+            analysis(log, i)
+        LearningAggregates(tmp_path / "state.json", log).sync()
+        for i in range(10, 14):
+            analysis(log, i, signal='HOLD')
+
+        resumed = LearningAggregates(tmp_path / "state.json", log)
+        assert resumed.sync() == 4
+        report = resumed.verify()
+        assert report['consistent'] and report['total_analyses'] == 14
+        assert resumed.signal_stats == {'BUY': 10, 'SELL': 0, 'HOLD': 4}
+
+    def test_rebuild_matches_incremental(self, tmp_path, log):
+        """Reconstruir desde el log da el mismo estado que el fold incremental"""
+        aggregates = LearningAggregates(tmp_path / "state.json", log)
+        for i in range(20):
+            analysis(log, i, signal='BUY' if i % 2 else 'SELL')
+            if i % 6 == 0:
+                aggregates.sync()
+        aggregates.sync()
+        incremental = aggregates.to_dict()
+
+        assert aggregates.rebuild().to_dict() == incremental
+        assert aggregates.strategy_view()['regime_detection']['total_uses'] == 20
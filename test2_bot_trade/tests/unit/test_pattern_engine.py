@@ -0,0 +1,97 @@
+"""
+Tests unitarios para el motor vectorizado de patrones (velas y gráficos)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.candlestick_analyzer import CandlestickAnalyzer
+from src.services.pattern_engine import CHART_PATTERN_WINDOWS, candlestick_patterns, chart_patterns
+from src.services.pattern_recognizer import PatternRecognizer
+
+
+def random_ohlc(shape, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=-1))
+    open_ = close * (1 + rng.normal(0, 0.01, shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, shape))
+    return open_, high, low, close
+
+
+def frame(open_, high, low, close):
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': 1000.0})
+
+
+class TestCandlestickPatterns:
+    """Tests para candlestick_patterns y CandlestickAnalyzer"""
+
+    def test_bullish_engulfing_on_last_bar(self):
+        """Vela bajista seguida de una alcista que la envuelve"""
+        df = frame([100, 105, 99], [101, 106, 107], [99, 99.5, 98.5], [100.5, 100, 106])
+        hits = candlestick_patterns(df['open'], df['high'], df['low'], df['close'])
+        assert hits['BULLISH_ENGULFING'].tolist() == [False, False, True]
+        # Un patrón por grupo y por vela
+        assert not hits['PIERCING_PATTERN'][-1]
+
+        result = CandlestickAnalyzer().analyze(df, lookback=3)
+        assert result['patterns'][0] == {'pattern': 'BULLISH_ENGULFING',
+                                         'description': 'Bullish Engulfing', 'position': 2}
+
+    def test_panel_matches_each_symbol(self):
+        """Un panel símbolos × tiempo da lo mismo que evaluar cada símbolo por separado"""
+        panel = random_ohlc((3, 200))
+        candles = candlestick_patterns(*panel)
+        charts = chart_patterns(*panel[1:])
+        for row in range(3):
+            single = candlestick_patterns(*(x[row] for x in panel))
+            assert all(np.array_equal(candles[name][row], single[name]) for name in single)
+            single = chart_patterns(*(x[row] for x in panel[1:]))
+            assert all(np.array_equal(charts[name][row], single[name]) for name in single)
+
+    def test_history_only_uses_previous_candles(self):
+        """Cada vela depende solo de las 2 anteriores: recortar el historial no cambia el resultado"""
+        df = frame(*random_ohlc(300))
+        analyzer = CandlestickAnalyzer()
+        history = analyzer.analyze_history(df)
+        assert len(history) == len(df) and history.drop(columns='score').to_numpy().any()
+        for end in (50, 120, 299):
+            window = analyzer.analyze_history(df.iloc[end - 4:end + 1])
+            pd.testing.assert_frame_equal(window.iloc[2:], history.iloc[end - 2:end + 1])
+        # Sin velas previas no hay patrones de 3 velas
+        assert not history[['MORNING_STAR', 'THREE_WHITE_SOLDIERS']].iloc[:2].to_numpy().any()
+
+
+class TestChartPatterns:
+    """Tests para chart_patterns y PatternRecognizer"""
+
+    def test_double_bottom(self):
+        """Dos mínimos similares separados por un rebote y cierre sobre el rebote"""
+        low = np.full(20, 105.0)
+        low[2], low[10] = 100.0, 100.5
+        high = low + 3
+        close = low + 1
+        close[-1] = 108.0
+
+        hits = chart_patterns(high, low, close)
+        assert hits['DOUBLE_BOTTOM'][-1]
+        # Sin ventana completa de 20 velas no hay detección
+        assert not hits['DOUBLE_BOTTOM'][:-1].any()
+
+    def test_bull_flag(self):
+        """Subida mayor al 5% seguida de una consolidación estrecha"""
+        close = np.array([100, 102, 104, 106, 106, 106.5, 106, 106.2, 106.1, 106.3])
+        hits = chart_patterns(close + 0.5, close - 0.5, close)
+        assert hits['BULL_FLAG'][-1]
+        assert not hits['BEAR_FLAG'].any()
+
+    def test_live_detection_is_last_row_of_history(self):
+        """detect_all_patterns equivale a la última fila de detect_history"""
+        df = frame(*random_ohlc(400, seed=11))
+        recognizer = PatternRecognizer()
+        history = recognizer.detect_history(df)
+        for end in (60, 200, 399):
+            live = recognizer.detect_all_patterns(df.iloc[:end + 1])
+            row = history.iloc[end]
+            assert live['patterns_detected'] == [name for name in CHART_PATTERN_WINDOWS if row[name]]
+            assert live['score'] == pytest.approx(row['score'])
@@ -0,0 +1,122 @@
+"""
+Tests unitarios para el índice invertido del agente de razonamiento (código, logs y memoria)
+"""
+import os
+
+import pytest
+
+from src.services.search_index import SearchIndex, tokenize
+
+
+@pytest.fixture
+def bot_dir(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "logs").mkdir()
+    return tmp_path
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+
+class TestTokenize:
+    """Tests para tokenize"""
+
+    def test_words_and_numbers_split(self):
+        """Palabras y números se separan y se pasan a minúsculas"""
+        assert tokenize("HTTP401 Error: status_code=500") == {'http', '401', 'error', 'status', 'code', '500'}
+
+
+class TestSearchCode:
+    """Tests para la búsqueda en el código"""
+
+    def test_only_candidate_lines_and_changed_files(self, bot_dir):
+        """Se indexan solo las líneas con error/status/code y solo se reindexa lo que cambió"""
+        api = bot_dir / "src" / "api.py"
+        write(api, "x = 1\nif status == 401:\n    raise Error('code 401')\n")
+        write(bot_dir / "src" / "other.py", "print('hola')\n")
+        index = SearchIndex(str(bot_dir))
+
+        assert index.search_code('401') == [
+            "src/api.py:3 - raise Error('code 401')", "src/api.py:2 - if status == 401:"]
+        assert index.get_stats()['code_lines'] == 2
+
+        write(api, "if status == 500:\n    pass\n")
+        os.utime(api, ns=(1, 1))  # Otra firma aunque el tamaño coincida
+        index.refresh()
+        assert index.search_code('401') == []
+        assert index.search_code('500') == ["src/api.py:1 - if status == 500:"]
+
+        api.unlink()
+        index.refresh()
+        assert index.get_stats()['code_lines'] == 0
+
+    def test_without_code_returns_generic_error_lines(self, bot_dir):
+        """Sin código de error devuelve solo las referencias genéricas (error + code/status)"""
+        write(bot_dir / "src" / "api.py", "log_error(code)\nstatus = 0\n")
+        assert SearchIndex(str(bot_dir)).search_code() == ["src/api.py:1 - log_error(code)"]
+
+
+class TestSearchLogs:
+    """Tests para la búsqueda en los logs"""
+
+    def test_tail_reads_only_new_bytes(self, bot_dir):
+        """Las líneas nuevas se agregan y una línea incompleta espera al próximo refresco"""
+        log = bot_dir / "logs" / "bot.log"
+        write(log, "INFO inicio\nERROR 401 token vencido\n")
+        index = SearchIndex(str(bot_dir))
+        assert index.search_logs('401') == ["ERROR 401 token vencido"]
+
+        write(log, "ERROR 500 timeout", mode='a')
+        index.refresh()
+        assert index.search_logs('500') == []
+        write(log, " en IOL\n", mode='a')
+        index.refresh()
+        # La más nueva primero
+        assert index.search_logs() == ["ERROR 500 timeout en IOL", "ERROR 401 token vencido"]
+
+    def test_rotated_log_is_reindexed(self, bot_dir):
+        """Si el archivo se achica (rotó), se descartan sus líneas viejas"""
+        log = bot_dir / "logs" / "bot.log"
+        write(log, "ERROR 401 token vencido\nERROR 401 otra vez\n")
+        index = SearchIndex(str(bot_dir))
+        assert len(index.search_logs('401')) == 2
+
+        write(log, "ERROR 503\n")
+        index.refresh()
+        assert index.search_logs('401') == [] and index.search_logs('503') == ["ERROR 503"]
+
+    def test_keeps_last_lines_of_recent_files(self, bot_dir):
+        """Solo max_log_lines líneas por archivo y solo los max_log_files logs más recientes"""
+        for i, name in enumerate(["a.log", "b.log", "c.log"]):
+            path = bot_dir / "logs" / name
+            write(path, "".join(f"ERROR {name} {n}\n" for n in range(5)))
+            os.utime(path, (1000 + i, 1000 + i))
+        index = SearchIndex(str(bot_dir), max_log_files=2, max_log_lines=3)
+
+        lines = index.search_logs(limit=100)
+        assert lines == [f"ERROR c.log {n}" for n in (4, 3, 2)] + [f"ERROR b.log {n}" for n in (4, 3, 2)]
+        assert index.get_stats()['log_files'] == 2
+
+
+class TestSearchMemory:
+    """Tests para la búsqueda en la memoria del agente"""
+
+    def test_ranking_and_incremental_facts(self, bot_dir):
+        """Gana el hecho que cubre más palabras; los hechos nuevos se indexan al consultar"""
+        index = SearchIndex(str(bot_dir))
+        facts = [
+            {'title': 'Riesgo país', 'snippet': 'sube el riesgo', 'query': 'riesgo pais', 'timestamp': '1'},
+            {'title': 'Merval', 'snippet': 'riesgo merval en baja', 'query': 'merval', 'timestamp': '2'},
+        ]
+        assert index.search_memory('riesgo merval', facts)[0]['title'] == 'Merval'
+
+        facts.append({'title': 'Dólar', 'snippet': 'dólar blue', 'query': 'dolar', 'timestamp': '3'})
+        assert [f['title'] for f in index.search_memory('dolar', facts)] == ['Dólar']
+        assert index.get_stats()['memory_facts'] == 3
+
+        # La lista se recortó: se reindexa desde cero
+        facts = facts[1:]
+        assert index.search_memory('riesgo pais', facts) == [facts[0]]
+        assert index.get_stats()['memory_facts'] == 2
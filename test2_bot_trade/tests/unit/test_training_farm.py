@@ -0,0 +1,88 @@
+"""
+Tests unitarios para la Training Farm (ventanas, retomar corridas y armado de ensembles)
+"""
+import json
+
+import numpy as np
+
+from src.services.training_farm import TrainingFarm, multi_horizon_windows, sequence_windows
+
+
+class FakeExecutor:
+    """Registra los trabajos enviados sin ejecutarlos"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, job):
+        self.jobs.append(job)
+        return object()
+
+
+def arch_results(symbol, **statuses):
+    return {f"ensemble:{symbol}:{arch}": ({'status': 'done', 'val_loss': 0.1} if status == 'done'
+                                          else {'status': 'failed', 'error': 'boom'})
+            for arch, status in statuses.items()}
+
+
+class TestWindows:
+    """Tests para las ventanas strided"""
+
+    def test_windows_match_loop(self):
+        """Mismas muestras que el loop de entrenamiento original"""
+        data = np.arange(60, dtype=float).reshape(30, 2)
+        x, y = sequence_windows(data, lookback=5, horizon=1, target_col=0)
+        expected_x = np.array([data[i - 5:i] for i in range(5, 29)])
+        expected_y = np.array([data[i + 1, 0] for i in range(5, 29)])
+        np.testing.assert_array_equal(x, expected_x)
+        np.testing.assert_array_equal(y, expected_y)
+
+        x, y = multi_horizon_windows(data, lookback=5, horizons=[1, 3], target_col=1)
+        assert x.shape == (22, 5, 2)
+        np.testing.assert_array_equal(y[0], [data[6, 1], data[8, 1]])
+
+
+class TestTrainingFarm:
+    """Tests para retomar corridas y armar ensembles"""
+
+    def test_resume_drops_failed_results(self, tmp_path):
+        """Al retomar solo se conservan los trabajos terminados"""
+        state_file = tmp_path / "state.json"
+        jobs = {**arch_results('GGAL', lstm='done', gru='failed', cnn_lstm='done'),
+                'ensemble:GGAL:assemble': {'status': 'failed', 'error': 'boom'}}
+        state_file.write_text(json.dumps({'run_id': 'r1', 'kind': 'ensemble', 'finished_at': None,
+                                          'jobs': jobs}), encoding='utf-8')
+        farm = TrainingFarm(state_file=str(state_file))
+
+        state = farm._initial_state('ensemble', resume=True)
+        assert state['run_id'] == 'r1'
+        assert sorted(state['jobs']) == ['ensemble:GGAL:cnn_lstm', 'ensemble:GGAL:lstm']
+        assert farm._initial_state('lstm', resume=True)['jobs'] == {}
+        assert farm._initial_state('ensemble', resume=False)['jobs'] == {}
+
+    def test_assembly_waits_for_retried_architecture(self, tmp_path):
+        """El ensemble se arma solo cuando las tres arquitecturas terminaron bien"""
+        farm = TrainingFarm(state_file=str(tmp_path / "state.json"))
+        executor = FakeExecutor()
+        state = {'jobs': arch_results('GGAL', lstm='done', cnn_lstm='done')}
+        pending = {'GGAL'}
+
+        # gru se está reintentando: todavía no hay resultado
+        assert farm._submit_ready_assemblies(executor, state, pending) == {}
+        assert pending == {'GGAL'}
+
+        state['jobs'].update(arch_results('GGAL', gru='done'))
+        assert len(farm._submit_ready_assemblies(executor, state, pending)) == 1
+        assert executor.jobs[0]['val_losses'].keys() == {'lstm', 'gru', 'cnn_lstm'}
+        assert pending == set()
+
+    def test_failed_architecture_fails_assembly(self, tmp_path):
+        """Si una arquitectura falla el ensemble no se arma con las restantes"""
+        farm = TrainingFarm(state_file=str(tmp_path / "state.json"))
+        executor = FakeExecutor()
+        state = {'jobs': arch_results('YPF', lstm='done', gru='failed', cnn_lstm='done')}
+
+        assert farm._submit_ready_assemblies(executor, state, {'YPF'}) == {}
+        assert executor.jobs == []
+        assert state['jobs']['ensemble:YPF:assemble']['status'] == 'failed'
+        assert 'gru' in state['jobs']['ensemble:YPF:assemble']['error']
@@ -0,0 +1,158 @@
+"""
+Tests unitarios para el motor de triggers por precio y el trailing stop que lo usa
+"""
+import numpy as np
+import pytest
+
+from src.services.trailing_stop_loss import TrailingStopLoss
+from src.services.trigger_engine import ABOVE, BELOW, TriggerEngine, quote_watchlist
+
+
+class FakeIOL:
+    """Cliente IOL que devuelve cotizaciones fijas y registra las consultas"""
+
+    def __init__(self, quotes):
+        self.quotes = quotes
+        self.calls = []
+
+    def get_quote(self, symbol):
+        self.calls.append(symbol)
+        quote = self.quotes[symbol]
+        if isinstance(quote, Exception):
+            raise quote
+        return quote
+
+
+@pytest.fixture
+def stops_dir(tmp_path, monkeypatch):
+    """TrailingStopLoss guarda trailing_stops.json en el directorio actual"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestTriggerEngine:
+    """Tests para TriggerEngine"""
+
+    def test_crossings_by_direction(self):
+        """below dispara con precio <= nivel, above con precio >= nivel (o > si es strict)"""
+        engine = TriggerEngine()
+        engine.add('stop', 'GGAL', 95, BELOW)
+        engine.add('target', 'GGAL', 110, ABOVE)
+        engine.add('high', 'GGAL', 100, ABOVE, strict=True)
+
+        assert engine.on_price('GGAL', 100) == []
+        fired = engine.on_price('GGAL', 110)
+        assert sorted(f.trigger.key for f in fired) == ['high', 'target']
+        assert all(f.price == 110 for f in fired)
+        # Los disparados se eliminan; el stop sigue armado
+        assert len(engine) == 1 and engine.get('target') is None
+        assert [f.trigger.key for f in engine.on_price('GGAL', 95)] == ['stop']
+        assert len(engine) == 0 and engine.watchlist() == []
+
+    def test_relevel_and_remove_are_lazy(self):
+        """Re-nivelar o eliminar un trigger descarta la entrada vieja del heap"""
+        engine = TriggerEngine()
+        engine.add('stop', 'GGAL', 95, BELOW)
+        engine.add('stop', 'GGAL', 90, BELOW)
+        # El nivel viejo (95) ya no dispara
+        assert engine.on_price('GGAL', 94) == []
+        assert [f.trigger.level for f in engine.on_price('GGAL', 90)] == [90.0]
+
+        engine.add('alert', 'YPF', 50, ABOVE)
+        assert engine.remove('alert').level == 50.0
+        assert engine.on_price('YPF', 60) == []
+
+        engine.add('a', 'PAMP', 10, ABOVE)
+        engine.add('b', 'PAMP', 5, BELOW)
+        assert len(engine.remove_symbol('PAMP')) == 2
+        assert engine.on_price('PAMP', 1) == [] and len(engine) == 0
+
+    def test_on_prices_only_watched_symbols(self):
+        """Un tick multi-símbolo solo evalúa los símbolos con triggers y omite precios vacíos"""
+        engine = TriggerEngine()
+        engine.add(('GGAL', 'stop'), 'GGAL', 95, BELOW)
+        engine.add(('YPF', 'stop'), 'YPF', 40, BELOW)
+        assert engine.watchlist() == ['GGAL', 'YPF']
+
+        fired = engine.on_prices({'GGAL': 90, 'YPF': None, 'ALUA': 1})
+        assert [f.trigger.key for f in fired] == [('GGAL', 'stop')]
+        assert engine.watchlist() == ['YPF']
+
+    def test_many_triggers_match_linear_scan(self):
+        """Con muchos triggers (y compactación) se dispara lo mismo que recorriéndolos todos"""
+        rng = np.random.default_rng(5)
+        engine = TriggerEngine()
+        levels = {}
+        for i in range(200):
+            key, direction = f"t{i}", BELOW if i % 2 else ABOVE
+            for level in rng.uniform(80, 120, 3):  # Re-nivelado varias veces
+                engine.add(key, 'GGAL', level, direction)
+            levels[key] = (direction, float(level))
+
+        for price in rng.uniform(80, 120, 30):
+            expected = {key for key, (direction, level) in levels.items()
+                        if (price <= level if direction == BELOW else price >= level)}
+            assert {f.trigger.key for f in engine.on_price('GGAL', price)} == expected
+            for key in expected:
+                del levels[key]
+
+    def test_quote_watchlist_one_quote_per_symbol(self):
+        """Una cotización por símbolo aunque aparezca repetido; los errores se omiten"""
+        iol = FakeIOL({'GGAL': {'ultimoPrecio': 100.0}, 'YPF': {'error': 'sin datos'},
+                       'ALUA': RuntimeError('timeout')})
+        assert quote_watchlist(iol, ['GGAL', 'YPF', 'GGAL', 'ALUA']) == {'GGAL': 100.0}
+        assert iol.calls == ['GGAL', 'YPF', 'ALUA']
+
+
+class TestTrailingStopLoss:
+    """Tests para TrailingStopLoss sobre el motor de triggers"""
+
+    def test_update_all_matches_per_symbol_updates(self, stops_dir):
+        """Re-evaluar solo los símbolos disparados da el mismo resultado que actualizar todos"""
+        rng = np.random.default_rng(9)
+        fast, reference = TrailingStopLoss(), TrailingStopLoss()
+        symbols = ['GGAL', 'YPF', 'PAMP']
+        for tsl in (fast, reference):
+            for symbol in symbols:
+                tsl.add_position(symbol, entry_price=100.0, quantity=10, initial_stop_loss=95.0)
+
+        paths = {symbol: 100 * np.exp(np.cumsum(rng.normal(0.002, 0.015, 120))) for symbol in symbols}
+        sells_fast, sells_reference = [], []
+        for step in range(120):
+            prices = {symbol: float(path[step]) for symbol, path in paths.items()}
+            sells_fast.extend(fast.update_all(prices))
+            for symbol, price in prices.items():
+                action = reference.update(symbol, price)
+                if action:
+                    sells_reference.append(action)
+
+        assert [(a['symbol'], a['stop_price']) for a in sells_fast] == \
+               [(a['symbol'], a['stop_price']) for a in sells_reference]
+        for symbol, position in reference.get_all_positions().items():
+            live = fast.get_position_info(symbol)
+            assert live['current_stop_loss'] == position['current_stop_loss']
+            assert live['highest_price'] == position['highest_price']
+            assert live['activated'] == position['activated']
+
+    def test_sell_action_carries_quantity(self, stops_dir):
+        """Al tocar el stop se devuelve la venta con la cantidad y se deja de seguir el símbolo"""
+        tsl = TrailingStopLoss()
+        tsl.add_position('GGAL', entry_price=100.0, quantity=25, initial_stop_loss=95.0)
+
+        assert tsl.update_all({'GGAL': 104.0}) == []  # Activa el trailing (+4%)
+        assert tsl.get_position_info('GGAL')['activated']
+        [action] = tsl.update_all({'GGAL': 98.0})
+        assert action['action'] == 'SELL' and action['quantity'] == 25
+        assert action['stop_price'] == pytest.approx(104.0 * 0.95)
+        assert tsl.watchlist() == [] and tsl.get_position_info('GGAL') is None
+
+    def test_restored_positions_are_armed(self, stops_dir):
+        """Las posiciones guardadas en disco se vuelven a armar al iniciar"""
+        tsl = TrailingStopLoss()
+        tsl.add_position('YPF', entry_price=50.0, quantity=4, initial_stop_loss=45.0)
+        assert (stops_dir / "trailing_stops.json").exists()
+
+        restored = TrailingStopLoss()
+        assert restored.watchlist() == ['YPF']
+        assert restored.update_all({'YPF': 48.0}) == []
+        assert restored.update_all({'YPF': 44.0})[0]['quantity'] == 4
@@ -0,0 +1,94 @@
+"""
+Tests unitarios para el motor walk-forward (folds, kernel de simulación y selección sin lookahead)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.walk_forward import WalkForwardEngine, make_folds, simulate
+
+
+def prices_df(n=400, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    return pd.DataFrame({'close': close}, index=pd.bdate_range('2022-01-03', periods=n))
+
+
+CONFIGS = [
+    {'buy_threshold': 1.0, 'sell_threshold': -1.0},
+    {'buy_threshold': 2.0, 'sell_threshold': -2.0, 'stop_loss': 0.03},
+    {'buy_threshold': 0.5, 'sell_threshold': -3.0, 'take_profit': 0.05},
+]
+
+
+class TestFolds:
+    """Tests para make_folds"""
+
+    def test_rolling_folds(self):
+        """Train de tamaño fijo y test inmediatamente después, sin salirse del historial"""
+        folds = make_folds(100, train_size=40, test_size=20)
+        assert folds == [(0, 40, 40, 60), (20, 60, 60, 80), (40, 80, 80, 100)]
+        assert make_folds(59, train_size=40, test_size=20) == []
+
+    def test_anchored_folds_grow_from_start(self):
+        """anchored=True mantiene el inicio del train en 0"""
+        folds = make_folds(100, train_size=40, test_size=20, step=10, anchored=True)
+        assert all(f[0] == 0 and f[1] == f[2] for f in folds)
+        assert [f[1] for f in folds] == [40, 50, 60, 70, 80]
+
+
+class TestSimulate:
+    """Tests para el kernel de simulación"""
+
+    def test_closing_adds_proceeds_to_cash(self):
+        """Cerrar una posición suma lo cobrado al efectivo restante (no lo reemplaza)"""
+        prices = np.array([100.0, 100.0, 110.0])
+        scores = np.array([0.0, 60.0, -60.0])
+        config = {'max_position_size': 0.1, 'commission': 0.0, 'take_profit': 1.0}
+
+        result = simulate(prices, scores, config, initial_capital=1000.0)
+        [trade] = result['trades']
+        assert trade['reason'] == 'signal' and trade['pnl_pct'] == pytest.approx(0.10)
+        # 900 de efectivo + 1 acción vendida a 110
+        assert result['final_capital'] == pytest.approx(1010.0)
+        np.testing.assert_allclose(result['equity_curve'], [1000.0, 1000.0, 1000.0, 1010.0])
+
+    def test_open_position_closed_at_end(self):
+        """Una posición abierta al final se informa como trade 'close' valuada al último precio"""
+        result = simulate(np.array([100.0, 105.0]), np.array([60.0, 0.0]),
+                          {'max_position_size': 0.5, 'commission': 0.0}, initial_capital=1000.0)
+        assert [t['reason'] for t in result['trades']] == ['close']
+        assert result['final_capital'] == pytest.approx(1025.0)
+
+
+class TestWalkForwardEngine:
+    """Tests para WalkForwardEngine"""
+
+    def test_selection_uses_only_train_window(self):
+        """Cambiar los precios del test no cambia la configuración elegida en el train"""
+        df = prices_df()
+        engine = WalkForwardEngine(initial_capital=10000, workers=1)
+        report = engine.run({'GGAL': df}, CONFIGS, train_size=120, test_size=40)
+        selected = report['walk_forward']['GGAL']['selected_configs']
+
+        folds = make_folds(len(df), 120, 40)
+        shocked = df.copy()
+        last_test_start = folds[-1][2]
+        shocked.iloc[last_test_start:, 0] *= np.linspace(1, 3, len(df) - last_test_start)
+        report_shocked = engine.run({'GGAL': shocked}, CONFIGS, train_size=120, test_size=40)
+
+        assert report_shocked['walk_forward']['GGAL']['selected_configs'] == selected
+        assert report['total_folds'] == len(folds)
+        curve = report['walk_forward']['GGAL']['equity_curve']
+        assert curve[0] == 10000 and len(curve) == 1 + 40 * len(folds)
+
+    def test_parallel_matches_serial(self):
+        """El pool de procesos da el mismo reporte que la corrida serial"""
+        data = {'GGAL': prices_df(seed=1), 'YPF': prices_df(seed=2)}
+        serial = WalkForwardEngine(workers=1).run(data, CONFIGS, train_size=100, test_size=50)
+        parallel = WalkForwardEngine(workers=2).run(data, CONFIGS, train_size=100, test_size=50)
+
+        assert parallel['best_config_index'] == serial['best_config_index']
+        for symbol in data:
+            assert parallel['walk_forward'][symbol] == serial['walk_forward'][symbol]
+        assert [c['stability'] for c in parallel['configs']] == [c['stability'] for c in serial['configs']]
@@ -71,6 +71,7 @@ builtins.print = safe_print
 
 from src.services.enhanced_learning_system import EnhancedLearningSystem
 from src.services.operation_notifier import OperationNotifier
+from src.services.operations_log import get_operations_log
 from src.services.realtime_alerts import RealtimeAlertSystem
 from src.services.price_monitor import PriceMonitor
 from src.services.enhanced_sentiment import EnhancedSentimentAnalysis
@@ -109,6 +110,7 @@ class TradingBot:
         # Flag para evitar ejecuciones simultáneas de análisis
         self._analysis_running = False
         self._analysis_lock = threading.Lock()
+        self._symbols_lock = threading.Lock()  # self.symbols se reasigna desde los hilos de sync/Telegram
         
         # Control de estado del bot
         self._paused = False  # Para /pause y /resume
@@ -634,6 +636,14 @@ class TradingBot:
         print(f"🔍 DEBUG: self.symbols asignado = {self.symbols}")
         print(f"🔍 DEBUG: len(self.symbols) = {len(self.symbols)}")
         
+        # Cambios del portafolio (syncs, dashboard) llegan por evento, sin releer el JSON
+        from src.services.portfolio_persistence import subscribe_portfolio_changes
+        subscribe_portfolio_changes(self._on_portfolio_change)
+        # En paper trading el motor de riesgo solo sigue las posiciones simuladas
+        # (no se mezclan con las reales de my_portfolio.json)
+        if not self.paper_trading:
+            self.risk_manager.portfolio_risk.set_positions(self.portfolio)
+        
         # Verificar disponibilidad en IOL si no es paper trading
         if not self.paper_trading:
             from src.services.iol_availability_checker import IOLAvailabilityChecker
@@ -2153,6 +2163,23 @@ class TradingBot:
                 "reason": "Risk Manager blocked"
             }
         
+        # Control pre-trade de riesgo de portafolio (VaR incremental, O(1))
+        risk_ok, risk_reason, risk_metrics = self.risk_manager.check_order_risk(symbol, signal, quantity, price)
+        if not risk_ok:
+            print(f"\n⛔ Trade blocked by portfolio risk: {risk_reason}")
+            self.operation_notifier.notify_alert(
+                f"Operación bloqueada: {symbol}",
+                f"Riesgo de portafolio: {risk_reason}",
+                level="warning"
+            )
+            return {
+                "status": "BLOCKED",
+                "error": risk_reason,
+                "symbol": symbol,
+                "reason": "Portfolio risk limit",
+                "portfolio_risk": risk_metrics
+            }
+        
         print(f"\n⚡ Executing {signal} Order:")
         print(f"   Symbol: {symbol}")
         print(f"   Quantity: {quantity}")
@@ -2264,6 +2291,7 @@ class TradingBot:
             
             # Marcar como FILLED después de simular exitosamente
             trade_record['status'] = 'FILLED'
+            self.risk_manager.portfolio_risk.apply_order(symbol, signal, quantity, price)
             
             # Si es una venta, calcular P&L simulado para aprendizaje
             if signal == 'SELL':
@@ -2442,6 +2470,7 @@ class TradingBot:
                     print(f"✅ Orden ejecutada en IOL: ID {order_id}")
                     trade_record['order_id'] = order_id
                     trade_record['status'] = 'FILLED'
+                    self.risk_manager.portfolio_risk.apply_order(symbol, signal, quantity, price)
                 else:
                     # Respuesta sin error pero sin numeroOperacion (raro)
                     print(f"⚠️  Respuesta inesperada de IOL (sin numeroOperacion): {response}")
@@ -3071,34 +3100,15 @@ class TradingBot:
         def handle_scores(chat_id, args):
             """Muestra los scores recientes de los análisis"""
             try:
-                import json
                 from datetime import datetime as dt
                 
-                # Leer desde operations_log.json
-                operations_file = Path("data/operations_log.json")
-                
-                if not operations_file.exists():
-                    self.telegram_command_handler._send_message(
-                        chat_id,
-                        "ℹ️ No hay datos de análisis disponibles aún.\n"
-                        "💡 Ejecuta /analyze para generar análisis y scores."
-                    )
-                    return
-                
-                # Leer y filtrar análisis recientes
+                # Últimos análisis del log de operaciones (solo se leen los segmentos finales)
                 try:
-                    with open(operations_file, 'r', encoding='utf-8') as f:
-                        operations = json.load(f)
-                    
-                    # Filtrar solo análisis y ordenar por timestamp
                     analyses = [
-                        op for op in operations 
-                        if op.get('type') == 'ANALYSIS' and op.get('data', {}).get('score') is not None
+                        op for op in reversed(get_operations_log().tail(200, types={'ANALYSIS'}))
+                        if op.get('data', {}).get('score') is not None
                     ]
                     
-                    # Ordenar por timestamp (más reciente primero)
-                    analyses.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-                    
                     if not analyses:
                         self.telegram_command_handler._send_message(
                             chat_id,
@@ -3107,7 +3117,7 @@ class TradingBot:
                         )
                         return
                     
-                    # Tomar los últimos 10
+                    # Tomar los últimos 10 (más reciente primero)
                     recent_analyses = analyses[:10]
                     
                     message = "📊 *Scores Recientes:*\n\n"
@@ -3144,12 +3154,6 @@ class TradingBot:
                     
                     self.telegram_command_handler._send_message(chat_id, message)
                     
-                except json.JSONDecodeError as e:
-                    self.telegram_command_handler._send_message(
-                        chat_id,
-                        f"❌ Error leyendo archivo de operaciones: {e}\n"
-                        "💡 El archivo puede estar corrupto."
-                    )
                 except Exception as e:
                     self.telegram_command_handler._send_message(
                         chat_id,
@@ -4227,69 +4231,78 @@ O desde PowerShell:
     
     def sync_portfolio(self):
         """
-        Synchronize local portfolio with IOL and update monitored symbols.
+        Synchronize local portfolio with IOL.
+        El estado del portafolio solo escribe my_portfolio.json y publica un
+        cambio (ver _on_portfolio_change) si IOL trajo algo distinto.
         """
         if not self.paper_trading and self.iol_client:
             print("🔄 Auto-syncing portfolio...")
-            old_portfolio_count = len(self.portfolio) if self.portfolio else 0
-            
             sync_from_iol(self.iol_client)
+
+    def _on_portfolio_change(self, change):
+        """
+        Suscriptor del estado del portafolio: aplica el diff (syncs de IOL /
+        Tienda Broker, guardados del dashboard) y actualiza los símbolos
+        monitoreados sin releer el JSON.
+        """
+        old_portfolio_count = len(self.portfolio) if self.portfolio else 0
+        self.portfolio = change.portfolio
+        if not self.paper_trading:
+            self.risk_manager.portfolio_risk.set_positions(self.portfolio)
+        new_portfolio_count = len(self.portfolio)
+        print(f"📊 Portafolio actualizado ({change.source}): +{len(change.added)} "
+              f"-{len(change.removed)} ~{len(change.changed)} "
+              f"({old_portfolio_count} → {new_portfolio_count} activos)")
+
+        # professional_config.json solo se lee cuando el portafolio cambió
+        monitoring = {}
+        config_file = Path("professional_config.json")
+        if config_file.exists():
+            try:
+                import json
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    monitoring = json.load(f).get('monitoring', {})
+            except Exception:
+                pass
+        use_portfolio = monitoring.get('use_portfolio_symbols', True)
+        additional_symbols = monitoring.get('additional_symbols', [])
+        if use_portfolio and self.portfolio and hasattr(self, 'symbols'):
+            portfolio_symbols = [p.get('symbol', '').strip() for p in self.portfolio if p.get('symbol')]
             
-            # Recargar portafolio actualizado
-            self.portfolio = load_portfolio()
-            new_portfolio_count = len(self.portfolio) if self.portfolio else 0
-            
-            # Actualizar símbolos monitoreados si el portafolio cambió
-            import json
-            config_file = Path("professional_config.json")
-            use_portfolio = True
-            additional_symbols = []
-            if config_file.exists():
-                try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        config_data = json.load(f)
-                        monitoring = config_data.get('monitoring', {})
-                        use_portfolio = monitoring.get('use_portfolio_symbols', True)
-                        additional_symbols = monitoring.get('additional_symbols', [])
-                except Exception:
-                    pass
-            
-            if use_portfolio and self.portfolio:
-                portfolio_symbols = [p.get('symbol', '').strip() for p in self.portfolio if p.get('symbol')]
-                
-                # Combinar portafolio + adicionales
-                all_symbols = list(set(portfolio_symbols + additional_symbols))
-                
-                # Actualizar si hay cambios
-                if set(all_symbols) != set(self.symbols):
-                    old_count = len(self.symbols)
+            # Combinar portafolio + adicionales
+            all_symbols = list(set(portfolio_symbols + additional_symbols))
+            with self._symbols_lock:
+                old_count = len(self.symbols)
+                changed = set(all_symbols) != set(self.symbols)
+                if changed:
                     self.symbols = all_symbols
-                    new_count = len(self.symbols)
-                    print(f"🔄 Símbolos monitoreados actualizados: {old_count} → {new_count}")
-                    
-                    if new_portfolio_count != old_portfolio_count:
-                        print(f"📊 Portafolio actualizado: {old_portfolio_count} → {new_portfolio_count} activos")
-            
-            # 📢 NOTIFICACIÓN: Mostrar actualización de portafolio
+            if changed:
+                print(f"🔄 Símbolos monitoreados actualizados: {old_count} → {len(all_symbols)}")
+        
+        # Las respuestas cacheadas de /portfolio, /saldo, etc. quedaron viejas
+        command_handler = getattr(self, 'telegram_command_handler', None)
+        if command_handler is not None:
+            command_handler.invalidate_responses()
+        
+        # 📢 NOTIFICACIÓN: Mostrar actualización de portafolio
+        try:
+            if self.portfolio:
+                total_value = sum(p.get('current_value', 0) for p in self.portfolio)
+                total_cost = sum(p.get('cost_basis', 0) for p in self.portfolio)
+                total_pnl = total_value - total_cost
+                total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
+                
+                self.operation_notifier.notify_portfolio_update({
+                    'total_value': total_value,
+                    'total_pnl': total_pnl,
+                    'total_pnl_pct': total_pnl_pct,
+                    'positions_count': len(self.portfolio),
+                })
+        except Exception as e:
             try:
-                portfolio = load_portfolio()
-                if portfolio:
-                    total_value = sum(p.get('current_value', 0) for p in portfolio)
-                    total_cost = sum(p.get('cost_basis', 0) for p in portfolio)
-                    total_pnl = total_value - total_cost
-                    total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
-                    
-                    self.operation_notifier.notify_portfolio_update({
-                        'total_value': total_value,
-                        'total_pnl': total_pnl,
-                        'total_pnl_pct': total_pnl_pct,
-                        'positions_count': len(portfolio),
-                    })
-            except Exception as e:
-                try:
-                    safe_warning(logger, f"Error notificando actualización de portafolio: {e}")
-                except:
-                    pass
+                safe_warning(logger, f"Error notificando actualización de portafolio: {e}")
+            except:
+                pass
 
     def run_analysis_cycle(self):
         """
@@ -4326,24 +4339,25 @@ O desde PowerShell:
                 self.symbols = ['GGAL', 'YPFD', 'PAMP']
                 print(f"📌 Usando símbolos por defecto: {', '.join(self.symbols)}")
             
+            # Covarianza del motor de riesgo: se recalcula solo cuando venció
+            if self.risk_manager.portfolio_risk.is_stale():
+                try:
+                    self.risk_manager.portfolio_risk.refresh(self.symbols)
+                except Exception as e:
+                    safe_warning(logger, f"Error actualizando covarianza de riesgo: {e}")
+            
             # 📈 TRAILING STOP LOSS: Actualizar antes del análisis
             try:
                 if hasattr(self, 'trailing_stop_loss') and not self.paper_trading:
-                    current_prices = {}
-                    for sym in self.trailing_stop_loss.get_all_positions().keys():
-                        try:
-                            quote = self.iol_client.get_quote(sym)
-                            if 'ultimoPrecio' in quote:
-                                current_prices[sym] = quote['ultimoPrecio']
-                        except:
-                            pass
+                    from src.services.trigger_engine import quote_watchlist
+                    current_prices = quote_watchlist(self.iol_client, self.trailing_stop_loss.watchlist())
                     
                     if current_prices:
                         sell_actions = self.trailing_stop_loss.update_all(current_prices)
                         for action in sell_actions:
                             print(f"\n🚨 Trailing Stop: {action['symbol']} (+{action['gain_pct']:.2f}%)")
-                            position = self.trailing_stop_loss.get_all_positions().get(action['symbol'], {})
-                            qty = position.get('quantity', 1) if position else 1
+                            # La posición ya salió del tracking: la cantidad viene en la acción
+                            qty = action.get('quantity', 1)
                             self.execute_trade(action['symbol'], 'SELL', action['current_price'], qty, None, None)
             except Exception as e:
                 print(f"⚠️  Error trailing stops: {e}")
@@ -4401,7 +4415,11 @@ O desde PowerShell:
             except Exception as e:
                 print(f"⚠️  Error compartiendo aprendizaje: {e}")
             
-            for symbol in self.symbols:
+            # Todo el ciclo trabaja sobre la misma lista aunque un sync la reasigne
+            with self._symbols_lock:
+                symbols = list(self.symbols)
+            
+            for symbol in symbols:
                 # Fetch latest data (Fallback to Yahoo if IOL fails)
                 try:
                     from scripts.ingest_data import ingest_symbol
@@ -4437,7 +4455,7 @@ O desde PowerShell:
             print(f"{'='*60}")
             
             try:
-                returns_df = self.portfolio_optimizer.get_returns_data(self.symbols, days=252)
+                returns_df = self.portfolio_optimizer.get_returns_data(symbols, days=252)
                 
                 # Validar que tenemos datos suficientes
                 if returns_df.empty or len(returns_df.columns) < 2:
@@ -7,6 +7,8 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+
 print("="*70)
 print("🔍 VERIFICACIÓN DE ESTRATEGIAS AVANZADAS")
 print("="*70)
@@ -111,19 +113,12 @@ print("📊 Buscando evidencia de ejecución:")
 print("-" * 70)
 
 # Buscar archivo de análisis más reciente
-operations_file = Path("data/operations_log.json")
-if operations_file.exists():
+if DEFAULT_LOG_DIR.exists():
     try:
-        with open(operations_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
-        
-        # Buscar análisis recientes (última hora)
+        # Análisis recientes (última hora, solo los segmentos del rango)
         from datetime import timedelta
         cutoff = datetime.now() - timedelta(hours=1)
-        recent_analyses = [
-            op for op in operations 
-            if op['type'] == 'ANALYSIS' and datetime.fromisoformat(op['timestamp']) >= cutoff
-        ]
+        recent_analyses = list(get_operations_log().range(start=cutoff, types={'ANALYSIS'}))
         
         if recent_analyses:
             print(f"  ✅ {len(recent_analyses)} análisis en la última hora")
@@ -140,9 +135,9 @@ if operations_file.exists():
             print("  ⚠️  No hay análisis recientes en la última hora")
             print("     El bot puede estar en proceso de inicialización")
     except:
-        print("  ⚠️  Error leyendo operations_log.json")
+        print("  ⚠️  Error leyendo el log de operaciones")
 else:
-    print("  ⚠️  operations_log.json no existe aún")
+    print("  ⚠️  El log de operaciones (data/operations_log/) no existe aún")
 
 print()
 
@@ -0,0 +1,96 @@
+"""
+Tests unitarios para el pipeline de logging asíncrono
+"""
+import pytest
+import sys
+import logging
+import queue
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.async_logging import (
+    DROP_NEW, DROP_OLDEST, AsyncLogPipeline, BatchedFileHandler,
+    DroppingQueueHandler, SamplingFilter
+)
+
+
+def _record(msg, level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 1, msg, None, None)
+
+
+class TestAsyncLogging:
+    """Tests para el pipeline de logging"""
+
+    def test_drop_new_policy(self):
+        """Con la cola llena se descarta el registro entrante"""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2), drop_policy=DROP_NEW)
+        for i in range(3):
+            handler.emit(_record(f"m{i}"))
+
+        assert handler.dropped == 1
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ['m0', 'm1']
+
+    def test_drop_oldest_and_errors_are_kept(self):
+        """drop_oldest y los ERROR desplazan al registro más viejo"""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2), drop_policy=DROP_OLDEST)
+        for i in range(3):
+            handler.emit(_record(f"m{i}"))
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ['m1', 'm2']
+
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1), drop_policy=DROP_NEW)
+        handler.emit(_record("info"))
+        handler.emit(_record("boom", logging.ERROR))
+        assert handler.queue.get_nowait().msg == 'boom'
+
+    def test_sampling_filter(self):
+        """Solo se conserva 1 de cada N registros del nivel muestreado"""
+        sampling = SamplingFilter({logging.DEBUG: 10})
+        kept = sum(sampling.filter(_record('d', logging.DEBUG)) for _ in range(100))
+        assert kept == 10
+        assert sampling.filter(_record('i', logging.INFO))
+
+    def test_pipeline_writes_all_records(self, tmp_path):
+        """El listener escribe todo lo encolado al detenerse"""
+        file_handler = BatchedFileHandler(tmp_path / 'app.log', batch_size=50)
+        file_handler.setFormatter(logging.Formatter('%(message)s'))
+        pipeline = AsyncLogPipeline([file_handler])
+        test_logger = logging.getLogger('test_async_pipeline')
+        test_logger.propagate = False
+        test_logger.addHandler(pipeline.queue_handler)
+        pipeline.start()
+
+        for i in range(500):
+            test_logger.warning("line %d", i)
+        pipeline.stop()
+
+        lines = (tmp_path / 'app.log').read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 500
+        assert lines[-1] == 'line 499'
+        assert pipeline.get_stats()['records'] == 500
+
+    def test_file_handler_appends_without_rotating(self, tmp_path):
+        """Varios handlers (procesos) sobre el mismo archivo diario solo agregan líneas"""
+        handlers = [BatchedFileHandler(tmp_path / 'app.log', batch_size=1) for _ in range(2)]
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter('%(message)s'))
+        for i in range(50):
+            handlers[i % 2].emit(_record(f'line {i}'))
+        for handler in handlers:
+            handler.close()
+
+        assert len((tmp_path / 'app.log').read_text(encoding='utf-8').splitlines()) == 50
+        assert [p.name for p in tmp_path.iterdir()] == ['app.log']
+
+    def test_restart_registers_atexit_once(self, tmp_path, monkeypatch):
+        """Reiniciar el pipeline (flush de StructuredLogger) no acumula handlers de atexit"""
+        import src.core.async_logging as async_logging
+        registered = []
+        monkeypatch.setattr(async_logging.atexit, 'register', registered.append)
+        pipeline = AsyncLogPipeline([BatchedFileHandler(tmp_path / 'app.log')])
+        for _ in range(3):
+            pipeline.start()
+            pipeline.stop()
+
+        assert registered == [pipeline.stop]
@@ -0,0 +1,113 @@
+"""
+Tests unitarios para IntradayBarAggregator
+"""
+import pytest
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.bar_aggregator import BarRingBuffer, IntradayBarAggregator
+
+
+BASE_TS = 1_700_000_100 - (1_700_000_100 % 900)  # Inicio de un bloque de 15 minutos
+
+
+class TestBarRingBuffer:
+    """Tests para BarRingBuffer"""
+
+    def test_keeps_last_bars_in_order(self):
+        """El buffer conserva solo las últimas barras en orden cronológico"""
+        buffer = BarRingBuffer(capacity=3)
+        for i in range(5):
+            buffer.append({'timestamp': i, 'open': i, 'high': i, 'low': i, 'close': i, 'volume': i})
+
+        assert len(buffer) == 3
+        assert list(buffer.last()[:, 0]) == [2, 3, 4]
+        assert list(buffer.last(2)[:, 0]) == [3, 4]
+
+
+class TestIntradayBarAggregator:
+    """Tests para IntradayBarAggregator"""
+
+    def test_builds_ohlcv_bars(self):
+        """Los snapshots se agregan en OHLC y el volumen usa el delta del acumulado"""
+        aggregator = IntradayBarAggregator(persist=False)
+        quotes = [(0, 100.0, 1000), (20, 102.0, 1500), (40, 99.0, 1800), (65, 101.0, 2000)]
+        for offset, price, volume in quotes:
+            aggregator.on_quote('GGAL', {'ultimoPrecio': price, 'volumen': volume}, BASE_TS + offset)
+
+        bars = aggregator.get_bars('GGAL', '1m', include_partial=False)
+        assert len(bars) == 1
+        bar = bars.iloc[0]
+        assert (bar['open'], bar['high'], bar['low'], bar['close']) == (100.0, 102.0, 99.0, 99.0)
+        assert bar['volume'] == 800
+
+        # La barra de 5m sigue en formación e incluye todos los snapshots
+        five = aggregator.get_bars('GGAL', '5m')
+        assert len(five) == 1
+        assert five.iloc[-1]['close'] == 101.0
+        assert five.iloc[-1]['volume'] == 1000
+
+    def test_uses_puntas_when_no_last_price(self):
+        """Sin ultimoPrecio se usa el punto medio de puntas"""
+        aggregator = IntradayBarAggregator(persist=False)
+        quote = {'ultimoPrecio': 0, 'puntas': [{'compradorPrecio': 99.0, 'vendedorPrecio': 101.0}]}
+        assert aggregator.on_quote('GGAL.BA', quote, BASE_TS)
+        assert aggregator.get_latest_price('GGAL') == 100.0
+
+    def test_latest_quote_keeps_quote_volume(self):
+        """El último snapshot conserva el volumen de la cotización, no el de la barra"""
+        aggregator = IntradayBarAggregator(persist=False)
+        aggregator.on_quote('GGAL', {'ultimoPrecio': 100.0, 'volumen': 1000}, BASE_TS)
+        aggregator.on_quote('GGAL', {'ultimoPrecio': 101.0, 'volumen': 1500}, BASE_TS + 10)
+
+        quote = aggregator.get_latest_quote('GGAL.BA')
+        assert quote['price'] == 101.0 and quote['volume'] == 1500
+        assert aggregator.get_bars('GGAL', '1m').iloc[-1]['volume'] == 500
+        assert aggregator.get_latest_quote('GGAL', max_age=60) is None  # BASE_TS es del pasado
+        assert aggregator.get_latest_quote('YPFD') is None
+
+    def test_rejects_error_quotes(self):
+        """Las cotizaciones con error no generan barras"""
+        aggregator = IntradayBarAggregator(persist=False)
+        assert not aggregator.on_quote('GGAL', {'error': 'HTTP 500'}, BASE_TS)
+        assert aggregator.get_bars('GGAL', '1m').empty
+
+    def test_close_elapsed_bars_queues_for_flush(self):
+        """Las barras vencidas se cierran y quedan pendientes de escritura"""
+        aggregator = IntradayBarAggregator(persist=True, flush_batch_size=1000, flush_interval=10**9)
+        aggregator.on_quote('GGAL', {'ultimoPrecio': 100.0}, BASE_TS)
+        aggregator.close_elapsed_bars(now=BASE_TS + 15 * 60)
+
+        assert aggregator.stats['bars_completed'] == 3
+        assert sorted(bar['timeframe'] for bar in aggregator._pending) == ['15m', '1m', '5m']
+
+    def test_poller_follows_symbol_list_and_stops_promptly(self):
+        """Con una función de símbolos cada ciclo toma los nuevos; stop() no espera el intervalo"""
+        import threading
+        import time
+
+        polled = []
+        second_cycle = threading.Event()
+
+        class FakeIOL:
+            def get_quote(self, symbol):
+                polled.append(symbol)
+                if symbol == 'YPFD':
+                    second_cycle.set()
+                return {'ultimoPrecio': 100.0}
+
+        symbols = ['GGAL']
+        aggregator = IntradayBarAggregator(iol_client=FakeIOL(), persist=False)
+        aggregator.start(lambda: list(symbols), interval=0.05)
+        symbols.append('YPFD')
+        assert second_cycle.wait(timeout=5)
+
+        aggregator.stop()
+        aggregator.start(lambda: list(symbols), interval=3600)
+        start = time.monotonic()
+        aggregator.stop()
+        assert time.monotonic() - start < 2
+        assert aggregator._thread is None
@@ -0,0 +1,143 @@
+"""
+Tests unitarios para el read model incremental del dashboard
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.dashboard_data import DashboardDataService, TradesView, operations_in_window
+from src.services.operations_log import OperationsLog
+
+
+def write_json(path, data, tick=[0]):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    # Forzar un mtime distinto aunque la escritura caiga en el mismo tick del reloj
+    tick[0] += 1
+    os.utime(path, ns=(tick[0] * 10**9, tick[0] * 10**9))
+
+
+def make_trade(i):
+    signal = 'SELL' if i % 3 == 0 else 'BUY'
+    return {
+        'timestamp': (datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat(),
+        'symbol': f"SYM{i % 4}",
+        'signal': signal,
+        'quantity': 1 + i % 5,
+        'price': 100.0 + i,
+        'mode': 'PAPER',
+        'pnl': (i % 7 - 3) * 10.0 if signal == 'SELL' else None,
+    }
+
+
+@pytest.fixture
+def files(tmp_path):
+    return tmp_path / "trades.json", OperationsLog(tmp_path / "operations_log", legacy_file=None)
+
+
+class TestDashboardData:
+    """Tests para DashboardDataService"""
+
+    def test_incremental_matches_full_rebuild(self, files):
+        """Appends y recortes desde el inicio dan las mismas vistas que reconstruir de cero"""
+        trades_file, operations_log = files
+        trades = [make_trade(i) for i in range(20)]
+        write_json(trades_file, trades)
+        data = DashboardDataService(trades_file, operations_log)
+
+        for i in range(20, 60):
+            trades.append(make_trade(i))
+            trades = trades[-25:]  # El bot conserva solo las últimas N
+            write_json(trades_file, trades)
+            assert data.refresh() == ['trades']
+
+        fresh = DashboardDataService(trades_file, operations_log)
+        view, expected = data.view('trades'), fresh.view('trades')
+        assert view['summary'] == pytest.approx(expected['summary'])
+        assert view['bot'] == pytest.approx(expected['bot'])
+        assert view['positions'] == pytest.approx(expected['positions'])
+        assert view['symbols'].keys() == expected['symbols'].keys()
+        for key in ('pnl_series', 'recent_bot_trades', 'paper_trades', 'sales_with_pnl', 'manual_trades'):
+            assert view[key] == expected[key]
+        assert data.stats['incremental'] == 40
+        assert view['summary']['total_trades'] == 25
+
+    def test_unchanged_file_keeps_version(self, files):
+        """Sin cambios en el archivo no se relee ni cambia la versión (la caché sigue válida)"""
+        trades_file, operations_log = files
+        write_json(trades_file, [make_trade(1)])
+        data = DashboardDataService(trades_file, operations_log)
+        version = data.version('trades')
+
+        assert data.refresh() == []
+        assert data.version('trades') == version
+        data.invalidate('trades')
+        assert data.version('trades') == version + 1
+
+    def test_operations_view_and_window(self, files):
+        """Operaciones ordenadas de más nueva a más vieja, conteo diario y filtro por ventana"""
+        trades_file, operations_log = files
+        now = datetime(2024, 6, 1, 12, 0)
+        for i in reversed(range(30)):
+            operations_log.append('ANALYSIS' if i % 2 else 'PREDICTION', {},
+                                  (now - timedelta(hours=i)).isoformat())
+        data = DashboardDataService(trades_file, operations_log)
+        view = data.view('operations')
+
+        assert view['operations'][0]['timestamp'] == now.isoformat()
+        assert view['by_day'] == {'2024-06-01': 13, '2024-05-31': 17}
+        assert len(operations_in_window(view['operations'], 6, now=now)) == 7
+        assert len(operations_in_window(view['operations'], 6, 'ANALYSIS', now=now)) == 3
+
+        # Los eventos nuevos se leen desde el offset del cursor
+        operations_log.append('TRADE_EXECUTION', {'symbol': 'GGAL'}, (now + timedelta(minutes=1)).isoformat())
+        assert data.refresh() == ['operations']
+        assert data.view('operations')['by_type']['TRADE_EXECUTION'] == 1
+        assert data.view('operations')['total'] == 31
+
+    def test_pnl_series_is_cumulative(self):
+        """La serie de P&L solo incluye ventas del bot, ordenada y acumulada"""
+        records = [make_trade(i) for i in range(10)]
+        view = TradesView()
+        for record in records:
+            view.apply(record)
+        series = view.to_dict(records)['pnl_series']
+
+        expected = [t['pnl'] for t in records if t['signal'] == 'SELL']
+        assert [p['pnl'] for p in series] == expected
+        assert series[-1]['pnl_cumulative'] == pytest.approx(sum(expected))
+
+    def test_lists_are_maintained_without_rescanning(self):
+        """Las listas de la vista se arman al aplicar registros, no recorriendo `records` en to_dict"""
+        records = [make_trade(i) for i in range(12)]
+        records[4]['paper_trading'] = True
+        records[7]['strategy'] = 'Manual_Direct'
+        view = TradesView()
+        for record in records:
+            view.apply(record)
+        # Un trade que llega fuera de orden se intercala en la serie y recalcula el acumulado
+        late = {**make_trade(3), 'timestamp': datetime(2023, 12, 31).isoformat(), 'pnl': 5.0}
+        view.apply(late)
+
+        result = view.to_dict([])
+        assert [p['pnl'] for p in result['pnl_series']][:2] == [5.0, records[0]['pnl']]
+        assert result['pnl_series'][-1]['pnl_cumulative'] == pytest.approx(
+            5.0 + sum(t['pnl'] for t in records if t['pnl'] is not None))
+        assert result['recent_bot_trades'][0] == records[-1] and len(result['recent_bot_trades']) == 13
+        assert result['paper_trades'] == [records[4]] and result['manual_trades'] == [records[7]]
+
+        # Descontar registros (recorte desde el inicio) los saca de las listas
+        published = result['pnl_series']
+        for record in [late] + records[:6]:
+            view.apply(record, -1)
+        result = view.to_dict([])
+        assert result['paper_trades'] == [] and len(result['recent_bot_trades']) == 6
+        assert result['pnl_series'][0]['pnl_cumulative'] == result['pnl_series'][0]['pnl']
+        # La vista ya publicada no se modifica
+        assert published[0]['pnl'] == 5.0
@@ -0,0 +1,145 @@
+"""
+Tests unitarios para la capa de almacenamiento SQLite (WAL, pool de lectura, migración)
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.database import make_engines, make_session_factory, migrate_market_data, upsert
+from src.models.market_data import MarketData
+from src.services.technical_analysis import load_last_bars
+
+BASE = datetime(2024, 1, 1)
+LEGACY_SCHEMA = [
+    "CREATE TABLE market_data (id INTEGER NOT NULL PRIMARY KEY, symbol VARCHAR, timestamp DATETIME, "
+    "open FLOAT, high FLOAT, low FLOAT, close FLOAT, volume FLOAT, source VARCHAR)",
+    "CREATE INDEX ix_market_data_id ON market_data (id)",
+    "CREATE INDEX ix_market_data_symbol ON market_data (symbol)",
+]
+
+
+def bar(day, close=100.0, symbol='GGAL'):
+    return {'symbol': symbol, 'timestamp': BASE + timedelta(days=day), 'open': close, 'high': close,
+            'low': close, 'close': close, 'volume': 1000.0, 'source': 'test'}
+
+
+@pytest.fixture
+def engines(tmp_path):
+    writer, reader = make_engines(f"sqlite:///{tmp_path / 'test.db'}")
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def index_names(engine):
+    with engine.connect() as conn:
+        return {row[0] for row in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='market_data'")}
+
+
+class TestDatabase:
+    """Tests para make_engines, upsert, migrate_market_data y el ruteo de sesiones"""
+
+    def test_wal_and_read_only_pool(self, engines):
+        """Las conexiones usan WAL y las del pool de lectura no pueden escribir"""
+        writer, reader = engines
+        MarketData.__table__.create(bind=writer)
+        with reader.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("DELETE FROM market_data")
+
+    def test_upsert_updates_existing_bars(self, engines):
+        """El upsert inserta barras nuevas y actualiza las existentes por (símbolo, fecha)"""
+        writer, reader = engines
+        MarketData.__table__.create(bind=writer)
+        session = sessionmaker(bind=writer)()
+        upsert(session, MarketData, [bar(d) for d in range(3)])
+        upsert(session, MarketData, [bar(2, close=110.0), bar(3)])
+        session.commit()
+
+        read = sessionmaker(bind=reader)()
+        closes = [r.close for r in read.query(MarketData.close).order_by(MarketData.timestamp)]
+        assert closes == [100.0, 100.0, 110.0, 100.0]
+        read.close()
+        session.close()
+
+    def test_migration_dedupes_and_replaces_indexes(self, engines):
+        """La migración conserva la barra más nueva de cada duplicado y es idempotente"""
+        writer, _ = engines
+        with writer.begin() as conn:
+            for ddl in LEGACY_SCHEMA:
+                conn.exec_driver_sql(ddl)
+            for close in (100.0, 105.0):
+                conn.exec_driver_sql(
+                    "INSERT INTO market_data (symbol, timestamp, close) VALUES ('GGAL', '2024-01-01 00:00:00.000000', ?)",
+                    (close,))
+
+        assert migrate_market_data(writer) == 1
+        assert migrate_market_data(writer) == 0
+        names = index_names(writer)
+        assert {'uq_market_data_symbol_timestamp', 'ix_market_data_bars'} <= names
+        assert 'ix_market_data_symbol' not in names
+        with writer.connect() as conn:
+            assert conn.exec_driver_sql("SELECT close FROM market_data").scalar() == 105.0
+
+    def test_reading_session_does_not_hold_writer(self, engines):
+        """Una sesión que solo lee usa el pool de lectura y no bloquea a los escritores"""
+        writer, reader = engines
+        MarketData.__table__.create(bind=writer)
+        factory = make_session_factory(writer, reader)
+
+        reading = factory()
+        assert reading.query(MarketData).count() == 0
+        assert writer.pool.checkedout() == 0
+
+        writing = factory()
+        upsert(writing, MarketData, [bar(0)])
+        writing.commit()
+        writing.close()
+        reading.close()
+
+    def test_writing_session_reads_its_own_rows_and_releases_writer(self, engines):
+        """Desde la primera escritura hasta el commit todo va al escritor; después se libera"""
+        writer, reader = engines
+        MarketData.__table__.create(bind=writer)
+        session = make_session_factory(writer, reader)()
+
+        session.add(MarketData(**bar(0)))
+        session.flush()
+        upsert(session, MarketData, [bar(1)])
+        assert session.query(MarketData).count() == 2  # Filas sin commitear
+        assert writer.pool.checkedout() == 1
+        session.commit()
+        assert writer.pool.checkedout() == 0
+
+        # La sesión sigue abierta pero vuelve a leer del pool de lectura
+        assert session.query(MarketData).count() == 2
+        assert writer.pool.checkedout() == 0
+        session.close()
+
+    def test_last_bars_are_the_most_recent_in_order(self, engines):
+        """La consulta de "últimas N barras" trae las más nuevas (no las más viejas) en orden cronológico"""
+        writer, reader = engines
+        MarketData.__table__.create(bind=writer)
+        migrate_market_data(writer)
+        db = sessionmaker(bind=writer)()
+        upsert(db, MarketData, [bar(day, close=100.0 + day) for day in range(300)])
+        db.commit()
+        db.close()
+
+        read_db = sessionmaker(bind=reader)()
+        try:
+            df = load_last_bars(read_db, 'GGAL', 100)
+        finally:
+            read_db.close()
+        assert len(df) == 100
+        assert df.index[-1] == BASE + timedelta(days=299) and df.index.is_monotonic_increasing
+        assert list(df['close'][:2]) == [300.0, 301.0]
@@ -0,0 +1,140 @@
+"""
+Tests unitarios para la caché HTTP de la API REST (ETag/304 y gzip)
+"""
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask, jsonify
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.api.http_cache import GZIP_MIN_BYTES, ResponseCache, install_conditional_responses, source_version
+
+
+@pytest.fixture
+def app_and_cache():
+    """App Flask mínima con una ruta cacheada y otra que pasa por el after_request"""
+    app = Flask(__name__)
+    cache = ResponseCache()
+    state = {'version': 1, 'builds': 0, 'items': 3}
+
+    def build():
+        state['builds'] += 1
+        return {'items': ['x' * 50] * state['items']}
+
+    @app.route('/cached')
+    def cached():
+        return cache.respond(('cached',), state['version'], build)
+
+    @app.route('/plain')
+    def plain():
+        return jsonify({'items': ['y' * 50] * state['items']})
+
+    install_conditional_responses(app)
+    return app.test_client(), cache, state
+
+
+class TestResponseCache:
+    """Tests para ResponseCache"""
+
+    def test_builds_once_per_version(self, app_and_cache):
+        """Mientras la versión no cambie, el payload no se vuelve a construir"""
+        client, cache, state = app_and_cache
+        first = client.get('/cached')
+        second = client.get('/cached')
+        assert first.status_code == second.status_code == 200
+        assert first.data == second.data and state['builds'] == 1
+        assert cache.get_stats()['hits'] == 1
+
+        state['version'] = 2
+        client.get('/cached')
+        assert state['builds'] == 2
+
+    def test_if_none_match_returns_304(self, app_and_cache):
+        """Con el ETag actual responde 304 sin cuerpo; con uno viejo, el cuerpo completo"""
+        client, cache, state = app_and_cache
+        etag = client.get('/cached').headers['ETag']
+        assert etag.startswith('W/')
+
+        response = client.get('/cached', headers={'If-None-Match': etag})
+        assert response.status_code == 304 and response.data == b''
+        assert response.headers['ETag'] == etag
+        assert cache.get_stats()['not_modified'] == 1
+
+        state['version'] = 2
+        state['items'] = 4
+        response = client.get('/cached', headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.headers['ETag'] != etag
+
+    def test_gzip_only_for_large_bodies_when_accepted(self, app_and_cache):
+        """Comprime solo si el cliente acepta gzip y el cuerpo supera GZIP_MIN_BYTES"""
+        client, _, state = app_and_cache
+        small = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+        assert len(small.data) < GZIP_MIN_BYTES and 'Content-Encoding' not in small.headers
+
+        state['version'], state['items'] = 2, 100
+        plain = client.get('/cached')
+        assert 'Content-Encoding' not in plain.headers
+        zipped = client.get('/cached', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in zipped.headers['Vary']
+        assert gzip.decompress(zipped.data) == plain.data
+        # Misma representación lógica: mismo ETag y un solo build
+        assert zipped.headers['ETag'] == plain.headers['ETag'] and state['builds'] == 2
+
+
+class TestConditionalResponses:
+    """Tests para install_conditional_responses"""
+
+    def test_etag_and_304_on_plain_json(self, app_and_cache):
+        """Las respuestas JSON sin ResponseCache también llevan ETag y responden 304"""
+        client, _, _ = app_and_cache
+        response = client.get('/plain')
+        etag = response.headers['ETag']
+        assert response.status_code == 200 and json.loads(response.data)['items']
+
+        not_modified = client.get('/plain', headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304 and not_modified.data == b''
+
+    def test_gzip_on_plain_json(self, app_and_cache):
+        """Cuerpos grandes se comprimen solo si el cliente acepta gzip"""
+        client, _, state = app_and_cache
+        state['items'] = 100
+        plain = client.get('/plain')
+        zipped = client.get('/plain', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in plain.headers
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(zipped.data) == plain.data
+
+    def test_post_is_untouched(self):
+        """Solo se aplican a GET 200 de tipo JSON"""
+        app = Flask(__name__)
+
+        @app.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify({'ok': True})
+
+        install_conditional_responses(app)
+        response = app.test_client().post('/echo')
+        assert response.status_code == 200 and 'ETag' not in response.headers
+
+
+class TestSourceVersion:
+    """Tests para source_version"""
+
+    def test_changes_when_files_change(self, tmp_path):
+        """Cambia si se modifica un archivo o aparece uno nuevo en el directorio"""
+        (tmp_path / "a.json").write_text('{"a": 1}')
+        before = source_version(tmp_path)
+        assert before == source_version(tmp_path)
+
+        (tmp_path / "a.json").write_text('{"a": 12}')
+        after = source_version(tmp_path)
+        assert after != before
+        (tmp_path / "b.json").write_text('{}')
+        assert source_version(tmp_path) != after
+        assert source_version(tmp_path / "missing.json") == (('missing.json', None),)
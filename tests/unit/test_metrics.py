@@ -0,0 +1,82 @@
+"""
+Tests unitarios para el registro de métricas
+"""
+import pytest
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core import metrics as metrics_module
+from src.core.metrics import MetricsRegistry, load_snapshot, render_prometheus, timed, timer
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registro global aislado para cada test"""
+    fresh = MetricsRegistry(enabled=True)
+    monkeypatch.setattr(metrics_module, 'metrics', fresh)
+    return fresh
+
+
+class TestMetricsRegistry:
+    """Tests para MetricsRegistry y los helpers de instrumentación"""
+
+    def test_timed_decorator_and_timer(self, registry):
+        """El decorador y el context manager registran observaciones y errores"""
+        @timed("work_seconds", kind="decorated")
+        def work():
+            return 42
+
+        assert work() == 42
+        with pytest.raises(ValueError):
+            with timer("work_seconds", kind="block"):
+                raise ValueError("boom")
+
+        snapshot = registry.snapshot()
+        counts = {tuple(map(tuple, key))[0][1]: data['count'] for key, data in snapshot['histograms']['work_seconds']}
+        assert counts == {'decorated': 1, 'block': 1}
+        assert snapshot['counters']['work_errors_total'][0][1] == 1
+
+    def test_disabled_registry_records_nothing(self, registry):
+        """Con métricas deshabilitadas no se registra nada"""
+        registry.enabled = False
+
+        @timed("work_seconds")
+        def work():
+            return 1
+
+        work()
+        with timer("other_seconds"):
+            pass
+        registry.inc("calls_total")
+        assert registry.snapshot()['histograms'] == {}
+        assert registry.snapshot()['counters'] == {}
+
+    def test_cycle_summary_groups_sections(self, registry):
+        """El resumen del ciclo agrupa los timers observados durante el ciclo"""
+        registry.start_cycle()
+        registry.observe("analyze_symbol_seconds", 0.2)
+        registry.observe("analyze_symbol_seconds", 0.3)
+        registry.observe("iol_request_seconds", 0.1, endpoint="get_quote")
+        summary = registry.end_cycle(symbols=2)
+
+        assert summary['symbols'] == 2
+        assert summary['sections']['analyze_symbol_seconds'] == {'count': 2, 'total_ms': 500.0}
+        assert 'iol_request_seconds{endpoint=get_quote}' in summary['sections']
+        assert registry.get_cycle_summary()['cycles_tracked'] == 1
+
+    def test_prometheus_rendering_and_snapshot(self, registry, tmp_path):
+        """El snapshot exportado se puede leer y renderizar en formato Prometheus"""
+        registry.observe("db_read_seconds", 0.02, query="historical_data")
+        registry.inc("trades_total", side="buy")
+        path = tmp_path / "metrics_snapshot.json"
+        registry.export_snapshot(path)
+
+        text = render_prometheus((load_snapshot(path), {"process": "bot"}),
+                                 (registry.snapshot(), {"process": "api"}))
+        assert text.count("# TYPE db_read_seconds histogram") == 1
+        assert 'db_read_seconds_bucket{query="historical_data",le="0.025",process="bot"} 1' in text
+        assert 'db_read_seconds_bucket{query="historical_data",le="0.01",process="api"} 0' in text
+        assert 'trades_total{side="buy",process="bot"} 1.0' in text
@@ -0,0 +1,179 @@
+"""
+Tests unitarios para el model registry, la caché LRU y el model server
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.model_registry import ModelCache, ModelClient, ModelRegistry, ModelServer, load_authkey
+
+
+class FakePredictor:
+    """Predictor sin TensorFlow: predice el último close + offset"""
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+
+    def save(self, prefix):
+        Path(f"{prefix}_model.h5").write_text(str(self.offset))
+        Path(f"{prefix}_scaler.pkl").write_text("scaler")
+
+    def predict_batch(self, windows):
+        return windows[:, -1, 0] + self.offset
+
+
+def fake_loader(prefix):
+    return FakePredictor(float(Path(f"{prefix}_model.h5").read_text()))
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path), keep_versions=2)
+
+
+class TestModelRegistry:
+    """Tests para ModelRegistry y ModelCache"""
+
+    def test_publish_versions_and_checksums(self, registry, tmp_path):
+        """Cada publish crea una versión nueva y deja la actual verificable"""
+        registry.publish('GGAL', FakePredictor(1.0))
+        entry = registry.publish('GGAL', FakePredictor(2.0))
+
+        assert entry['version'] == 2
+        assert registry.verify('GGAL')
+        assert fake_loader(str(tmp_path / 'GGAL')).offset == 2.0
+
+        (tmp_path / 'GGAL_model.h5').write_text("corrupto")
+        assert not registry.verify('GGAL')
+        with pytest.raises(ValueError):
+            registry.load('GGAL', fake_loader)
+
+    def test_old_versions_are_pruned(self, registry, tmp_path):
+        """Solo se conservan las últimas keep_versions versiones"""
+        for offset in range(4):
+            registry.publish('YPF', FakePredictor(offset))
+        versions = sorted(p.name for p in (tmp_path / 'versions' / 'YPF').glob('*_model.h5'))
+        assert versions == ['v3_model.h5', 'v4_model.h5']
+
+    def test_cache_hot_swap_and_lru(self, registry):
+        """La caché recarga al publicar una versión nueva y desaloja el menos usado"""
+        cache = ModelCache(registry, max_models=2, loader=fake_loader)
+        for symbol in ('A', 'B', 'C'):
+            registry.publish(symbol, FakePredictor(1.0))
+
+        first = cache.get('A')
+        assert cache.get('A') is first
+        registry.publish('A', FakePredictor(5.0))
+        assert cache.get('A').offset == 5.0
+        assert cache.stats['reloads'] == 1
+
+        cache.get('B')
+        cache.get('C')
+        assert cache.loaded() == ['B', 'C']
+        assert cache.stats['evictions'] == 1
+
+    def test_slow_load_does_not_block_other_models(self, registry):
+        """Mientras un modelo carga, los demás se siguen sirviendo"""
+        registry.publish('A', FakePredictor(1.0))
+        registry.publish('B', FakePredictor(2.0))
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_loader(prefix):
+            if prefix.endswith('A'):
+                loading.set()
+                release.wait(5)
+            return fake_loader(prefix)
+
+        cache = ModelCache(registry, loader=slow_loader)
+        results = {}
+        loader_thread = threading.Thread(target=lambda: results.setdefault('A', cache.get('A')))
+        loader_thread.start()
+        assert loading.wait(5)
+        try:
+            assert cache.get('B').offset == 2.0
+            assert 'A' not in results
+        finally:
+            release.set()
+            loader_thread.join(5)
+        assert results['A'].offset == 1.0 and cache.stats['loads'] == 2
+
+    def test_generic_model_fallback(self, registry):
+        """Los símbolos sin modelo propio usan el modelo genérico"""
+        cache = ModelCache(registry, loader=fake_loader)
+        assert cache.get('NOPE') is None
+        registry.publish('lstm', FakePredictor(3.0))
+        assert cache.get('NOPE').offset == 3.0
+
+
+    def test_corrupt_symbol_model_falls_back_to_generic(self, registry, tmp_path):
+        """Un modelo del símbolo que no pasa el checksum (o no carga) cede al genérico"""
+        registry.publish('lstm', FakePredictor(3.0))
+        registry.publish('GGAL', FakePredictor(1.0))
+        (tmp_path / 'GGAL_model.h5').write_text("corrupto")
+        calls = []
+
+        def counting_loader(prefix):
+            calls.append(Path(prefix).name)
+            return fake_loader(prefix)
+
+        cache = ModelCache(registry, loader=counting_loader)
+        assert cache.get('GGAL').offset == 3.0
+        assert cache.get('GGAL').offset == 3.0
+        assert cache.stats['fallbacks'] == 2 and cache.stats['errors'] == 1
+        assert calls == ['lstm']  # La versión corrupta no se reintenta en cada get
+
+        # Modelo previo al registry (sin checksum) que el loader no puede leer
+        (tmp_path / 'YPF_model.h5').write_text("no es un número")
+        (tmp_path / 'YPF_scaler.pkl').write_text("scaler")
+        assert cache.get('YPF').offset == 3.0
+
+        registry.publish('GGAL', FakePredictor(7.0))
+        assert cache.get('GGAL').offset == 7.0
+
+class TestModelServer:
+    """Tests para el model server por socket local"""
+
+    def test_batched_predictions_over_socket(self, registry):
+        """El cliente recibe las predicciones de un batch de varios símbolos"""
+        registry.publish('A', FakePredictor(1.0))
+        registry.publish('B', FakePredictor(10.0))
+        cache = ModelCache(registry, loader=fake_loader)
+        server = ModelServer(cache, address=('127.0.0.1', 0), authkey=b'test')
+        server.start()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        try:
+            client = ModelClient(address=server.address, authkey=b'test')
+            windows = [np.full((60, 6), 100.0), np.full((60, 6), 200.0), np.full((60, 6), 1.0)]
+            predictions = client.predict_batch([('A', windows[0]), ('B', windows[1]), ('A', windows[2])])
+            assert predictions == [101.0, 210.0, 2.0]
+            assert client.get_stats()['loads'] == 2
+        finally:
+            server.stop()
+
+    def test_authkey_is_random_per_install(self, tmp_path, monkeypatch):
+        """Sin MODEL_SERVER_AUTHKEY se genera un secreto aleatorio 0600 y se reutiliza"""
+        monkeypatch.delenv('MODEL_SERVER_AUTHKEY', raising=False)
+        monkeypatch.delenv('MODEL_SERVER_KEY_FILE', raising=False)
+        key_file = tmp_path / 'data' / 'model_server.key'
+
+        key = load_authkey(key_file)
+        assert len(key) == 64 and load_authkey(key_file) == key
+        assert load_authkey(tmp_path / 'other.key') != key
+        if os.name == 'posix':
+            assert key_file.stat().st_mode & 0o777 == 0o600
+
+        monkeypatch.setenv('MODEL_SERVER_AUTHKEY', 'from-env')
+        assert load_authkey(key_file) == b'from-env'
+
+    def test_client_returns_none_when_server_is_down(self):
+        """Sin servidor el cliente devuelve None (el llamador usa su modelo local)"""
+        client = ModelClient(address=('127.0.0.1', 1), authkey=b'test')
+        assert client.predict('A', np.zeros((60, 6))) is None
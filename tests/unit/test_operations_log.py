@@ -0,0 +1,119 @@
+"""
+Tests unitarios para el log de eventos de operaciones (segmentos JSONL)
+"""
+import json
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.operations_log import OperationsLog
+
+BASE = datetime(2024, 1, 1)
+
+
+def fill(log, n, start=0):
+    for i in range(start, start + n):
+        log.append('ANALYSIS' if i % 2 else 'PREDICTION', {'i': i}, (BASE + timedelta(hours=i)).isoformat())
+
+
+@pytest.fixture
+def log(tmp_path):
+    return OperationsLog(tmp_path / "ops", segment_max_bytes=500, retention_days=None,
+                         max_segments=None, legacy_file=None)
+
+
+class TestOperationsLog:
+    """Tests para OperationsLog y LogCursor"""
+
+    def test_append_rotates_segments(self, log):
+        """Los eventos se reparten en segmentos con seq global creciente"""
+        fill(log, 40)
+        assert len(log.segments()) > 1
+        assert log.last_seq() == 40
+        assert log.count() == 40
+        assert [r['seq'] for r in log.read_from(35)] == [36, 37, 38, 39, 40]
+
+    def test_tail_and_range(self, log):
+        """tail y range filtran por tipo y tiempo"""
+        fill(log, 40)
+        assert [r['data']['i'] for r in log.tail(3)] == [37, 38, 39]
+        assert [r['data']['i'] for r in log.tail(2, types={'PREDICTION'})] == [36, 38]
+
+        window = log.range(BASE + timedelta(hours=10), BASE + timedelta(hours=14), types={'ANALYSIS'})
+        assert [r['data']['i'] for r in window] == [11, 13]
+
+    def test_cursor_returns_only_new_events(self, log):
+        """El cursor retoma desde su offset, también desde otra instancia con el mismo nombre"""
+        fill(log, 10)
+        cursor = log.cursor('reporte')
+        assert len(cursor.poll(limit=4)) == 4
+        assert [r['seq'] for r in cursor.poll()] == list(range(5, 11))
+        assert cursor.poll() == []
+
+        fill(log, 3, start=10)
+        assert [r['seq'] for r in log.cursor('reporte').poll()] == [11, 12, 13]
+
+    def test_page_walks_backwards_with_filters(self, log):
+        """La paginación por cursor recorre del más nuevo al más viejo filtrando por tipo y fecha"""
+        fill(log, 40)
+        seen, cursor = [], None
+        while True:
+            records, cursor = log.page(before=cursor, limit=6, types=['ANALYSIS'])
+            seen.extend(r['data']['i'] for r in records)
+            if cursor is None:
+                break
+        assert seen == list(range(39, 0, -2))
+
+        records, _ = log.page(limit=10, since=BASE + timedelta(hours=10), until=BASE + timedelta(hours=12))
+        assert [r['data']['i'] for r in records] == [11, 10]
+
+    def test_retention_keeps_last_segments(self, tmp_path):
+        """Con max_segments se borran los segmentos más viejos"""
+        log = OperationsLog(tmp_path / "ops", segment_max_bytes=200, max_segments=3, legacy_file=None)
+        fill(log, 30)
+        assert len(log.segments()) <= 3
+        assert log.tail(1)[0]['seq'] == 30
+
+    def test_legacy_json_is_migrated(self, tmp_path):
+        """El operations_log.json anterior se importa en el primer append"""
+        legacy = tmp_path / "operations_log.json"
+        legacy.write_text(json.dumps([
+            {'type': 'TRADE_EXECUTION', 'timestamp': BASE.isoformat(), 'data': {'symbol': 'GGAL'}},
+            # Las alertas se guardaban sin 'data': sus campos son el payload
+            {'type': 'ALERT', 'timestamp': BASE.isoformat(), 'level': 'warning', 'title': 'API', 'message': 'lenta'},
+        ]))
+        log = OperationsLog(tmp_path / "ops", legacy_file=legacy)
+        log.append('ALERT', {'title': 'x'})
+        records = log.tail(10)
+        assert [r['type'] for r in records] == ['TRADE_EXECUTION', 'ALERT', 'ALERT']
+        assert records[1]['data'] == {'level': 'warning', 'title': 'API', 'message': 'lenta'}
+
+    def test_writers_in_other_processes_get_unique_seqs(self, tmp_path):
+        """Dos instancias sobre el mismo directorio (como dos procesos) no repiten seq, aun al rotar"""
+        kwargs = dict(segment_max_bytes=300, retention_days=None, max_segments=None, legacy_file=None)
+        first, second = OperationsLog(tmp_path / "ops", **kwargs), OperationsLog(tmp_path / "ops", **kwargs)
+
+        def write(log, tag):
+            for i in range(40):
+                log.append('ANALYSIS', {'writer': tag, 'i': i}, BASE.isoformat())
+
+        threads = [threading.Thread(target=write, args=(log, tag)) for tag, log in (('a', first), ('b', second))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        records = first.read_from(0)
+        assert [r['seq'] for r in records] == list(range(1, 81))
+        for tag in 'ab':
+            assert [r['data']['i'] for r in records if r['data']['writer'] == tag] == list(range(40))
+
+    def test_unknown_type_is_rejected(self, log):
+        with pytest.raises(ValueError):
+            log.append('OTRO', {})
@@ -0,0 +1,107 @@
+"""
+Tests unitarios para el motor de riesgo del portafolio (VaR/CVaR y control pre-trade)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.portfolio_risk import DEFAULT_DAILY_VOL, PortfolioRiskEngine
+
+Z_95 = 1.6448536269514722
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(5)
+    common = rng.normal(0, 0.01, 300)
+    data = {
+        'GGAL': common + rng.normal(0, 0.02, 300),
+        'YPFD': common + rng.normal(0, 0.015, 300),
+        'PAMP': rng.normal(0, 0.01, 300),
+    }
+    return pd.DataFrame(data)
+
+
+def portfolio(**values):
+    return [{'symbol': s, 'quantity': 1, 'total_val': v} for s, v in values.items()]
+
+
+class TestPortfolioRiskEngine:
+    """Tests para PortfolioRiskEngine"""
+
+    def test_var_and_decomposition_match_direct_formula(self, returns):
+        """VaR = z·√(w'Σw); los componentes suman el VaR total"""
+        engine = PortfolioRiskEngine(confidence=0.95)
+        engine.set_returns(returns)
+        engine.set_positions(portfolio(GGAL=50_000, YPFD=30_000, PAMP=20_000))
+
+        w = np.array([50_000, 30_000, 20_000])
+        cov = returns[['GGAL', 'YPFD', 'PAMP']].cov().to_numpy()
+        expected = Z_95 * np.sqrt(w @ cov @ w)
+        assert engine.var() == pytest.approx(expected)
+        assert engine.cvar() > engine.var()
+        components = engine.component_var()
+        assert sum(components.values()) == pytest.approx(expected)
+        assert max(components, key=components.get) == 'GGAL'
+
+    def test_incremental_var_matches_full_recalculation(self, returns):
+        """El VaR incremental O(1) coincide con recalcular; apply_order deja el mismo estado"""
+        engine = PortfolioRiskEngine()
+        engine.set_returns(returns)
+        engine.set_positions(portfolio(GGAL=50_000, PAMP=20_000))
+
+        var_after, change = engine.incremental_var('YPFD', 'BUY', 10, 1_000.0)
+        reference = PortfolioRiskEngine()
+        reference.set_returns(returns)
+        reference.set_positions(portfolio(GGAL=50_000, PAMP=20_000, YPFD=10_000))
+        assert var_after == pytest.approx(reference.var())
+        assert change == pytest.approx(reference.var() - engine.var())
+
+        engine.apply_order('YPFD', 'BUY', 10, 1_000.0)
+        assert engine.var() == pytest.approx(reference.var())
+        # No se puede vender más de lo que hay: la venta total deja el VaR sin YPFD
+        engine.apply_order('YPFD', 'SELL', 50, 1_000.0)
+        reference.set_positions(portfolio(GGAL=50_000, PAMP=20_000))
+        assert engine.var() == pytest.approx(reference.var())
+
+    def test_check_order_limits(self, returns):
+        """Bloquea órdenes que suben el VaR sobre el límite; las que reducen riesgo pasan siempre"""
+        engine = PortfolioRiskEngine(max_var_pct=0.05, max_component_pct=0.6)
+        engine.set_returns(returns)
+        engine.set_positions(portfolio(GGAL=20_000, YPFD=20_000, PAMP=20_000))
+
+        allowed, _, metrics = engine.check_order('PAMP', 'BUY', 10, 1_000.0, equity=100_000)
+        assert allowed and metrics['incremental_var'] > 0
+        allowed, reason, _ = engine.check_order('GGAL', 'BUY', 100, 1_000.0, equity=100_000)
+        assert not allowed and 'GGAL' in reason
+        allowed, reason, _ = engine.check_order('GGAL', 'BUY', 10, 1_000.0, equity=20_000)
+        assert not allowed and 'VaR' in reason
+        assert engine.check_order('GGAL', 'SELL', 10, 1_000.0, equity=20_000)[0]
+
+        # Símbolo sin historia: volatilidad por defecto, sin correlación
+        var_after, _ = PortfolioRiskEngine().incremental_var('ALUA', 'BUY', 10, 100.0)
+        assert var_after == pytest.approx(Z_95 * DEFAULT_DAILY_VOL * 1_000)
+        engine.apply_order('ALUA', 'BUY', 10, 100.0)
+        assert engine.component_var()['ALUA'] > 0
+        assert engine.get_stats()['blocked'] == 2
+
+    def test_component_cap_needs_enough_positions(self, returns):
+        """Con dos posiciones alguna siempre aporta ≥50% del VaR: el tope del 40% no bloquea sumar"""
+        engine = PortfolioRiskEngine()
+        engine.set_returns(returns)
+        engine.set_positions(portfolio(GGAL=1_000, YPFD=1_000))
+
+        for symbol in ('GGAL', 'YPFD'):
+            allowed, reason, metrics = engine.check_order(symbol, 'BUY', 1, 100.0, equity=1_000_000)
+            assert allowed, reason
+            assert metrics['var_pct'] < 0.001
+        # Con una tercera posición (3 > 1/0.4) el tope vuelve a aplicar
+        engine.set_positions(portfolio(GGAL=1_000, YPFD=1_000, PAMP=1_000))
+        allowed, reason, _ = engine.check_order('GGAL', 'BUY', 100, 100.0, equity=1_000_000)
+        assert not allowed and 'GGAL' in reason
@@ -0,0 +1,62 @@
+"""
+Tests unitarios para el estado del portafolio en memoria
+"""
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.portfolio_state import PortfolioState
+
+
+def position(symbol, quantity, price=100.0):
+    return {'symbol': symbol, 'quantity': quantity, 'avg_price': price, 'market': 'ARG'}
+
+
+class TestPortfolioState:
+    """Tests para PortfolioState: escritura solo ante cambios, diff y eventos"""
+
+    def test_merge_writes_only_when_changed(self, tmp_path):
+        """Un sync que trae lo mismo no publica, pero renueva last_updated"""
+        path = tmp_path / "portfolio.json"
+        state = PortfolioState(path)
+        events = []
+        state.subscribe(events.append)
+
+        state.replace([position('GGAL', 10), position('YPFD', 5)], source='save')
+        saved = json.loads(path.read_text(encoding='utf-8'))
+        path.write_text(json.dumps({**saved, 'last_updated': '2025-01-01T00:00:00'}), encoding='utf-8')
+        assert state.merge([position('GGAL', 10)], source='iol') is None
+        assert json.loads(path.read_text(encoding='utf-8'))['last_updated'] > '2025-01-01T00:00:00'
+        assert state.get_stats()['writes'] == 1 and state.get_stats()['unchanged'] == 1
+
+        change = state.merge([position('GGAL', 15), position('PAMP', 3)], source='iol')
+        assert (change.source, change.added, change.removed, change.changed) == ('iol', ['PAMP'], [], ['GGAL'])
+        assert [e.version for e in events] == [1, 2]
+        saved = json.loads(path.read_text(encoding='utf-8'))['portfolio']
+        assert [p['symbol'] for p in saved] == ['GGAL', 'YPFD', 'PAMP'] and saved[0]['quantity'] == 15
+
+    def test_get_returns_copies(self, tmp_path):
+        """Modificar lo leído no altera el estado (update_prices_from_iol muta la lista)"""
+        state = PortfolioState(tmp_path / "portfolio.json")
+        assert state.get() is None
+        state.replace([position('GGAL', 10)])
+
+        portfolio = state.get()
+        portfolio[0]['last_price'] = 120.0
+        assert 'last_price' not in state.get()[0]
+        assert state.replace(portfolio, source='iol_prices').changed == ['GGAL']
+
+    def test_external_edit_is_reloaded_and_published(self, tmp_path):
+        """Si otro proceso reescribe el archivo, la próxima lectura lo detecta y lo publica"""
+        path = tmp_path / "portfolio.json"
+        state = PortfolioState(path)
+        state.replace([position('GGAL', 10)])
+        events = []
+        state.subscribe(events.append)
+
+        path.write_text(json.dumps({'portfolio': [position('GGAL', 10), position('ALUA', 1)]}), encoding='utf-8')
+        assert [p['symbol'] for p in state.get()] == ['GGAL', 'ALUA']
+        assert len(events) == 1 and events[0].source == 'file' and events[0].added == ['ALUA']
@@ -0,0 +1,160 @@
+"""
+Tests unitarios para el servicio de predicciones batch de la API
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.market_data_events import publish_market_data
+from src.services.prediction_batcher import PredictionBatcher
+
+
+class FakeService:
+    """generate_signals que registra cada batch y bloquea un poco (como la inferencia)"""
+
+    def __init__(self, delay=0.05, known=('GGAL', 'YPFD', 'PAMP')):
+        self.delay = delay
+        self.known = set(known)
+        self.batches = []
+        self.threads = set()
+
+    def generate_signals(self, symbols, threshold=2.0):
+        self.batches.append(list(symbols))
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return {s: {'signal': 'BUY', 'change_pct': 3.0} if s in self.known else None for s in symbols}
+
+
+class Markers:
+    """Marca de última barra por símbolo, como la vería otro proceso al ingerir"""
+
+    def __init__(self):
+        self.bars = {}
+
+    def __call__(self, symbols):
+        return {s: self.bars[s] for s in symbols if s in self.bars}
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestPredictionBatcher:
+    """Tests para PredictionBatcher"""
+
+    def test_concurrent_symbols_share_one_batch(self):
+        """Pedidos del mismo símbolo se coalescen y distintos símbolos van en un solo batch"""
+        service = FakeService()
+        batcher = PredictionBatcher(service, window_ms=20, markers=Markers(), clock=Clock())
+
+        async def run():
+            return await asyncio.gather(*(batcher.predict(s) for s in ['GGAL', 'YPFD', 'GGAL', 'XXX', 'GGAL']))
+
+        results = asyncio.run(run())
+        assert service.batches == [['GGAL', 'YPFD', 'XXX']]
+        assert results[0] == results[2] == results[4] == {'signal': 'BUY', 'change_pct': 3.0}
+        assert results[3] is None
+        assert batcher.stats['coalesced'] == 2
+        # La inferencia corre en el executor, no en el hilo del event loop
+        assert all(name.startswith('prediction') for name in service.threads)
+
+    def test_cache_until_ingest_event(self):
+        """El resultado se reutiliza hasta que se publica la ingesta de datos del símbolo"""
+        service = FakeService(delay=0)
+        batcher = PredictionBatcher(service, window_ms=1, markers=Markers(), clock=Clock())
+
+        asyncio.run(batcher.predict_many(['GGAL', 'YPFD']))
+        asyncio.run(batcher.predict('GGAL'))
+        assert len(service.batches) == 1
+        assert batcher.stats['cache_hits'] == 1
+
+        publish_market_data(['GGAL'])
+        asyncio.run(batcher.predict_many(['GGAL', 'YPFD']))
+        assert service.batches == [['GGAL', 'YPFD'], ['GGAL']]
+        batcher.shutdown()
+
+    def test_none_results_are_not_cached(self):
+        """Sin modelo o sin datos (None) se vuelve a intentar en el próximo pedido"""
+        service = FakeService(delay=0)
+        batcher = PredictionBatcher(service, window_ms=1, markers=Markers(), clock=Clock())
+
+        assert asyncio.run(batcher.predict('XXX')) is None
+        assert asyncio.run(batcher.predict('XXX')) is None
+        assert len(service.batches) == 2
+        assert batcher.get_stats()['cached_symbols'] == 0
+        batcher.shutdown()
+
+    def test_ingest_during_batch_is_not_cached(self):
+        """Si llegan datos mientras se predice, el resultado (ya viejo) no queda en caché"""
+        service = FakeService(delay=0.1)
+        batcher = PredictionBatcher(service, window_ms=1, markers=Markers(), clock=Clock())
+
+        async def run():
+            task = asyncio.create_task(batcher.predict('GGAL'))
+            await asyncio.sleep(0.05)
+            # Desde otro hilo, como el DataCollector del bot
+            thread = threading.Thread(target=publish_market_data, args=(['GGAL'],))
+            thread.start()
+            thread.join()
+            await task
+            await batcher.predict('GGAL')
+
+        asyncio.run(run())
+        assert len(service.batches) == 2
+        batcher.shutdown()
+
+    def test_ingest_from_other_process_detected_by_marker(self):
+        """Cada check_seconds se compara la última barra y se descartan los símbolos que cambiaron"""
+        service = FakeService(delay=0)
+        markers, clock = Markers(), Clock()
+        markers.bars = {'GGAL': ('2024-03-04', 100.0), 'YPFD': ('2024-03-04', 50.0)}
+        batcher = PredictionBatcher(service, window_ms=1, check_seconds=60, markers=markers, clock=clock)
+
+        async def run():
+            await batcher.predict_many(['GGAL', 'YPFD'])
+            markers.bars['GGAL'] = ('2024-03-05', 101.0)  # scripts/ingest_data.py
+            clock.now += 30
+            await batcher.predict('GGAL')  # Todavía no toca verificar
+            assert batcher._check_task is None
+            clock.now += 30
+            await batcher.predict('GGAL')  # Sale de caché y dispara la verificación
+            await batcher._check_task
+            await batcher.predict_many(['GGAL', 'YPFD'])
+
+        asyncio.run(run())
+        assert service.batches == [['GGAL', 'YPFD'], ['GGAL']]
+        assert batcher.stats['stale_invalidations'] == 1
+        batcher.shutdown()
+
+    def test_event_loop_is_not_blocked(self):
+        """Mientras el modelo trabaja, el loop sigue atendiendo otras tareas"""
+        batcher = PredictionBatcher(FakeService(delay=0.2), window_ms=1, markers=Markers(), clock=Clock())
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            await batcher.predict_many(['GGAL', 'PAMP'])
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(run()) >= 5
+        stats = batcher.get_stats()
+        assert stats['batches'] == 1
+        assert stats['latency_ms']['count'] == 2
+        assert stats['latency_ms']['p99'] >= stats['latency_ms']['p50'] > 0
@@ -0,0 +1,124 @@
+"""
+Tests unitarios para ServiceRegistry
+"""
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.service_registry import ServiceRegistry, LazyService
+
+
+class TestServiceRegistry:
+    """Tests para ServiceRegistry"""
+
+    def test_lazy_construction_and_timing(self):
+        """El servicio se construye recién en el primer get y una sola vez"""
+        calls = []
+        registry = ServiceRegistry()
+        registry.register('svc', lambda: calls.append(1) or object())
+
+        assert not registry.is_built('svc')
+        first = registry.get('svc')
+        assert registry.get('svc') is first
+        assert len(calls) == 1
+        assert 'svc' in registry.timings
+
+    def test_concurrent_get_builds_once(self):
+        """Varios threads pidiendo el mismo servicio no lo construyen dos veces"""
+        calls = []
+
+        def slow_factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        registry = ServiceRegistry()
+        registry.register('svc', slow_factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('svc'))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(set(map(id, results))) == 1
+
+    def test_optional_service_failure_returns_none(self):
+        """Un servicio opcional que falla queda en None"""
+        registry = ServiceRegistry()
+        registry.register('broken', lambda: 1 / 0, optional=True)
+        assert registry.get('broken') is None
+
+        registry.register('required', lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            registry.get('required')
+
+    def test_required_failure_is_cached(self):
+        """Un servicio requerido que falla no vuelve a ejecutar la factory hasta reset()"""
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise RuntimeError("sin conexión")
+
+        registry = ServiceRegistry()
+        registry.register('required', broken)
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                registry.get('required')
+        assert len(calls) == 1
+
+        registry.reset('required')
+        with pytest.raises(RuntimeError):
+            registry.get('required')
+        assert len(calls) == 2
+
+    def test_dependency_cycle_raises_instead_of_deadlocking(self):
+        """Un ciclo de dependencias se rechaza en get() y el warm-up lo omite sin colgarse"""
+        registry = ServiceRegistry()
+        registry.register('a', object, depends_on=['b'])
+        registry.register('b', object, depends_on=['a'])
+        registry.register('c', object)
+
+        with pytest.raises(ValueError, match='a -> b -> a'):
+            registry.get('a')
+
+        thread = threading.Thread(target=registry.warm_up, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert registry.is_built('c') and not registry.is_built('a')
+
+    def test_warm_up_respects_dependencies(self):
+        """El warm-up construye las dependencias antes que los dependientes"""
+        order = []
+        registry = ServiceRegistry()
+        registry.register('base', lambda: order.append('base'))
+        registry.register('child', lambda: order.append('child'), depends_on=['base'])
+
+        registry.warm_up(max_workers=2)
+        assert order == ['base', 'child']
+
+    def test_lazy_service_descriptor(self):
+        """El descriptor resuelve desde el registro y permite reemplazar con mocks"""
+
+        class Bot:
+            svc = LazyService()
+
+            def __init__(self):
+                self.services = ServiceRegistry()
+                self.services.register('svc', lambda: 'real')
+
+        bot = Bot()
+        assert bot.svc == 'real'
+
+        other = Bot()
+        other.svc = 'mock'
+        assert other.svc == 'mock'
+        assert not other.services.is_built('svc')
@@ -0,0 +1,97 @@
+"""
+Tests unitarios para el scoring de señales (camino en vivo vs replay vectorizado)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.prediction_service import PredictionService
+from src.services.signal_scoring import (
+    score_arrays, score_history, score_signal, score_universe, technical_fallback_change
+)
+from src.services.technical_analysis import TechnicalAnalysisService
+
+
+def random_bars(seed, n=300, start='2020-01-01'):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.date_range(start, periods=n, freq='D')
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                         'close': close, 'volume': 1000.0}, index=index)
+
+
+def live_score(df):
+    """Lo que calcula analyze_symbol sobre esa ventana (sin modelo IA, con respaldo técnico)"""
+    service = TechnicalAnalysisService()
+    technical = {
+        'momentum': service.calculate_momentum_indicators(df),
+        'trend': service.calculate_trend_indicators(df),
+    }
+    prediction = PredictionService.generate_signal_from_technical(None, 'TEST', technical)
+    ai_signal = PredictionService.signal_from_prediction(prediction) if prediction else None
+    return score_signal(ai_signal, technical, None)[0]
+
+
+class TestSignalScoring:
+    """Tests para score_signal, score_arrays, score_history y score_universe"""
+
+    def test_vectorized_matches_scalar(self):
+        """Para los mismos valores, score_arrays da el mismo puntaje que score_signal"""
+        rng = np.random.default_rng(7)
+        n = 2000
+        rsi = rng.choice([np.nan, 0.0, 30.0, 50.0, 70.0, 10.0, 45.0, 60.0, 85.0], n)
+        macd = rng.normal(0, 1, n)
+        macd[rng.random(n) < 0.1] = np.nan
+        macd_signal = rng.normal(0, 1, n)
+        price = rng.choice([0.0, 100.0, 105.0], n)
+        sma_20 = rng.choice([np.nan, 100.0, 103.0], n)
+        change = rng.choice([np.nan, -4.0, -2.0, -1.5, 1.5, 2.0, 2.5, 4.0], n)
+        from_model = rng.random(n) < 0.5
+        sentiment = rng.choice([-1, 0, 1], n)
+        sentiment_score = rng.choice([-0.5, -0.2, -0.1, 0.1, 0.2, 0.5], n)
+
+        vectorized = score_arrays(rsi, macd, macd_signal, price, sma_20, ai_change=change,
+                                  ai_from_model=from_model, sentiment=sentiment,
+                                  sentiment_score=sentiment_score)
+        for i in range(n):
+            ai_signal = None
+            if not np.isnan(change[i]):
+                ai_signal = PredictionService.signal_from_prediction(
+                    {'change_pct': change[i], 'source': 'ai_model' if from_model[i] else 'technical_analysis'})
+            technical = {
+                'momentum': {'rsi': None if np.isnan(rsi[i]) else rsi[i],
+                             'macd': macd[i], 'macd_signal': macd_signal[i]},
+                'trend': {'current_price': price[i], 'sma_20': None if np.isnan(sma_20[i]) else sma_20[i]},
+            }
+            label = {1: 'POSITIVE', -1: 'NEGATIVE', 0: 'NEUTRAL'}[sentiment[i]]
+            news = {'sample_size': 3, 'overall_sentiment': label, 'score': sentiment_score[i]}
+            assert vectorized[i] == score_signal(ai_signal, technical, news)[0], i
+
+    def test_history_matches_live_analysis(self):
+        """Cada barra de la historia puntúa igual que el bot en vivo sobre los datos hasta esa barra"""
+        df = random_bars(seed=1)
+        history = score_history(df, thresholds=(20, -20))
+        for end in [30, 31, 45, 60, 150, 300]:
+            assert history['score'].iloc[end - 1] == live_score(df.iloc[:end]), end
+
+        fallback = technical_fallback_change(history['rsi'], history['macd'], history['macd_signal'],
+                                             history['close'], history['sma_20'])
+        assert np.isnan(fallback[:19]).all() and not np.isnan(fallback[19:]).any()
+
+    def test_universe_matches_per_symbol_history(self):
+        """La matriz del universo coincide con puntuar cada símbolo por separado"""
+        frames = {'GGAL': random_bars(2, n=250), 'YPFD': random_bars(3, n=180, start='2020-03-01'),
+                  'PAMP': random_bars(4, n=220).iloc[::2]}  # PAMP con huecos
+        bars = pd.concat([df.assign(symbol=s).rename_axis('timestamp').reset_index()
+                          for s, df in frames.items()])
+
+        matrix = score_universe(bars)
+        assert sorted(matrix.columns) == ['GGAL', 'PAMP', 'YPFD']
+        for symbol, df in frames.items():
+            expected = score_history(df, thresholds=(20, -20))['score'].astype(float)
+            pd.testing.assert_series_equal(matrix[symbol].dropna(), expected, check_names=False, check_freq=False)
@@ -0,0 +1,155 @@
+"""
+Tests unitarios para el pool de comandos de TelegramCommandHandler
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services import telegram_command_handler as module
+from src.services.telegram_command_handler import TelegramCommandHandler
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Mensajes enviados a la API de Telegram (sin red)"""
+    messages = []
+
+    def post(url, json=None, timeout=None):
+        messages.append(json['text'])
+        response = MagicMock()
+        response.json.return_value = {'ok': True}
+        return response
+
+    monkeypatch.setattr(module.requests, 'post', post)
+    return messages
+
+
+@pytest.fixture
+def handler(sent):
+    return TelegramCommandHandler(bot_token='test-token', chat_id='1')
+
+
+def update(text, update_id=1):
+    return {'update_id': update_id, 'message': {'chat': {'id': 1}, 'text': text, 'from': {}}}
+
+
+def wait_idle(handler, timeout=5.0):
+    deadline = time.time() + timeout
+    while handler.get_command_stats()['inflight'] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestCommandPool:
+    """Tests para _dispatch: pool, coalescing, caché y timeouts"""
+
+    def test_slow_command_does_not_block_polling(self, handler, sent):
+        """Un comando lento no frena el procesamiento de updates y los de solo lectura repetidos se agrupan"""
+        release = threading.Event()
+        calls = []
+
+        def slow(chat_id, args):
+            calls.append(args)
+            release.wait(5)
+            handler._send_message(chat_id, "listo")
+
+        handler.register_command('/start', slow)
+        start = time.perf_counter()
+        for i, text in enumerate(['/start GGAL', '/start GGAL', '/help'], 1):
+            handler._process_message(update(text, i))
+        assert time.perf_counter() - start < 0.5
+
+        release.set()
+        wait_idle(handler)
+        assert calls == ['GGAL']
+        assert handler.command_stats['coalesced'] == 1
+        assert sent.count("listo") == 1
+
+    def test_read_only_responses_are_cached(self, handler, sent):
+        """/saldo se responde desde caché hasta que un comando que cambia estado la invalida"""
+        calls = []
+
+        def balance(chat_id, args):
+            calls.append(args)
+            handler._send_message(chat_id, f"💰 Saldo #{len(calls)}")
+
+        handler.register_command('/saldo', balance)
+        handler.register_command('/pausar', lambda chat_id, args: handler._send_message(chat_id, "⏸️"))
+
+        for text in ['/saldo', '/saldo', '/pausar', '/saldo']:
+            handler._process_message(update(text))
+            wait_idle(handler)
+
+        assert len(calls) == 2
+        assert sent == ["💰 Saldo #1", "💰 Saldo #1", "⏸️", "💰 Saldo #2"]
+        assert handler.command_stats['cache_hits'] == 1
+
+    def test_state_commands_run_in_order_per_chat(self, handler, sent):
+        """Los comandos que cambian estado corren de a uno y en orden; los de lectura no esperan"""
+        release = threading.Event()
+        running, order = [], []
+
+        def set_threshold(chat_id, args):
+            running.append(args)
+            assert len(running) == 1, "dos comandos de configuración a la vez"
+            if args == '60':
+                release.wait(5)
+            order.append(args)
+            running.remove(args)
+
+        handler.register_command('/set_buy_threshold', set_threshold)
+        handler.register_command('/pausar', lambda chat_id, args: order.append('pausar'))
+        handler.register_command('/saldo', lambda chat_id, args: handler._send_message(chat_id, "💰"))
+        for i, text in enumerate(['/set_buy_threshold 60', '/set_buy_threshold 70', '/pausar', '/saldo'], 1):
+            handler._process_message(update(text, i))
+
+        deadline = time.time() + 5
+        while "💰" not in sent and time.time() < deadline:
+            time.sleep(0.01)
+        # /saldo respondió mientras el primer /set_* sigue bloqueado
+        assert "💰" in sent and order == []
+        release.set()
+        wait_idle(handler)
+        assert order == ['60', '70', 'pausar']
+        assert handler.command_stats['serialized'] == 2
+
+    def test_repeated_state_command_is_not_coalesced(self, handler, sent):
+        """/pausar en curso, /reanudar, /pausar: el segundo /pausar corre y el bot queda en pausa"""
+        release = threading.Event()
+        state = []
+
+        def pause(chat_id, args):
+            if not state:
+                release.wait(5)
+            state.append('paused')
+
+        handler.register_command('/pausar', pause)
+        handler.register_command('/reanudar', lambda chat_id, args: state.append('resumed'))
+        for i, text in enumerate(['/pausar', '/reanudar', '/pausar'], 1):
+            handler._process_message(update(text, i))
+        release.set()
+        wait_idle(handler)
+
+        assert state == ['paused', 'resumed', 'paused']
+        assert handler.command_stats['coalesced'] == 0
+        assert handler.command_stats['serialized'] == 2
+
+    def test_timeout_notifies_user(self, handler, sent):
+        """Si el comando supera su timeout se avisa y la respuesta llega igual al terminar"""
+        def slow(chat_id, args):
+            time.sleep(0.3)
+            handler._send_message(chat_id, "gráfico")
+
+        handler.register_command('/grafico', slow)
+        handler.command_timeouts['/grafico'] = 0.05
+        handler._process_message(update('/grafico GGAL'))
+        wait_idle(handler)
+
+        assert handler.command_stats['timeouts'] == 1
+        assert sent[0].startswith("⏱️") and sent[-1] == "gráfico"
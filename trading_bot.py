@@ -37,13 +37,16 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import time
 import threading
 from datetime import datetime, timedelta
-from src.services.prediction_service import PredictionService
 from src.services.technical_analysis import TechnicalAnalysisService
+from src.services.bar_aggregator import IntradayBarAggregator
 from src.services.portfolio_optimizer import PortfolioOptimizer
 from src.services.alert_system import AlertSystem
 from src.services.adaptive_risk_manager import AdaptiveRiskManager
+from src.services.signal_scoring import score_signal, classify_score, load_thresholds
 from src.services.portfolio_persistence import sync_from_iol, load_portfolio
 from src.core.logger import get_logger
+from src.core.async_logging import logging_latency
+from src.core.metrics import metrics, timed
 from src.core.safe_logger import safe_log, safe_info, safe_error, safe_warning
 from src.core.safe_print import safe_print as _safe_print
 from src.services.continuous_learning import ContinuousLearning
@@ -68,10 +71,11 @@ from src.services.telegram_bot import TelegramAlertBot
 from src.services.advanced_learning import AdvancedLearningSystem
 from src.services.enhanced_learning_system import EnhancedLearningSystem
 from src.services.operation_notifier import OperationNotifier
+from src.services.operations_log import get_operations_log
 from src.services.realtime_alerts import RealtimeAlertSystem
 from src.services.price_monitor import PriceMonitor
-from src.services.enhanced_sentiment import EnhancedSentimentAnalysis
 from src.services.daily_report_service import DailyReportService
+from src.core.service_registry import ServiceRegistry, LazyService
 
 logger = get_logger("trading_bot")
 
@@ -81,6 +85,20 @@ class TradingBot:
     Soporta modo Paper Trading y Live Trading con estrategias profesionales.
     """
     
+    # Servicios de construcción perezosa (registrados en _register_services)
+    prediction_service = LazyService()
+    portfolio_optimizer = LazyService()
+    alert_system = LazyService()
+    continuous_learning = LazyService()
+    professional_trader = LazyService()
+    advanced_learning = LazyService()
+    enhanced_learning = LazyService()
+    realtime_alerts = LazyService()
+    price_monitor = LazyService()
+    sentiment_analysis = LazyService()
+    daily_report_service = LazyService()
+    auto_configurator = LazyService()
+    
     def __init__(self, symbols=None, initial_capital=None, paper_trading=True):
         """
         Args:
@@ -95,6 +113,7 @@ class TradingBot:
         # Flag para evitar ejecuciones simultáneas de análisis
         self._analysis_running = False
         self._analysis_lock = threading.Lock()
+        self._symbols_lock = threading.Lock()  # self.symbols se reasigna desde los hilos de sync/Telegram
         
         # Control de estado del bot
         self._paused = False  # Para /pause y /resume
@@ -102,57 +121,52 @@ class TradingBot:
         self._start_time = datetime.now()  # Para /uptime y /next
         self._last_analysis_time = None  # Para /next
         
+        # Registro de servicios: los servicios pesados se construyen en el primer
+        # uso o en el warm-up paralelo en background (ver _register_services)
+        self.services = ServiceRegistry()
+        startup_begin = time.perf_counter()
+        
+        # Configuración profesional (se relee en cada cambio del portafolio y al guardarla por Telegram)
+        self._professional_config = self._read_professional_config()
+        
         # Initialize IOL client
-        self.iol_client = IOLClient()
+        with self.services.measure('iol_client'):
+            self.iol_client = IOLClient()
         
         # Obtener capital inicial
         if initial_capital is None and not paper_trading:
             # Obtener saldo real de IOL
-            self.capital = self.iol_client.get_available_balance()
+            with self.services.measure('iol_balance'):
+                self.capital = self.iol_client.get_available_balance()
             print(f"💰 Saldo obtenido de IOL: ${self.capital:.2f} ARS")
         else:
             self.capital = initial_capital or 100.0
         
-        # Initialize services
-        self.prediction_service = PredictionService()
+        # Barras intradiarias (1m/5m/15m) construidas desde cotizaciones de IOL
+        self.bar_aggregator = IntradayBarAggregator(iol_client=self.iol_client)
         # Pass IOL client for real-time data
-        self.technical_service = TechnicalAnalysisService(iol_client=self.iol_client)
-        self.portfolio_optimizer = PortfolioOptimizer()
-        self.alert_system = AlertSystem()
-        self.telegram_bot = TelegramAlertBot() # Telegram Integration
-        
-        # Telegram Command Handler (para recibir mensajes)
-        from src.services.telegram_command_handler import TelegramCommandHandler
-        self.telegram_command_handler = TelegramCommandHandler()
-        # Registrar comandos personalizados del bot
-        self._register_telegram_commands()
+        self.technical_service = TechnicalAnalysisService(
+            iol_client=self.iol_client, bar_aggregator=self.bar_aggregator
+        )
+        with self.services.measure('telegram'):
+            self.telegram_bot = TelegramAlertBot() # Telegram Integration
+            
+            # Telegram Command Handler (para recibir mensajes)
+            from src.services.telegram_command_handler import TelegramCommandHandler
+            self.telegram_command_handler = TelegramCommandHandler()
+            # Registrar comandos personalizados del bot
+            self._register_telegram_commands()
         
         self.risk_manager = AdaptiveRiskManager(initial_capital=self.capital)
         # Asegurar que current_capital también se inicialice con el capital real
         self.risk_manager.current_capital = self.capital
         
-        self.continuous_learning = ContinuousLearning()
-        # Cargar configuración profesional desde professional_config.json si existe
-        config_file = Path("professional_config.json")
-        if config_file.exists():
-            self.professional_trader = ProfessionalTrader(config_file="professional_config.json")
-        else:
-            self.professional_trader = ProfessionalTrader()  # Usar default si no existe
-        self.advanced_learning = AdvancedLearningSystem()  # NEW: Advanced learning system
-        # Inicializar enhanced learning con manejo de errores
-        try:
-            self.enhanced_learning = EnhancedLearningSystem()  # NEW: Enhanced learning (símbolos, horarios, condiciones)
-        except Exception as e:
-            try:
-                safe_warning(logger, f"No se pudo inicializar EnhancedLearningSystem: {e}")
-            except:
-                pass
-            self.enhanced_learning = None  # Continuar sin este sistema si falla
         self.operation_notifier = OperationNotifier(enable_telegram=True)  # NEW: Operation notifications
-        self.realtime_alerts = RealtimeAlertSystem()  # NEW: Real-time alerts
-        self.price_monitor = PriceMonitor()  # NEW: Price monitoring
-        self.sentiment_analysis = EnhancedSentimentAnalysis()  # NEW: Sentiment analysis
-        self.daily_report_service = DailyReportService(telegram_bot=self.telegram_bot)  # NEW: Daily reports
+        
+        # Servicios pesados (TensorFlow, aprendizaje, sentimiento, reportes...):
+        # se registran sin construir y se calientan en paralelo en background
+        self._register_services()
+        self.services.warm_up_async(max_workers=4)
         
         # ACTUALIZACIÓN INMEDIATA DEL SALDO al iniciar (solo en modo LIVE)
         if not self.paper_trading:
@@ -179,8 +193,6 @@ class TradingBot:
                 except:
                     pass
                 print(f"⚠️  Usando saldo inicial: ${self.capital:,.2f} ARS")
-        from src.services.auto_configurator import AutoConfigurator
-        self.auto_configurator = AutoConfigurator()  # NEW: Auto-configuration system
         
         # Load persistent portfolio
         from src.services.portfolio_persistence import load_portfolio
@@ -192,25 +204,11 @@ class TradingBot:
         if symbols is None or len(symbols) == 0:
             symbols = []
             
-            # Cargar configuración de monitoreo desde professional_config.json
-            import json
-            config_file = Path("professional_config.json")
-            use_portfolio = True
-            additional_symbols_config = []
-            max_symbols = 50
-            if config_file.exists():
-                try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        config_data = json.load(f)
-                        monitoring = config_data.get('monitoring', {})
-                        use_portfolio = monitoring.get('use_portfolio_symbols', True)
-                        additional_symbols_config = monitoring.get('additional_symbols', [])
-                        max_symbols = monitoring.get('max_symbols', 50)
-                except Exception as e:
-                    try:
-                        safe_warning(logger, f"Error cargando configuración de monitoreo: {e}")
-                    except:
-                        pass
+            # Configuración de monitoreo (professional_config.json, leído al inicio)
+            monitoring = self._professional_config.get('monitoring', {})
+            use_portfolio = monitoring.get('use_portfolio_symbols', True)
+            additional_symbols_config = monitoring.get('additional_symbols', [])
+            max_symbols = monitoring.get('max_symbols', 50)
             
             # 1. PRIORIDAD ALTA: Cargar desde portafolio guardado (my_portfolio.json)
             portfolio_symbols = []
@@ -266,14 +264,23 @@ class TradingBot:
         
         self.symbols = symbols if symbols else ['AAPL']  # Asegurar al menos un símbolo
         
+        # Cambios del portafolio (syncs, dashboard) llegan por evento, sin releer el JSON
+        from src.services.portfolio_persistence import subscribe_portfolio_changes
+        subscribe_portfolio_changes(self._on_portfolio_change)
+        # En paper trading el motor de riesgo solo sigue las posiciones simuladas
+        # (no se mezclan con las reales de my_portfolio.json)
+        if not self.paper_trading:
+            self.risk_manager.portfolio_risk.set_positions(self.portfolio)
+        
         # Verificar disponibilidad en IOL si no es paper trading
         if not self.paper_trading:
             from src.services.iol_availability_checker import IOLAvailabilityChecker
             availability_checker = IOLAvailabilityChecker(self.iol_client)
             
-            # Verificar todos los símbolos
+            # Verificar todos los símbolos (consultas concurrentes)
             print("\n🔍 Verificando disponibilidad de símbolos en IOL...")
-            unavailable = availability_checker.get_unavailable_symbols(self.symbols)
+            with self.services.measure('availability_check'):
+                unavailable = availability_checker.get_unavailable_symbols(self.symbols, max_workers=8)
             
             if unavailable:
                 print(f"\n{'='*60}")
@@ -311,7 +318,66 @@ class TradingBot:
             print(f"⚠️  Max position size: {self.risk_manager.base_position_size_pct*100}% (${self.capital * self.risk_manager.base_position_size_pct:.2f})")
             print(f"⚠️  Max daily trades: {self.risk_manager.max_daily_trades}")
             print(f"⚠️  Max daily loss: {self.risk_manager.max_daily_loss_pct*100}%\n")
+        
+        self.services.timings['startup_total'] = time.perf_counter() - startup_begin
+        print(self.services.timing_report())
     
+    def _read_professional_config(self):
+        """Lee professional_config.json (dict vacío si no existe o es inválido)"""
+        import json
+        config_file = Path("professional_config.json")
+        if not config_file.exists():
+            return {}
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            try:
+                safe_warning(logger, f"Error cargando professional_config.json: {e}")
+            except:
+                pass
+            return {}
+    
+    def _register_services(self):
+        """
+        Registra los servicios de construcción perezosa.
+        Se construyen en el primer acceso al atributo o en el warm-up paralelo.
+        """
+        def build_prediction_service():
+            # Importar aquí: el módulo carga TensorFlow
+            from src.services.prediction_service import PredictionService
+            return PredictionService()
+        
+        def build_professional_trader():
+            # Cargar configuración profesional desde professional_config.json si existe
+            if Path("professional_config.json").exists():
+                return ProfessionalTrader(config_file="professional_config.json")
+            return ProfessionalTrader()  # Usar default si no existe
+        
+        def build_sentiment_analysis():
+            from src.services.enhanced_sentiment import EnhancedSentimentAnalysis
+            return EnhancedSentimentAnalysis()
+        
+        def build_auto_configurator():
+            from src.services.auto_configurator import AutoConfigurator
+            return AutoConfigurator()
+        
+        self.services.register('prediction_service', build_prediction_service)
+        self.services.register('portfolio_optimizer', PortfolioOptimizer)
+        self.services.register('alert_system', AlertSystem)
+        self.services.register('continuous_learning', ContinuousLearning)
+        self.services.register('professional_trader', build_professional_trader)
+        self.services.register('advanced_learning', AdvancedLearningSystem)  # Advanced learning system
+        # Enhanced learning (símbolos, horarios, condiciones): opcional, None si falla
+        self.services.register('enhanced_learning', EnhancedLearningSystem, optional=True)
+        self.services.register('realtime_alerts', RealtimeAlertSystem)
+        self.services.register('price_monitor', PriceMonitor)
+        self.services.register('sentiment_analysis', build_sentiment_analysis)
+        self.services.register('daily_report_service',
+                               lambda: DailyReportService(telegram_bot=self.telegram_bot))
+        self.services.register('auto_configurator', build_auto_configurator)
+    
+    @timed("analyze_symbol_seconds")
     def analyze_symbol(self, symbol):
         """
         Perform complete analysis on a symbol.
@@ -432,137 +498,29 @@ class TradingBot:
         # 3. Determine final signal using Weighted Voting System (Score 0-100)
         # Previous consensus logic was too strict, leading to constant HOLD
         
-        score = 0
-        buy_factors = []
-        sell_factors = []
-        
-        # A. AI Signal Impact (Max 30 pts) - con fallback a análisis técnico
-        ai_signal = None
-        ai_pred_change = 0.0
-        ai_source = "none"
-        
-        if analysis_result.get('ai_signal'):
-            ai_signal = analysis_result['ai_signal'].get('signal')
-            ai_pred_change = analysis_result['ai_signal'].get('change_pct', 0.0)
-            ai_source = analysis_result['ai_signal'].get('source', 'ai_model')
-        
-        if ai_signal == 'BUY':
-            # Ajustar puntos según fuente: IA tiene más peso que análisis técnico
-            base_points = 30 if ai_pred_change > 2.0 else 15
-            points = base_points if ai_source == 'ai_model' else int(base_points * 0.7)
-            score += points
-            source_label = "IA" if ai_source == 'ai_model' else "Técnico"
-            buy_factors.append(f"{source_label} Bullish (+{points})")
-        elif ai_signal == 'SELL':
-            base_points = 30 if ai_pred_change < -2.0 else 15
-            points = base_points if ai_source == 'ai_model' else int(base_points * 0.7)
-            score -= points
-            source_label = "IA" if ai_source == 'ai_model' else "Técnico"
-            sell_factors.append(f"{source_label} Bearish (-{points})")
-            
-        # B. Technical Signal Impact (Max 40 pts)
-        # RSI Analysis
-        rsi = None
-        if (analysis_result.get('technical_signal') and 
-            analysis_result['technical_signal'].get('momentum') and 
-            'rsi' in analysis_result['technical_signal']['momentum']):
-            rsi = analysis_result['technical_signal']['momentum']['rsi']
-        
-        if rsi:
-            if rsi < 30: # Oversold
-                score += 20
-                buy_factors.append("RSI Oversold (+20)")
-            elif rsi > 70: # Overbought
-                score -= 20
-                sell_factors.append("RSI Overbought (-20)")
-            elif 50 < rsi < 70: # Bullish Trend
-                score += 5
-                buy_factors.append("RSI Uptrend (+5)")
-            elif 30 < rsi < 50: # Bearish Trend
-                score -= 5
-                sell_factors.append("RSI Downtrend (-5)")
-                
-        # MACD Analysis
-        macd = None
-        macd_signal = None
-        if (analysis_result.get('technical_signal') and 
-            analysis_result['technical_signal'].get('momentum')):
-            macd = analysis_result['technical_signal']['momentum'].get('macd')
-            macd_signal = analysis_result['technical_signal']['momentum'].get('macd_signal')
-        
-        if macd is not None and macd_signal is not None:
-            if macd > macd_signal:
-                score += 15
-                buy_factors.append("MACD > Signal (+15)")
-            else:
-                score -= 15
-                sell_factors.append("MACD < Signal (-15)")
-        
-        # C. Trend Analysis (Max 10 pts)
-        current_price = None
-        sma_20 = None
-        if (analysis_result.get('technical_signal') and 
-            analysis_result['technical_signal'].get('trend')):
-            current_price = analysis_result['technical_signal']['trend'].get('current_price')
-            sma_20 = analysis_result['technical_signal']['trend'].get('sma_20')
-        
-        if current_price and sma_20:
-            if current_price > sma_20:
-                score += 10
-                buy_factors.append("Price > SMA20 (+10)")
-            else:
-                score -= 10
-                sell_factors.append("Price < SMA20 (-10)")
-        
-        # D. Sentiment Analysis Impact (Max 20 pts)
-        sentiment_result = analysis_result.get('sentiment')
-        if sentiment_result and sentiment_result.get('sample_size', 0) > 0:
-            sentiment_score = sentiment_result.get('score', 0)
-            overall_sentiment = sentiment_result.get('overall_sentiment', 'NEUTRAL')
-            
-            if overall_sentiment == 'POSITIVE':
-                # Score positivo: +10 a +20 puntos según intensidad
-                points = 20 if sentiment_score > 0.3 else 15 if sentiment_score > 0.15 else 10
-                score += points
-                buy_factors.append(f"Sentiment Positive (+{points})")
-            elif overall_sentiment == 'NEGATIVE':
-                # Score negativo: -10 a -20 puntos según intensidad
-                points = 20 if sentiment_score < -0.3 else 15 if sentiment_score < -0.15 else 10
-                score -= points
-                sell_factors.append(f"Sentiment Negative (-{points})")
-            # NEUTRAL no afecta el score
+        score, buy_factors, sell_factors = score_signal(
+            analysis_result.get('ai_signal'),
+            analysis_result.get('technical_signal'),
+            analysis_result.get('sentiment')
+        )
+        technical = analysis_result.get('technical_signal') or {}
+        current_price = (technical.get('trend') or {}).get('current_price')
 
         # Decision Thresholds (cargar desde professional_config.json)
         try:
-            from pathlib import Path
-            import json
-            config_file = Path("professional_config.json")
-            if config_file.exists():
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    buy_threshold = config.get('buy_threshold', 30)
-                    sell_threshold = config.get('sell_threshold', -30)
-            else:
+            thresholds = load_thresholds()
+            if thresholds is None:
                 # Fallback a parámetros adaptativos si no existe el archivo
                 strategy_params = self.advanced_learning.adaptive_strategy.get_current_params()
-                buy_threshold = strategy_params.get('buy_threshold', 25)
-                sell_threshold = strategy_params.get('sell_threshold', -25)
+                thresholds = strategy_params.get('buy_threshold', 25), strategy_params.get('sell_threshold', -25)
         except Exception as e:
             # Fallback a parámetros adaptativos si hay error
             safe_warning(logger, f"Error cargando umbrales desde professional_config.json: {e}")
             strategy_params = self.advanced_learning.adaptive_strategy.get_current_params()
-            buy_threshold = strategy_params.get('buy_threshold', 25)
-            sell_threshold = strategy_params.get('sell_threshold', -25)
+            thresholds = strategy_params.get('buy_threshold', 25), strategy_params.get('sell_threshold', -25)
+        buy_threshold, sell_threshold = thresholds
         
-        final_signal = 'HOLD'
-        confidence = 'LOW'
-        
-        if score >= buy_threshold:
-            final_signal = 'BUY'
-            confidence = 'HIGH' if score >= (buy_threshold + 25) else 'MEDIUM'
-        elif score <= sell_threshold:
-            final_signal = 'SELL'
-            confidence = 'HIGH' if score <= (sell_threshold - 25) else 'MEDIUM'
+        final_signal, confidence = classify_score(score, buy_threshold, sell_threshold)
             
         print(f"\n📊 Scoring Analysis (Score: {score}):")
         print(f"   Buy Factors: {', '.join(buy_factors) if buy_factors else 'None'}")
@@ -909,6 +867,23 @@ class TradingBot:
                 "reason": "Risk Manager blocked"
             }
         
+        # Control pre-trade de riesgo de portafolio (VaR incremental, O(1))
+        risk_ok, risk_reason, risk_metrics = self.risk_manager.check_order_risk(symbol, signal, quantity, price)
+        if not risk_ok:
+            print(f"\n⛔ Trade blocked by portfolio risk: {risk_reason}")
+            self.operation_notifier.notify_alert(
+                f"Operación bloqueada: {symbol}",
+                f"Riesgo de portafolio: {risk_reason}",
+                level="warning"
+            )
+            return {
+                "status": "BLOCKED",
+                "error": risk_reason,
+                "symbol": symbol,
+                "reason": "Portfolio risk limit",
+                "portfolio_risk": risk_metrics
+            }
+        
         print(f"\n⚡ Executing {signal} Order:")
         print(f"   Symbol: {symbol}")
         print(f"   Quantity: {quantity}")
@@ -983,6 +958,7 @@ class TradingBot:
             
             # Marcar como FILLED después de simular exitosamente
             trade_record['status'] = 'FILLED'
+            self.risk_manager.portfolio_risk.apply_order(symbol, signal, quantity, price)
             
             # Si es una venta, calcular P&L simulado para aprendizaje
             if signal == 'SELL':
@@ -1121,6 +1097,7 @@ class TradingBot:
                     print(f"✅ Orden ejecutada en IOL: ID {order_id}")
                     trade_record['order_id'] = order_id
                     trade_record['status'] = 'FILLED'
+                    self.risk_manager.portfolio_risk.apply_order(symbol, signal, quantity, price)
                 else:
                     # Respuesta sin error pero sin numeroOperacion (raro)
                     print(f"⚠️  Respuesta inesperada de IOL (sin numeroOperacion): {response}")
@@ -1385,6 +1362,7 @@ class TradingBot:
             try:
                 with open(config_file, 'w', encoding='utf-8') as f:
                     json.dump(config, f, indent=2, ensure_ascii=False)
+                self._professional_config = config
                 return True
             except Exception as e:
                 safe_error(logger, f"Error guardando professional_config.json: {e}")
@@ -1747,34 +1725,15 @@ class TradingBot:
         def handle_scores(chat_id, args):
             """Muestra los scores recientes de los análisis"""
             try:
-                import json
                 from datetime import datetime as dt
                 
-                # Leer desde operations_log.json
-                operations_file = Path("data/operations_log.json")
-                
-                if not operations_file.exists():
-                    self.telegram_command_handler._send_message(
-                        chat_id,
-                        "ℹ️ No hay datos de análisis disponibles aún.\n"
-                        "💡 Ejecuta /analyze para generar análisis y scores."
-                    )
-                    return
-                
-                # Leer y filtrar análisis recientes
+                # Últimos análisis del log de operaciones (solo se leen los segmentos finales)
                 try:
-                    with open(operations_file, 'r', encoding='utf-8') as f:
-                        operations = json.load(f)
-                    
-                    # Filtrar solo análisis y ordenar por timestamp
                     analyses = [
-                        op for op in operations 
-                        if op.get('type') == 'ANALYSIS' and op.get('data', {}).get('score') is not None
+                        op for op in reversed(get_operations_log().tail(200, types={'ANALYSIS'}))
+                        if op.get('data', {}).get('score') is not None
                     ]
                     
-                    # Ordenar por timestamp (más reciente primero)
-                    analyses.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-                    
                     if not analyses:
                         self.telegram_command_handler._send_message(
                             chat_id,
@@ -1783,7 +1742,7 @@ class TradingBot:
                         )
                         return
                     
-                    # Tomar los últimos 10
+                    # Tomar los últimos 10 (más reciente primero)
                     recent_analyses = analyses[:10]
                     
                     message = "📊 *Scores Recientes:*\n\n"
@@ -1820,12 +1779,6 @@ class TradingBot:
                     
                     self.telegram_command_handler._send_message(chat_id, message)
                     
-                except json.JSONDecodeError as e:
-                    self.telegram_command_handler._send_message(
-                        chat_id,
-                        f"❌ Error leyendo archivo de operaciones: {e}\n"
-                        "💡 El archivo puede estar corrupto."
-                    )
                 except Exception as e:
                     self.telegram_command_handler._send_message(
                         chat_id,
@@ -2634,69 +2587,71 @@ O desde PowerShell:
     
     def sync_portfolio(self):
         """
-        Synchronize local portfolio with IOL and update monitored symbols.
+        Synchronize local portfolio with IOL.
+        El estado del portafolio solo escribe my_portfolio.json y publica un
+        cambio (ver _on_portfolio_change) si IOL trajo algo distinto.
         """
         if not self.paper_trading and self.iol_client:
             print("🔄 Auto-syncing portfolio...")
-            old_portfolio_count = len(self.portfolio) if self.portfolio else 0
-            
             sync_from_iol(self.iol_client)
-            
-            # Recargar portafolio actualizado
-            self.portfolio = load_portfolio()
-            new_portfolio_count = len(self.portfolio) if self.portfolio else 0
-            
-            # Actualizar símbolos monitoreados si el portafolio cambió
-            import json
-            config_file = Path("professional_config.json")
-            use_portfolio = True
-            additional_symbols = []
-            if config_file.exists():
-                try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        config_data = json.load(f)
-                        monitoring = config_data.get('monitoring', {})
-                        use_portfolio = monitoring.get('use_portfolio_symbols', True)
-                        additional_symbols = monitoring.get('additional_symbols', [])
-                except Exception:
-                    pass
-            
-            if use_portfolio and self.portfolio:
-                portfolio_symbols = [p.get('symbol', '').strip() for p in self.portfolio if p.get('symbol')]
-                
-                # Combinar portafolio + adicionales
-                all_symbols = list(set(portfolio_symbols + additional_symbols))
-                
-                # Actualizar si hay cambios
-                if set(all_symbols) != set(self.symbols):
-                    old_count = len(self.symbols)
+
+    def _on_portfolio_change(self, change):
+        """
+        Suscriptor del estado del portafolio: aplica el diff (syncs de IOL /
+        Tienda Broker, guardados del dashboard) y actualiza los símbolos
+        monitoreados sin releer el JSON.
+        """
+        old_portfolio_count = len(self.portfolio) if self.portfolio else 0
+        self.portfolio = change.portfolio
+        if not self.paper_trading:
+            self.risk_manager.portfolio_risk.set_positions(self.portfolio)
+        new_portfolio_count = len(self.portfolio)
+        print(f"📊 Portafolio actualizado ({change.source}): +{len(change.added)} "
+              f"-{len(change.removed)} ~{len(change.changed)} "
+              f"({old_portfolio_count} → {new_portfolio_count} activos)")
+
+        # Releer: los símbolos adicionales pudieron cambiar desde el dashboard o Telegram
+        self._professional_config = self._read_professional_config()
+        monitoring = self._professional_config.get('monitoring', {})
+        use_portfolio = monitoring.get('use_portfolio_symbols', True)
+        additional_symbols = monitoring.get('additional_symbols', [])
+        if use_portfolio and self.portfolio and hasattr(self, 'symbols'):
+            portfolio_symbols = [p.get('symbol', '').strip() for p in self.portfolio if p.get('symbol')]
+            
+            # Combinar portafolio + adicionales
+            all_symbols = list(set(portfolio_symbols + additional_symbols))
+            with self._symbols_lock:
+                old_count = len(self.symbols)
+                changed = set(all_symbols) != set(self.symbols)
+                if changed:
                     self.symbols = all_symbols
-                    new_count = len(self.symbols)
-                    print(f"🔄 Símbolos monitoreados actualizados: {old_count} → {new_count}")
-                    
-                    if new_portfolio_count != old_portfolio_count:
-                        print(f"📊 Portafolio actualizado: {old_portfolio_count} → {new_portfolio_count} activos")
-            
-            # 📢 NOTIFICACIÓN: Mostrar actualización de portafolio
+            if changed:
+                print(f"🔄 Símbolos monitoreados actualizados: {old_count} → {len(all_symbols)}")
+        
+        # Las respuestas cacheadas de /portfolio, /saldo, etc. quedaron viejas
+        command_handler = getattr(self, 'telegram_command_handler', None)
+        if command_handler is not None:
+            command_handler.invalidate_responses()
+        
+        # 📢 NOTIFICACIÓN: Mostrar actualización de portafolio
+        try:
+            if self.portfolio:
+                total_value = sum(p.get('current_value', 0) for p in self.portfolio)
+                total_cost = sum(p.get('cost_basis', 0) for p in self.portfolio)
+                total_pnl = total_value - total_cost
+                total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
+                
+                self.operation_notifier.notify_portfolio_update({
+                    'total_value': total_value,
+                    'total_pnl': total_pnl,
+                    'total_pnl_pct': total_pnl_pct,
+                    'positions_count': len(self.portfolio),
+                })
+        except Exception as e:
             try:
-                portfolio = load_portfolio()
-                if portfolio:
-                    total_value = sum(p.get('current_value', 0) for p in portfolio)
-                    total_cost = sum(p.get('cost_basis', 0) for p in portfolio)
-                    total_pnl = total_value - total_cost
-                    total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
-                    
-                    self.operation_notifier.notify_portfolio_update({
-                        'total_value': total_value,
-                        'total_pnl': total_pnl,
-                        'total_pnl_pct': total_pnl_pct,
-                        'positions_count': len(portfolio),
-                    })
-            except Exception as e:
-                try:
-                    safe_warning(logger, f"Error notificando actualización de portafolio: {e}")
-                except:
-                    pass
+                safe_warning(logger, f"Error notificando actualización de portafolio: {e}")
+            except:
+                pass
 
     def run_analysis_cycle(self):
         """
@@ -2716,6 +2671,8 @@ O desde PowerShell:
         try:
             self._analysis_running = True
             self._last_analysis_time = datetime.now()  # Track for /next command
+            logging_latency.start_cycle()  # Medir cuánto agrega el logging a este ciclo
+            metrics.start_cycle()  # Resumen de tiempos por sección del ciclo
             
             # Check if trading is paused
             if self._paused:
@@ -2729,6 +2686,17 @@ O desde PowerShell:
             
             results = []
             
+            # Todo el ciclo trabaja sobre la misma lista aunque un sync la reasigne
+            with self._symbols_lock:
+                symbols = list(self.symbols)
+            
+            # Covarianza del motor de riesgo: se recalcula solo cuando venció
+            if self.risk_manager.portfolio_risk.is_stale():
+                try:
+                    self.risk_manager.portfolio_risk.refresh(symbols)
+                except Exception as e:
+                    safe_warning(logger, f"Error actualizando covarianza de riesgo: {e}")
+            
             # 🧠 APRENDIZAJE: Ejecutar ciclo de aprendizaje antes de analizar
             try:
                 learning_summary = self.advanced_learning.run_learning_cycle()
@@ -2739,7 +2707,7 @@ O desde PowerShell:
             except Exception as e:
                 print(f"⚠️  Error en ciclo de aprendizaje: {e}")
             
-            for symbol in self.symbols:
+            for symbol in symbols:
                 # Fetch latest data (Fallback to Yahoo if IOL fails)
                 try:
                     from scripts.ingest_data import ingest_symbol
@@ -2758,7 +2726,7 @@ O desde PowerShell:
             print(f"{'='*60}")
             
             try:
-                returns_df = self.portfolio_optimizer.get_returns_data(self.symbols, days=252)
+                returns_df = self.portfolio_optimizer.get_returns_data(symbols, days=252)
                 
                 # Validar que tenemos datos suficientes
                 if returns_df.empty or len(returns_df.columns) < 2:
@@ -2836,6 +2804,10 @@ O desde PowerShell:
             else:
                 print("ℹ️ Ciclo sin novedades relevantes. Silenciando notificación.")
             
+            log_cost = logging_latency.cycle_summary()
+            print(f"📝 Logging del ciclo: {log_cost['records']} registros, "
+                  f"{log_cost['logging_ms']:.1f} ms en el hilo de trading")
+            
             return results
         except Exception as e:
             # Log del error pero no interrumpir el bot (con logging seguro)
@@ -2848,6 +2820,10 @@ O desde PowerShell:
                 print(f"   Tipo: {type(e).__name__}")
             return []
         finally:
+            cycle = metrics.end_cycle(symbols=len(self.symbols))
+            if cycle:
+                metrics.observe("analysis_cycle_seconds", cycle['total_ms'] / 1000)
+                metrics.export_snapshot()
             # Liberar el flag y el lock al finalizar (incluso si hay error)
             self._analysis_running = False
             self._analysis_lock.release()
@@ -2887,6 +2863,23 @@ O desde PowerShell:
         else:
             print("ℹ️  Telegram command handler no disponible - Comandos de Telegram deshabilitados")
         
+        # Iniciar feed intradiario (barras desde cotizaciones de IOL)
+        try:
+            import json
+            intraday_enabled = False  # Opt-in: duplica el tráfico de cotizaciones a IOL
+            intraday_poll_seconds = 30
+            config_file = Path("professional_config.json")
+            if config_file.exists():
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    monitoring = json.load(f).get('monitoring', {})
+                    intraday_enabled = monitoring.get('intraday_bars_enabled', False)
+                    intraday_poll_seconds = monitoring.get('intraday_poll_seconds', 30)
+            if intraday_enabled and not self.bar_aggregator.running:
+                self.bar_aggregator.start(lambda: list(self.symbols), interval=intraday_poll_seconds)
+                print(f"📈 Barras intradiarias activas (cotizaciones cada {intraday_poll_seconds}s)")
+        except Exception as e:
+            safe_warning(logger, f"No se pudo iniciar el feed intradiario: {e}")
+        
         # Contador para autoconfiguración (cada 24 horas o cada 50 trades)
         last_auto_config = datetime.now()
         auto_config_interval = timedelta(hours=24)
@@ -3121,6 +3114,11 @@ Se ajustaron {len(result['changes'])} parámetros:
                 
         except KeyboardInterrupt:
             print("\n\n🛑 Bot stopped by user")
+            # Detener feed intradiario (escribe las barras pendientes)
+            try:
+                self.bar_aggregator.stop()
+            except Exception:
+                pass
             # Detener polling de Telegram
             if hasattr(self, 'telegram_command_handler') and self.telegram_command_handler:
                 try:
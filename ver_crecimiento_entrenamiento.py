@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import Dict, List
 import sqlite3
 
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+
 def get_trained_models() -> Dict[str, dict]:
     """Obtiene información de modelos entrenados"""
     models_dir = Path("models")
@@ -103,25 +105,23 @@ def get_database_stats() -> Dict[str, int]:
 
 def get_operations_log_stats() -> Dict[str, any]:
     """Obtiene estadísticas del log de operaciones"""
-    log_file = Path("data/operations_log.json")
     stats = {
         "total_analyses": 0,
         "symbols_analyzed": set(),
         "date_range": {"first": None, "last": None}
     }
     
-    if not log_file.exists():
+    if not DEFAULT_LOG_DIR.exists():
         return stats
     
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
+        operations = get_operations_log().read_from(0, types={'ANALYSIS'})
         
         stats["total_analyses"] = len(operations)
         
         dates = []
         for op in operations:
-            symbol = op.get("symbol", "UNKNOWN")
+            symbol = op.get("data", {}).get("symbol", "UNKNOWN")
             stats["symbols_analyzed"].add(symbol)
             
             timestamp = op.get("timestamp", "")
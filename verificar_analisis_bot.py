@@ -7,6 +7,8 @@ import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+
 def verificar_analisis():
     """Verifica si el bot está analizando activamente"""
     print("\n" + "="*70)
@@ -108,34 +110,26 @@ def verificar_analisis():
     else:
         print("❌ Directorio de logs no existe")
     
-    # 3. Verificar operations_log.json
+    # 3. Verificar el log de operaciones
     print("\n3️⃣ OPERACIONES REGISTRADAS")
     print("-" * 70)
-    operations_file = Path("data/operations_log.json")
-    if operations_file.exists():
+    if DEFAULT_LOG_DIR.exists():
         try:
-            with open(operations_file, 'r', encoding='utf-8') as f:
-                operations = json.load(f)
+            operations_log = get_operations_log()
+            total = operations_log.count()
             
-            if operations:
-                print(f"✅ Total de operaciones: {len(operations)}")
+            if total:
+                print(f"✅ Total de operaciones: {total}")
                 
-                # Operaciones recientes (últimas 24 horas)
+                # Operaciones recientes (últimas 24 horas, solo los segmentos del rango)
                 cutoff = datetime.now() - timedelta(hours=24)
-                recent_ops = []
-                for op in operations:
-                    try:
-                        op_time = datetime.fromisoformat(op.get('timestamp', ''))
-                        if op_time >= cutoff:
-                            recent_ops.append(op)
-                    except:
-                        pass
+                recent_ops = list(operations_log.range(start=cutoff))
                 
                 if recent_ops:
                     print(f"   📊 Operaciones en las últimas 24h: {len(recent_ops)}")
                     print(f"\n   📋 Últimas 3 operaciones:")
                     for op in recent_ops[-3:]:
-                        symbol = op.get('symbol', 'N/A')
+                        symbol = op.get('data', {}).get('symbol', 'N/A')
                         op_type = op.get('type', 'N/A')
                         timestamp = op.get('timestamp', 'N/A')
                         print(f"      • {symbol} - {op_type} - {timestamp}")
@@ -143,16 +137,16 @@ def verificar_analisis():
                     print(f"   ⚠️  No hay operaciones en las últimas 24 horas")
                 
                 # Última operación
-                last_op = operations[-1]
+                last_op = operations_log.tail(1)[-1]
                 last_time = datetime.fromisoformat(last_op.get('timestamp', ''))
                 time_diff = datetime.now() - last_time
                 print(f"\n   🕐 Última operación: hace {time_diff}")
             else:
-                print("⚠️  Archivo existe pero está vacío")
+                print("⚠️  El log de operaciones está vacío")
         except Exception as e:
             print(f"⚠️  Error leyendo operaciones: {e}")
     else:
-        print("❌ Archivo operations_log.json no existe")
+        print("❌ El log de operaciones (data/operations_log/) no existe")
     
     # 4. Verificar trades.json
     print("\n4️⃣ TRADES EJECUTADOS")
@@ -3,8 +3,11 @@ Script para verificar si el bot realizó operaciones
 """
 import json
 from pathlib import Path
+from collections import Counter
 from datetime import datetime
 
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+
 def main():
     print("="*70)
     print("🔍 VERIFICACIÓN DE OPERACIONES DEL BOT")
@@ -66,20 +69,18 @@ def main():
         print("\n⚠️  No se encontró trades.json")
         print("   → El bot aún no ha realizado operaciones")
     
-    # Verificar operations_log.json
-    ops_file = Path("data/operations_log.json")
-    if ops_file.exists():
-        with open(ops_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
-        
-        # Filtrar solo operaciones de trading (no análisis)
-        trade_ops = [op for op in operations if op.get('type') in ['TRADE', 'BUY', 'SELL']]
-        analysis_ops = [op for op in operations if op.get('type') == 'ANALYSIS']
+    # Verificar el log de operaciones (conteos por tipo desde el índice de cada segmento)
+    if DEFAULT_LOG_DIR.exists():
+        operations_log = get_operations_log()
+        by_type = Counter()
+        for segment in operations_log.segments():
+            by_type.update(operations_log.segment_summary(segment)['types'])
+        trade_ops = operations_log.tail(3, types={'TRADE_EXECUTION'})
         
         print(f"\n\n📝 OPERACIONES EN LOG:")
-        print(f"   • Total operaciones: {len(operations)}")
-        print(f"   • Trades: {len(trade_ops)}")
-        print(f"   • Análisis: {len(analysis_ops)}")
+        print(f"   • Total operaciones: {sum(by_type.values())}")
+        print(f"   • Trades: {by_type['TRADE_EXECUTION']}")
+        print(f"   • Análisis: {by_type['ANALYSIS']}")
         
         if trade_ops:
             print(f"\n   📋 Últimas operaciones de trading:")
@@ -90,7 +91,7 @@ def main():
                 timestamp = op.get('timestamp', 'N/A')
                 print(f"      • {symbol} | {action} | {timestamp}")
     else:
-        print("\n⚠️  No se encontró data/operations_log.json")
+        print("\n⚠️  No se encontró el log de operaciones (data/operations_log/)")
     
     # Resumen
     print("\n" + "="*70)
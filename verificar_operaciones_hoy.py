@@ -5,6 +5,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from src.services.operations_log import DEFAULT_LOG_DIR, get_operations_log
+
 def main():
     print("="*70)
     print("🔍 VERIFICACIÓN DE OPERACIONES DE HOY")
@@ -53,26 +55,20 @@ def main():
             print("\n⚠️  No hay trades registrados para hoy")
             print("   → El bot NO ha realizado operaciones hoy")
     
-    # Verificar operations_log.json
-    ops_file = Path("data/operations_log.json")
+    # Verificar el log de operaciones (solo se abren los segmentos de hoy)
     today_operations = []
     today_analyses = []
     
-    if ops_file.exists():
-        with open(ops_file, 'r', encoding='utf-8') as f:
-            operations = json.load(f)
-        
-        # Filtrar operaciones de hoy
-        for op in operations:
-            timestamp = op.get('timestamp', '')
-            if timestamp and timestamp.startswith(today):
-                today_operations.append(op)
-                if op.get('type') == 'ANALYSIS':
-                    today_analyses.append(op)
+    if DEFAULT_LOG_DIR.exists():
+        start = datetime.strptime(today, '%Y-%m-%d')
+        for op in get_operations_log().range(start=start):
+            today_operations.append(op)
+            if op.get('type') == 'ANALYSIS':
+                today_analyses.append(op)
         
         print(f"\n📝 OPERACIONES EN LOG DE HOY: {len(today_operations)}")
         print(f"   • Análisis: {len(today_analyses)}")
-        print(f"   • Trades: {len([o for o in today_operations if o.get('type') in ['TRADE', 'BUY', 'SELL']])}")
+        print(f"   • Trades: {len([o for o in today_operations if o.get('type') == 'TRADE_EXECUTION'])}")
         
         if today_analyses:
             print(f"\n📊 Últimos análisis de hoy:")